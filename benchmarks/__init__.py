@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for the ShortFactory pipeline using simulated providers.
+"""
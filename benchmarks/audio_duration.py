@@ -0,0 +1,103 @@
+"""
+Micro-benchmark of audio duration measurement: frame headers against a full pydub decode.
+
+Writes silent constant bitrate MP3 files of the given lengths and times src.utils.audio.audio_duration
+(which walks every frame header when there is no Xing/VBRI header, its slowest path) and the pydub
+decode it replaced. The decoder needs ffmpeg; without it only the header path is reported.
+
+Usage:
+    python -m benchmarks.audio_duration --seconds 5 30 120 --repeat 20
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fakes import silent_mp3_bytes
+from src.utils.audio import AudioDurationError, audio_duration, decoded_duration
+
+
+def time_method(method: Callable[[str], float], path: str, repeat: int) -> Dict[str, Any]:
+    """
+    Time repeated duration measurements of one file.
+
+    Args:
+        method: Function returning the duration of a file
+        path: Audio file
+        repeat: Number of measurements
+
+    Returns:
+        Measured duration and p50/mean/max milliseconds per call, or the error of the method
+    """
+    timings = []
+    duration = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            duration = method(path)
+        except AudioDurationError as e:
+            return {"error": str(e)}
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return {
+        "duration": round(duration, 4),
+        "p50_ms": round(statistics.median(timings), 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+        "max_ms": round(max(timings), 4)
+    }
+
+
+def run_benchmark(lengths: List[float], repeat: int, work_dir: str) -> List[Dict[str, Any]]:
+    """
+    Compare header and decoder measurements for silent MP3 files of the given lengths.
+
+    Args:
+        lengths: Audio lengths in seconds
+        repeat: Measurements per file and method
+        work_dir: Directory for the generated files
+
+    Returns:
+        One result per length with both timings and the speedup of the header path
+    """
+    results = []
+    for seconds in lengths:
+        path = os.path.join(work_dir, f"silence_{seconds:g}s.mp3")
+        with open(path, "wb") as f:
+            f.write(silent_mp3_bytes(seconds))
+        headers = time_method(audio_duration, path, repeat)
+        decoder = time_method(decoded_duration, path, repeat)
+        result = {"seconds": seconds, "bytes": os.path.getsize(path), "headers": headers, "decoder": decoder}
+        if "error" not in headers and "error" not in decoder and headers["p50_ms"] > 0:
+            result["speedup"] = round(decoder["p50_ms"] / headers["p50_ms"], 1)
+        results.append(result)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark audio duration measurement")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[5.0, 30.0, 120.0], help="Audio lengths to measure")
+    parser.add_argument("--repeat", type=int, default=20, help="Measurements per file and method")
+    parser.add_argument("--output", type=str, help="Path of the results JSON file")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="audio_duration_")
+    try:
+        results = run_benchmark(args.seconds, args.repeat, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = json.dumps({"results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,257 @@
+"""
+Offline stand-ins for the LLM, TTS and image providers with configurable latency and error rates.
+
+The fakes plug in at the provider boundary: the narration and visual fakes subclass the real
+generators and only replace the network call, so caching, rate limiting, checkpointing and profiling
+run exactly as in production. They write real artifacts (silent MP3 frames, solid-colour PNGs), so the
+real VideoAssembler can encode them.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import zlib
+import random
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.generators.narration_generator import NarrationGenerator
+from src.generators.visual_generator import VisualGenerator
+from src.assemblers.video_assembler import VideoAssembler
+from src.models.schemas import GenerationResult
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, mono, no CRC. With all-zero side info the frame decodes to silence.
+MP3_FRAME_HEADER = b"\xff\xfb\x90\xc0"
+MP3_FRAME_BYTES = 144 * 128000 // 44100
+MP3_FRAME_SECONDS = 1152 / 44100
+WORDS_PER_SECOND = 2.5
+
+
+@dataclass
+class LatencyModel:
+    """
+    Latency distribution and failure rate of a simulated provider call.
+
+    Attributes:
+        distribution: "constant", "lognormal" (median = mean_seconds) or "heavy_tailed" (Pareto)
+        mean_seconds: Constant latency, lognormal median or Pareto scale
+        sigma: Lognormal shape
+        alpha: Pareto shape; smaller values give heavier tails
+        error_rate: Probability that a call fails after its latency
+        seed: Optional seed for reproducible runs
+    """
+    distribution: str = "constant"
+    mean_seconds: float = 0.0
+    sigma: float = 0.5
+    alpha: float = 2.5
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.distribution not in ("constant", "lognormal", "heavy_tailed"):
+            raise ValueError(f"Unsupported latency distribution: {self.distribution}")
+        self._random = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """Draw one latency in seconds."""
+        with self._lock:
+            if self.distribution == "constant":
+                return self.mean_seconds
+            if self.distribution == "lognormal":
+                return self._random.lognormvariate(math.log(max(self.mean_seconds, 1e-6)), self.sigma)
+            return self.mean_seconds * self._random.paretovariate(self.alpha)
+
+    def should_fail(self) -> bool:
+        """Decide whether the current call fails."""
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def wait(self) -> bool:
+        """
+        Sleep for one sampled latency.
+
+        Returns:
+            True if the call should succeed, False if it should fail
+        """
+        time.sleep(self.sample())
+        return not self.should_fail()
+
+
+def silent_mp3_bytes(duration_seconds: float) -> bytes:
+    """Build a constant bitrate MP3 stream of silent frames lasting about duration_seconds."""
+    frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_BYTES - len(MP3_FRAME_HEADER))
+    return frame * max(1, round(duration_seconds / MP3_FRAME_SECONDS))
+
+
+def timed_speech(text: str) -> Tuple[bytes, Dict[str, List]]:
+    """
+    Build silent MP3 audio for a text together with an ElevenLabs style character alignment.
+
+    Every word lasts 1 / WORDS_PER_SECOND seconds, shared evenly by its characters; whitespace takes no time.
+
+    Returns:
+        Tuple of the MP3 bytes and the alignment (characters with their start and end times in seconds)
+    """
+    starts, ends = [], []
+    word_seconds = 1.0 / WORDS_PER_SECOND
+    clock = 0.0
+    for word in re.finditer(r"\s+|\S+", text):
+        token = word.group()
+        if token.isspace():
+            starts.extend([clock] * len(token))
+            ends.extend([clock] * len(token))
+            continue
+        step = word_seconds / len(token)
+        for index in range(len(token)):
+            starts.append(clock + index * step)
+            ends.append(clock + (index + 1) * step)
+        clock += word_seconds
+    alignment = {
+        "characters": list(text),
+        "character_start_times_seconds": [round(value, 4) for value in starts],
+        "character_end_times_seconds": [round(value, 4) for value in ends]
+    }
+    return silent_mp3_bytes(clock), alignment
+
+
+def solid_png_bytes(width: int, height: int, rgb=(32, 96, 160)) -> bytes:
+    """Build an RGB PNG image of a single colour."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    row = b"\x00" + bytes(rgb) * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeStoryChatModel(BaseChatModel):
+    """Chat model that answers story prompts with a valid StoryWithScenes JSON document."""
+
+    latency: Any = None
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-story-chat-model"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if self.latency is not None and not self.latency.wait():
+            raise RuntimeError("Simulated LLM failure")
+        prompt = "\n".join(str(message.content) for message in messages)
+        match = re.search(r"into (\d+) distinct scenes", prompt)
+        scene_count = int(match.group(1)) if match else 4
+        content = json.dumps(self.build_story(scene_count))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    @staticmethod
+    def build_story(scene_count: int) -> dict:
+        """Build a story dictionary with the given number of scenes."""
+        return {
+            "title": "Benchmark Story",
+            "full_story_summary": "A benchmark story used to measure the pipeline.",
+            "overall_image_style": "Flat colours, simple shapes",
+            "main_characters": [{"name": "Bench", "appearance": "A small grey robot with round eyes"}],
+            "scenes": [
+                {
+                    "scene_number": number,
+                    "visual_description": f"Bench stands in room number {number}",
+                    "narration_text": " ".join([f"Bench walks through room {number} and looks around."] * 3)
+                }
+                for number in range(1, scene_count + 1)
+            ]
+        }
+
+
+class FakeNarrationGenerator(NarrationGenerator):
+    """NarrationGenerator whose ElevenLabs call is replaced by a simulated one writing silent MP3 audio."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, **kwargs):
+        self.latency = latency or LatencyModel()
+        super().__init__(provider="elevenlabs", **kwargs)
+
+    def _setup_elevenlabs(self):
+        # No credentials and no shared rate limiter: the simulated latency stands in for the provider
+        self.api_key = "benchmark"
+
+    def _generate_elevenlabs_narration(self, text: str, output_path: str) -> GenerationResult:
+        if not self.latency.wait():
+            return GenerationResult(success=False, output_path="", error="Simulated TTS failure")
+        with open(output_path, "wb") as f:
+            f.write(silent_mp3_bytes(len(text.split()) / WORDS_PER_SECOND))
+        return GenerationResult(success=True, output_path=output_path)
+
+    def _synthesize_with_timestamps(self, text: str) -> Tuple[bytes, Dict[str, List]]:
+        if not self.latency.wait():
+            raise RuntimeError("Simulated TTS failure")
+        return timed_speech(text)
+
+
+class FakeVisualGenerator(VisualGenerator):
+    """VisualGenerator whose provider call is replaced by a simulated one writing a PNG."""
+
+    def __init__(self, latency: Optional[LatencyModel] = None, size: int = 256, **kwargs):
+        self.latency = latency or LatencyModel()
+        self.size = size
+        super().__init__(provider="stable_diffusion_api", **kwargs)
+
+    def _setup_stable_diffusion_api(self):
+        self.api_key = "benchmark"
+
+    def _generate_stable_diffusion_image(self, prompt_text: str, output_path: str) -> GenerationResult:
+        if not self.latency.wait():
+            return GenerationResult(success=False, output_path="", error="Simulated image failure")
+        with open(output_path, "wb") as f:
+            f.write(solid_png_bytes(self.size, self.size))
+        return GenerationResult(success=True, output_path=output_path)
+
+
+class FakeVideoAssembler(VideoAssembler):
+    """VideoAssembler that simulates encoding time instead of running x264 (for hosts without ffmpeg)."""
+
+    def __init__(self, latency_per_second: Optional[LatencyModel] = None):
+        """
+        Initialize the FakeVideoAssembler.
+
+        Args:
+            latency_per_second: Simulated encoding time per second of output video
+        """
+        super().__init__()
+        self.latency_per_second = latency_per_second or LatencyModel()
+
+    def _encode(self, output_path: str, duration: float) -> GenerationResult:
+        time.sleep(self.latency_per_second.sample() * duration)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(bytes(max(1, int(duration * 1024))))
+        return GenerationResult(success=True, output_path=output_path, duration=duration)
+
+    def assemble_video(self, image_paths, audio_paths, audio_durations, output_video_path,
+                       image_transition_duration=0.5, fps=24) -> GenerationResult:
+        return self._encode(output_video_path, sum(audio_durations))
+
+    def render_scene_segment(self, image_path, audio_path, audio_duration, output_segment_path, fps=24,
+                             fade_duration=0.0) -> GenerationResult:
+        return self._encode(output_segment_path, audio_duration)
+
+    def concatenate_segments(self, segment_paths, output_video_path) -> GenerationResult:
+        os.makedirs(os.path.dirname(output_video_path), exist_ok=True)
+        with open(output_video_path, "wb") as output:
+            for segment_path in segment_paths:
+                with open(segment_path, "rb") as segment:
+                    output.write(segment.read())
+        return GenerationResult(success=True, output_path=output_video_path)
@@ -0,0 +1,378 @@
+"""
+End-to-end pipeline benchmark with simulated providers.
+
+Runs ShortVideoFactory.create_video for a grid of scene counts, per-video concurrency levels and
+numbers of videos produced in parallel, and records end-to-end latency, per-stage time (from the run
+profiles), videos per hour and peak RSS. Results are saved as JSON baselines that can be compared
+between commits.
+
+With --providers http the TTS and image requests go through the real HTTP code paths to the local
+stand-in server (benchmarks.provider_server), which can inject throttling, slow responses and
+connection resets.
+
+Usage:
+    python -m benchmarks.pipeline --scenes 4 8 --concurrency 1 4 --latency lognormal
+    python -m benchmarks.pipeline --compare benchmarks/results/baseline.json
+    python -m benchmarks.pipeline --providers http --throttle-rate 0.1 --reset-rate 0.02
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fakes import (
+    FakeNarrationGenerator, FakeStoryChatModel, FakeVideoAssembler, FakeVisualGenerator, LatencyModel
+)
+from benchmarks.provider_server import FaultProfile, ProviderStubServer
+from src.core.factory import ShortVideoFactory
+from src.generators.narration_generator import NarrationGenerator
+from src.generators.visual_generator import VisualGenerator
+from src.models.schemas import VideoCreationConfig
+from src.utils.http_client import get_http_client
+from src.utils.profiling import summarize_profiles
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+@dataclass
+class BenchmarkCase:
+    """One point of the benchmark grid."""
+    scenes: int
+    concurrency: int
+    parallel_videos: int = 1
+    pipeline_mode: str = "batch"
+    videos: int = 3
+    narration_mode: str = "scene"
+
+    @property
+    def case_id(self) -> str:
+        """Stable identifier used to match cases between result files."""
+        case_id = (f"scenes={self.scenes},concurrency={self.concurrency},"
+                   f"parallel={self.parallel_videos},mode={self.pipeline_mode}")
+        # Per-scene narration cases keep the identifiers of results recorded before the option existed
+        return case_id if self.narration_mode == "scene" else f"{case_id},narration={self.narration_mode}"
+
+
+@dataclass
+class ProviderLatencies:
+    """Latency models of the simulated providers."""
+    llm: LatencyModel
+    tts: LatencyModel
+    image: LatencyModel
+    encode_per_second: Optional[LatencyModel] = None
+
+
+def build_factory(case: BenchmarkCase, latencies: ProviderLatencies, output_dir: str,
+                  assembler: str = "real", server: Optional[ProviderStubServer] = None) -> ShortVideoFactory:
+    """
+    Build a factory wired to the simulated providers.
+
+    Args:
+        case: Benchmark case providing concurrency and pipeline mode
+        latencies: Latency models of the simulated providers
+        output_dir: Directory for all run outputs
+        assembler: "real" to encode with moviepy/x264, "fake" to simulate encoding
+        server: Stand-in provider server; when given, TTS and images use the real HTTP clients against it
+
+    Returns:
+        A ShortVideoFactory whose provider calls are simulated
+    """
+    config = VideoCreationConfig(
+        story_subject="Benchmark subject",
+        num_scenes=case.scenes,
+        tts_provider="elevenlabs",
+        elevenlabs_voice_id="benchmark",
+        image_provider="stable_diffusion_api",
+        gcp_project_id="",
+        gcp_location="us-central1",
+        vertex_ai_imagen_model_id="",
+        image_transition_duration=0.0,
+        video_fps=24,
+        output_directories={
+            "base": output_dir,
+            "audios": os.path.join(output_dir, "story_audios"),
+            "images": os.path.join(output_dir, "story_images"),
+            "videos": os.path.join(output_dir, "final_videos"),
+            "runs": os.path.join(output_dir, "runs")
+        },
+        max_concurrent_narrations=case.concurrency,
+        max_concurrent_images=case.concurrency,
+        pipeline_mode=case.pipeline_mode,
+        narration_mode=case.narration_mode
+    )
+    factory = ShortVideoFactory(FakeStoryChatModel(latency=latencies.llm), config=config)
+    if server is not None:
+        factory.narration_generator = NarrationGenerator(elevenlabs_voice_id="benchmark",
+                                                         elevenlabs_base_url=server.base_url)
+        factory.visual_generator = VisualGenerator(provider="openai_dalle", openai_base_url=server.openai_base_url)
+    else:
+        factory.narration_generator = FakeNarrationGenerator(latency=latencies.tts)
+        factory.visual_generator = FakeVisualGenerator(latency=latencies.image)
+    if assembler == "fake":
+        factory.video_assembler = FakeVideoAssembler(latencies.encode_per_second)
+    return factory
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_case(case: BenchmarkCase, latencies: ProviderLatencies, work_dir: str,
+             assembler: str = "real", server: Optional[ProviderStubServer] = None) -> Dict[str, Any]:
+    """
+    Produce case.videos videos, case.parallel_videos at a time, and measure the pipeline.
+
+    Args:
+        case: Benchmark case
+        latencies: Latency models of the simulated providers
+        work_dir: Scratch directory for the outputs of this case
+        assembler: "real" or "fake" video assembler
+        server: Stand-in provider server for the HTTP code paths, if any
+
+    Returns:
+        Result record with the case, throughput, latency distribution, stage timings and peak RSS
+    """
+    local = threading.local()
+
+    def produce(index: int) -> Dict[str, Any]:
+        # Each worker keeps its own factory, like the batch runner
+        if not hasattr(local, "factory"):
+            local.factory = build_factory(case, latencies, work_dir, assembler, server)
+        return local.factory.create_video(run_id=f"bench-{index}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=case.parallel_videos) as executor:
+        results = list(executor.map(produce, range(case.videos)))
+    wall_seconds = time.perf_counter() - start
+
+    succeeded = sum(1 for result in results if result["success"])
+    summary = summarize_profiles(result["profile"] for result in results if result.get("profile"))
+    return {
+        "case_id": case.case_id,
+        "case": asdict(case),
+        "videos": case.videos,
+        "succeeded": succeeded,
+        "wall_seconds": round(wall_seconds, 3),
+        "videos_per_hour": round(succeeded / wall_seconds * 3600, 1) if wall_seconds > 0 else 0.0,
+        "latency_seconds": summary["total_seconds"],
+        "stages": summary["stages"],
+        "providers": summary["providers"],
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_benchmarks(cases: List[BenchmarkCase], latencies: ProviderLatencies, assembler: str = "real",
+                   keep_outputs: bool = False, server: Optional[ProviderStubServer] = None) -> Dict[str, Any]:
+    """
+    Run every case in its own scratch directory.
+
+    Args:
+        cases: Benchmark grid
+        latencies: Latency models of the simulated providers
+        assembler: "real" or "fake" video assembler
+        keep_outputs: Keep the generated files instead of deleting them after each case
+        server: Stand-in provider server for the HTTP code paths, if any
+
+    Returns:
+        Results document with metadata and one record per case
+    """
+    records = []
+    for case in cases:
+        work_dir = tempfile.mkdtemp(prefix="shortfactory-bench-")
+        try:
+            logger.info(f"Running benchmark case {case.case_id}...")
+            get_http_client().stats.reset()
+            records.append(run_case(case, latencies, work_dir, assembler, server))
+            if server is not None:
+                records[-1]["server"] = dict(server.stats)
+                records[-1]["http_client"] = get_http_client().stats.snapshot()
+        finally:
+            if not keep_outputs:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "assembler": assembler,
+            "providers": "http" if server is not None else "fake",
+            "latencies": {name: _describe_latency(model) for name, model in asdict(latencies).items() if model}
+        },
+        "results": records
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare two results documents case by case.
+
+    Args:
+        baseline: Earlier results document
+        current: New results document
+        threshold: Relative change above which a metric counts as a regression
+
+    Returns:
+        One row per case and metric with both values, the relative change and a regression flag
+    """
+    # Higher is better for throughput; lower is better for everything else
+    metrics = {
+        "videos_per_hour": lambda record: record["videos_per_hour"],
+        "latency_p50": lambda record: record["latency_seconds"]["p50"],
+        "latency_p95": lambda record: record["latency_seconds"]["p95"],
+        "peak_rss_mb": lambda record: record["peak_rss_mb"]
+    }
+    baseline_records = {record["case_id"]: record for record in baseline["results"]}
+    rows = []
+    for record in current["results"]:
+        previous = baseline_records.get(record["case_id"])
+        if previous is None:
+            continue
+        for metric, extract in metrics.items():
+            before, after = extract(previous), extract(record)
+            change = (after - before) / before if before else 0.0
+            regressed = -change > threshold if metric == "videos_per_hour" else change > threshold
+            rows.append({
+                "case_id": record["case_id"],
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regression": regressed
+            })
+    return rows
+
+
+def _describe_latency(model: Dict[str, Any]) -> Dict[str, Any]:
+    """Latency model parameters without private fields."""
+    return {key: value for key, value in model.items() if not key.startswith("_")}
+
+
+def _git_commit() -> str:
+    """Commit of the working tree, or an empty string outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the ShortFactory pipeline with simulated providers")
+    parser.add_argument("--scenes", type=int, nargs="+", default=[4], help="Scene counts to benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="Per-video TTS/image concurrency levels")
+    parser.add_argument("--parallel-videos", type=int, nargs="+", default=[1], help="Numbers of videos produced in parallel")
+    parser.add_argument("--videos", type=int, default=3, help="Videos produced per case")
+    parser.add_argument("--mode", choices=["batch", "streaming"], default="batch", help="Pipeline mode")
+    parser.add_argument("--narration-mode", choices=["scene", "story"], nargs="+", default=["scene"],
+                        help="Narration modes to benchmark: one TTS request per scene or per story")
+    parser.add_argument("--latency", choices=["constant", "lognormal", "heavy_tailed"], default="lognormal",
+                        help="Latency distribution of the simulated providers")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Typical LLM latency in seconds")
+    parser.add_argument("--tts-latency", type=float, default=0.4, help="Typical TTS latency in seconds")
+    parser.add_argument("--image-latency", type=float, default=0.8, help="Typical image latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Failure probability of TTS and image calls")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency samples")
+    parser.add_argument("--assembler", choices=["real", "fake"], default="real",
+                        help="Encode with moviepy/x264 or simulate encoding")
+    parser.add_argument("--encode-latency", type=float, default=0.05,
+                        help="Simulated encoding seconds per video second (fake assembler only)")
+    parser.add_argument("--providers", choices=["fake", "http"], default="fake",
+                        help="Simulate providers in process, or call the local stand-in server over HTTP")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability of a 429 from the stand-in server")
+    parser.add_argument("--server-max-concurrency", type=int, default=0,
+                        help="Requests in flight above which the stand-in server answers 429 (0 = unlimited)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds of the stand-in server")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Probability of a connection reset by the stand-in server")
+    parser.add_argument("--output", type=str, help="Path of the results JSON file")
+    parser.add_argument("--compare", type=str, metavar="BASELINE", help="Compare the results with a baseline file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as a regression")
+    parser.add_argument("--keep-outputs", action="store_true", help="Keep generated audio, images and videos")
+    args = parser.parse_args(argv)
+
+    def latency(mean_seconds: float, error_rate: float = 0.0, offset: int = 0) -> LatencyModel:
+        seed = None if args.seed is None else args.seed + offset
+        return LatencyModel(args.latency, mean_seconds, error_rate=error_rate, seed=seed)
+
+    latencies = ProviderLatencies(
+        llm=latency(args.llm_latency),
+        tts=latency(args.tts_latency, args.error_rate, 1),
+        image=latency(args.image_latency, args.error_rate, 2),
+        encode_per_second=LatencyModel("constant", args.encode_latency)
+    )
+    cases = [
+        BenchmarkCase(scenes, concurrency, parallel_videos, args.mode, args.videos, narration_mode)
+        for scenes in args.scenes
+        for concurrency in args.concurrency
+        for parallel_videos in args.parallel_videos
+        for narration_mode in args.narration_mode
+    ]
+
+    server = None
+    if args.providers == "http":
+        # The real generators need credentials; only the local server ever sees these
+        os.environ.setdefault("ELEVEN_LABS_API_KEY", "benchmark")
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+        server = ProviderStubServer(faults=FaultProfile(
+            throttle_rate=args.throttle_rate,
+            max_concurrency=args.server_max_concurrency,
+            retry_after=args.retry_after,
+            first_byte=latency(args.tts_latency, offset=3),
+            reset_rate=args.reset_rate,
+            seed=args.seed
+        )).start_in_thread()
+    try:
+        results = run_benchmarks(cases, latencies, args.assembler, args.keep_outputs, server)
+    finally:
+        if server is not None:
+            server.stop_thread()
+
+    output_path = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for record in results["results"]:
+        print(f"{record['case_id']}: {record['succeeded']}/{record['videos']} videos, "
+              f"{record['videos_per_hour']} videos/h, p50 {record['latency_seconds']['p50']:.2f}s, "
+              f"p95 {record['latency_seconds']['p95']:.2f}s, peak RSS {record['peak_rss_mb']} MiB")
+    print(f"Results written to {output_path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            rows = compare_results(json.load(f), results, args.threshold)
+        regressions = [row for row in rows if row["regression"]]
+        for row in rows:
+            marker = "REGRESSION" if row["regression"] else "ok"
+            print(f"{marker:>10}  {row['case_id']}  {row['metric']}: {row['baseline']} -> {row['current']} ({row['change']:+.1%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(message)s")
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+    # The pipeline logs every scene and simulated failure; keep benchmark output readable and cheap
+    logging.getLogger("src").setLevel(logging.CRITICAL)
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Local HTTP stand-in for the ElevenLabs text-to-speech and OpenAI Images endpoints.
+
+The server speaks plain HTTP/1.1 with keep-alive on asyncio, so the real provider code paths (requests
+for ElevenLabs, the OpenAI client and the image download) can be load tested offline by pointing
+ELEVENLABS_BASE_URL and OPENAI_BASE_URL at it. Faults are configurable: random or concurrency-based
+throttling (429 with Retry-After), slow first byte, slow streaming and connection resets.
+
+Usage:
+    python -m benchmarks.provider_server --port 8089 --throttle-rate 0.05 --first-byte-latency 0.3
+"""
+
+import time
+import base64
+import random
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass, field
+from typing import Optional
+
+from benchmarks.fakes import WORDS_PER_SECOND, LatencyModel, silent_mp3_bytes, solid_png_bytes, timed_speech
+from src.utils.http_server import AsyncHttpServer, HttpError, HttpRequest, response_head, send_chunk, send_response
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FaultProfile:
+    """
+    Faults injected by the stand-in server.
+
+    Attributes:
+        throttle_rate: Probability that a request is rejected with 429
+        max_concurrency: Requests in flight above this limit are rejected with 429 (0 = unlimited)
+        retry_after: Seconds sent in the Retry-After header of 429 responses
+        first_byte: Delay before the response headers are sent
+        chunk_delay: Delay between streamed audio chunks in seconds
+        reset_rate: Probability that the connection is reset instead of completing the response
+        seed: Optional seed for reproducible fault sequences
+    """
+    throttle_rate: float = 0.0
+    max_concurrency: int = 0
+    retry_after: float = 1.0
+    first_byte: LatencyModel = field(default_factory=LatencyModel)
+    chunk_delay: float = 0.0
+    reset_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+class ProviderStubServer(AsyncHttpServer):
+    """
+    asyncio HTTP server mimicking the ElevenLabs and OpenAI Images APIs.
+
+    Endpoints:
+        POST /v1/text-to-speech/{voice_id}[/stream]          streams silent MP3 audio sized to the text
+        POST /v1/text-to-speech/{voice_id}/with-timestamps   returns that audio as base64 with its character alignment
+        POST /v1/images/generations                           returns an image URL or a b64_json payload
+        GET  /images/{image_id}.png                           serves the image behind a returned URL
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, faults: Optional[FaultProfile] = None,
+                 image_size: int = 256, audio_chunk_bytes: int = 4096):
+        """
+        Initialize the ProviderStubServer.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+            faults: Faults to inject; none by default
+            image_size: Edge length of the generated square PNG images
+            audio_chunk_bytes: Size of the streamed audio chunks
+        """
+        super().__init__(host, port)
+        self.faults = faults or FaultProfile()
+        self.audio_chunk_bytes = audio_chunk_bytes
+        self.image_bytes = solid_png_bytes(image_size, image_size)
+        self.stats = {"requests": 0, "throttled": 0, "resets": 0, "in_flight": 0, "peak_in_flight": 0, "connections": 0}
+        self._random = random.Random(self.faults.seed)
+
+    @property
+    def openai_base_url(self) -> str:
+        """URL to use as OPENAI_BASE_URL (base_url is the ELEVENLABS_BASE_URL)."""
+        return f"{self.base_url}/v1"
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        await super()._handle_connection(reader, writer)
+
+    async def handle(self, request: HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        """Route a request, injecting throttling, first byte delay and resets."""
+        if request.method == "POST" and request.path.startswith("/v1/text-to-speech/"):
+            route = self._text_to_speech_with_timestamps if request.path.endswith("/with-timestamps") else self._text_to_speech
+        elif request.method == "POST" and request.path == "/v1/images/generations":
+            route = self._image_generation
+        elif request.method == "GET" and request.path.startswith("/images/"):
+            route = self._image_download
+        else:
+            raise HttpError(404, f"No route for {request.method} {request.path}")
+        payload = request.json()
+
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        try:
+            if self._should_throttle():
+                self.stats["throttled"] += 1
+                await send_response(writer, 429, self._throttle_body(request.path),
+                                    {"Retry-After": f"{self.faults.retry_after:g}"})
+                return True
+
+            await asyncio.sleep(self.faults.first_byte.sample())
+            if self._random.random() < self.faults.reset_rate:
+                self.stats["resets"] += 1
+                writer.transport.abort()
+                return False
+            return await route(payload, writer)
+        finally:
+            self.stats["in_flight"] -= 1
+
+    def _should_throttle(self) -> bool:
+        """Decide whether the current request is rejected with 429."""
+        if self.faults.max_concurrency and self.stats["in_flight"] > self.faults.max_concurrency:
+            return True
+        return self._random.random() < self.faults.throttle_rate
+
+    @staticmethod
+    def _throttle_body(path: str) -> dict:
+        """Error body of a 429 response in the style of the mimicked provider."""
+        if path.startswith("/v1/text-to-speech/"):
+            return {"detail": {"status": "too_many_concurrent_requests", "message": "Simulated rate limit"}}
+        return {"error": {"message": "Simulated rate limit", "type": "requests", "code": "rate_limit_exceeded"}}
+
+    async def _text_to_speech(self, payload: dict, writer: asyncio.StreamWriter) -> bool:
+        """Stream silent MP3 audio lasting as long as the text would take to read."""
+        text = payload.get("text", "")
+        if not text:
+            raise HttpError(400, "text is required")
+
+        audio = silent_mp3_bytes(len(text.split()) / WORDS_PER_SECOND)
+        writer.write(response_head(200, {"Content-Type": "audio/mpeg", "Transfer-Encoding": "chunked"}))
+        for offset in range(0, len(audio), self.audio_chunk_bytes):
+            await send_chunk(writer, audio[offset:offset + self.audio_chunk_bytes])
+            if self.faults.chunk_delay:
+                await asyncio.sleep(self.faults.chunk_delay)
+        await send_chunk(writer, b"")
+        return True
+
+    async def _text_to_speech_with_timestamps(self, payload: dict, writer: asyncio.StreamWriter) -> bool:
+        """Answer with the silent MP3 audio of the text and the start and end time of every character."""
+        text = payload.get("text", "")
+        if not text:
+            raise HttpError(400, "text is required")
+
+        audio, alignment = timed_speech(text)
+        await send_response(writer, 200, {
+            "audio_base64": base64.b64encode(audio).decode("ascii"),
+            "alignment": alignment,
+            "normalized_alignment": alignment
+        })
+        return True
+
+    async def _image_generation(self, payload: dict, writer: asyncio.StreamWriter) -> bool:
+        """Answer an image generation request with a URL or an inline b64_json image."""
+        if not payload.get("prompt"):
+            raise HttpError(400, "prompt is required")
+
+        images = []
+        for _ in range(int(payload.get("n", 1))):
+            if payload.get("response_format") == "b64_json":
+                image = {"b64_json": base64.b64encode(self.image_bytes).decode("ascii")}
+            else:
+                image = {"url": f"{self.base_url}/images/{self._random.getrandbits(48):012x}.png"}
+            image["revised_prompt"] = payload["prompt"]
+            images.append(image)
+        await send_response(writer, 200, {"created": int(time.time()), "data": images})
+        return True
+
+    async def _image_download(self, payload: dict, writer: asyncio.StreamWriter) -> bool:
+        """Serve the image behind a generated URL."""
+        await send_response(writer, 200, self.image_bytes, content_type="image/png")
+        return True
+
+
+def main(argv=None):
+    """Command line entry point: serve until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in for the ElevenLabs and OpenAI Images APIs")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8089, help="Port to listen on")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Reject requests above this many in flight with 429 (0 = unlimited)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds of 429 responses")
+    parser.add_argument("--latency", choices=["constant", "lognormal", "heavy_tailed"], default="constant",
+                        help="Distribution of the first byte delay")
+    parser.add_argument("--first-byte-latency", type=float, default=0.0, help="Typical delay before the response starts")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Delay between streamed audio chunks")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Probability of resetting the connection")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible faults")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    faults = FaultProfile(
+        throttle_rate=args.throttle_rate,
+        max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        first_byte=LatencyModel(args.latency, args.first_byte_latency, seed=args.seed),
+        chunk_delay=args.chunk_delay,
+        reset_rate=args.reset_rate,
+        seed=args.seed
+    )
+    server = ProviderStubServer(args.host, args.port, faults)
+
+    async def serve():
+        await server.start()
+        print(f"ELEVENLABS_BASE_URL={server.base_url}")
+        print(f"OPENAI_BASE_URL={server.openai_base_url}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logger.info(f"Stopped; stats: {server.stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
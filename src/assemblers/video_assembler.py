@@ -6,11 +6,13 @@ import os
 import logging
 from typing import List, Optional
 
+import ffmpeg
 import moviepy.editor as mpy_editor
 from moviepy.audio.AudioClip import AudioClip
 from moviepy.video.VideoClip import ImageClip
 
 from src.models.schemas import GenerationResult
+from src.utils.profiling import span
 
 logger = logging.getLogger(__name__)
 
@@ -60,28 +62,31 @@ class VideoAssembler:
         os.makedirs(os.path.dirname(output_video_path), exist_ok=True)
             
         try:
-            # Create video clips for each scene
-            scene_clips = []
-            
-            for i, (img_path, audio_path, audio_duration) in enumerate(zip(image_paths, audio_paths, audio_durations)):
-                logger.info(f"Processing scene {i+1}...")
-                
-                # Create image clip with duration matching the audio
-                img_clip = ImageClip(img_path, duration=audio_duration)
-                
-                # Add audio to the image clip
-                audio_clip = mpy_editor.AudioFileClip(audio_path)
-                video_clip = img_clip.set_audio(audio_clip)
-                
-                scene_clips.append(video_clip)
+            with span("clip_build"):
+                # Create video clips for each scene
+                scene_clips = []
                 
-            # Concatenate all clips
-            logger.info(f"Concatenating {len(scene_clips)} scenes...")
-            final_clip = mpy_editor.concatenate_videoclips(scene_clips, method="compose", transition=mpy_editor.VideoFileClip.fadein(image_transition_duration) if image_transition_duration > 0 else None)
+                for i, (img_path, audio_path, audio_duration) in enumerate(zip(image_paths, audio_paths, audio_durations)):
+                    logger.info(f"Processing scene {i+1}...")
+                    
+                    # Create image clip with duration matching the audio
+                    img_clip = ImageClip(img_path, duration=audio_duration)
+                    
+                    # Add audio to the image clip
+                    audio_clip = mpy_editor.AudioFileClip(audio_path)
+                    video_clip = img_clip.set_audio(audio_clip)
+                    
+                    scene_clips.append(video_clip)
+                    
+                # Concatenate all clips
+                logger.info(f"Concatenating {len(scene_clips)} scenes...")
+                final_clip = mpy_editor.concatenate_videoclips(scene_clips, method="compose", transition=mpy_editor.VideoFileClip.fadein(image_transition_duration) if image_transition_duration > 0 else None)
             
             # Write output video file
             logger.info(f"Writing video file to {output_video_path}...")
-            final_clip.write_videofile(output_video_path, fps=fps, codec="libx264", audio_codec="aac")
+            with span("encode") as encode_span:
+                final_clip.write_videofile(output_video_path, fps=fps, codec="libx264", audio_codec="aac")
+                encode_span.add_file(output_video_path)
             
             logger.info(f"Video assembly complete. Video saved to {output_video_path}")
             return GenerationResult(success=True, output_path=output_video_path)
@@ -90,6 +95,102 @@ class VideoAssembler:
             logger.error(error_msg)
             return GenerationResult(success=False, output_path="", error=error_msg)
             
+    def render_scene_segment(self,
+                             image_path: str,
+                             audio_path: str,
+                             audio_duration: float,
+                             output_segment_path: str,
+                             fps: int = 24,
+                             fade_duration: float = 0.0) -> GenerationResult:
+        """
+        Encodes a single scene (one image with its narration) into a standalone video segment.
+        Segments share codec settings so they can later be joined without re-encoding.
+        
+        Args:
+            image_path: Path to the scene image
+            audio_path: Path to the scene narration
+            audio_duration: Duration of the narration in seconds
+            output_segment_path: Path where to save the encoded segment
+            fps: Frames per second for the segment
+            fade_duration: Duration of a fade-in at the start of the segment; segments are joined
+                without re-encoding, so transitions between images are rendered into the segments
+            
+        Returns:
+            GenerationResult with success status and output information
+        """
+        logger.info(f"Encoding scene segment {output_segment_path}...")
+        os.makedirs(os.path.dirname(output_segment_path), exist_ok=True)
+        
+        img_clip = audio_clip = segment_clip = None
+        try:
+            with span("clip_build"):
+                img_clip = ImageClip(image_path, duration=audio_duration)
+                audio_clip = mpy_editor.AudioFileClip(audio_path)
+                segment_clip = img_clip.set_audio(audio_clip)
+                if fade_duration > 0:
+                    segment_clip = segment_clip.fx(mpy_editor.vfx.fadein, min(fade_duration, audio_duration))
+            with span("encode") as encode_span:
+                segment_clip.write_videofile(output_segment_path, fps=fps, codec="libx264", audio_codec="aac", logger=None)
+                encode_span.add_file(output_segment_path)
+            
+            return GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+        except Exception as e:
+            error_msg = f"Error during scene segment encoding: {e}"
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+        finally:
+            # Release the audio reader and frame buffers even if encoding failed
+            for clip in (segment_clip, img_clip, audio_clip):
+                if clip is not None:
+                    clip.close()
+            
+    def concatenate_segments(self, segment_paths: List[str], output_video_path: str) -> GenerationResult:
+        """
+        Joins pre-encoded scene segments into the final video using the ffmpeg concat demuxer.
+        Streams are copied, so this step does not re-encode any frames.
+        
+        Args:
+            segment_paths: Paths to the encoded segments, in playback order
+            output_video_path: Path where to save the output video
+            
+        Returns:
+            GenerationResult with success status and output information
+        """
+        if not segment_paths:
+            error_msg = "No segments provided for concatenation."
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+            
+        os.makedirs(os.path.dirname(output_video_path), exist_ok=True)
+        list_path = f"{output_video_path}.segments.txt"
+        
+        try:
+            with open(list_path, "w") as f:
+                for segment_path in segment_paths:
+                    escaped_path = os.path.abspath(segment_path).replace("'", "'\\''")
+                    f.write(f"file '{escaped_path}'\n")
+                    
+            logger.info(f"Concatenating {len(segment_paths)} segments into {output_video_path}...")
+            with span("concat") as concat_span:
+                (
+                    ffmpeg
+                    .input(list_path, format="concat", safe=0)
+                    .output(output_video_path, c="copy", movflags="+faststart")
+                    .overwrite_output()
+                    .run(quiet=True)
+                )
+                concat_span.add_file(output_video_path)
+            
+            logger.info(f"Segment concatenation complete. Video saved to {output_video_path}")
+            return GenerationResult(success=True, output_path=output_video_path)
+        except Exception as e:
+            error_msg = f"Error during segment concatenation: {e}"
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+            
     def create_slideshow_with_background_music(self,
                                              image_paths: List[str],
                                              output_video_path: str, 
@@ -21,26 +21,98 @@ class Config:
     # Story Generation Configuration
     STORY_SUBJECT = os.getenv("STORY_SUBJECT", "A mischievous squirrel trying to steal a giant acorn from a grumpy wizard's garden.")
     NUM_SCENES = int(os.getenv("NUM_SCENES", "4"))  # Desired number of scenes for the story
+    STORY_CACHE_MAX_BYTES = int(os.getenv("STORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # LRU eviction budget for cached stories
+    STORY_CACHE_TTL_SECONDS = float(os.getenv("STORY_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # Maximum age of a cached story (0 = never expires)
+    STORY_MAX_CONCURRENCY = int(os.getenv("STORY_MAX_CONCURRENCY", "8"))  # Parallel LLM requests of batched story generation
+    STORY_PROMPT_MODE = os.getenv("STORY_PROMPT_MODE", "parser")  # Options: "parser" (JSON schema in the prompt), "structured" (native structured output)
 
     # Narration Configuration
     TTS_PROVIDER = os.getenv("TTS_PROVIDER", "elevenlabs")  # Options: "elevenlabs", "google_cloud_tts"
     ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "onwK4e9ZLuTAKqWW03F9")  # Default voice ID
+    NARRATION_MODE = os.getenv("NARRATION_MODE", "scene")  # Options: "scene" (one TTS request per scene), "story" (one request per story, split by timestamps)
+    TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))  # LRU eviction budget for cached audio
+    TTS_CHUNK_MAX_CHARS = int(os.getenv("TTS_CHUNK_MAX_CHARS", "1000"))  # Longer narrations are split at sentence boundaries and synthesized in parallel (0 = never split)
+    TTS_CHUNK_CONCURRENCY = int(os.getenv("TTS_CHUNK_CONCURRENCY", "4"))  # Chunks of one narration synthesized at once
+    TTS_CHUNK_CROSSFADE_MS = int(os.getenv("TTS_CHUNK_CROSSFADE_MS", "0"))  # Crossfade between chunks (needs ffmpeg; 0 = join frames without re-encoding)
 
     # Image Generation Configuration
     IMAGE_PROVIDER = os.getenv("IMAGE_PROVIDER", "google_vertex_ai_image")  # Options: "openai_dalle", "google_vertex_ai_image", "stable_diffusion_api"
     GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID", "")  # Google Cloud Project ID
     GCP_LOCATION = os.getenv("GCP_LOCATION", "us-central1")  # Google Cloud region
     VERTEX_AI_IMAGEN_MODEL_ID = os.getenv("VERTEX_AI_IMAGEN_MODEL_ID", "imagegeneration@002")
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))  # LRU eviction budget for cached images
+    IMAGE_CACHE_TTL_SECONDS = float(os.getenv("IMAGE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))  # Maximum age of a cached image (0 = never expires)
 
     # Video Assembly Configuration
     IMAGE_TRANSITION_DURATION = float(os.getenv("IMAGE_TRANSITION_DURATION", "0.5"))  # Duration of fade transition between images
     VIDEO_FPS = int(os.getenv("VIDEO_FPS", "24"))  # Frames per second for output video
+    VIDEO_FILENAME_TEMPLATE = os.getenv("VIDEO_FILENAME_TEMPLATE", "final_video_{run_id}.mp4")  # Published video name; may use {run_id} and {timestamp}
+    SCRATCH_CLEANUP_POLICY = os.getenv("SCRATCH_CLEANUP_POLICY", "on_success")  # Options: "on_success", "always", "never"
+
+    # Concurrency Configuration
+    MAX_CONCURRENT_NARRATIONS = int(os.getenv("MAX_CONCURRENT_NARRATIONS", "4"))  # Parallel TTS requests per video (1 = sequential)
+    MAX_CONCURRENT_IMAGES = int(os.getenv("MAX_CONCURRENT_IMAGES", "4"))  # Parallel image requests per video (1 = sequential)
+
+    # Pipeline Configuration
+    PIPELINE_MODE = os.getenv("PIPELINE_MODE", "batch")  # Options: "batch" (assemble after all scenes), "streaming" (encode scenes as they complete)
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))  # Bounded queue size between streaming pipeline stages
+    STORY_STREAMING = os.getenv("STORY_STREAMING", "false").lower() == "true"  # Start scenes while the story is still being written (streaming mode only)
+
+    # Provider Endpoints (point these at a local stand-in server for offline load tests)
+    ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None  # None uses the OpenAI client default
+    OPENAI_IMAGES_RESPONSE_FORMAT = os.getenv("OPENAI_IMAGES_RESPONSE_FORMAT", "url")  # Options: "url" (download the image), "b64_json" (inline)
+    PROVIDER_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_TIMEOUT_SECONDS", "120"))  # Connect/read timeout of direct HTTP requests
+
+    # HTTP Client Configuration (pooled keep-alive connections shared by all provider calls in the process)
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))  # Connections kept alive per host
+    HTTP_KEEP_ALIVE = os.getenv("HTTP_KEEP_ALIVE", "true").lower() == "true"  # Reuse connections between requests
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # Idle seconds before a pooled httpx connection is closed
+    HTTP2 = os.getenv("HTTP2", "false").lower() == "true"  # Negotiate HTTP/2 in the shared httpx client (needs the h2 package)
+
+    # Provider Rate Limits (per API key, shared by all runs in the process)
+    ELEVENLABS_REQUESTS_PER_SECOND = float(os.getenv("ELEVENLABS_REQUESTS_PER_SECOND", "2"))
+    ELEVENLABS_MAX_CONCURRENCY = int(os.getenv("ELEVENLABS_MAX_CONCURRENCY", "4"))  # Upper bound of the adaptive concurrency limit
+    OPENAI_IMAGES_REQUESTS_PER_SECOND = float(os.getenv("OPENAI_IMAGES_REQUESTS_PER_SECOND", "1"))
+    OPENAI_IMAGES_MAX_CONCURRENCY = int(os.getenv("OPENAI_IMAGES_MAX_CONCURRENCY", "4"))
+    VERTEX_IMAGEN_REQUESTS_PER_SECOND = float(os.getenv("VERTEX_IMAGEN_REQUESTS_PER_SECOND", "1"))
+    VERTEX_IMAGEN_MAX_CONCURRENCY = int(os.getenv("VERTEX_IMAGEN_MAX_CONCURRENCY", "4"))
+    RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))  # Retries of a throttled (HTTP 429) request
+    RATE_LIMITS = {
+        "elevenlabs": (ELEVENLABS_REQUESTS_PER_SECOND, ELEVENLABS_MAX_CONCURRENCY),
+        "openai_dalle": (OPENAI_IMAGES_REQUESTS_PER_SECOND, OPENAI_IMAGES_MAX_CONCURRENCY),
+        "google_vertex_ai_image": (VERTEX_IMAGEN_REQUESTS_PER_SECOND, VERTEX_IMAGEN_MAX_CONCURRENCY)
+    }
+    DEFAULT_RATE_LIMIT = (1.0, 4)
+
+    # Stage Scheduler Configuration (slots shared by all jobs of the batch runner or job service)
+    SCHEDULER_SLOTS = {
+        "story": int(os.getenv("SCHEDULER_STORY_SLOTS", "4")),
+        "tts": int(os.getenv("SCHEDULER_TTS_SLOTS", str(ELEVENLABS_MAX_CONCURRENCY))),
+        "image": int(os.getenv("SCHEDULER_IMAGE_SLOTS", str(OPENAI_IMAGES_MAX_CONCURRENCY))),
+        "encode": int(os.getenv("SCHEDULER_ENCODE_SLOTS", "2"))
+    }
+
+    # Batch Configuration
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))  # Number of videos produced in parallel in batch mode
+
+    # Job Service Configuration
+    JOB_SERVICE_HOST = os.getenv("JOB_SERVICE_HOST", "127.0.0.1")
+    JOB_SERVICE_PORT = int(os.getenv("JOB_SERVICE_PORT", "8080"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Number of warm workers producing videos in parallel
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # Seconds an idle worker waits before checking the queue again
 
     # Output Directories
     BASE_OUTPUT_DIR = os.getenv("BASE_OUTPUT_DIR", "shortfactory_output")
     STORY_AUDIOS_DIR = os.path.join(BASE_OUTPUT_DIR, "story_audios")
     STORY_IMAGES_DIR = os.path.join(BASE_OUTPUT_DIR, "story_images")
     FINAL_VIDEOS_DIR = os.path.join(BASE_OUTPUT_DIR, "final_videos")
+    RUNS_DIR = os.path.join(BASE_OUTPUT_DIR, "runs")  # Per-run workspaces: manifest, scene assets and scratch space
+    CACHE_DIR = os.path.join(BASE_OUTPUT_DIR, "cache")  # Default location of caches enabled from the command line
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(BASE_OUTPUT_DIR, "jobs.sqlite3"))  # Persistent job queue of the job service
+    STORY_CACHE_DIR = os.getenv("STORY_CACHE_DIR", "")  # Directory of the story cache; empty (the default) disables it
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "")  # Directory of the narration cache; empty (the default) disables it
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "")  # Directory of the image cache; empty (the default) disables it
     
     @classmethod
     def create_output_directories(cls) -> Dict[str, str]:
@@ -48,12 +120,14 @@ class Config:
         os.makedirs(cls.STORY_AUDIOS_DIR, exist_ok=True)
         os.makedirs(cls.STORY_IMAGES_DIR, exist_ok=True)
         os.makedirs(cls.FINAL_VIDEOS_DIR, exist_ok=True)
+        os.makedirs(cls.RUNS_DIR, exist_ok=True)
         
         return {
             "base": cls.BASE_OUTPUT_DIR,
             "audios": cls.STORY_AUDIOS_DIR,
             "images": cls.STORY_IMAGES_DIR,
-            "videos": cls.FINAL_VIDEOS_DIR
+            "videos": cls.FINAL_VIDEOS_DIR,
+            "runs": cls.RUNS_DIR
         }
     
     @classmethod
@@ -0,0 +1,250 @@
+"""
+Batch module for producing many videos from a subjects file with a pool of factory workers.
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from pydantic import ValidationError
+
+from src.core.factory import ShortVideoFactory
+from src.core.checkpoint import new_run_id
+from src.core.scheduler import StageScheduler
+from src.models.schemas import BatchJob, VideoCreationConfig
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def iter_batch_rows(jobs_path: str) -> Iterator[Tuple[int, Dict]]:
+    """
+    Lazily read rows from a JSONL or CSV subjects file.
+
+    Args:
+        jobs_path: Path to a .jsonl or .csv file; CSV files need a header row
+
+    Yields:
+        Tuples of (line number, row dictionary). Empty values are dropped from the row.
+    """
+    extension = os.path.splitext(jobs_path)[1].lower()
+
+    with open(jobs_path, newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {key: value for key, value in row.items() if value not in (None, "")}
+        elif extension in (".jsonl", ".ndjson"):
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = {"_error": f"Invalid JSON: {e}"}
+                if not isinstance(row, dict):
+                    row = {"_error": "Each JSONL line must be an object."}
+                yield line_number, {key: value for key, value in row.items() if value not in (None, "")}
+        else:
+            raise ValueError(f"Unsupported batch file format: {extension}. Use .jsonl or .csv")
+
+
+class BatchRunner:
+    """
+    Runs many video jobs through a pool of ShortVideoFactory workers.
+
+    Each worker thread keeps its own factories (one per provider combination), so the LLM and
+    provider clients are initialised once per worker rather than once per video. Jobs are read lazily
+    and at most a small multiple of the worker count is in flight, so memory stays flat regardless of
+    the size of the subjects file. Results are appended to a JSONL file as soon as each job finishes.
+    """
+
+    def __init__(self,
+                 llm_factory: Callable[[], BaseChatModel],
+                 base_config: VideoCreationConfig,
+                 workers: Optional[int] = None,
+                 scheduler: Optional[StageScheduler] = None):
+        """
+        Initialize the BatchRunner.
+
+        Args:
+            llm_factory: Callable returning a new LLM; called once per worker thread
+            base_config: Configuration applied to every job before per-row overrides
+            workers: Number of videos produced in parallel (defaults to Config.BATCH_WORKERS)
+            scheduler: Optional stage scheduler; jobs then share its slots by priority, tenant and deadline
+        """
+        self.llm_factory = llm_factory
+        self.base_config = base_config
+        self.scheduler = scheduler
+        self.workers = workers or Config.BATCH_WORKERS
+        if self.workers < 1:
+            raise ValueError("Number of batch workers must be at least 1.")
+        self._local = threading.local()
+
+    def run(self, jobs_path: str, results_path: str) -> Dict[str, int]:
+        """
+        Run every job of a subjects file and write one result line per job.
+
+        Args:
+            jobs_path: Path to the .jsonl or .csv subjects file
+            results_path: Path to the results JSONL file (appended to)
+
+        Returns:
+            Summary with total, succeeded and failed job counts
+        """
+        summary = {"total": 0, "succeeded": 0, "failed": 0}
+        max_in_flight = self.workers * 2
+        results_dir = os.path.dirname(results_path)
+        if results_dir:
+            os.makedirs(results_dir, exist_ok=True)
+
+        logger.info(f"Starting batch from {jobs_path} with {self.workers} workers...")
+
+        with open(results_path, "a", encoding="utf-8") as results_file, \
+             ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shortfactory-batch") as executor:
+            pending = set()
+
+            def drain(return_when):
+                nonlocal pending
+                done, pending = wait(pending, return_when=return_when)
+                for future in done:
+                    record = future.result()
+                    results_file.write(json.dumps(record) + "\n")
+                    results_file.flush()
+                    summary["total"] += 1
+                    summary["succeeded" if record["success"] else "failed"] += 1
+
+            for line_number, row in iter_batch_rows(jobs_path):
+                if len(pending) >= max_in_flight:
+                    drain(FIRST_COMPLETED)
+                pending.add(executor.submit(self._run_row, line_number, row))
+
+            if pending:
+                drain(ALL_COMPLETED)
+
+        logger.info(f"Batch complete: {summary['succeeded']} succeeded, {summary['failed']} failed out of {summary['total']} jobs.")
+        return summary
+
+    def _run_row(self, line_number: int, row: Dict) -> Dict:
+        """
+        Validate a single row and run it as a job, never raising.
+
+        Args:
+            line_number: Line number of the row in the subjects file
+            row: Raw row values
+
+        Returns:
+            Result record for the results file
+        """
+        row.setdefault("job_id", f"job_{line_number}")
+        if "_error" in row:
+            return self._failure_record(row, f"Line {line_number}: {row['_error']}")
+
+        try:
+            job = BatchJob(**row)
+        except ValidationError as e:
+            return self._failure_record(row, f"Line {line_number}: invalid job row: {e}")
+
+        start = time.monotonic()
+        try:
+            result = self.run_job(job)
+        except Exception as e:
+            logger.exception(f"Batch job {job.job_id} raised an exception")
+            result = {"success": False, "error": f"Error during batch job: {e}", "steps_completed": []}
+
+        return {
+            "job_id": job.job_id,
+            "subject": job.subject,
+            "success": bool(result.get("success")),
+            "error": result.get("error", ""),
+            "steps_completed": result.get("steps_completed", []),
+            "video_path": result.get("video", {}).get("video_path", ""),
+            "run_id": result.get("run_id", ""),
+            "elapsed_seconds": round(time.monotonic() - start, 3)
+        }
+
+    def run_job(self, job: BatchJob, run_id: Optional[str] = None, deadline: Optional[float] = None) -> Dict:
+        """
+        Run a single job on the calling worker's factory, under the scheduler if there is one.
+
+        Args:
+            job: Validated job description
+            run_id: Run to use for the job; a run that already has a checkpoint is resumed.
+                Generated from the job id if omitted.
+            deadline: Wall clock time the video should be done by (defaults to now + job.deadline_seconds)
+
+        Returns:
+            The create_video (or resume) result dictionary
+        """
+        if self.scheduler is None:
+            return self._run_job(job, run_id)
+
+        if deadline is None and job.deadline_seconds is not None:
+            deadline = time.time() + job.deadline_seconds
+        with self.scheduler.job(job.job_id, priority=job.priority, deadline=deadline, tenant=job.tenant,
+                                num_scenes=job.num_scenes or self.base_config.num_scenes):
+            return self._run_job(job, run_id)
+
+    def _run_job(self, job: BatchJob, run_id: Optional[str]) -> Dict:
+        """Create or resume the run of a job."""
+        factory = self._get_factory(job.tts_provider or self.base_config.tts_provider,
+                                    job.image_provider or self.base_config.image_provider)
+
+        if run_id is not None and factory.has_run(run_id):
+            logger.info(f"Resuming job {job.job_id} from run {run_id}: '{job.subject}'")
+            return factory.resume(run_id)
+
+        # Every run gets its own workspace; the suffix keeps job ids reused across batch files apart
+        run_id = run_id or f"{job.job_id}-{new_run_id()}"
+        logger.info(f"Running batch job {job.job_id} as run {run_id}: '{job.subject}'")
+        return factory.create_video(subject=job.subject, num_scenes=job.num_scenes, run_id=run_id)
+
+    def warm_up(self):
+        """Create the calling worker's LLM and factory for the base providers ahead of its first job."""
+        self._get_factory(self.base_config.tts_provider, self.base_config.image_provider)
+
+    def _get_factory(self, tts_provider: str, image_provider: str) -> ShortVideoFactory:
+        """
+        Get (or lazily create) this worker thread's factory for a provider combination.
+
+        Args:
+            tts_provider: TTS provider of the job
+            image_provider: Image provider of the job
+
+        Returns:
+            A ShortVideoFactory owned by the calling thread
+        """
+        if not hasattr(self._local, "factories"):
+            self._local.factories = {}
+            self._local.llm = self.llm_factory()
+
+        key = (tts_provider, image_provider)
+        if key not in self._local.factories:
+            config = self.base_config.model_copy(deep=True, update={
+                "tts_provider": tts_provider,
+                "image_provider": image_provider
+            })
+            self._local.factories[key] = ShortVideoFactory(self._local.llm, config=config)
+        return self._local.factories[key]
+
+    @staticmethod
+    def _failure_record(row: Dict, error: str) -> Dict:
+        """Build a results record for a row that could not be run."""
+        logger.error(error)
+        return {
+            "job_id": str(row.get("job_id", "")),
+            "subject": str(row.get("subject", "")),
+            "success": False,
+            "error": error,
+            "steps_completed": [],
+            "video_path": "",
+            # Rows that could not be run never got a run, but keep the shape of the other records
+            "run_id": "",
+            "elapsed_seconds": 0.0
+        }
@@ -0,0 +1,168 @@
+"""
+Checkpoint module for persisting run manifests so interrupted or failed runs can be resumed.
+"""
+
+import os
+import uuid
+import logging
+import tempfile
+import threading
+from typing import Optional
+
+from src.models.schemas import GenerationResult, RunManifest, StoryWithScenes
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def new_run_id() -> str:
+    """Generate a new unique run identifier."""
+    return uuid.uuid4().hex[:12]
+
+
+def is_valid_artifact(result: Optional[GenerationResult], require_duration: bool = False) -> bool:
+    """
+    Check that a recorded generation result still points at a usable artifact.
+
+    Args:
+        result: Recorded result, if any
+        require_duration: Whether the result must also carry a positive duration (audio)
+
+    Returns:
+        True if the result succeeded and its output file exists and is not empty
+    """
+    if result is None or not result.success or not result.output_path:
+        return False
+    if require_duration and result.duration <= 0:
+        return False
+    return os.path.isfile(result.output_path) and os.path.getsize(result.output_path) > 0
+
+
+class RunCheckpoint:
+    """
+    Thread-safe wrapper around a RunManifest that persists every update atomically.
+
+    Scene results are recorded from worker threads as soon as they finish, so a killed process
+    loses at most the scenes that were in flight.
+    """
+
+    def __init__(self, manifest: RunManifest, manifest_path: str):
+        """
+        Initialize the RunCheckpoint.
+
+        Args:
+            manifest: Manifest of the run
+            manifest_path: Path of the manifest JSON file
+        """
+        self.manifest = manifest
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, runs_dir: str, run_id: str, subject: str, num_scenes: int) -> "RunCheckpoint":
+        """
+        Create and persist a new, empty checkpoint.
+
+        Args:
+            runs_dir: Directory holding one sub-directory per run
+            run_id: Identifier of the run
+            subject: Subject of the story
+            num_scenes: Number of scenes requested
+
+        Returns:
+            The new RunCheckpoint
+        """
+        manifest = RunManifest(run_id=run_id, subject=subject, num_scenes=num_scenes)
+        checkpoint = cls(manifest, os.path.join(runs_dir, run_id, MANIFEST_FILENAME))
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, runs_dir: str, run_id: str) -> "RunCheckpoint":
+        """
+        Load the checkpoint of an existing run.
+
+        Args:
+            runs_dir: Directory holding one sub-directory per run
+            run_id: Identifier of the run
+
+        Returns:
+            The loaded RunCheckpoint
+
+        Raises:
+            FileNotFoundError: If the run has no manifest
+        """
+        manifest_path = os.path.join(runs_dir, run_id, MANIFEST_FILENAME)
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = RunManifest.model_validate_json(f.read())
+        return cls(manifest, manifest_path)
+
+    def save(self):
+        """Atomically write the manifest to disk."""
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        """Write the manifest to a temporary file and rename it over the previous version."""
+        directory = os.path.dirname(self.manifest_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.manifest.model_dump_json(indent=2))
+            os.replace(tmp_path, self.manifest_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def record_story(self, story: StoryWithScenes):
+        """Record the generated story."""
+        with self._lock:
+            self.manifest.story = story
+            self._save_locked()
+
+    def discard_scene_assets(self):
+        """Forget recorded narrations, images and video, which only belong to the recorded story."""
+        with self._lock:
+            if not (self.manifest.narrations or self.manifest.visuals or self.manifest.video):
+                return
+            self.manifest.narrations = {}
+            self.manifest.visuals = {}
+            self.manifest.video = None
+            self._save_locked()
+
+    def record_narration(self, scene_number: int, result: GenerationResult):
+        """Record a scene's narration result; invalidates any previously assembled video."""
+        with self._lock:
+            self.manifest.narrations[scene_number] = result
+            self.manifest.video = None
+            self._save_locked()
+
+    def record_visual(self, scene_number: int, result: GenerationResult):
+        """Record a scene's image result; invalidates any previously assembled video."""
+        with self._lock:
+            self.manifest.visuals[scene_number] = result
+            self.manifest.video = None
+            self._save_locked()
+
+    def record_video(self, result: GenerationResult):
+        """Record the final video result."""
+        with self._lock:
+            self.manifest.video = result
+            self._save_locked()
+
+    def valid_narration(self, scene_number: int) -> Optional[GenerationResult]:
+        """Return the recorded narration of a scene if its audio file is still usable."""
+        result = self.manifest.narrations.get(scene_number)
+        return result if is_valid_artifact(result, require_duration=True) else None
+
+    def valid_visual(self, scene_number: int) -> Optional[GenerationResult]:
+        """Return the recorded image of a scene if its file is still usable."""
+        result = self.manifest.visuals.get(scene_number)
+        return result if is_valid_artifact(result) else None
+
+    def valid_video(self) -> Optional[GenerationResult]:
+        """Return the recorded final video if its file is still usable."""
+        return self.manifest.video if is_valid_artifact(self.manifest.video) else None
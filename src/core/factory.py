@@ -3,16 +3,24 @@ Core Factory module for orchestrating the ShortVideo creation process.
 """
 
 import os
+import queue
 import logging
-from typing import List, Dict, Optional, Tuple, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Optional, Tuple, Union
 
 from langchain_core.language_models import BaseChatModel
 
-from src.models.schemas import StoryWithScenes, GenerationResult, VideoCreationConfig
+from src.models.schemas import CharacterDescription, Scene, StoryWithScenes, GenerationResult, VideoCreationConfig
 from src.generators.story_generator import StoryGenerator
 from src.generators.narration_generator import NarrationGenerator
 from src.generators.visual_generator import VisualGenerator
 from src.assemblers.video_assembler import VideoAssembler
+from src.core.checkpoint import MANIFEST_FILENAME, RunCheckpoint, new_run_id
+from src.core.scheduler import scheduled
+from src.core.workspace import RunWorkspace
+from src.utils.cache import FileCache
+from src.utils.profiling import PROFILE_FILENAME, RunAborted, detached, profile_run, propagate, span
 from src.config.config import Config
 
 logger = logging.getLogger(__name__)
@@ -33,70 +41,213 @@ class ShortVideoFactory:
         """
         # Create default config if none provided
         if config is None:
-            # Get output directories
-            output_dirs = Config.create_output_directories()
-            
-            config = VideoCreationConfig(
-                story_subject=Config.STORY_SUBJECT,
-                num_scenes=Config.NUM_SCENES,
-                tts_provider=Config.TTS_PROVIDER,
-                elevenlabs_voice_id=Config.ELEVENLABS_VOICE_ID,
-                image_provider=Config.IMAGE_PROVIDER,
-                gcp_project_id=Config.GCP_PROJECT_ID,
-                gcp_location=Config.GCP_LOCATION,
-                vertex_ai_imagen_model_id=Config.VERTEX_AI_IMAGEN_MODEL_ID,
-                image_transition_duration=Config.IMAGE_TRANSITION_DURATION,
-                video_fps=Config.VIDEO_FPS,
-                output_directories=output_dirs
-            )
+            config = self.build_default_config()
             
         self.config = config
         
         # Initialize components
-        self.story_generator = StoryGenerator(llm)
+        self.story_generator = StoryGenerator(
+            llm,
+            story_cache=FileCache(config.story_cache_dir, max_bytes=config.story_cache_max_bytes, suffix=".json",
+                                  ttl_seconds=config.story_cache_ttl_seconds or None) if config.story_cache_dir else None,
+            prompt_mode=config.story_prompt_mode
+        )
         self.narration_generator = NarrationGenerator(
             provider=config.tts_provider,
-            elevenlabs_voice_id=config.elevenlabs_voice_id
+            elevenlabs_voice_id=config.elevenlabs_voice_id,
+            audio_cache=FileCache(config.tts_cache_dir, max_bytes=config.tts_cache_max_bytes, suffix=".mp3") if config.tts_cache_dir else None
         )
         self.visual_generator = VisualGenerator(
             provider=config.image_provider,
             gcp_project_id=config.gcp_project_id,
             gcp_location=config.gcp_location,
-            vertex_ai_imagen_model_id=config.vertex_ai_imagen_model_id
+            vertex_ai_imagen_model_id=config.vertex_ai_imagen_model_id,
+            image_cache=FileCache(config.image_cache_dir, max_bytes=config.image_cache_max_bytes, suffix=".png",
+                                  ttl_seconds=config.image_cache_ttl_seconds or None) if config.image_cache_dir else None
         )
         self.video_assembler = VideoAssembler()
         
         logger.info("ShortVideoFactory initialized with all components.")
         
-    def create_video(self, subject: Optional[str] = None, num_scenes: Optional[int] = None) -> Dict[str, Union[bool, str, Dict]]:
+    @staticmethod
+    def build_default_config() -> VideoCreationConfig:
         """
-        Execute the full video creation pipeline: story -> narration -> visuals -> assembly.
+        Build a VideoCreationConfig from the global Config settings, creating the output directories.
+        
+        Returns:
+            VideoCreationConfig populated from environment-driven defaults
+        """
+        output_dirs = Config.create_output_directories()
+        
+        return VideoCreationConfig(
+            story_subject=Config.STORY_SUBJECT,
+            num_scenes=Config.NUM_SCENES,
+            tts_provider=Config.TTS_PROVIDER,
+            elevenlabs_voice_id=Config.ELEVENLABS_VOICE_ID,
+            image_provider=Config.IMAGE_PROVIDER,
+            gcp_project_id=Config.GCP_PROJECT_ID,
+            gcp_location=Config.GCP_LOCATION,
+            vertex_ai_imagen_model_id=Config.VERTEX_AI_IMAGEN_MODEL_ID,
+            image_transition_duration=Config.IMAGE_TRANSITION_DURATION,
+            video_fps=Config.VIDEO_FPS,
+            output_directories=output_dirs,
+            max_concurrent_narrations=Config.MAX_CONCURRENT_NARRATIONS,
+            max_concurrent_images=Config.MAX_CONCURRENT_IMAGES,
+            narration_mode=Config.NARRATION_MODE,
+            story_prompt_mode=Config.STORY_PROMPT_MODE,
+            story_cache_dir=Config.STORY_CACHE_DIR,
+            story_cache_max_bytes=Config.STORY_CACHE_MAX_BYTES,
+            story_cache_ttl_seconds=Config.STORY_CACHE_TTL_SECONDS,
+            tts_cache_dir=Config.TTS_CACHE_DIR,
+            tts_cache_max_bytes=Config.TTS_CACHE_MAX_BYTES,
+            image_cache_dir=Config.IMAGE_CACHE_DIR,
+            image_cache_max_bytes=Config.IMAGE_CACHE_MAX_BYTES,
+            image_cache_ttl_seconds=Config.IMAGE_CACHE_TTL_SECONDS,
+            pipeline_mode=Config.PIPELINE_MODE,
+            pipeline_queue_size=Config.PIPELINE_QUEUE_SIZE,
+            story_streaming=Config.STORY_STREAMING,
+            video_filename_template=Config.VIDEO_FILENAME_TEMPLATE,
+            scratch_cleanup_policy=Config.SCRATCH_CLEANUP_POLICY
+        )
+        
+    def create_video(self, subject: Optional[str] = None, num_scenes: Optional[int] = None,
+                     run_id: Optional[str] = None) -> Dict[str, Union[bool, str, Dict]]:
+        """
+        Execute the full video creation pipeline: story -> (narration | visuals) -> assembly.
+        Narration and visual generation only depend on the story, so both stages run concurrently.
+        Progress is checkpointed to a run manifest, so a failed or interrupted run can be continued with resume().
+        Every run works in its own directory under the runs directory, so concurrent runs never share paths;
+        the final video is published atomically under a unique name (see video_filename_template).
+        Inside StageScheduler.job(), every story, narration, image and encode step waits for a slot of
+        the shared scheduler, so concurrent jobs are served by priority, tenant and deadline.
         
         Args:
             subject: Optional subject override for story generation
             num_scenes: Optional number of scenes override
+            run_id: Optional identifier for the run (generated if omitted)
             
         Returns:
-            Dictionary with process results and output paths
+            Dictionary with process results and output paths, including the run_id
         """
         final_subject = subject or self.config.story_subject
         final_num_scenes = num_scenes or self.config.num_scenes
         
-        logger.info(f"Starting video creation for subject: '{final_subject}' with {final_num_scenes} scenes...")
+        workspace = self._open_workspace(run_id or new_run_id())
+        checkpoint = RunCheckpoint.create(self._runs_dir(), workspace.run_id, final_subject, final_num_scenes)
+        logger.info(f"Starting video creation run {workspace.run_id} for subject: '{final_subject}' with {final_num_scenes} scenes...")
+        
+        return self._run_pipeline(checkpoint, workspace)
+        
+    def resume(self, run_id: str) -> Dict[str, Union[bool, str, Dict]]:
+        """
+        Resume a previous run from its manifest.
+        The story, and every scene whose recorded artifact still exists and validates, are reused;
+        only the missing or invalid pieces are regenerated.
+        
+        Args:
+            run_id: Identifier of the run to resume
+            
+        Returns:
+            Dictionary with process results and output paths, including the run_id
+        """
+        try:
+            checkpoint = RunCheckpoint.load(self._runs_dir(), run_id)
+        except FileNotFoundError:
+            error_msg = f"No manifest found for run {run_id}."
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg, "steps_completed": [], "run_id": run_id}
+        except Exception as e:
+            error_msg = f"Could not load manifest for run {run_id}: {e}"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg, "steps_completed": [], "run_id": run_id}
+            
+        logger.info(f"Resuming video creation run {run_id} for subject: '{checkpoint.manifest.subject}'...")
+        return self._run_pipeline(checkpoint, self._open_workspace(run_id))
+        
+    def has_run(self, run_id: str) -> bool:
+        """
+        Check whether a run has a checkpoint that resume() can continue.
+        
+        Args:
+            run_id: Identifier of the run
+            
+        Returns:
+            True if the run's manifest exists
+        """
+        return os.path.isfile(os.path.join(self._runs_dir(), run_id, MANIFEST_FILENAME))
+        
+    def _run_pipeline(self, checkpoint: RunCheckpoint, workspace: RunWorkspace) -> Dict[str, Union[bool, str, Dict]]:
+        """
+        Run the pipeline stages for a checkpointed run, reusing any valid recorded artifacts,
+        then clean up the run's scratch space according to the cleanup policy.
+        
+        Args:
+            checkpoint: Checkpoint of the run
+            workspace: Workspace of the run
+            
+        Returns:
+            Dictionary with process results and output paths, including the run_id, run_dir and
+            the run's timing profile (also saved as profile.json in the run directory)
+        """
+        result = {"success": False}
+        try:
+            with profile_run(workspace.run_id) as profile:
+                result = self._run_stages(checkpoint, workspace)
+        finally:
+            workspace.cleanup(success=bool(result.get("success")))
+        result["run_id"] = workspace.run_id
+        result["run_dir"] = workspace.root
+        result["profile"] = profile.to_dict()
+        try:
+            profile.save(os.path.join(workspace.root, PROFILE_FILENAME))
+        except OSError as e:
+            logger.warning(f"Could not save profile of run {workspace.run_id}: {e}")
+        return result
+        
+    def _run_stages(self, checkpoint: RunCheckpoint, workspace: RunWorkspace) -> Dict[str, Union[bool, str, Dict]]:
+        """
+        Run the story, narration, visual and assembly stages of a run.
+        
+        Args:
+            checkpoint: Checkpoint of the run
+            workspace: Workspace of the run
+            
+        Returns:
+            Dictionary with process results and output paths
+        """
+        manifest = checkpoint.manifest
         
         # 1. Generate structured story
-        story_result = self.generate_story(final_subject, final_num_scenes)
-        if not story_result["success"]:
-            return {
-                "success": False,
-                "error": f"Story generation failed: {story_result.get('error', 'Unknown error')}",
-                "steps_completed": []
-            }
+        if manifest.story is not None and manifest.story.scenes:
+            logger.info(f"Reusing checkpointed story: '{manifest.story.title}'")
+            story_result = {"success": True, "story": manifest.story}
+        elif self.config.pipeline_mode == "streaming" and self.config.story_streaming:
+            # Assets of a story interrupted while streaming do not match the story written next
+            checkpoint.discard_scene_assets()
+            story_events = detached(self._stream_story(manifest.subject, manifest.num_scenes))
+            return self._run_streaming_pipeline(story_events, checkpoint, workspace)
+        else:
+            story_result = self.generate_story(manifest.subject, manifest.num_scenes)
+            if not story_result["success"]:
+                return {
+                    "success": False,
+                    "error": f"Story generation failed: {story_result.get('error', 'Unknown error')}",
+                    "steps_completed": []
+                }
+            checkpoint.record_story(story_result["story"])
         
         structured_story = story_result["story"]
         
-        # 2. Generate narrations for each scene
-        narration_results = self.generate_narrations(structured_story)
+        if self.config.pipeline_mode == "streaming":
+            return self._create_video_streaming(story_result, checkpoint, workspace)
+        
+        # 2 & 3. Generate narrations and visuals for each scene concurrently
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="shortfactory-stage") as executor:
+            narration_future = executor.submit(propagate(self.generate_narrations), structured_story, checkpoint, workspace)
+            visual_future = executor.submit(propagate(self.generate_visuals), structured_story, checkpoint, workspace)
+            narration_results = narration_future.result()
+            visual_results = visual_future.result()
+
         if not narration_results["success"]:
             return {
                 "success": False,
@@ -105,8 +256,6 @@ class ShortVideoFactory:
                 "story": story_result
             }
             
-        # 3. Generate visuals for each scene
-        visual_results = self.generate_visuals(structured_story)
         if not visual_results["success"]:
             return {
                 "success": False,
@@ -129,7 +278,14 @@ class ShortVideoFactory:
                 "visuals": visual_results
             }
             
-        video_result = self.assemble_video(valid_scene_data)
+        existing_video = checkpoint.valid_video()
+        if existing_video is not None:
+            logger.info(f"Reusing checkpointed video: {existing_video.output_path}")
+            video_result = {"success": True, "result": existing_video, "video_path": existing_video.output_path}
+        else:
+            video_result = self.assemble_video(valid_scene_data, workspace)
+            if video_result["success"]:
+                checkpoint.record_video(video_result["result"])
         
         return {
             "success": video_result["success"],
@@ -155,7 +311,13 @@ class ShortVideoFactory:
         logger.info(f"Generating story for subject: '{subject}' with {num_scenes} scenes...")
         
         try:
-            result = self.story_generator.generate_structured_story(subject, num_scenes)
+            with scheduled("story"), span("story"):
+                result = self.story_generator.generate_structured_story(
+                    subject,
+                    num_scenes,
+                    use_cache=self.config.story_cache_mode != "bypass",
+                    refresh_cache=self.config.story_cache_mode == "refresh"
+                )
             
             if isinstance(result, StoryWithScenes):
                 logger.info(f"Successfully generated story: '{result.title}'")
@@ -170,12 +332,16 @@ class ShortVideoFactory:
             logger.error(error_msg)
             return {"success": False, "error": error_msg}
 
-    def generate_narrations(self, story: StoryWithScenes) -> Dict[str, Union[bool, str, List[GenerationResult]]]:
+    def generate_narrations(self, story: StoryWithScenes,
+                            checkpoint: Optional[RunCheckpoint] = None,
+                            workspace: Optional[RunWorkspace] = None) -> Dict[str, Union[bool, str, List[GenerationResult]]]:
         """
         Generate narrations for all scenes in the story.
         
         Args:
             story: Structured story with scenes
+            checkpoint: Optional run checkpoint; scenes with a valid recorded narration are reused
+            workspace: Optional run workspace; audio files are written to its audios directory
             
         Returns:
             Dictionary with success flag, results list and error if any
@@ -183,19 +349,18 @@ class ShortVideoFactory:
         logger.info(f"Generating narrations for {len(story.scenes)} scenes...")
         
         narration_results = []
-        audio_dir = self.config.output_directories.get("audios", "shortfactory_output/story_audios")
-        os.makedirs(audio_dir, exist_ok=True)
+        if workspace is not None:
+            audio_dir = workspace.audios_dir
+        else:
+            audio_dir = self.config.output_directories.get("audios", "shortfactory_output/story_audios")
+            os.makedirs(audio_dir, exist_ok=True)
         
         try:
-            for scene in story.scenes:
-                audio_path = os.path.join(audio_dir, f"scene_{scene.scene_number}_narration.mp3")
-                result = self.narration_generator.generate_narration(scene.narration_text, audio_path)
-                narration_results.append(result)
-                
-                if result.success:
-                    logger.info(f"Generated narration for scene {scene.scene_number}, duration: {result.duration:.2f}s")
+            with span("narration"):
+                if self.config.narration_mode == "story":
+                    narration_results = self._narrate_story(story.scenes, audio_dir, checkpoint)
                 else:
-                    logger.error(f"Failed to generate narration for scene {scene.scene_number}: {result.error}")
+                    narration_results = self._map_scenes(lambda scene: self._narrate_scene(scene, audio_dir, checkpoint), story.scenes, self.config.max_concurrent_narrations)
                 
             # Check if at least one narration succeeded
             if any(result.success for result in narration_results):
@@ -208,12 +373,16 @@ class ShortVideoFactory:
             logger.error(error_msg)
             return {"success": False, "error": error_msg, "results": narration_results}
             
-    def generate_visuals(self, story: StoryWithScenes) -> Dict[str, Union[bool, str, List[GenerationResult]]]:
+    def generate_visuals(self, story: StoryWithScenes,
+                         checkpoint: Optional[RunCheckpoint] = None,
+                         workspace: Optional[RunWorkspace] = None) -> Dict[str, Union[bool, str, List[GenerationResult]]]:
         """
         Generate visuals for all scenes in the story.
         
         Args:
             story: Structured story with scenes
+            checkpoint: Optional run checkpoint; scenes with a valid recorded image are reused
+            workspace: Optional run workspace; image files are written to its images directory
             
         Returns:
             Dictionary with success flag, results list and error if any
@@ -221,24 +390,15 @@ class ShortVideoFactory:
         logger.info(f"Generating visuals for {len(story.scenes)} scenes...")
         
         visual_results = []
-        images_dir = self.config.output_directories.get("images", "shortfactory_output/story_images")
-        os.makedirs(images_dir, exist_ok=True)
+        if workspace is not None:
+            images_dir = workspace.images_dir
+        else:
+            images_dir = self.config.output_directories.get("images", "shortfactory_output/story_images")
+            os.makedirs(images_dir, exist_ok=True)
         
         try:
-            for scene in story.scenes:
-                image_path = os.path.join(images_dir, f"scene_{scene.scene_number}_image.png")
-                result = self.visual_generator.generate_image(
-                    overall_image_style=story.overall_image_style,
-                    main_characters=story.main_characters,
-                    scene_visual_description=scene.visual_description,
-                    output_path=image_path
-                )
-                visual_results.append(result)
-                
-                if result.success:
-                    logger.info(f"Generated image for scene {scene.scene_number}")
-                else:
-                    logger.error(f"Failed to generate image for scene {scene.scene_number}: {result.error}")
+            with span("visuals"):
+                visual_results = self._map_scenes(lambda scene: self._illustrate_scene(story.overall_image_style, story.main_characters, scene, images_dir, checkpoint), story.scenes, self.config.max_concurrent_images)
                 
             # Check if at least one visual succeeded
             if any(result.success for result in visual_results):
@@ -251,12 +411,14 @@ class ShortVideoFactory:
             logger.error(error_msg)
             return {"success": False, "error": error_msg, "results": visual_results}
             
-    def assemble_video(self, valid_scene_data: List[Tuple[str, str, float]]) -> Dict[str, Union[bool, str, GenerationResult]]:
+    def assemble_video(self, valid_scene_data: List[Tuple[str, str, float]],
+                       workspace: Optional[RunWorkspace] = None) -> Dict[str, Union[bool, str, GenerationResult]]:
         """
         Assemble final video from valid scene data.
         
         Args:
             valid_scene_data: List of tuples (image_path, audio_path, audio_duration)
+            workspace: Optional run workspace; the video is rendered in its scratch space and then published
             
         Returns:
             Dictionary with success flag, video result and error if any
@@ -266,10 +428,12 @@ class ShortVideoFactory:
             logger.error(error_msg)
             return {"success": False, "error": error_msg}
             
-        videos_dir = self.config.output_directories.get("videos", "shortfactory_output/final_videos")
-        os.makedirs(videos_dir, exist_ok=True)
-        
-        video_path = os.path.join(videos_dir, "final_video.mp4")
+        if workspace is not None:
+            video_path = workspace.scratch_path("final_video.mp4")
+        else:
+            videos_dir = self.config.output_directories.get("videos", "shortfactory_output/final_videos")
+            os.makedirs(videos_dir, exist_ok=True)
+            video_path = os.path.join(videos_dir, "final_video.mp4")
         
         try:
             # Unpack scene data
@@ -278,16 +442,20 @@ class ShortVideoFactory:
             audio_durations = [item[2] for item in valid_scene_data]
             
             # Assemble video
-            result = self.video_assembler.assemble_video(
-                image_paths=image_paths,
-                audio_paths=audio_paths,
-                audio_durations=audio_durations,
-                output_video_path=video_path,
-                image_transition_duration=self.config.image_transition_duration,
-                fps=self.config.video_fps
-            )
+            with scheduled("encode"), span("assembly"):
+                result = self.video_assembler.assemble_video(
+                    image_paths=image_paths,
+                    audio_paths=audio_paths,
+                    audio_durations=audio_durations,
+                    output_video_path=video_path,
+                    image_transition_duration=self.config.image_transition_duration,
+                    fps=self.config.video_fps
+                )
             
             if result.success:
+                if workspace is not None:
+                    video_path = workspace.publish(video_path)
+                    result = result.model_copy(update={"output_path": video_path})
                 logger.info(f"Successfully assembled video: {video_path}")
                 return {"success": True, "result": result, "video_path": video_path}
             else:
@@ -300,6 +468,489 @@ class ShortVideoFactory:
             logger.error(error_msg)
             return {"success": False, "error": error_msg}
     
+    def _create_video_streaming(self, story_result: Dict, checkpoint: RunCheckpoint,
+                                workspace: RunWorkspace) -> Dict[str, Union[bool, str, Dict]]:
+        """
+        Streaming variant of the narration, visuals and assembly stages for a complete story.
+        
+        Args:
+            story_result: Successful result of generate_story
+            checkpoint: Checkpoint of the run
+            workspace: Workspace of the run; segments are encoded in its scratch space
+            
+        Returns:
+            Dictionary with process results and output paths, shaped like create_video's result
+        """
+        story = story_result["story"]
+        events = [("overall_image_style", story.overall_image_style), ("main_characters", story.main_characters)]
+        events += [("scene", scene) for scene in story.scenes]
+        events.append(("story", story))
+        return self._run_streaming_pipeline(iter(events), checkpoint, workspace)
+    
+    def _stream_story(self, subject: str, num_scenes: int) -> Iterator[Tuple[str, object]]:
+        """
+        Generate the story while yielding its parts as they are written (see StoryGenerator.stream_structured_story).
+        
+        Args:
+            subject: Subject for the story
+            num_scenes: Number of scenes to generate
+            
+        The story slot and span stay open while the LLM streams; consume the events through
+        profiling.detached() so scene work started between events is not nested under the story span.
+        
+        Yields:
+            (event, value) pairs, ending with ("story", StoryWithScenes) or ("error", str)
+        """
+        logger.info(f"Streaming story for subject: '{subject}' with {num_scenes} scenes...")
+        with scheduled("story"), span("story"):
+            try:
+                yield from self.story_generator.stream_structured_story(
+                    subject,
+                    num_scenes,
+                    use_cache=self.config.story_cache_mode != "bypass",
+                    refresh_cache=self.config.story_cache_mode == "refresh"
+                )
+            except Exception as e:
+                error_msg = f"Error during story generation: {e}"
+                logger.error(error_msg)
+                yield "error", error_msg
+    
+    def _run_streaming_pipeline(self, story_events: Iterator[Tuple[str, object]], checkpoint: RunCheckpoint,
+                                workspace: RunWorkspace) -> Dict[str, Union[bool, str, Dict]]:
+        """
+        Run the narration, visuals and assembly stages as a streaming pipeline fed by story events.
+        
+        Each scene's narration starts as soon as the scene arrives, and its image as soon as the scene,
+        the overall image style and the main characters are known, so with a streamed story the first
+        scenes are produced while the LLM is still writing the later ones. Each scene's video segment
+        is encoded as soon as both its narration and image exist and the earlier scenes have been
+        handed to the encoder or skipped. Stages are connected by bounded
+        queues, so a slow encoder applies backpressure to generation instead of buffering finished
+        assets without limit. The final step only concatenates the already encoded segments.
+        
+        A scene whose segment fails to encode is skipped like a scene whose generation failed. After a
+        fatal error the stages start no more scene work and only drain their queues, so the run ends
+        instead of blocking on a full queue; a RunAborted raised by a span listener in any stage is
+        re-raised here once the stages have stopped.
+        
+        Args:
+            story_events: (event, value) pairs as yielded by StoryGenerator.stream_structured_story
+            checkpoint: Checkpoint of the run; the story is recorded once it is complete
+            workspace: Workspace of the run; segments are encoded in its scratch space
+            
+        Returns:
+            Dictionary with process results and output paths, shaped like create_video's result
+        """
+        logger.info("Running streaming pipeline...")
+        
+        audio_dir = workspace.audios_dir
+        images_dir = workspace.images_dir
+        segments_dir = workspace.segments_dir
+        
+        scenes: Dict[int, Scene] = {}
+        ready_queue = queue.Queue(maxsize=self.config.pipeline_queue_size)
+        encode_queue = queue.Queue(maxsize=self.config.pipeline_queue_size)
+        narration_results: Dict[int, GenerationResult] = {}
+        visual_results: Dict[int, GenerationResult] = {}
+        segment_results: Dict[int, GenerationResult] = {}
+        # Set after a fatal error: scene work stops and the stages only drain their queues
+        abort = threading.Event()
+        aborted: List[RunAborted] = []
+        
+        def stop(error: RunAborted):
+            # A span listener refused scene work for the whole run (e.g. the job was cancelled)
+            logger.warning(f"Streaming pipeline aborted: {error}")
+            aborted.append(error)
+            abort.set()
+        
+        def hand_over(target: queue.Queue, item: Tuple) -> bool:
+            # Blocks while the next stage is behind, which throttles generation, until the pipeline aborts
+            while not abort.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce(index: int, kind: str, generate: Callable[[], GenerationResult]):
+            if abort.is_set():
+                return
+            try:
+                result = generate()
+            except RunAborted as e:
+                stop(e)
+                return
+            except Exception as e:
+                logger.error(f"Error during {kind} generation for scene {scenes[index].scene_number}: {e}")
+                result = GenerationResult(success=False, output_path="", error=f"Error during {kind} generation: {e}")
+            hand_over(ready_queue, (index, kind, result))
+        
+        def pair_scenes():
+            # Pair up narrations and images as they arrive and hand complete scenes to the encoder in
+            # scene order, so each segment knows whether an earlier one opens the video
+            paired: Dict[int, Optional[Tuple]] = {}
+            next_index = 0
+            while True:
+                item = ready_queue.get()
+                if item is None:
+                    # Scenes after one that never completed (e.g. an aborted story) are still encoded
+                    for index in sorted(paired):
+                        if paired[index] is not None:
+                            hand_over(encode_queue, paired[index])
+                    encode_queue.put(None)
+                    return
+                index, kind, result = item
+                if kind == "narration":
+                    narration_results[index] = result
+                else:
+                    visual_results[index] = result
+                    
+                narration, visual = narration_results.get(index), visual_results.get(index)
+                if narration is None or visual is None:
+                    continue
+                if narration.success and visual.success:
+                    paired[index] = (index, narration, visual)
+                else:
+                    paired[index] = None
+                    logger.warning(f"Skipping scene {scenes[index].scene_number} due to failed generation "
+                                   f"(narration success: {narration.success}, visual success: {visual.success})")
+                while next_index in paired:
+                    ready = paired.pop(next_index)
+                    next_index += 1
+                    if ready is not None:
+                        hand_over(encode_queue, ready)
+        
+        def encode_segments():
+            while True:
+                item = encode_queue.get()
+                if item is None:
+                    return
+                if abort.is_set():
+                    continue
+                index, narration, visual = item
+                scene_number = scenes[index].scene_number
+                segment_path = os.path.join(segments_dir, f"scene_{scene_number}_segment.mp4")
+                # Like the batch pipeline's transitions, a segment only fades in after an encoded segment
+                # of an earlier scene (encoded first, as scenes arrive in order), so the video never
+                # starts with a fade from black
+                follows_segment = any(earlier < index and segment.success for earlier, segment in segment_results.items())
+                # A failed scene must not stop the encoder: the stages before it would block on the full queue
+                try:
+                    with scheduled("encode"), span("scene_segment", scene=scene_number):
+                        segment_results[index] = self.video_assembler.render_scene_segment(
+                            image_path=visual.output_path,
+                            audio_path=narration.output_path,
+                            audio_duration=narration.duration,
+                            output_segment_path=segment_path,
+                            fps=self.config.video_fps,
+                            fade_duration=self.config.image_transition_duration if follows_segment else 0.0
+                        )
+                except RunAborted as e:
+                    stop(e)
+                except Exception as e:
+                    logger.error(f"Error during segment encoding for scene {scene_number}: {e}")
+                    segment_results[index] = GenerationResult(success=False, output_path="", error=f"Error during segment encoding: {e}")
+        
+        pairer = threading.Thread(target=pair_scenes, name="shortfactory-pairer", daemon=True)
+        encoder = threading.Thread(target=propagate(encode_segments), name="shortfactory-encoder", daemon=True)
+        pairer.start()
+        encoder.start()
+        
+        story_result: Dict = {"success": False, "error": "Story generation ended without a story."}
+        style: Optional[str] = None
+        characters: Optional[List[CharacterDescription]] = None
+        pending_images: List[int] = []
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.config.max_concurrent_narrations, thread_name_prefix="shortfactory-tts") as tts_executor, \
+                 ThreadPoolExecutor(max_workers=self.config.max_concurrent_images, thread_name_prefix="shortfactory-image") as image_executor:
+                
+                def illustrate(index: int):
+                    scene = scenes[index]
+                    image_executor.submit(propagate(produce), index, "image", lambda: self._illustrate_scene(
+                        style, characters, scene, images_dir, checkpoint))
+                
+                def dispatch(index: int, scene: Scene):
+                    scenes[index] = scene
+                    tts_executor.submit(propagate(produce), index, "narration", lambda: self._narrate_scene(scene, audio_dir, checkpoint))
+                    if style is not None and characters is not None:
+                        illustrate(index)
+                    else:
+                        pending_images.append(index)
+                
+                for event, value in story_events:
+                    # Checked between scenes, so an aborted run stops dispatching new scene work
+                    if abort.is_set():
+                        break
+                    if event == "overall_image_style":
+                        style = value
+                    elif event == "main_characters":
+                        characters = value
+                    elif event == "scene":
+                        dispatch(len(scenes), value)
+                    elif event == "story":
+                        story_result = {"success": True, "story": value}
+                        style, characters = value.overall_image_style, value.main_characters
+                        checkpoint.record_story(value)
+                        for index in range(len(scenes), len(value.scenes)):
+                            dispatch(index, value.scenes[index])
+                    elif event == "error":
+                        story_result = {"success": False, "error": value}
+                        
+                    if style is not None and characters is not None:
+                        for index in pending_images:
+                            illustrate(index)
+                        pending_images.clear()
+        except BaseException:
+            abort.set()
+            raise
+        finally:
+            # Release the story slot of a stream that was abandoned before its last event
+            close = getattr(story_events, "close", None)
+            if close is not None:
+                close()
+            # The pairer and the encoder drain their queues until the end marker, even after an abort
+            ready_queue.put(None)
+            pairer.join()
+            encoder.join()
+        
+        if aborted:
+            raise aborted[0]
+        
+        if not story_result["success"]:
+            checkpoint.discard_scene_assets()
+            return {
+                "success": False,
+                "error": f"Story generation failed: {story_result.get('error', 'Unknown error')}",
+                "steps_completed": []
+            }
+        
+        scene_count = len(story_result["story"].scenes)
+        narration_stage = self._summarize_stage([narration_results[index] for index in range(scene_count)], "narration")
+        visual_stage = self._summarize_stage([visual_results[index] for index in range(scene_count)], "image")
+        
+        if not narration_stage["success"]:
+            return {
+                "success": False,
+                "error": f"Narration generation failed: {narration_stage['error']}",
+                "steps_completed": ["story"],
+                "story": story_result
+            }
+        if not visual_stage["success"]:
+            return {
+                "success": False,
+                "error": f"Visual generation failed: {visual_stage['error']}",
+                "steps_completed": ["story", "narration"],
+                "story": story_result,
+                "narration": narration_stage
+            }
+            
+        segment_paths = []
+        for index in sorted(segment_results):
+            segment = segment_results[index]
+            if segment.success:
+                segment_paths.append(segment.output_path)
+            else:
+                logger.warning(f"Skipping scene {scenes[index].scene_number} due to failed segment encoding: {segment.error}")
+                
+        if not segment_paths:
+            return {
+                "success": False,
+                "error": "No valid scene segments for video assembly.",
+                "steps_completed": ["story", "narration", "visuals"],
+                "story": story_result,
+                "narration": narration_stage,
+                "visuals": visual_stage
+            }
+            
+        video_path = workspace.scratch_path("final_video.mp4")
+        with scheduled("encode"), span("assembly"):
+            result = self.video_assembler.concatenate_segments(segment_paths, video_path)
+        
+        if result.success:
+            video_path = workspace.publish(video_path)
+            result = result.model_copy(update={"output_path": video_path})
+            logger.info(f"Successfully assembled video: {video_path}")
+            checkpoint.record_video(result)
+            video_result = {"success": True, "result": result, "video_path": video_path}
+        else:
+            error_msg = f"Video assembly failed: {result.error}"
+            logger.error(error_msg)
+            video_result = {"success": False, "error": error_msg, "result": result}
+        
+        return {
+            "success": video_result["success"],
+            "error": video_result.get("error", ""),
+            "steps_completed": ["story", "narration", "visuals", "video"] if video_result["success"] else ["story", "narration", "visuals"],
+            "story": story_result,
+            "narration": narration_stage,
+            "visuals": visual_stage,
+            "video": video_result
+        }
+    
+    @staticmethod
+    def _summarize_stage(results: List[GenerationResult], kind: str) -> Dict[str, Union[bool, str, List[GenerationResult]]]:
+        """
+        Build a stage result dictionary (as returned by generate_narrations/generate_visuals) from per-scene results.
+        
+        Args:
+            results: Per-scene results in scene order
+            kind: Human readable stage name used in the error message
+            
+        Returns:
+            Dictionary with success flag, results list and error if any
+        """
+        if any(result.success for result in results):
+            return {"success": True, "results": results}
+        return {"success": False, "error": f"All {kind} generation attempts failed.", "results": results}
+    
+    def _narrate_scene(self, scene: Scene, audio_dir: str, checkpoint: Optional[RunCheckpoint] = None) -> GenerationResult:
+        """
+        Generate the narration for a single scene, reusing a valid checkpointed narration if there is one.
+        
+        Args:
+            scene: Scene to narrate
+            audio_dir: Directory where the audio file is written
+            checkpoint: Optional run checkpoint the result is read from and recorded to
+            
+        Returns:
+            GenerationResult of the narration
+        """
+        if checkpoint is not None:
+            existing = checkpoint.valid_narration(scene.scene_number)
+            if existing is not None:
+                logger.info(f"Reusing checkpointed narration for scene {scene.scene_number}")
+                return existing
+            
+        audio_path = os.path.join(audio_dir, f"scene_{scene.scene_number}_narration.mp3")
+        with scheduled("tts"), span("scene_narration", scene=scene.scene_number):
+            result = self.narration_generator.generate_narration(scene.narration_text, audio_path)
+        if checkpoint is not None:
+            checkpoint.record_narration(scene.scene_number, result)
+        
+        if result.success:
+            logger.info(f"Generated narration for scene {scene.scene_number}, duration: {result.duration:.2f}s")
+        else:
+            logger.error(f"Failed to generate narration for scene {scene.scene_number}: {result.error}")
+        return result
+        
+    def _narrate_story(self, scenes: List[Scene], audio_dir: str, checkpoint: Optional[RunCheckpoint] = None) -> List[GenerationResult]:
+        """
+        Generate the narrations of all scenes with one TTS request, split at the scene boundaries.
+        
+        Scenes with a valid checkpointed narration are reused and left out of the request. If the
+        story request fails, the remaining scenes are narrated one by one instead.
+        
+        Args:
+            scenes: Scenes to narrate
+            audio_dir: Directory where the audio files are written
+            checkpoint: Optional run checkpoint the results are read from and recorded to
+            
+        Returns:
+            GenerationResult of each scene's narration, in scene order
+        """
+        results: Dict[int, GenerationResult] = {}
+        pending = []
+        for scene in scenes:
+            existing = checkpoint.valid_narration(scene.scene_number) if checkpoint is not None else None
+            if existing is not None:
+                logger.info(f"Reusing checkpointed narration for scene {scene.scene_number}")
+                results[scene.scene_number] = existing
+            else:
+                pending.append(scene)
+        
+        # A single scene gains nothing from timestamps and takes the per-scene path
+        if len(pending) > 1:
+            audio_paths = [os.path.join(audio_dir, f"scene_{scene.scene_number}_narration.mp3") for scene in pending]
+            with scheduled("tts"), span("story_narration"):
+                story_results = self.narration_generator.generate_story_narration([scene.narration_text for scene in pending], audio_paths)
+            if all(result.success for result in story_results):
+                for scene, result in zip(pending, story_results):
+                    if checkpoint is not None:
+                        checkpoint.record_narration(scene.scene_number, result)
+                    logger.info(f"Generated narration for scene {scene.scene_number}, duration: {result.duration:.2f}s")
+                    results[scene.scene_number] = result
+                pending = []
+            else:
+                logger.warning(f"Story narration failed ({story_results[0].error}); narrating the scenes one by one")
+        
+        scene_results = self._map_scenes(lambda scene: self._narrate_scene(scene, audio_dir, checkpoint), pending, self.config.max_concurrent_narrations)
+        for scene, result in zip(pending, scene_results):
+            results[scene.scene_number] = result
+        return [results[scene.scene_number] for scene in scenes]
+        
+    def _illustrate_scene(self, overall_image_style: str, main_characters: List[CharacterDescription], scene: Scene,
+                          images_dir: str, checkpoint: Optional[RunCheckpoint] = None) -> GenerationResult:
+        """
+        Generate the image for a single scene, reusing a valid checkpointed image if there is one.
+        
+        Args:
+            overall_image_style: Visual style of the story
+            main_characters: Main characters of the story
+            scene: Scene to illustrate
+            images_dir: Directory where the image file is written
+            checkpoint: Optional run checkpoint the result is read from and recorded to
+            
+        Returns:
+            GenerationResult of the image generation
+        """
+        if checkpoint is not None:
+            existing = checkpoint.valid_visual(scene.scene_number)
+            if existing is not None:
+                logger.info(f"Reusing checkpointed image for scene {scene.scene_number}")
+                return existing
+            
+        image_path = os.path.join(images_dir, f"scene_{scene.scene_number}_image.png")
+        with scheduled("image"), span("scene_image", scene=scene.scene_number):
+            result = self.visual_generator.generate_image(
+                overall_image_style=overall_image_style,
+                main_characters=main_characters,
+                scene_visual_description=scene.visual_description,
+                output_path=image_path
+            )
+        if checkpoint is not None:
+            checkpoint.record_visual(scene.scene_number, result)
+        
+        if result.success:
+            logger.info(f"Generated image for scene {scene.scene_number}")
+        else:
+            logger.error(f"Failed to generate image for scene {scene.scene_number}: {result.error}")
+        return result
+    
+    def _runs_dir(self) -> str:
+        """Directory holding one workspace (manifest, assets and scratch space) per run."""
+        return self.config.output_directories.get("runs", "shortfactory_output/runs")
+    
+    def _open_workspace(self, run_id: str) -> RunWorkspace:
+        """Create (or reopen) the workspace of a run."""
+        return RunWorkspace(
+            self._runs_dir(),
+            run_id,
+            videos_dir=self.config.output_directories.get("videos", "shortfactory_output/final_videos"),
+            video_filename_template=self.config.video_filename_template,
+            cleanup_policy=self.config.scratch_cleanup_policy
+        )
+    
+    @staticmethod
+    def _map_scenes(func: Callable, scenes: List, max_workers: int) -> List[GenerationResult]:
+        """
+        Apply a per-scene generation function with bounded concurrency.
+        
+        Args:
+            func: Callable taking a scene and returning its GenerationResult
+            scenes: Scenes to process
+            max_workers: Maximum number of scenes processed at once (1 = sequential)
+            
+        Returns:
+            List of results in the same order as the given scenes
+        """
+        if max_workers <= 1 or len(scenes) <= 1:
+            return [func(scene) for scene in scenes]
+            
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(scenes)), thread_name_prefix="shortfactory-scene") as executor:
+            return list(executor.map(propagate(func), scenes))
+    
     def _collect_valid_scene_data(self, narration_results: List[GenerationResult], visual_results: List[GenerationResult]) -> List[Tuple[str, str, float]]:
         """
         Collect valid scene data from narration and visual results.
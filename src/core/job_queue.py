@@ -0,0 +1,258 @@
+"""
+Persistent job queue of the job service, stored in SQLite.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.core.checkpoint import new_run_id
+from src.models.schemas import BatchJob
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+JOB_STATUSES = (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL DEFAULT 'normal',
+    tenant TEXT NOT NULL DEFAULT 'default',
+    deadline REAL,
+    run_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT NOT NULL DEFAULT '',
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, submitted_at);
+"""
+
+# Columns added after the first release of the schema, created on open if missing
+_ADDED_COLUMNS = {
+    "priority": "TEXT NOT NULL DEFAULT 'normal'",
+    "tenant": "TEXT NOT NULL DEFAULT 'default'",
+    "deadline": "REAL"
+}
+
+# Claim order: priority class, then earliest deadline (jobs without one last), then submission
+_CLAIM_ORDER = ("CASE priority WHEN 'urgent' THEN 0 WHEN 'normal' THEN 1 ELSE 2 END, "
+                "deadline IS NULL, deadline, submitted_at, rowid")
+
+
+class JobQueue:
+    """
+    Queue of video jobs with their status, progress and results, served by priority class, then
+    deadline, then submission order.
+
+    Jobs survive restarts: the database is the source of truth and jobs left running by a stopped
+    service are put back in the queue by requeue_interrupted(), keeping their run id so the
+    interrupted run is resumed from its checkpoint. Safe to share between threads.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the JobQueue, creating the database if needed.
+
+        Args:
+            db_path: Path of the SQLite database file (":memory:" for a transient queue)
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory and db_path != ":memory:":
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode; multi-statement updates use explicit transactions
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in _ADDED_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def submit(self, job: BatchJob) -> Dict[str, Any]:
+        """
+        Add a job to the queue. A relative deadline (job.deadline_seconds) is fixed at submission.
+
+        Args:
+            job: Validated job description
+
+        Returns:
+            The queued job record
+
+        Raises:
+            ValueError: If a job with the same id already exists
+        """
+        now = time.time()
+        deadline = now + job.deadline_seconds if job.deadline_seconds is not None else None
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, request, status, priority, tenant, deadline, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job.job_id, job.model_dump_json(), QUEUED, job.priority, job.tenant, deadline, now)
+                )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Job {job.job_id} already exists.")
+        return self.get(job.job_id)
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the next queued job (by priority, deadline, then submission) and mark it running.
+
+        Args:
+            worker: Name of the claiming worker
+
+        Returns:
+            The claimed job record (with its run_id assigned), or None if the queue is empty
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT job_id, run_id FROM jobs WHERE status = ? ORDER BY {_CLAIM_ORDER} LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                run_id = row["run_id"] or f"{row['job_id']}-{new_run_id()}"
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, run_id = ?, worker = ?, attempts = attempts + 1, started_at = ? WHERE job_id = ?",
+                    (RUNNING, run_id, worker, time.time(), row["job_id"])
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["job_id"])
+
+    def update_progress(self, job_id: str, progress: Dict[str, Any]):
+        """Record the stage progress of a running job."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET progress = ? WHERE job_id = ?", (json.dumps(progress), job_id))
+
+    def finish(self, job_id: str, status: str, result: Dict[str, Any], error: str = ""):
+        """
+        Record the outcome of a job.
+
+        Args:
+            job_id: Identifier of the job
+            status: SUCCEEDED, FAILED or CANCELLED
+            result: Summary of the run
+            error: Error message of a failed job
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                (status, json.dumps(result), error, time.time(), job_id)
+            )
+
+    def request_cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a queued job immediately, or flag a running job for cancellation.
+
+        Args:
+            job_id: Identifier of the job
+
+        Returns:
+            The updated job record, or None if the job does not exist
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, cancel_requested = 1 WHERE job_id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = ? AND status = ?", (job_id, RUNNING))
+        return self.get(job_id)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """Check whether cancellation of a job was requested."""
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def requeue_interrupted(self) -> int:
+        """
+        Put jobs left running by a previous process back in the queue (or mark them cancelled if
+        cancellation was requested).
+
+        Returns:
+            Number of requeued jobs
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE status = ? AND cancel_requested = 1",
+                (CANCELLED, time.time(), RUNNING)
+            )
+            cursor = self._conn.execute("UPDATE jobs SET status = ?, worker = NULL WHERE status = ?", (QUEUED, RUNNING))
+        if cursor.rowcount:
+            logger.info(f"Requeued {cursor.rowcount} interrupted jobs.")
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record, or None if the job does not exist."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        List jobs, most recently submitted first.
+
+        Args:
+            status: Only list jobs with this status
+            limit: Maximum number of jobs returned
+
+        Returns:
+            Job records
+        """
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY submitted_at DESC, rowid DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (limit,)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a database row into a JSON serialisable job record."""
+        record = dict(row)
+        record["request"] = json.loads(record["request"])
+        record["progress"] = json.loads(record["progress"]) if record["progress"] else None
+        record["result"] = json.loads(record["result"]) if record["result"] else None
+        record["cancel_requested"] = bool(record["cancel_requested"])
+        return record
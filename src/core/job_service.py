@@ -0,0 +1,404 @@
+"""
+Long-running job service: a persistent queue of video jobs, a pool of warm workers and a small
+asyncio HTTP API to submit, poll and cancel jobs.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from langchain_core.language_models import BaseChatModel
+from pydantic import ValidationError
+
+from src.core.batch import BatchRunner
+from src.core.checkpoint import new_run_id
+from src.core.job_queue import CANCELLED, FAILED, JOB_STATUSES, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from src.core.scheduler import StageScheduler
+from src.models.schemas import BatchJob, VideoCreationConfig
+from src.config.config import Config
+from src.utils.http_client import get_http_client
+from src.utils.http_server import AsyncHttpServer, HttpError, HttpRequest, send_response
+from src.utils.profiling import RunAborted, Span, observe_spans
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("story", "narration", "visuals", "assembly")
+SCENE_STEPS = {"scene_narration": "narration", "scene_image": "image", "scene_segment": "segment"}
+
+
+class JobCancelled(RunAborted):
+    """
+    Raised at the next stage or scene boundary of a job whose cancellation was requested.
+
+    As a RunAborted it stops every stage of a streaming run, not just the scene step it was raised in.
+    """
+
+
+class JobProgress:
+    """Stage and per-scene progress of a running job, fed by the pipeline's spans."""
+
+    def __init__(self, num_scenes: int, on_change: Callable[[Dict[str, Any]], None],
+                 is_cancelled: Callable[[], bool]):
+        """
+        Initialize the JobProgress.
+
+        Args:
+            num_scenes: Number of scenes of the job
+            on_change: Called with the progress dictionary whenever a stage or scene step changes
+            is_cancelled: Returns True once the job should stop
+        """
+        self.num_scenes = num_scenes
+        self.on_change = on_change
+        self.is_cancelled = is_cancelled
+        self.stage: Optional[str] = None
+        self.stages_completed: List[str] = []
+        self.scenes_done = {step: 0 for step in SCENE_STEPS.values()}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: str, span: Span):
+        """Span listener: raise JobCancelled before new work starts and record finished steps."""
+        if span.name not in STAGES and span.name not in SCENE_STEPS:
+            return
+        if event == "start":
+            if self.is_cancelled():
+                raise JobCancelled("Job cancelled")
+            if span.name in STAGES:
+                with self._lock:
+                    self.stage = span.name
+                self.on_change(self.to_dict())
+            return
+
+        if span.error:
+            return
+        with self._lock:
+            if span.name in STAGES:
+                self.stages_completed.append(span.name)
+            else:
+                self.scenes_done[SCENE_STEPS[span.name]] += 1
+        self.on_change(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Progress as a JSON serialisable dictionary."""
+        with self._lock:
+            return {
+                "stage": self.stage,
+                "stages_completed": list(self.stages_completed),
+                "num_scenes": self.num_scenes,
+                "scenes_done": dict(self.scenes_done),
+                "updated_at": time.time()
+            }
+
+
+class JobService:
+    """
+    Runs queued video jobs on a pool of worker threads.
+
+    Each worker keeps its LLM and factories (and so the provider clients) between jobs, so only the
+    first job of a worker pays the start-up cost. Jobs are persisted in a JobQueue; jobs interrupted
+    by a restart are resumed from their run checkpoint. Cancellation is cooperative: a running job
+    stops at the next stage or scene boundary, also when it was cancelled through another service
+    sharing the queue's database.
+
+    Workers claim jobs by priority and deadline, and the stage work of running jobs shares the slots
+    of a StageScheduler. With more workers than slots, an urgent job can start while backfill jobs run
+    and take over their queued scene work.
+    """
+
+    def __init__(self,
+                 llm_factory: Callable[[], BaseChatModel],
+                 base_config: VideoCreationConfig,
+                 queue: JobQueue,
+                 workers: Optional[int] = None,
+                 poll_interval: Optional[float] = None,
+                 scheduler: Optional[StageScheduler] = None):
+        """
+        Initialize the JobService.
+
+        Args:
+            llm_factory: Callable returning a new LLM; called once per worker thread
+            base_config: Configuration applied to every job before per-job overrides
+            queue: Persistent job queue
+            workers: Number of worker threads (defaults to Config.JOB_WORKERS)
+            poll_interval: Seconds an idle worker waits before checking the queue again
+            scheduler: Stage scheduler shared by the running jobs (a new one using Config.SCHEDULER_SLOTS by default)
+        """
+        self.queue = queue
+        self.base_config = base_config
+        self.workers = workers or Config.JOB_WORKERS
+        self.poll_interval = poll_interval if poll_interval is not None else Config.JOB_POLL_INTERVAL
+        self.scheduler = scheduler or StageScheduler()
+        self.runner = BatchRunner(llm_factory, base_config, workers=self.workers, scheduler=self.scheduler)
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._cancelled: Set[str] = set()
+        self._busy = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Requeue interrupted jobs and start the workers."""
+        self.queue.requeue_interrupted()
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, args=(f"worker-{index}",),
+                                      name=f"shortfactory-job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job service started with {self.workers} workers.")
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the workers after their current job.
+
+        Args:
+            timeout: Maximum seconds to wait for each worker
+        """
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate and queue a job.
+
+        Args:
+            payload: Job fields (subject and optional job_id, num_scenes, tts_provider, image_provider,
+                priority, deadline_seconds and tenant)
+
+        Returns:
+            The queued job record
+
+        Raises:
+            ValueError: If the job is invalid or its id already exists
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("A job must be a JSON object.")
+        payload = {key: value for key, value in payload.items() if value not in (None, "")}
+        payload.setdefault("job_id", f"job-{new_run_id()}")
+        try:
+            job = BatchJob(**payload)
+        except ValidationError as e:
+            raise ValueError(f"Invalid job: {e}")
+        record = self.queue.submit(job)
+        self._wake.set()
+        return record
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a job: queued jobs never start, running jobs stop at the next stage or scene boundary.
+
+        Args:
+            job_id: Identifier of the job
+
+        Returns:
+            The job record, or None if the job does not exist
+        """
+        record = self.queue.request_cancel(job_id)
+        if record is not None and record["status"] == RUNNING:
+            with self._lock:
+                self._cancelled.add(job_id)
+        return record
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record, or None if the job does not exist."""
+        return self.queue.get(job_id)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """List jobs, most recently submitted first."""
+        return self.queue.list_jobs(status, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the load of the service.
+
+        Returns:
+            Queue depth, jobs in flight, worker counts, the number of jobs per status, the
+            scheduler's slot usage per stage and the connection reuse of the provider HTTP pool
+        """
+        counts = self.queue.counts()
+        with self._lock:
+            busy = self._busy
+        return {
+            "queue_depth": counts[QUEUED],
+            "in_flight": counts[RUNNING],
+            "workers": self.workers,
+            "busy_workers": busy,
+            "jobs": counts,
+            "scheduler": self.scheduler.stats(),
+            "http": get_http_client().stats.snapshot()
+        }
+
+    def _worker_loop(self, worker: str):
+        """Claim and run jobs until the service stops."""
+        try:
+            self.runner.warm_up()
+        except Exception as e:
+            # Jobs will retry creating the factory and report the error
+            logger.error(f"Job {worker} could not warm up: {e}")
+
+        while not self._stopping.is_set():
+            record = self.queue.claim(worker)
+            if record is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            with self._lock:
+                self._busy += 1
+            try:
+                self._run_job(record)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+    def _run_job(self, record: Dict[str, Any]):
+        """Run a claimed job and record its outcome."""
+        job = BatchJob(**record["request"])
+        job_id = job.job_id
+        if record["cancel_requested"]:
+            with self._lock:
+                self._cancelled.add(job_id)
+
+        last_checked = [time.monotonic()]
+
+        def is_cancelled() -> bool:
+            with self._lock:
+                if job_id in self._cancelled:
+                    return True
+                # Cancellations requested through another service sharing the queue are only in the
+                # database, which is read at most once per poll interval
+                now = time.monotonic()
+                if now - last_checked[0] < self.poll_interval:
+                    return False
+                last_checked[0] = now
+            if not self.queue.is_cancel_requested(job_id):
+                return False
+            with self._lock:
+                self._cancelled.add(job_id)
+            return True
+
+        progress = JobProgress(job.num_scenes or self.base_config.num_scenes,
+                               lambda state: self.queue.update_progress(job_id, state), is_cancelled)
+        start = time.monotonic()
+        logger.info(f"Starting job {job_id} (run {record['run_id']}, attempt {record['attempts']})")
+        try:
+            with observe_spans(progress):
+                result = self.runner.run_job(job, run_id=record["run_id"], deadline=record["deadline"])
+        except JobCancelled:
+            result = {"success": False, "error": "Job cancelled", "steps_completed": []}
+        except Exception as e:
+            logger.exception(f"Job {job_id} raised an exception")
+            result = {"success": False, "error": f"Error during job: {e}", "steps_completed": []}
+
+        if is_cancelled() and not result.get("success"):
+            status, error = CANCELLED, "Job cancelled"
+        else:
+            status, error = (SUCCEEDED, "") if result.get("success") else (FAILED, result.get("error", "Unknown error"))
+        self.queue.finish(job_id, status, {
+            "success": bool(result.get("success")),
+            "steps_completed": result.get("steps_completed", []),
+            "video_path": result.get("video", {}).get("video_path", ""),
+            "run_id": result.get("run_id", record["run_id"]),
+            "run_dir": result.get("run_dir", ""),
+            "total_seconds": result.get("profile", {}).get("total_seconds"),
+            "elapsed_seconds": round(time.monotonic() - start, 3)
+        }, error)
+        with self._lock:
+            self._cancelled.discard(job_id)
+        logger.info(f"Job {job_id} {status}")
+
+
+class JobServiceServer(AsyncHttpServer):
+    """
+    HTTP API of a JobService.
+
+    Endpoints:
+        POST   /jobs                 submit a job (JSON body: subject, optional job_id, num_scenes,
+                                     tts_provider, image_provider, priority, deadline_seconds,
+                                     tenant); 202 with the job record
+        GET    /jobs                 list jobs (query: status, limit)
+        GET    /jobs/{job_id}        job record with status, progress and result
+        POST   /jobs/{job_id}/cancel cancel a job (DELETE /jobs/{job_id} is equivalent)
+        GET    /stats                queue depth, jobs in flight and worker usage
+        GET    /health               liveness check
+    """
+
+    def __init__(self, service: JobService, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the JobServiceServer.
+
+        Args:
+            service: Service answering the requests
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        """
+        super().__init__(host, port)
+        self.service = service
+
+    async def handle(self, request: HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        """Route an API request; queue operations run off the event loop."""
+        parts = [part for part in request.path.split("/") if part]
+        status, body = 200, None
+
+        if parts == ["health"] and request.method == "GET":
+            body = {"status": "ok"}
+        elif parts == ["stats"] and request.method == "GET":
+            body = await asyncio.to_thread(self.service.stats)
+        elif parts == ["jobs"] and request.method == "POST":
+            try:
+                body = await asyncio.to_thread(self.service.submit, request.json())
+            except ValueError as e:
+                raise HttpError(409 if "already exists" in str(e) else 400, str(e))
+            status = 202
+        elif parts == ["jobs"] and request.method == "GET":
+            job_status = request.query.get("status")
+            if job_status is not None and job_status not in JOB_STATUSES:
+                raise HttpError(400, f"Unknown status: {job_status}")
+            try:
+                limit = int(request.query.get("limit", "100"))
+            except ValueError:
+                raise HttpError(400, "limit must be an integer")
+            body = {"jobs": await asyncio.to_thread(self.service.list_jobs, job_status, limit)}
+        elif len(parts) == 2 and parts[0] == "jobs" and request.method == "GET":
+            body = await asyncio.to_thread(self.service.get, parts[1])
+        elif (len(parts) == 3 and parts[0] == "jobs" and parts[2] == "cancel" and request.method == "POST") or \
+             (len(parts) == 2 and parts[0] == "jobs" and request.method == "DELETE"):
+            body = await asyncio.to_thread(self.service.cancel, parts[1])
+        else:
+            raise HttpError(404, f"No route for {request.method} {request.path}")
+
+        if body is None:
+            raise HttpError(404, f"Job {parts[1]} not found")
+        await send_response(writer, status, body)
+        return True
+
+
+def serve(service: JobService, host: Optional[str] = None, port: Optional[int] = None):
+    """
+    Run the job service and its HTTP API until interrupted.
+
+    Args:
+        service: The job service
+        host: Interface to listen on (defaults to Config.JOB_SERVICE_HOST)
+        port: Port to listen on (defaults to Config.JOB_SERVICE_PORT)
+    """
+    server = JobServiceServer(service, host or Config.JOB_SERVICE_HOST,
+                              port if port is not None else Config.JOB_SERVICE_PORT)
+
+    async def run():
+        await server.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    service.start()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("Shutting down the job service; running jobs finish first...")
+    finally:
+        service.stop()
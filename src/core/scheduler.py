@@ -0,0 +1,244 @@
+"""
+Priority- and deadline-aware scheduling of pipeline stage work across concurrent video jobs.
+
+Every unit of provider or encoder work (a story request, one scene's narration or image, an encode)
+asks the scheduler for a slot of its stage before it starts. Waiting work is ordered in two steps:
+
+1. Flows, i.e. (priority class, tenant) pairs, share a stage's slots by weighted fair queuing: each
+   dispatch charges the flow the stage's estimated duration divided by its class weight, and the flow
+   with the least charged virtual time goes next. Urgent work therefore overtakes queued backfill
+   work as soon as it arrives, while backfill and every tenant keep a share of the capacity.
+2. Within a flow, the work of the job with the least slack (deadline minus now minus the estimated
+   remaining work of the job) goes first; work without a deadline follows in arrival order.
+
+Jobs enter the scheduler with StageScheduler.job(); the job is held in a context variable, so work
+submitted to thread pools must be wrapped with profiling.propagate(), as for profiling. Outside a
+scheduled job, scheduled() does nothing.
+"""
+
+import time
+import math
+import logging
+import threading
+import itertools
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.config.config import Config
+from src.utils.profiling import span
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_WEIGHTS = {"urgent": 16.0, "normal": 4.0, "backfill": 1.0}
+
+
+class JobTicket:
+    """Scheduling identity of a job: priority class, deadline, tenant and remaining planned work."""
+
+    def __init__(self, scheduler: "StageScheduler", job_id: str, priority: str = "normal",
+                 deadline: Optional[float] = None, tenant: str = "default", num_scenes: int = 1):
+        """
+        Initialize the JobTicket.
+
+        Args:
+            scheduler: Scheduler the job runs under
+            job_id: Identifier of the job
+            priority: Priority class, a key of the scheduler's weights
+            deadline: Wall clock time (time.time()) the video should be done by, if any
+            tenant: Tenant the job is billed to
+            num_scenes: Number of scenes, used to estimate the remaining work
+        """
+        if priority not in scheduler.weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+        self.scheduler = scheduler
+        self.job_id = job_id
+        self.priority = priority
+        self.deadline = deadline
+        self.tenant = tenant
+        self.planned = {"story": 1, "tts": num_scenes, "image": num_scenes, "encode": 1}
+        self.done = {resource: 0 for resource in self.planned}
+
+    def remaining_work(self) -> float:
+        """Estimated seconds of stage work the job still has to do."""
+        return sum(max(0, planned - self.done.get(resource, 0)) * self.scheduler.estimate(resource)
+                   for resource, planned in self.planned.items())
+
+    def slack(self, now: float) -> float:
+        """Seconds the job can still wait without missing its deadline (infinite without a deadline)."""
+        if self.deadline is None:
+            return math.inf
+        return self.deadline - now - self.remaining_work()
+
+
+class _Request:
+    """A unit of work waiting for a slot."""
+
+    __slots__ = ("ticket", "seq", "flow")
+
+    def __init__(self, ticket: JobTicket, seq: int):
+        self.ticket = ticket
+        self.seq = seq
+        self.flow = (ticket.priority, ticket.tenant)
+
+
+_current_ticket: contextvars.ContextVar[Optional[JobTicket]] = contextvars.ContextVar("shortfactory_job_ticket", default=None)
+
+
+class StageScheduler:
+    """Shares per-stage concurrency slots between concurrent jobs by priority, tenant and deadline."""
+
+    def __init__(self, slots: Optional[Dict[str, int]] = None, weights: Optional[Dict[str, float]] = None,
+                 initial_estimate: float = 1.0, estimate_alpha: float = 0.2):
+        """
+        Initialize the StageScheduler.
+
+        Args:
+            slots: Concurrent units of work per stage resource (defaults to Config.SCHEDULER_SLOTS)
+            weights: Share of each priority class (defaults to PRIORITY_WEIGHTS)
+            initial_estimate: Estimated seconds of a unit of work before any has been measured
+            estimate_alpha: Smoothing factor of the measured durations (exponential moving average)
+        """
+        self.slots = dict(slots or Config.SCHEDULER_SLOTS)
+        self.weights = dict(weights or PRIORITY_WEIGHTS)
+        self.estimate_alpha = estimate_alpha
+        self._estimates: Dict[str, float] = {resource: initial_estimate for resource in self.slots}
+        self._initial_estimate = initial_estimate
+        self._waiting: Dict[str, List[_Request]] = {}
+        self._in_use: Dict[str, int] = {}
+        self._virtual_time: Dict[Tuple[str, Tuple[str, str]], float] = {}
+        self._clock: Dict[str, float] = {}
+        self._dispatched: Dict[str, Dict[str, int]] = {}
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+
+    def estimate(self, resource: str) -> float:
+        """Estimated seconds of one unit of work on a resource."""
+        return self._estimates.get(resource, self._initial_estimate)
+
+    @contextmanager
+    def job(self, job_id: str, priority: str = "normal", deadline: Optional[float] = None,
+            tenant: str = "default", num_scenes: int = 1) -> Iterator[JobTicket]:
+        """
+        Schedule all stage work started in the current context under one job.
+
+        Args:
+            job_id: Identifier of the job
+            priority: Priority class ("urgent", "normal" or "backfill" by default)
+            deadline: Wall clock time the video should be done by, if any
+            tenant: Tenant the job is billed to
+            num_scenes: Number of scenes of the job
+
+        Yields:
+            The job's ticket
+        """
+        ticket = JobTicket(self, job_id, priority, deadline, tenant, num_scenes)
+        token = _current_ticket.set(ticket)
+        try:
+            yield ticket
+        finally:
+            _current_ticket.reset(token)
+
+    @contextmanager
+    def slot(self, resource: str, ticket: JobTicket) -> Iterator[None]:
+        """
+        Hold one slot of a resource, waiting until the scheduler picks this request.
+
+        Args:
+            resource: Stage resource, e.g. "tts"
+            ticket: Job the work belongs to
+        """
+        request = _Request(ticket, next(self._seq))
+        # The span opens first: a listener raising on its start must not leave the request waiting
+        with span("schedule_wait"), self._condition:
+            waiting = self._waiting.setdefault(resource, [])
+            flow_key = (resource, request.flow)
+            if not any(other.flow == request.flow for other in waiting):
+                # A flow that was idle restarts at the current virtual clock instead of cashing in unused share
+                self._virtual_time[flow_key] = max(self._virtual_time.get(flow_key, 0.0), self._clock.get(resource, 0.0))
+            waiting.append(request)
+            try:
+                while not (self._in_use.get(resource, 0) < self.slots.get(resource, 1)
+                           and self._select(resource) is request):
+                    self._condition.wait()
+            except BaseException:
+                self._waiting[resource].remove(request)
+                self._condition.notify_all()
+                raise
+            self._dispatch(resource, request)
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            with self._condition:
+                self._in_use[resource] -= 1
+                ticket.done[resource] = ticket.done.get(resource, 0) + 1
+                previous = self.estimate(resource)
+                self._estimates[resource] = previous + self.estimate_alpha * (elapsed - previous)
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Report slot usage per resource.
+
+        Returns:
+            Per resource: slots, slots in use, waiting requests per priority class, units dispatched
+            per priority class and the current duration estimate
+        """
+        with self._condition:
+            report = {}
+            for resource in sorted(set(self.slots) | set(self._waiting)):
+                waiting: Dict[str, int] = {}
+                for request in self._waiting.get(resource, []):
+                    waiting[request.ticket.priority] = waiting.get(request.ticket.priority, 0) + 1
+                report[resource] = {
+                    "slots": self.slots.get(resource, 1),
+                    "in_use": self._in_use.get(resource, 0),
+                    "waiting": waiting,
+                    "dispatched": dict(self._dispatched.get(resource, {})),
+                    "estimate_seconds": round(self.estimate(resource), 3)
+                }
+            return report
+
+    def _select(self, resource: str) -> Optional[_Request]:
+        """Pick the next request of a resource: least virtual time flow, then least slack, then arrival."""
+        waiting = self._waiting.get(resource)
+        if not waiting:
+            return None
+        now = time.time()
+        return min(waiting, key=lambda request: (
+            self._virtual_time.get((resource, request.flow), 0.0),
+            -self.weights[request.ticket.priority],
+            request.ticket.slack(now),
+            request.seq
+        ))
+
+    def _dispatch(self, resource: str, request: _Request):
+        """Give a slot to a request and charge its flow."""
+        self._waiting[resource].remove(request)
+        self._in_use[resource] = self._in_use.get(resource, 0) + 1
+        flow_key = (resource, request.flow)
+        self._clock[resource] = self._virtual_time.get(flow_key, 0.0)
+        self._virtual_time[flow_key] = self._clock[resource] + self.estimate(resource) / self.weights[request.ticket.priority]
+        dispatched = self._dispatched.setdefault(resource, {})
+        dispatched[request.ticket.priority] = dispatched.get(request.ticket.priority, 0) + 1
+        # Other waiters may now be selectable for a free slot
+        self._condition.notify_all()
+
+
+@contextmanager
+def scheduled(resource: str) -> Iterator[None]:
+    """
+    Run a unit of stage work under the current job's scheduler; a no-op outside a scheduled job.
+
+    Args:
+        resource: Stage resource of the work ("story", "tts", "image" or "encode")
+    """
+    ticket = _current_ticket.get()
+    if ticket is None:
+        yield
+        return
+    with ticket.scheduler.slot(resource, ticket):
+        yield
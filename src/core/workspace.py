@@ -0,0 +1,130 @@
+"""
+Workspace module giving every video creation run its own isolated directory tree.
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+from typing import Literal
+
+logger = logging.getLogger(__name__)
+
+
+class RunWorkspace:
+    """
+    Isolated directories of a single run, so concurrent runs never write to the same paths.
+
+    Layout under ``<runs_dir>/<run_id>/``: ``audios/`` and ``images/`` hold the per-scene assets
+    (kept for resuming), ``scratch/`` holds intermediate files such as encoded segments and the
+    unpublished video. The final video is published atomically into the shared videos directory.
+    """
+
+    def __init__(self,
+                 runs_dir: str,
+                 run_id: str,
+                 videos_dir: str,
+                 video_filename_template: str = "final_video_{run_id}.mp4",
+                 cleanup_policy: Literal["on_success", "always", "never"] = "on_success"):
+        """
+        Initialize the RunWorkspace and create its directories.
+
+        Args:
+            runs_dir: Directory holding one sub-directory per run
+            run_id: Identifier of the run
+            videos_dir: Shared directory where final videos are published
+            video_filename_template: Name of the published video; may use {run_id} and {timestamp}
+            cleanup_policy: When to delete the scratch directory: after successful runs, always, or never
+        """
+        self.run_id = run_id
+        self.root = os.path.join(runs_dir, run_id)
+        self.audios_dir = os.path.join(self.root, "audios")
+        self.images_dir = os.path.join(self.root, "images")
+        self.scratch_dir = os.path.join(self.root, "scratch")
+        self.segments_dir = os.path.join(self.scratch_dir, "segments")
+        self.videos_dir = videos_dir
+        self.video_filename_template = video_filename_template
+        self.cleanup_policy = cleanup_policy
+
+        for directory in (self.audios_dir, self.images_dir, self.segments_dir, self.videos_dir):
+            os.makedirs(directory, exist_ok=True)
+
+    def scratch_path(self, filename: str) -> str:
+        """Path of a file in the run's scratch directory."""
+        return os.path.join(self.scratch_dir, filename)
+
+    def publish(self, source_path: str) -> str:
+        """
+        Atomically move a finished video into the shared videos directory under a unique name.
+
+        The file is first moved to a hidden temporary file in the videos directory (which may be on a
+        different filesystem than the scratch directory), then given its final name atomically, so
+        readers never see a partially written video and concurrent runs never replace each other's.
+
+        Args:
+            source_path: Path of the finished video, usually in the scratch directory
+
+        Returns:
+            Path of the published video
+        """
+        filename = self.video_filename_template.format(run_id=self.run_id, timestamp=time.strftime("%Y%m%d-%H%M%S"))
+        stem, extension = os.path.splitext(filename)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(stem)}.", suffix=".partial", dir=self.videos_dir)
+        os.close(fd)
+        try:
+            shutil.move(source_path, tmp_path)
+            published_path = self._claim_name(tmp_path, stem, extension)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        logger.info(f"Published video for run {self.run_id} to {published_path}")
+        return published_path
+
+    def _claim_name(self, tmp_path: str, stem: str, extension: str) -> str:
+        """
+        Give a finished video the first free name of the form <stem>[_<n>]<extension>.
+
+        A name is taken with an operation that fails if it exists (a hard link, or an exclusive create
+        on filesystems without hard links), so checking and taking a name cannot race.
+
+        Args:
+            tmp_path: Temporary path of the video in the videos directory
+            stem: File name without extension
+            extension: File extension, including the dot
+
+        Returns:
+            Path of the published video
+        """
+        counter = 0
+        while True:
+            path = os.path.join(self.videos_dir, f"{stem}_{counter}{extension}" if counter else f"{stem}{extension}")
+            try:
+                os.link(tmp_path, path)
+                return path
+            except FileExistsError:
+                counter += 1
+                continue
+            except OSError:
+                pass
+            # No hard links here: reserve the name, then rename the video over the empty placeholder
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                counter += 1
+                continue
+            os.replace(tmp_path, path)
+            return path
+
+    def cleanup(self, success: bool):
+        """
+        Remove the scratch directory according to the cleanup policy.
+
+        Args:
+            success: Whether the run produced a video
+        """
+        if self.cleanup_policy == "never" or (self.cleanup_policy == "on_success" and not success):
+            return
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+        logger.info(f"Removed scratch space of run {self.run_id}")
@@ -3,13 +3,26 @@ Narration Generator module for creating audio narrations from text using various
 """
 
 import os
+import base64
+import asyncio
 import logging
 import requests
-from typing import Optional, Literal
-from pydub import AudioSegment
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Literal, Tuple
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 from src.models.schemas import GenerationResult
 from src.config.config import Config
+from src.utils.audio import audio_duration, concatenate_mp3, crossfade_audio, split_mp3
+from src.utils.cache import FileCache
+from src.utils.http_client import get_http_client
+from src.utils.profiling import propagate, span
+from src.utils.rate_limiter import ThrottledError, get_rate_limiter, parse_retry_after
+from src.utils.text_chunks import chunk_text
 
 logger = logging.getLogger(__name__)
 
@@ -19,18 +32,48 @@ class NarrationGenerator:
     Currently supports ElevenLabs and has a placeholder for Google Cloud TTS.
     """
     
+    ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+    ELEVENLABS_VOICE_SETTINGS = {
+        "stability": 0.7,
+        "similarity_boost": 0.8,
+        "style": 0.0,
+        "use_speaker_boost": True
+    }
+    CHUNK_MAX_CHARS = Config.TTS_CHUNK_MAX_CHARS
+    CHUNK_CONCURRENCY = Config.TTS_CHUNK_CONCURRENCY
+    CHUNK_CROSSFADE_MS = Config.TTS_CHUNK_CROSSFADE_MS
+    
     def __init__(self, provider: Literal["elevenlabs", "google_cloud_tts"] = "elevenlabs",
-                 elevenlabs_voice_id: str = None):
+                 elevenlabs_voice_id: str = None,
+                 audio_cache: Optional[FileCache] = None,
+                 elevenlabs_base_url: Optional[str] = None,
+                 chunk_max_chars: Optional[int] = None,
+                 chunk_concurrency: Optional[int] = None,
+                 chunk_crossfade_ms: Optional[int] = None):
         """
         Initialize the NarrationGenerator.
         
         Args:
             provider: The TTS provider to use
             elevenlabs_voice_id: The voice ID to use with ElevenLabs
+            audio_cache: Optional shared audio cache; identical requests are served from it
+            elevenlabs_base_url: ElevenLabs API root, e.g. a local stand-in server (defaults to Config.ELEVENLABS_BASE_URL)
+            chunk_max_chars: Longer ElevenLabs texts are synthesized in chunks split at sentence boundaries
+                (defaults to Config.TTS_CHUNK_MAX_CHARS; 0 never splits)
+            chunk_concurrency: Chunks of one text synthesized in parallel (defaults to Config.TTS_CHUNK_CONCURRENCY)
+            chunk_crossfade_ms: Crossfade at the joins between chunks, which needs pydub/ffmpeg
+                (defaults to Config.TTS_CHUNK_CROSSFADE_MS; 0 joins them frame by frame without decoding)
         """
         self.provider = provider
         self.api_key = None
         self.elevenlabs_voice_id = elevenlabs_voice_id or Config.ELEVENLABS_VOICE_ID
+        self.elevenlabs_base_url = (elevenlabs_base_url or Config.ELEVENLABS_BASE_URL).rstrip("/")
+        self.audio_cache = audio_cache
+        self.chunk_max_chars = self.CHUNK_MAX_CHARS if chunk_max_chars is None else chunk_max_chars
+        self.chunk_concurrency = max(1, chunk_concurrency or self.CHUNK_CONCURRENCY)
+        self.chunk_crossfade_ms = self.CHUNK_CROSSFADE_MS if chunk_crossfade_ms is None else chunk_crossfade_ms
+        self.rate_limiter = None
+        self.http_client = get_http_client()
 
         if self.provider == "elevenlabs":
             self._setup_elevenlabs()
@@ -52,7 +95,8 @@ class NarrationGenerator:
                 "Content-Type": "application/json",
                 "xi-api-key": self.api_key
             }
-            self.elevenlabs_url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.elevenlabs_voice_id}"
+            self.elevenlabs_url = f"{self.elevenlabs_base_url}/v1/text-to-speech/{self.elevenlabs_voice_id}"
+            self.rate_limiter = get_rate_limiter("elevenlabs", self.api_key)
             logger.info("ElevenLabs setup complete.")
         except Exception as e:
             self.api_key = None
@@ -77,6 +121,9 @@ class NarrationGenerator:
         """
         Generates narration audio for a given text and saves it to a file.
         
+        ElevenLabs texts longer than chunk_max_chars are split at sentence boundaries into chunks that
+        are synthesized in parallel and joined into one file; each chunk is cached on its own.
+        
         Args:
             text: The text to convert to speech
             output_path: Path where to save the generated audio file
@@ -90,7 +137,15 @@ class NarrationGenerator:
             return GenerationResult(success=False, output_path="", error=error_msg)
 
         try:
-            if self.provider == "elevenlabs":
+            cache_key = self._cache_key(text)
+            cached = self._get_cached_narration(cache_key, output_path)
+            if cached is not None:
+                return cached
+                
+            chunks = chunk_text(text, self.chunk_max_chars) if self.provider == "elevenlabs" else []
+            if len(chunks) > 1:
+                result = self._generate_chunked_narration(chunks, output_path)
+            elif self.provider == "elevenlabs":
                 result = self._generate_elevenlabs_narration(text, output_path)
             elif self.provider == "google_cloud_tts":
                 result = self._generate_google_cloud_tts_narration(text, output_path)
@@ -98,7 +153,11 @@ class NarrationGenerator:
                 raise ValueError(f"Unsupported provider: {self.provider}")
                 
             if result.success:
-                result.duration = self.get_audio_duration(result.output_path)
+                if result.duration <= 0:
+                    with span("duration_probe"):
+                        result.duration = self.get_audio_duration(result.output_path)
+                if cache_key is not None and result.duration > 0:
+                    self.audio_cache.put_file(cache_key, result.output_path, {"duration": result.duration})
                 
             return result
         except Exception as e:
@@ -106,6 +165,337 @@ class NarrationGenerator:
             logger.error(error_msg)
             return GenerationResult(success=False, output_path="", error=error_msg)
 
+    async def agenerate_narration(self, text: str, output_path: str) -> GenerationResult:
+        """
+        Async variant of generate_narration for the ElevenLabs provider.
+        
+        The request runs on the event loop's shared httpx connection pool and the audio body is
+        received without blocking the loop; file writes, cache copies and the duration probe run in
+        worker threads. Cancelling the coroutine aborts the request, frees its rate limiter slot and
+        leaves no partial output file; the CancelledError propagates to the caller.
+        
+        Args:
+            text: The text to convert to speech
+            output_path: Path where to save the generated audio file
+            
+        Returns:
+            GenerationResult with success status and output information
+        """
+        if not self.api_key:
+            error_msg = f"API Key not set for {self.provider}. Cannot generate narration."
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+        if self.provider != "elevenlabs" or httpx is None:
+            error_msg = f"Async narration is not available for {self.provider} (requires ElevenLabs and httpx)."
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+
+        try:
+            cache_key = self._cache_key(text)
+            if cache_key is not None:
+                cached = await asyncio.to_thread(self._get_cached_narration, cache_key, output_path)
+                if cached is not None:
+                    return cached
+            
+            chunks = chunk_text(text, self.chunk_max_chars)
+            if len(chunks) > 1:
+                result = await self._agenerate_chunked_narration(chunks, output_path)
+            else:
+                result = await self._agenerate_elevenlabs_narration(text, output_path)
+            if result.success:
+                if result.duration <= 0:
+                    with span("duration_probe"):
+                        result.duration = await asyncio.to_thread(self.get_audio_duration, result.output_path)
+                if cache_key is not None and result.duration > 0:
+                    await asyncio.to_thread(self.audio_cache.put_file, cache_key, result.output_path, {"duration": result.duration})
+            return result
+        except Exception as e:
+            error_msg = f"Error generating narration: {e}"
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+
+    def _generate_chunked_narration(self, chunks: List[str], output_path: str) -> GenerationResult:
+        """
+        Synthesizes the chunks of a long text in parallel and joins them into one file.
+        
+        Args:
+            chunks: Consecutive chunks of the text
+            output_path: Path where to save the joined audio file
+            
+        Returns:
+            GenerationResult with the duration of the joined audio; it fails if any chunk fails
+        """
+        logger.info(f"Generating narration in {len(chunks)} chunks, {self.chunk_concurrency} at a time")
+        chunk_paths = self._chunk_paths(output_path, len(chunks))
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.chunk_concurrency, len(chunks)), thread_name_prefix="shortfactory-tts-chunk") as executor:
+                results = list(executor.map(propagate(self._synthesize_chunk), chunks, chunk_paths))
+            return self._join_chunk_results(results, chunk_paths, output_path)
+        finally:
+            self._remove_files(chunk_paths)
+
+    async def _agenerate_chunked_narration(self, chunks: List[str], output_path: str) -> GenerationResult:
+        """Async variant of _generate_chunked_narration."""
+        logger.info(f"Generating narration in {len(chunks)} chunks, {self.chunk_concurrency} at a time")
+        chunk_paths = self._chunk_paths(output_path, len(chunks))
+        slots = asyncio.Semaphore(self.chunk_concurrency)
+        try:
+            results = await asyncio.gather(*(self._asynthesize_chunk(chunk, path, slots) for chunk, path in zip(chunks, chunk_paths)))
+            return await asyncio.to_thread(self._join_chunk_results, results, chunk_paths, output_path)
+        finally:
+            await asyncio.to_thread(self._remove_files, chunk_paths)
+
+    def _synthesize_chunk(self, text: str, output_path: str) -> GenerationResult:
+        """
+        Synthesize one chunk of a long text, serving it from the audio cache when possible.
+        
+        Args:
+            text: The chunk's text
+            output_path: Path where to save the chunk's audio file
+            
+        Returns:
+            GenerationResult of the chunk
+        """
+        cache_key = self._cache_key(text)
+        cached = self._get_cached_narration(cache_key, output_path)
+        if cached is not None:
+            return cached
+        result = self._generate_elevenlabs_narration(text, output_path)
+        if result.success and cache_key is not None:
+            result.duration = self.get_audio_duration(output_path)
+            self.audio_cache.put_file(cache_key, output_path, {"duration": result.duration})
+        return result
+
+    async def _asynthesize_chunk(self, text: str, output_path: str, slots: asyncio.Semaphore) -> GenerationResult:
+        """Async variant of _synthesize_chunk; slots bounds the chunks of one text in flight."""
+        cache_key = self._cache_key(text)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(self._get_cached_narration, cache_key, output_path)
+            if cached is not None:
+                return cached
+        async with slots:
+            result = await self._agenerate_elevenlabs_narration(text, output_path)
+        if result.success and cache_key is not None:
+            result.duration = await asyncio.to_thread(self.get_audio_duration, output_path)
+            await asyncio.to_thread(self.audio_cache.put_file, cache_key, output_path, {"duration": result.duration})
+        return result
+
+    def _join_chunk_results(self, results: List[GenerationResult], chunk_paths: List[str], output_path: str) -> GenerationResult:
+        """
+        Join the audio of synthesized chunks into one file.
+        
+        Without a crossfade the chunks' MP3 frames are concatenated as they are, so no samples are lost
+        or added at the joins and the duration is exactly the sum of the chunks; with a crossfade the
+        chunks are decoded, overlapped and encoded again.
+        
+        Args:
+            results: Results of the chunks, in order
+            chunk_paths: Audio files of the chunks
+            output_path: Path where to save the joined audio file
+            
+        Returns:
+            GenerationResult with the duration of the joined audio, or the failure of the first failed chunk
+        """
+        failed = [result for result in results if not result.success]
+        if failed:
+            error_msg = f"{len(failed)} of {len(results)} narration chunks failed: {failed[0].error}"
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+        
+        with span("audio_join"):
+            if self.chunk_crossfade_ms > 0:
+                duration = crossfade_audio(chunk_paths, output_path, self.chunk_crossfade_ms)
+            else:
+                parts = []
+                for path in chunk_paths:
+                    with open(path, "rb") as f:
+                        parts.append(f.read())
+                audio, duration = concatenate_mp3(parts)
+                self._write_audio(output_path, audio)
+        logger.info(f"Joined {len(results)} narration chunks into {output_path} ({duration:.2f}s)")
+        return GenerationResult(success=True, output_path=output_path, duration=duration)
+
+    @staticmethod
+    def _chunk_paths(output_path: str, count: int) -> List[str]:
+        """Paths of the chunk files of a narration, next to its output file."""
+        base, extension = os.path.splitext(output_path)
+        return [f"{base}.chunk{index}{extension or '.mp3'}" for index in range(count)]
+
+    @staticmethod
+    def _remove_files(paths: List[str]):
+        """Delete files that exist, ignoring the others."""
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def generate_story_narration(self, texts: List[str], output_paths: List[str]) -> List[GenerationResult]:
+        """
+        Generates the narrations of several scenes with a single TTS request.
+        
+        The scene texts are joined and synthesized in one ElevenLabs request that also returns the
+        timing of every character, so the story is read with consistent prosody and the request
+        overhead is paid once. The audio is then cut locally, at the MP3 frame boundary closest to the
+        middle of the pause between two scenes, into one file per scene; the duration of each result
+        is the exact playing time of its file. The whole response is cached under all scene texts.
+        
+        Args:
+            texts: Narration text of each scene, in order
+            output_paths: Path where to save each scene's audio file
+            
+        Returns:
+            One GenerationResult per scene; if the request fails, all of them fail
+        """
+        if not self.api_key:
+            error_msg = f"API Key not set for {self.provider}. Cannot generate narration."
+            logger.error(error_msg)
+            return [GenerationResult(success=False, output_path="", error=error_msg) for _ in texts]
+        if self.provider != "elevenlabs":
+            error_msg = f"Story narration is not available for {self.provider} (requires ElevenLabs timestamps)."
+            logger.error(error_msg)
+            return [GenerationResult(success=False, output_path="", error=error_msg) for _ in texts]
+
+        try:
+            text, spans = self._join_scene_texts(texts)
+            cache_key = self._cache_key(text, "with-timestamps", spans)
+            cached = self._get_cached_story_narration(cache_key)
+            if cached is not None:
+                audio, cut_times = cached
+            else:
+                audio, alignment = self._synthesize_with_timestamps(text)
+                cut_times = self._scene_cut_times(alignment, text, spans)
+            segments = split_mp3(audio, cut_times)
+            if cached is None and cache_key is not None:
+                self.audio_cache.put_bytes(cache_key, audio, {"cut_times": cut_times})
+            
+            results = []
+            for (segment, duration), output_path in zip(segments, output_paths):
+                self._write_audio(output_path, segment)
+                results.append(GenerationResult(success=True, output_path=output_path, duration=duration))
+            logger.info(f"Story narration split into {len(results)} scenes, {sum(result.duration for result in results):.2f}s in total")
+            return results
+        except Exception as e:
+            error_msg = f"Error generating story narration: {e}"
+            logger.error(error_msg)
+            return [GenerationResult(success=False, output_path="", error=error_msg) for _ in texts]
+
+    def _cache_key(self, text: str, *variant) -> Optional[str]:
+        """
+        Build the audio cache key of a request: everything that determines the synthesized audio.
+        
+        Args:
+            text: The text to convert to speech
+            variant: Further values that determine the cached payload (none for a plain TTS request)
+            
+        Returns:
+            The cache key, or None if caching is disabled for this generator
+        """
+        if self.audio_cache is None or self.provider != "elevenlabs":
+            return None
+        return FileCache.make_key(self.provider, self.elevenlabs_voice_id, self.ELEVENLABS_MODEL_ID,
+                                  self.ELEVENLABS_VOICE_SETTINGS, text, *variant)
+
+    def _get_cached_story_narration(self, cache_key: Optional[str]) -> Optional[Tuple[bytes, List[float]]]:
+        """
+        Look up the audio and scene cut times of a story narration in the audio cache.
+        
+        Args:
+            cache_key: Cache key of the request, or None if caching is disabled
+            
+        Returns:
+            Tuple of the audio and the cut times on a cache hit, None on a miss
+        """
+        if cache_key is None:
+            return None
+        entry = self.audio_cache.get(cache_key)
+        if entry is None:
+            return None
+        try:
+            with open(entry.path, "rb") as f:
+                audio = f.read()
+        except OSError as e:
+            # The entry was evicted between lookup and read
+            logger.warning(f"Could not read cached story narration {entry.path}: {e}")
+            return None
+        logger.info("Story narration cache hit")
+        return audio, list(entry.metadata.get("cut_times", []))
+
+    @staticmethod
+    def _join_scene_texts(texts: List[str]) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        Join scene texts into the text of a single request.
+        
+        Args:
+            texts: Narration text of each scene
+            
+        Returns:
+            Tuple of the joined text and the (start, end) character span of each scene in it
+            
+        Raises:
+            ValueError: If there are no texts or one of them is empty
+        """
+        if not texts:
+            raise ValueError("No scene texts to narrate")
+        parts, spans = [], []
+        position = 0
+        for text in texts:
+            text = text.strip()
+            if not text:
+                raise ValueError("Scene narration text is empty")
+            spans.append((position, position + len(text)))
+            parts.append(text)
+            position += len(text) + 1
+        return " ".join(parts), spans
+
+    @staticmethod
+    def _scene_cut_times(alignment: Dict[str, List], text: str, spans: List[Tuple[int, int]]) -> List[float]:
+        """
+        Place a cut in the middle of the pause between every two scenes.
+        
+        Args:
+            alignment: ElevenLabs character alignment of the joined text
+            text: The joined text
+            spans: Character span of each scene in the text
+            
+        Returns:
+            Cut times in seconds, one fewer than there are scenes
+            
+        Raises:
+            ValueError: If the alignment does not cover the text character by character
+        """
+        starts = alignment.get("character_start_times_seconds") or []
+        ends = alignment.get("character_end_times_seconds") or []
+        if len(alignment.get("characters") or []) != len(text) or len(starts) != len(text) or len(ends) != len(text):
+            raise ValueError("The timestamps returned by ElevenLabs do not match the narration text")
+        return [(ends[current[1] - 1] + starts[following[0]]) / 2 for current, following in zip(spans, spans[1:])]
+        
+    def _get_cached_narration(self, cache_key: Optional[str], output_path: str) -> Optional[GenerationResult]:
+        """
+        Serve a narration from the audio cache, skipping both the TTS request and the duration probe.
+        
+        Args:
+            cache_key: Cache key of the request, or None if caching is disabled
+            output_path: Path where to save the audio file
+            
+        Returns:
+            GenerationResult on a cache hit, None on a miss
+        """
+        if cache_key is None:
+            return None
+            
+        entry = self.audio_cache.get(cache_key)
+        if entry is None:
+            return None
+            
+        try:
+            self.audio_cache.copy_to(entry, output_path)
+        except OSError as e:
+            # The entry was evicted between lookup and copy
+            logger.warning(f"Could not copy cached narration {entry.path}: {e}")
+            return None
+            
+        logger.info(f"Narration cache hit, saved to {output_path}")
+        return GenerationResult(success=True, output_path=output_path, duration=float(entry.metadata.get("duration", 0.0)))
+
     def _generate_elevenlabs_narration(self, text: str, output_path: str) -> GenerationResult:
         """
         Generates narration using ElevenLabs API.
@@ -120,36 +510,173 @@ class NarrationGenerator:
         if not self.api_key:
             return GenerationResult(success=False, output_path="", error="ElevenLabs API key not set.")
             
-        json_data = {
-            "text": text,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": {
-                "stability": 0.7,
-                "similarity_boost": 0.8,
-                "style": 0.0,
-                "use_speaker_boost": True
-            }
-        }
+        json_data = self._elevenlabs_request_body(text)
         
         try:
             logger.info(f"Generating ElevenLabs narration for text: '{text[:50]}...'")
-            response = requests.post(self.elevenlabs_url, json=json_data, headers=self.headers, stream=True)
-            response.raise_for_status()
-            
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            if self.rate_limiter is not None:
+                self.rate_limiter.call(self._download_elevenlabs_narration, json_data, output_path)
+            else:
+                self._download_elevenlabs_narration(json_data, output_path)
                     
             logger.info(f"Narration saved to {output_path}")
             return GenerationResult(success=True, output_path=output_path)
+        except ThrottledError as e:
+            error_msg = f"ElevenLabs narration still throttled after retries: {e}"
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
         except requests.exceptions.RequestException as e:
-            error_msg = f"Error during ElevenLabs narration: {e} - {getattr(response, 'text', '')}"
+            error_msg = f"Error during ElevenLabs narration: {e} - {getattr(e.response, 'text', '')}"
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+
+    async def _agenerate_elevenlabs_narration(self, text: str, output_path: str) -> GenerationResult:
+        """Async variant of _generate_elevenlabs_narration."""
+        json_data = self._elevenlabs_request_body(text)
+        try:
+            logger.info(f"Generating ElevenLabs narration for text: '{text[:50]}...'")
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acall(self._adownload_elevenlabs_narration, json_data, output_path)
+            else:
+                await self._adownload_elevenlabs_narration(json_data, output_path)
+                    
+            logger.info(f"Narration saved to {output_path}")
+            return GenerationResult(success=True, output_path=output_path)
+        except ThrottledError as e:
+            error_msg = f"ElevenLabs narration still throttled after retries: {e}"
+            logger.error(error_msg)
+            return GenerationResult(success=False, output_path="", error=error_msg)
+        except httpx.HTTPError as e:
+            response = getattr(e, "response", None)
+            error_msg = f"Error during ElevenLabs narration: {e} - {response.text if response is not None else ''}"
             logger.error(error_msg)
             return GenerationResult(success=False, output_path="", error=error_msg)
 
+    def _synthesize_with_timestamps(self, text: str) -> Tuple[bytes, Dict[str, List]]:
+        """
+        Synthesize a text with ElevenLabs, also returning the timing of every character.
+        
+        Args:
+            text: The text to convert to speech
+            
+        Returns:
+            Tuple of the MP3 audio and the character alignment
+            
+        Raises:
+            ThrottledError: If ElevenLabs is still throttling after the rate limiter's retries
+            requests.exceptions.RequestException: If the request fails
+        """
+        json_data = self._elevenlabs_request_body(text)
+        logger.info(f"Generating ElevenLabs story narration with timestamps for {len(text)} characters")
+        if self.rate_limiter is not None:
+            return self.rate_limiter.call(self._download_elevenlabs_timestamps, json_data)
+        return self._download_elevenlabs_timestamps(json_data)
+
+    def _download_elevenlabs_timestamps(self, json_data: dict) -> Tuple[bytes, Dict[str, List]]:
+        """
+        Send one ElevenLabs TTS request for audio with character timestamps.
+        
+        Args:
+            json_data: Request body
+            
+        Returns:
+            Tuple of the MP3 audio and the character alignment
+            
+        Raises:
+            ThrottledError: If ElevenLabs rejects the request with HTTP 429
+        """
+        with span("tts_request", provider=self.provider):
+            response = self.http_client.post(f"{self.elevenlabs_url}/with-timestamps", json=json_data,
+                                             headers={**self.headers, "Accept": "application/json"},
+                                             timeout=Config.PROVIDER_TIMEOUT_SECONDS)
+            try:
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    raise ThrottledError(f"ElevenLabs rate limit: {response.text}", retry_after=retry_after)
+                response.raise_for_status()
+                body = response.json()
+            finally:
+                response.close()
+        return base64.b64decode(body["audio_base64"]), body["alignment"]
+
+    def _elevenlabs_request_body(self, text: str) -> dict:
+        """Body of an ElevenLabs TTS request."""
+        return {
+            "text": text,
+            "model_id": self.ELEVENLABS_MODEL_ID,
+            "voice_settings": self.ELEVENLABS_VOICE_SETTINGS
+        }
+
+    def _download_elevenlabs_narration(self, json_data: dict, output_path: str):
+        """
+        Send one ElevenLabs TTS request and stream the audio to a file.
+        
+        Args:
+            json_data: Request body
+            output_path: Path where to save the generated audio file
+            
+        Raises:
+            ThrottledError: If ElevenLabs rejects the request with HTTP 429
+        """
+        with span("tts_request", provider=self.provider) as request_span:
+            response = self.http_client.post(self.elevenlabs_url, json=json_data, headers=self.headers, stream=True,
+                                             timeout=Config.PROVIDER_TIMEOUT_SECONDS)
+            try:
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    raise ThrottledError(f"ElevenLabs rate limit: {response.text}", retry_after=retry_after)
+                response.raise_for_status()
+                
+                # Ensure directory exists
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+            finally:
+                # Hands the connection back to the host's pool (a no-op once the body is consumed)
+                response.close()
+            request_span.add_file(output_path)
+
+    async def _adownload_elevenlabs_narration(self, json_data: dict, output_path: str):
+        """
+        Async variant of _download_elevenlabs_narration.
+        
+        The audio is received into memory and written in one go by a worker thread, so the event
+        loop never waits for the disk and a cancelled request leaves no partial file.
+        
+        Args:
+            json_data: Request body
+            output_path: Path where to save the generated audio file
+            
+        Raises:
+            ThrottledError: If ElevenLabs rejects the request with HTTP 429
+        """
+        client = self.http_client.async_client()
+        with span("tts_request", provider=self.provider) as request_span:
+            async with client.stream("POST", self.elevenlabs_url, json=json_data, headers=self.headers,
+                                     timeout=Config.PROVIDER_TIMEOUT_SECONDS) as response:
+                if response.is_error:
+                    await response.aread()
+                    if response.status_code == 429:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        raise ThrottledError(f"ElevenLabs rate limit: {response.text}", retry_after=retry_after)
+                    response.raise_for_status()
+                audio = bytearray()
+                async for chunk in response.aiter_bytes(8192):
+                    audio.extend(chunk)
+            await asyncio.to_thread(self._write_audio, output_path, bytes(audio))
+            request_span.add_file(output_path)
+
+    @staticmethod
+    def _write_audio(output_path: str, audio: bytes):
+        """Write audio to a file atomically, so readers never see a partial file."""
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        temp_path = f"{output_path}.part"
+        with open(temp_path, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, output_path)
+
     def _generate_google_cloud_tts_narration(self, text: str, output_path: str) -> GenerationResult:
         """
         Generates narration using Google Cloud TTS.
@@ -173,15 +700,15 @@ class NarrationGenerator:
         """
         Gets the duration of an audio file in seconds.
         
+        MP3 and WAV durations are read from the file headers; other files are decoded.
+        
         Args:
             audio_path: Path to the audio file
             
         Returns:
             Duration of the audio in seconds
+            
+        Raises:
+            AudioDurationError: If the duration cannot be determined
         """
-        try:
-            audio = AudioSegment.from_file(audio_path)
-            return len(audio) / 1000.0
-        except Exception as e:
-            logger.error(f"Error getting audio duration for {audio_path}: {e}")
-            return 0.0
+        return audio_duration(audio_path)
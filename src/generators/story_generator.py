@@ -2,40 +2,152 @@
 Story Generator module for creating structured stories using LLMs.
 """
 
+import json
 import logging
-from typing import Union, Optional
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import LLMResult
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+from langchain_core.exceptions import OutputParserException
 from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 
-from src.models.schemas import StoryWithScenes
+from src.config.config import Config
+from src.models.schemas import CharacterDescription, RegeneratedScenes, Scene, StoryWithScenes
+from src.utils.cache import FileCache
+from src.utils.json_repair import repair_json
+from src.utils.json_stream import IncrementalJsonParser
+from src.utils.profiling import detached, span
 
 logger = logging.getLogger(__name__)
 
+# Replaces the JSON schema of the format instructions when the model answers through its native
+# structured output; the schema then travels as a tool/response schema instead of prompt text
+STRUCTURED_OUTPUT_INSTRUCTIONS = "Return your answer through the provided structured output."
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """
+    Callback counting the prompt and completion tokens reported by the LLM calls it is attached to.
+    
+    Reads the standard usage_metadata of chat messages and falls back to the provider's
+    llm_output["token_usage"] (OpenAI style prompt_tokens / completion_tokens).
+    """
+    
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+    
+    def on_llm_end(self, response: LLMResult, **kwargs: Any):
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        if not input_tokens and not output_tokens:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            input_tokens = token_usage.get("prompt_tokens", 0)
+            output_tokens = token_usage.get("completion_tokens", 0)
+        logger.info(f"LLM call used {input_tokens} prompt and {output_tokens} completion tokens")
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+
 class StoryGenerator:
     """
     Class for generating structured stories using LangChain compatible LLMs.
     Can work with different LLM providers as long as they implement the BaseChatModel interface.
     """
     
-    def __init__(self, llm: BaseChatModel):
+    def __init__(self, llm: BaseChatModel, story_cache: Optional[FileCache] = None, llm_repair: bool = True,
+                 prompt_mode: str = "parser", scene_retries: int = 1):
         """
         Initialize the StoryGenerator with a LangChain compatible language model.
         
         Args:
             llm: A LangChain compatible language model like ChatGoogleGenerativeAI, ChatOpenAI, etc.
+            story_cache: Optional persistent cache of validated stories
+            llm_repair: Ask the LLM to fix its JSON when a completion cannot be repaired locally
+            prompt_mode: "parser" embeds the JSON schema of the story in the prompt, "structured" uses the
+                model's native structured output with a shorter prompt (falls back to "parser" if the
+                model does not support it)
+            scene_retries: Rounds of regenerating only the missing or invalid scenes of a story (0 = none)
         """
+        if prompt_mode not in ("parser", "structured"):
+            raise ValueError(f"Unsupported prompt mode: {prompt_mode}")
         if llm is None:
             raise ValueError("LLM cannot be None. Please ensure a valid LangChain model is provided.")
         self.llm = llm
+        self.story_cache = story_cache
         self.parser = PydanticOutputParser(pydantic_object=StoryWithScenes)
-        self.prompt_template = self._create_prompt_template()
+        self.llm_repair = llm_repair
+        # Prompts and chains are built once and never mutated, so one generator can serve
+        # concurrent threads and tasks; per-call values only travel through invoke()
+        self.format_instructions = self.parser.get_format_instructions()
+        self.prompt_template = self._create_prompt_template(self.format_instructions)
+        self.repair_prompt_template = PromptTemplate(
+            template="""The following JSON output does not match the required format.
+            
+            Error: {error}
+            
+            Output:
+            {completion}
+            
+            Return only the corrected JSON, without any explanation.
+            {format_instructions}""",
+            input_variables=["completion", "error"],
+            partial_variables={"format_instructions": self.format_instructions},
+        )
+        # Streaming needs the story as prompt-formatted JSON text, so it always uses the parser prompt
+        self.text_story_chain = self.prompt_template | self.llm | StrOutputParser()
+        self.repair_chain = self.repair_prompt_template | self.llm | StrOutputParser()
+        self.scene_retries = scene_retries
+        self.scene_parser = PydanticOutputParser(pydantic_object=RegeneratedScenes)
+        self.prompt_mode = prompt_mode
+        self.story_chain = self.text_story_chain
+        self.scene_chain = (self._create_scene_prompt_template(self.scene_parser.get_format_instructions()) | self.llm
+                            | StrOutputParser())
+        if prompt_mode == "structured":
+            try:
+                structured_llm = self.llm.with_structured_output(StoryWithScenes, include_raw=True)
+                structured_scenes_llm = self.llm.with_structured_output(RegeneratedScenes, include_raw=True)
+            except NotImplementedError:
+                logger.warning(f"{type(self.llm).__name__} has no native structured output; using the parser prompt.")
+                self.prompt_mode = "parser"
+            else:
+                # The chains still return JSON text, so parsing, repair and caching are shared by both modes
+                self.story_chain = (self._create_prompt_template(STRUCTURED_OUTPUT_INSTRUCTIONS) | structured_llm
+                                    | RunnableLambda(self._structured_output_text))
+                self.scene_chain = (self._create_scene_prompt_template(STRUCTURED_OUTPUT_INSTRUCTIONS) | structured_scenes_llm
+                                    | RunnableLambda(self._structured_output_text))
+        # Outcome counts of parse_story: valid as returned, repaired locally, repaired by the LLM, failed
+        self.repair_stats = {"valid": 0, "repaired": 0, "llm_repaired": 0, "failed": 0}
+        # Stories whose scenes were validated, scenes regenerated, stories left with defective scenes
+        self.scene_stats = {"checked": 0, "regenerated": 0, "unrecoverable": 0}
+        # Cumulative token usage of all LLM calls of this generator
+        self.token_usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        self._stats_lock = threading.Lock()
 
-    def _create_prompt_template(self) -> PromptTemplate:
+    @staticmethod
+    def _create_prompt_template(format_instructions: str) -> PromptTemplate:
         """
         Creates and returns the LangChain PromptTemplate for story generation.
         
+        Args:
+            format_instructions: Output format section of the prompt
+            
         Returns:
             PromptTemplate configured for story generation
         """
@@ -61,18 +173,60 @@ class StoryGenerator:
             **Output Format Instructions:**
             {format_instructions}""",
             input_variables=["subject", "word_limit", "scene_count"],
-            partial_variables={"format_instructions": ""},
+            partial_variables={"format_instructions": format_instructions},
+        )
+
+    @staticmethod
+    def _create_scene_prompt_template(format_instructions: str) -> PromptTemplate:
+        """
+        Creates the PromptTemplate that asks for replacements of some scenes of an existing story.
+        
+        Args:
+            format_instructions: Output format section of the prompt
+            
+        Returns:
+            PromptTemplate configured for scene regeneration
+        """
+        return PromptTemplate(
+            template="""You are a storytelling AI completing a short story written for visual adaptation.
+            The story has {scene_count} scenes, but scenes {scene_numbers} are missing or invalid. Write only these scenes.
+
+            **Title:** {title}
+            **Summary:** {full_story_summary}
+            **Overall Image Style:** {overall_image_style}
+            **Main Characters:**
+            {main_characters}
+
+            **Neighbouring Scenes (the new scenes must continue them seamlessly):**
+            {neighbouring_scenes}
+
+            Each scene needs a `visual_description` that is concise but extremely detailed, explicitly incorporating the
+            overall image style and the appearance of the characters in it, and the exact `narration_text` of the scene.
+            Keep the `scene_number` of each requested scene.
+
+            **Output Format Instructions:**
+            {format_instructions}""",
+            input_variables=["scene_count", "scene_numbers", "title", "full_story_summary", "overall_image_style",
+                             "main_characters", "neighbouring_scenes"],
+            partial_variables={"format_instructions": format_instructions},
         )
         
-    def generate_structured_story(self, subject: str, scene_count: int = 5, word_limit: Optional[int] = None) -> Union[StoryWithScenes, str]:
+    def generate_structured_story(self, subject: str, scene_count: int = 5, word_limit: Optional[int] = None,
+                                  use_cache: bool = True, refresh_cache: bool = False) -> Union[StoryWithScenes, str]:
         """
         Generates a short story and breaks it into structured scenes using the provided LLM,
         outputting a Pydantic object.
         
+        The LLM is called once; a completion that does not parse is repaired locally (see
+        parse_story) and only sent back to the LLM as a last resort. Missing or invalid scenes are
+        regenerated on their own (see complete_story).
+        
         Args:
             subject: The subject or theme for the story
             scene_count: Number of scenes to create (default: 5)
             word_limit: Optional word limit for the story (defaults to scene_count * 50)
+            use_cache: Whether to read from and write to the story cache, if one is configured
+            refresh_cache: Skip the cache lookup but store the newly generated story
             
         Returns:
             A StoryWithScenes object or an error message string
@@ -80,33 +234,652 @@ class StoryGenerator:
         if word_limit is None:
             word_limit = scene_count * 50  # Rough estimate for story length
             
-        # Update format instructions right before invocation to ensure latest schema
-        self.prompt_template.partial_variables = {"format_instructions": self.parser.get_format_instructions()}
+        cache_key, cached_story = self._lookup_cache(subject, scene_count, word_limit, use_cache, refresh_cache)
+        if cached_story is not None:
+            return cached_story
+            
+        logger.info(f"Generating structured story for subject: '{subject}' with {scene_count} scenes...")
+        
+        try:
+            with self._llm_request() as config:
+                raw_output = self.story_chain.invoke(self._story_inputs(subject, scene_count, word_limit), config=config)
+        except Exception as e:
+            return self._story_error(subject, e)
+        return self._finish_story(subject, raw_output, cache_key, scene_count)
+
+    def generate_structured_stories(self, subjects: List[str], scene_count: int = 5, word_limit: Optional[int] = None,
+                                    use_cache: bool = True, refresh_cache: bool = False,
+                                    max_concurrency: Optional[int] = None) -> List[Union[StoryWithScenes, str]]:
+        """
+        Generate stories for many subjects with one batched chain call.
+        
+        Cached stories are served from the story cache; the remaining subjects are sent to the LLM in
+        parallel through the chain's batch(). A failing subject does not affect the others.
+        
+        Args:
+            subjects: Subjects or themes of the stories
+            scene_count: Number of scenes per story (default: 5)
+            word_limit: Optional word limit per story (defaults to scene_count * 50)
+            use_cache: Whether to read from and write to the story cache, if one is configured
+            refresh_cache: Skip the cache lookup but store the newly generated stories
+            max_concurrency: Maximum parallel LLM requests (defaults to Config.STORY_MAX_CONCURRENCY)
+            
+        Returns:
+            One StoryWithScenes object or error message string per subject, in the order of subjects
+        """
+        if word_limit is None:
+            word_limit = scene_count * 50
+            
+        results: List[Union[StoryWithScenes, str, None]] = [None] * len(subjects)
+        pending: List[Tuple[int, Optional[str]]] = []
+        for index, subject in enumerate(subjects):
+            cache_key, cached_story = self._lookup_cache(subject, scene_count, word_limit, use_cache, refresh_cache)
+            if cached_story is not None:
+                results[index] = cached_story
+            else:
+                pending.append((index, cache_key))
+        if not pending:
+            return results
+        
+        logger.info(f"Generating {len(pending)} structured stories with {scene_count} scenes each...")
+        with self._llm_request() as config:
+            raw_outputs = self.story_chain.batch(
+                [self._story_inputs(subjects[index], scene_count, word_limit) for index, _ in pending],
+                config={**config, "max_concurrency": max_concurrency or Config.STORY_MAX_CONCURRENCY},
+                return_exceptions=True
+            )
+        for (index, cache_key), raw_output in zip(pending, raw_outputs):
+            if isinstance(raw_output, Exception):
+                results[index] = self._story_error(subjects[index], raw_output)
+            else:
+                results[index] = self._finish_story(subjects[index], raw_output, cache_key, scene_count)
+        return results
+
+    async def agenerate_structured_story(self, subject: str, scene_count: int = 5, word_limit: Optional[int] = None,
+                                         use_cache: bool = True, refresh_cache: bool = False) -> Union[StoryWithScenes, str]:
+        """
+        Async variant of generate_structured_story, built on the chain's ainvoke().
+        
+        Args:
+            subject: The subject or theme for the story
+            scene_count: Number of scenes to create (default: 5)
+            word_limit: Optional word limit for the story (defaults to scene_count * 50)
+            use_cache: Whether to read from and write to the story cache, if one is configured
+            refresh_cache: Skip the cache lookup but store the newly generated story
+            
+        Returns:
+            A StoryWithScenes object or an error message string
+        """
+        if word_limit is None:
+            word_limit = scene_count * 50
             
-        structured_story_chain = self.prompt_template | self.llm | self.parser
+        cache_key, cached_story = self._lookup_cache(subject, scene_count, word_limit, use_cache, refresh_cache)
+        if cached_story is not None:
+            return cached_story
+        
         logger.info(f"Generating structured story for subject: '{subject}' with {scene_count} scenes...")
+        try:
+            with self._llm_request() as config:
+                raw_output = await self.story_chain.ainvoke(self._story_inputs(subject, scene_count, word_limit), config=config)
+            structured_output = await self.acomplete_story(await self.aparse_story(raw_output), scene_count)
+        except Exception as e:
+            return self._story_error(subject, e)
+        self._store_story(subject, structured_output, cache_key)
+        return structured_output
+
+    async def agenerate_structured_stories(self, subjects: List[str], scene_count: int = 5, word_limit: Optional[int] = None,
+                                           use_cache: bool = True, refresh_cache: bool = False,
+                                           max_concurrency: Optional[int] = None) -> List[Union[StoryWithScenes, str]]:
+        """
+        Async variant of generate_structured_stories, built on the chain's abatch().
+        
+        Args:
+            subjects: Subjects or themes of the stories
+            scene_count: Number of scenes per story (default: 5)
+            word_limit: Optional word limit per story (defaults to scene_count * 50)
+            use_cache: Whether to read from and write to the story cache, if one is configured
+            refresh_cache: Skip the cache lookup but store the newly generated stories
+            max_concurrency: Maximum parallel LLM requests (defaults to Config.STORY_MAX_CONCURRENCY)
+            
+        Returns:
+            One StoryWithScenes object or error message string per subject, in the order of subjects
+        """
+        if word_limit is None:
+            word_limit = scene_count * 50
+            
+        results: List[Union[StoryWithScenes, str, None]] = [None] * len(subjects)
+        pending: List[Tuple[int, Optional[str]]] = []
+        for index, subject in enumerate(subjects):
+            cache_key, cached_story = self._lookup_cache(subject, scene_count, word_limit, use_cache, refresh_cache)
+            if cached_story is not None:
+                results[index] = cached_story
+            else:
+                pending.append((index, cache_key))
+        if not pending:
+            return results
+        
+        logger.info(f"Generating {len(pending)} structured stories with {scene_count} scenes each...")
+        with self._llm_request() as config:
+            raw_outputs = await self.story_chain.abatch(
+                [self._story_inputs(subjects[index], scene_count, word_limit) for index, _ in pending],
+                config={**config, "max_concurrency": max_concurrency or Config.STORY_MAX_CONCURRENCY},
+                return_exceptions=True
+            )
+        for (index, cache_key), raw_output in zip(pending, raw_outputs):
+            subject = subjects[index]
+            if isinstance(raw_output, Exception):
+                results[index] = self._story_error(subject, raw_output)
+                continue
+            try:
+                structured_output = await self.acomplete_story(await self.aparse_story(raw_output), scene_count)
+            except Exception as e:
+                results[index] = self._story_error(subject, e, raw_output)
+                continue
+            self._store_story(subject, structured_output, cache_key)
+            results[index] = structured_output
+        return results
+
+    def stream_structured_story(self, subject: str, scene_count: int = 5, word_limit: Optional[int] = None,
+                                use_cache: bool = True, refresh_cache: bool = False) -> Iterator[Tuple[str, Any]]:
+        """
+        Generate a structured story like generate_structured_story, reporting its parts while the
+        LLM is still writing.
         
+        The LLM's token stream is parsed incrementally, so each part is yielded as soon as its JSON
+        object is complete: ("overall_image_style", str), ("main_characters", List[CharacterDescription])
+        and one ("scene", Scene) per scene. Scenes are only yielded while they are valid and numbered
+        in order, so the yielded scenes are always the first scenes of the final story; invalid later
+        scenes are regenerated after the stream ends (see complete_story). The last event
+        is ("story", StoryWithScenes) once the whole completion has been parsed (and repaired if
+        needed), or ("error", str) if generation or validation failed; scenes yielded before an error
+        belong to no valid story.
+        
+        Args:
+            subject: The subject or theme for the story
+            scene_count: Number of scenes to create (default: 5)
+            word_limit: Optional word limit for the story (defaults to scene_count * 50)
+            use_cache: Whether to read from and write to the story cache, if one is configured
+            refresh_cache: Skip the cache lookup but store the newly generated story
+            
+        Yields:
+            (event, value) pairs as described above
+        """
+        # The llm_request span stays open across the yields; the consumer's work must not nest under it
+        return detached(self._stream_story_events(subject, scene_count, word_limit, use_cache, refresh_cache))
+        
+    def _stream_story_events(self, subject: str, scene_count: int, word_limit: Optional[int],
+                             use_cache: bool, refresh_cache: bool) -> Iterator[Tuple[str, Any]]:
+        """Generator behind stream_structured_story."""
+        if word_limit is None:
+            word_limit = scene_count * 50
+            
+        cache_key, cached_story = self._lookup_cache(subject, scene_count, word_limit, use_cache, refresh_cache)
+        if cached_story is not None:
+            yield "overall_image_style", cached_story.overall_image_style
+            yield "main_characters", cached_story.main_characters
+            for scene in cached_story.scenes:
+                yield "scene", scene
+            yield "story", cached_story
+            return
+            
+        logger.info(f"Streaming structured story for subject: '{subject}' with {scene_count} scenes...")
+        
+        json_parser: Optional[IncrementalJsonParser] = IncrementalJsonParser()
+        chunks = []
+        streamed_scenes = []
         try:
-            structured_output: StoryWithScenes = structured_story_chain.invoke({
-                "subject": subject,
-                "word_limit": word_limit,
-                "scene_count": scene_count
-            })
-            logger.info("Structured story generated successfully!")
-            return structured_output
+            with self._llm_request() as config:
+                for chunk in self.text_story_chain.stream(self._story_inputs(subject, scene_count, word_limit), config=config):
+                    chunks.append(chunk)
+                    if json_parser is None:
+                        continue
+                    try:
+                        completed = json_parser.feed(chunk)
+                    except ValueError as e:
+                        # Malformed output: keep collecting it for the repair of the whole completion
+                        logger.debug(f"Incremental story parsing stopped: {e}")
+                        json_parser = None
+                        continue
+                    for path, value in completed:
+                        event = self._stream_event(path, value, streamed_scenes, scene_count)
+                        if event is None:
+                            continue
+                        if event[0] == "scene":
+                            streamed_scenes.append(event[1])
+                        yield event
+            structured_output = self.complete_story(self.parse_story("".join(chunks)), scene_count)
+            if structured_output.scenes[:len(streamed_scenes)] != streamed_scenes:
+                raise ValueError("The repaired story does not match the scenes already streamed.")
         except Exception as e:
-            error_msg = f"Error during structured story generation: {e}"
-            logger.error(error_msg)
+            yield "error", self._story_error(subject, e, "".join(chunks))
+            return
+        
+        self._store_story(subject, structured_output, cache_key)
+        yield "story", structured_output
+
+    def parse_story(self, raw_output: str) -> StoryWithScenes:
+        """
+        Parse an LLM completion into a story, repairing it if needed.
+        
+        The completion is first parsed as is. If that fails it is repaired locally (code fences,
+        trailing or missing commas, truncated strings and brackets, scene numbering) and validated
+        again. Only if local repair fails, and llm_repair is enabled, is the LLM asked once to fix
+        its JSON. The outcome is counted in repair_stats.
+        
+        Args:
+            raw_output: Raw text of the completion
+            
+        Returns:
+            The validated StoryWithScenes
+            
+        Raises:
+            OutputParserException: If the completion could not be turned into a valid story
+        """
+        story, parse_error = self._parse_locally(raw_output)
+        if story is not None:
+            return story
+        
+        if self.llm_repair:
+            logger.warning(f"Asking the LLM to fix its story JSON: {parse_error}")
             try:
-                # Attempt to get raw output for debugging
-                raw_output_chain = self.prompt_template | self.llm | StrOutputParser()
-                raw_output = raw_output_chain.invoke({
-                    "subject": subject,
-                    "word_limit": word_limit,
-                    "scene_count": scene_count
-                })
-                logger.debug("\nRaw LLM output (for debugging parsing issues):\n%s", raw_output)
-            except Exception as inner_e:
-                logger.error(f"Could not get raw LLM output for debugging: {inner_e}")
-                
-            return f"Error: Could not generate structured story for '{subject}'. Details: {e}"
+                with self._llm_request() as config:
+                    fixed_output = self.repair_chain.invoke(self._repair_inputs(raw_output, parse_error), config=config)
+                story = self._repair_story(fixed_output)
+            except Exception as e:
+                logger.error(f"LLM repair of the story JSON failed: {e}")
+        return self._count_llm_repair(story, parse_error)
+
+    async def aparse_story(self, raw_output: str) -> StoryWithScenes:
+        """Async variant of parse_story; the LLM repair request uses ainvoke()."""
+        story, parse_error = self._parse_locally(raw_output)
+        if story is not None:
+            return story
+        
+        if self.llm_repair:
+            logger.warning(f"Asking the LLM to fix its story JSON: {parse_error}")
+            try:
+                with self._llm_request() as config:
+                    fixed_output = await self.repair_chain.ainvoke(self._repair_inputs(raw_output, parse_error), config=config)
+                story = self._repair_story(fixed_output)
+            except Exception as e:
+                logger.error(f"LLM repair of the story JSON failed: {e}")
+        return self._count_llm_repair(story, parse_error)
+
+    def complete_story(self, story: StoryWithScenes, scene_count: int) -> StoryWithScenes:
+        """
+        Validate the scenes of a parsed story, regenerating only the missing or invalid ones.
+        
+        Scenes are identified by their position: scenes beyond scene_count are dropped and scene
+        numbers follow the order of the scenes. Missing scenes, scenes with an empty narration or
+        visual description and scenes repeating an earlier scene's narration are written again by
+        the LLM, all in one request per round (up to scene_retries rounds) with the title, style,
+        characters and neighbouring scenes as context, and merged back in place. Scenes that are still
+        missing or invalid after the last round are left out. Counted in scene_stats.
+        
+        Args:
+            story: Parsed story
+            scene_count: Number of scenes requested
+            
+        Returns:
+            The story with its valid scenes, up to scene_count of them
+            
+        Raises:
+            OutputParserException: If not a single scene is valid
+        """
+        scenes = self._check_scenes(story.scenes, scene_count)
+        for _ in range(self.scene_retries):
+            missing = self._missing_scenes(scenes)
+            if not missing:
+                break
+            logger.warning(f"Regenerating scenes {missing} of '{story.title}'")
+            try:
+                with self._llm_request() as config:
+                    raw_output = self.scene_chain.invoke(self._scene_inputs(story, scenes, missing), config=config)
+            except Exception as e:
+                logger.error(f"Scene regeneration failed: {e}")
+                break
+            scenes = self._merge_scenes(scenes, raw_output, missing)
+        return self._finish_scenes(story, scenes)
+
+    async def acomplete_story(self, story: StoryWithScenes, scene_count: int) -> StoryWithScenes:
+        """Async variant of complete_story; the regeneration requests use ainvoke()."""
+        scenes = self._check_scenes(story.scenes, scene_count)
+        for _ in range(self.scene_retries):
+            missing = self._missing_scenes(scenes)
+            if not missing:
+                break
+            logger.warning(f"Regenerating scenes {missing} of '{story.title}'")
+            try:
+                with self._llm_request() as config:
+                    raw_output = await self.scene_chain.ainvoke(self._scene_inputs(story, scenes, missing), config=config)
+            except Exception as e:
+                logger.error(f"Scene regeneration failed: {e}")
+                break
+            scenes = self._merge_scenes(scenes, raw_output, missing)
+        return self._finish_scenes(story, scenes)
+
+    def _check_scenes(self, scenes: List[Scene], scene_count: int) -> List[Optional[Scene]]:
+        """
+        Validate scenes by position.
+        
+        Args:
+            scenes: Scenes of the parsed story
+            scene_count: Number of scenes requested
+            
+        Returns:
+            scene_count entries: the scene, renumbered to its position, or None if it is missing or invalid
+        """
+        if len(scenes) > scene_count:
+            logger.warning(f"Dropping {len(scenes) - scene_count} scenes beyond the {scene_count} requested "
+                           f"(scenes {scene_count + 1}-{len(scenes)})")
+        checked: List[Optional[Scene]] = []
+        narrations = set()
+        for position, scene in enumerate(scenes[:scene_count], start=1):
+            defect = self._scene_defect(scene, narrations)
+            if defect is not None:
+                logger.warning(f"Scene {position} is invalid: {defect}")
+                checked.append(None)
+                continue
+            narrations.add(scene.narration_text.strip())
+            checked.append(scene if scene.scene_number == position else scene.model_copy(update={"scene_number": position}))
+        return checked + [None] * (scene_count - len(checked))
+
+    @staticmethod
+    def _scene_defect(scene: Scene, narrations: set) -> Optional[str]:
+        """Describe what is wrong with a scene given the narrations of the scenes before it, or None if it is valid."""
+        if not scene.narration_text.strip():
+            return "empty narration_text"
+        if not scene.visual_description.strip():
+            return "empty visual_description"
+        if scene.narration_text.strip() in narrations:
+            return "repeats the narration of an earlier scene"
+        return None
+
+    @staticmethod
+    def _missing_scenes(scenes: List[Optional[Scene]]) -> List[int]:
+        """Positions (scene numbers) of the missing or invalid scenes."""
+        return [position for position, scene in enumerate(scenes, start=1) if scene is None]
+
+    @staticmethod
+    def _scene_inputs(story: StoryWithScenes, scenes: List[Optional[Scene]], missing: List[int]) -> Dict[str, Any]:
+        """Inputs of the scene regeneration prompt: the story's context and the valid neighbours of the missing scenes."""
+        neighbours = sorted({position for number in missing for position in (number - 1, number + 1)
+                             if 1 <= position <= len(scenes) and scenes[position - 1] is not None})
+        return {
+            "scene_count": len(scenes),
+            "scene_numbers": ", ".join(str(number) for number in missing),
+            "title": story.title,
+            "full_story_summary": story.full_story_summary,
+            "overall_image_style": story.overall_image_style,
+            "main_characters": "\n".join(f"- {character.name}: {character.appearance}" for character in story.main_characters) or "None",
+            "neighbouring_scenes": "\n".join(
+                f"Scene {position}: {scenes[position - 1].narration_text} (Visual: {scenes[position - 1].visual_description})"
+                for position in neighbours
+            ) or "None"
+        }
+
+    def _merge_scenes(self, scenes: List[Optional[Scene]], raw_output: str, missing: List[int]) -> List[Optional[Scene]]:
+        """
+        Put the valid regenerated scenes in place of the missing ones.
+        
+        Args:
+            scenes: Checked scenes, None where a scene is missing or invalid
+            raw_output: Completion of the scene regeneration request
+            missing: Requested scene numbers
+            
+        Returns:
+            The merged scenes; scenes that are still missing or invalid stay None
+        """
+        try:
+            data = json.loads(repair_json(raw_output))
+            if isinstance(data, dict):
+                data = data.get("scenes")
+            regenerated = [Scene.model_validate(item) for item in data]
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not parse the regenerated scenes: {e}")
+            return scenes
+        by_number = {scene.scene_number: scene for scene in regenerated if scene.scene_number in missing}
+        if len(by_number) < len(missing) and len(regenerated) == len(missing):
+            # Misnumbered replies are taken in the order the scenes were requested
+            by_number = dict(zip(missing, regenerated))
+        
+        merged = list(scenes)
+        narrations = {scene.narration_text.strip() for scene in scenes if scene is not None}
+        for number in missing:
+            scene = by_number.get(number)
+            defect = "not returned" if scene is None else self._scene_defect(scene, narrations)
+            if defect is not None:
+                logger.warning(f"Regenerated scene {number} is invalid: {defect}")
+                continue
+            narrations.add(scene.narration_text.strip())
+            merged[number - 1] = scene.model_copy(update={"scene_number": number})
+            with self._stats_lock:
+                self.scene_stats["regenerated"] += 1
+        return merged
+
+    def _finish_scenes(self, story: StoryWithScenes, scenes: List[Optional[Scene]]) -> StoryWithScenes:
+        """Count the outcome of the scene validation and put the valid checked scenes into the story."""
+        missing = self._missing_scenes(scenes)
+        with self._stats_lock:
+            self.scene_stats["checked"] += 1
+            if missing:
+                self.scene_stats["unrecoverable"] += 1
+        if missing:
+            logger.error(f"Scenes {missing} of '{story.title}' are still missing or invalid; continuing without them")
+        valid = [scene for scene in scenes if scene is not None]
+        if not valid:
+            raise OutputParserException("None of the scenes of the story are valid.")
+        return story if valid == story.scenes else story.model_copy(update={"scenes": valid})
+
+    def _parse_locally(self, raw_output: str) -> Tuple[Optional[StoryWithScenes], Optional[OutputParserException]]:
+        """
+        Parse a completion as is, then with local repair.
+        
+        Args:
+            raw_output: Raw text of the completion
+            
+        Returns:
+            The story (or None) and the error of the unrepaired parse, if it failed
+        """
+        try:
+            story = self.parser.parse(raw_output)
+            self._count_repair("valid")
+            return story, None
+        except OutputParserException as e:
+            parse_error = e
+        
+        story = self._repair_story(raw_output)
+        if story is not None:
+            logger.info("Repaired the story JSON locally.")
+            self._count_repair("repaired")
+        return story, parse_error
+
+    @contextmanager
+    def _llm_request(self) -> Iterator[Dict[str, Any]]:
+        """
+        Time LLM calls in an "llm_request" span and count their tokens.
+        
+        Yields:
+            Runnable config with a TokenUsageCallback; the tokens are added to the span and to token_usage
+        """
+        usage = TokenUsageCallback()
+        with span("llm_request", provider=type(self.llm).__name__) as request_span:
+            try:
+                yield {"callbacks": [usage]}
+            finally:
+                request_span.add_tokens(usage.input_tokens, usage.output_tokens)
+                with self._stats_lock:
+                    self.token_usage["calls"] += usage.calls
+                    self.token_usage["input_tokens"] += usage.input_tokens
+                    self.token_usage["output_tokens"] += usage.output_tokens
+
+    @staticmethod
+    def _structured_output_text(output: Dict[str, Any]) -> str:
+        """
+        Turn the result of with_structured_output(include_raw=True) into story JSON text.
+        
+        A validated story is serialized as is; otherwise the raw tool call arguments (or the message
+        text) are returned so parse_story can repair them like any other completion.
+        """
+        if output.get("parsed") is not None:
+            return output["parsed"].model_dump_json()
+        logger.warning(f"Structured story output did not validate: {output.get('parsing_error')}")
+        raw = output.get("raw")
+        if isinstance(raw, AIMessage) and raw.tool_calls:
+            return json.dumps(raw.tool_calls[0]["args"])
+        content = raw.content if isinstance(raw, AIMessage) else raw
+        return content if isinstance(content, str) else json.dumps(content)
+
+    def _repair_inputs(self, raw_output: str, parse_error: Exception) -> Dict[str, str]:
+        """Inputs of the repair prompt for a completion."""
+        return {"completion": raw_output, "error": str(parse_error)}
+
+    def _count_llm_repair(self, story: Optional[StoryWithScenes], parse_error: OutputParserException) -> StoryWithScenes:
+        """Count the outcome of the LLM repair step, raising the original parse error if it failed."""
+        if story is None:
+            self._count_repair("failed")
+            raise parse_error
+        self._count_repair("llm_repaired")
+        return story
+
+    @staticmethod
+    def _story_inputs(subject: str, scene_count: int, word_limit: int) -> Dict[str, Any]:
+        """Prompt inputs of a story request."""
+        return {"subject": subject, "word_limit": word_limit, "scene_count": scene_count}
+
+    def _lookup_cache(self, subject: str, scene_count: int, word_limit: int, use_cache: bool,
+                      refresh_cache: bool) -> Tuple[Optional[str], Optional[StoryWithScenes]]:
+        """
+        Look a request up in the story cache.
+        
+        Returns:
+            The cache key (None if the cache is not used) and the cached story on a hit
+        """
+        cache_key = self._cache_key(subject, scene_count, word_limit) if use_cache else None
+        if cache_key is None or refresh_cache:
+            return cache_key, None
+        return cache_key, self._get_cached_story(cache_key)
+
+    def _finish_story(self, subject: str, raw_output: str, cache_key: Optional[str],
+                      scene_count: int) -> Union[StoryWithScenes, str]:
+        """Parse a completion, complete its scenes and cache the story, or turn the failure into an error message."""
+        try:
+            structured_output = self.complete_story(self.parse_story(raw_output), scene_count)
+        except Exception as e:
+            return self._story_error(subject, e, raw_output)
+        self._store_story(subject, structured_output, cache_key)
+        return structured_output
+
+    def _store_story(self, subject: str, story: StoryWithScenes, cache_key: Optional[str]):
+        """Log a generated story and store it in the cache."""
+        logger.info("Structured story generated successfully!")
+        if cache_key is not None:
+            self.story_cache.put_bytes(cache_key, story.model_dump_json().encode("utf-8"), {"subject": subject})
+
+    @staticmethod
+    def _story_error(subject: str, error: Exception, raw_output: Optional[str] = None) -> str:
+        """Log a failed story request and build its error message."""
+        logger.error(f"Error during structured story generation: {error}")
+        if raw_output is not None:
+            logger.debug("\nRaw LLM output (for debugging parsing issues):\n%s", raw_output)
+        return f"Error: Could not generate structured story for '{subject}'. Details: {error}"
+
+    def _repair_story(self, raw_output: str) -> Optional[StoryWithScenes]:
+        """
+        Repair a completion locally and validate it as a story.
+        
+        Args:
+            raw_output: Raw text of the completion
+            
+        Returns:
+            The validated StoryWithScenes, or None if the repaired JSON is still not a valid story
+        """
+        try:
+            data = json.loads(repair_json(raw_output))
+            if isinstance(data, dict) and isinstance(data.get("scenes"), list):
+                # Scenes are identified by their number downstream; number them by position
+                for position, scene in enumerate(data["scenes"], start=1):
+                    if isinstance(scene, dict):
+                        scene["scene_number"] = position
+            return StoryWithScenes.model_validate(data)
+        except ValueError as e:
+            logger.debug(f"Local repair of the story JSON failed: {e}")
+            return None
+
+    def _count_repair(self, outcome: str):
+        """Count a parse outcome in repair_stats."""
+        with self._stats_lock:
+            self.repair_stats[outcome] += 1
+
+    def _stream_event(self, path: Tuple, value: Any, streamed_scenes: List[Scene],
+                      scene_count: int) -> Optional[Tuple[str, Any]]:
+        """
+        Turn a completed value of the streamed story JSON into a stream event.
+        
+        Args:
+            path: Path of the value in the story object
+            value: Decoded value
+            streamed_scenes: Scenes yielded so far
+            scene_count: Number of scenes requested
+            
+        Returns:
+            The (event, value) pair, or None for values that are not reported or not valid yet
+        """
+        try:
+            if path == ("overall_image_style",) and isinstance(value, str):
+                return "overall_image_style", value
+            if path == ("main_characters",) and isinstance(value, list):
+                return "main_characters", [CharacterDescription.model_validate(character) for character in value]
+            scenes_streamed = len(streamed_scenes)
+            if len(path) == 2 and path[0] == "scenes" and path[1] == scenes_streamed < scene_count:
+                scene = Scene.model_validate(value)
+                # Defective scenes are regenerated after the stream, so they must not be started now
+                defect = self._scene_defect(scene, {streamed.narration_text.strip() for streamed in streamed_scenes})
+                if scene.scene_number == scenes_streamed + 1 and defect is None:
+                    return "scene", scene
+                logger.warning(f"Not streaming scene {scene.scene_number} at position {scenes_streamed + 1}: "
+                               f"{defect or 'out of order'}")
+        except ValueError as e:
+            # The final parse of the whole story repairs or reports the error
+            logger.warning(f"Ignoring invalid streamed story part {path}: {e}")
+        return None
+
+    def _cache_key(self, subject: str, scene_count: int, word_limit: int) -> Optional[str]:
+        """
+        Build the story cache key from the inputs that determine the story.
+        
+        Args:
+            subject: The subject or theme for the story
+            scene_count: Number of scenes
+            word_limit: Word limit for the story
+            
+        Returns:
+            The cache key, or None if no story cache is configured
+        """
+        if self.story_cache is None:
+            return None
+        model_name = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None)
+        temperature = getattr(self.llm, "temperature", None)
+        return FileCache.make_key(type(self.llm).__name__, model_name, temperature, subject, scene_count, word_limit)
+
+    def _get_cached_story(self, cache_key: str) -> Optional[StoryWithScenes]:
+        """
+        Load a story from the cache, treating unreadable or invalid entries as misses.
+        
+        Args:
+            cache_key: Cache key of the request
+            
+        Returns:
+            The cached StoryWithScenes, or None on a miss
+        """
+        entry = self.story_cache.get(cache_key)
+        if entry is None:
+            return None
+        try:
+            with open(entry.path, "r", encoding="utf-8") as f:
+                story = StoryWithScenes.model_validate_json(f.read())
+        except Exception as e:
+            logger.warning(f"Ignoring invalid story cache entry {entry.path}: {e}")
+            return None
+        logger.info(f"Story cache hit: '{story.title}'")
+        return story
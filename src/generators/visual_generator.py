@@ -2,12 +2,17 @@
 
 import os
 import re
+import base64
 import logging
 from typing import Optional, List, Literal
 
 # Assuming these are correctly defined and imported from your project structure
 from src.models.schemas import CharacterDescription, GenerationResult
 from src.config.config import Config
+from src.utils.cache import FileCache
+from src.utils.http_client import get_http_client
+from src.utils.profiling import span
+from src.utils.rate_limiter import as_throttled_error, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 # Set logging level to INFO to see more details during debugging
@@ -39,12 +44,21 @@ class VisualGenerator:
                  provider: Literal["openai_dalle", "google_vertex_ai_image", "stable_diffusion_api"] = "google_vertex_ai_image",
                  gcp_project_id: str = None,
                  gcp_location: str = None,
-                 vertex_ai_imagen_model_id: str = None):
+                 vertex_ai_imagen_model_id: str = None,
+                 image_cache: Optional[FileCache] = None,
+                 openai_base_url: Optional[str] = None):
         logger.info(f"VisualGenerator initializing with provider: {provider}")
         self.provider = provider
         self.api_key = None
         self.client = None
         self.vertex_ai_model = None
+        self.image_cache = image_cache
+        self.rate_limiter = None
+        self.http_client = get_http_client()
+        self.dalle_model = "dall-e-3"
+        self.dalle_size = "1024x1024"
+        self.dalle_response_format = Config.OPENAI_IMAGES_RESPONSE_FORMAT
+        self.openai_base_url = openai_base_url or Config.OPENAI_BASE_URL
         # Use provided args or fallback to Config
         self.gcp_project_id = gcp_project_id if gcp_project_id is not None else Config.GCP_PROJECT_ID
         self.gcp_location = gcp_location if gcp_location is not None else Config.GCP_LOCATION
@@ -78,7 +92,11 @@ class VisualGenerator:
             if not self.api_key:
                 raise ValueError("OPENAI_API_KEY not found in environment variables.")
 
-            self.client = OpenAI(api_key=self.api_key)
+            # Throttling is retried by the shared rate limiter rather than by each client
+            # Connections are pooled by the process-wide httpx client instead of one pool per generator
+            self.client = OpenAI(api_key=self.api_key, base_url=self.openai_base_url, max_retries=0,
+                                 http_client=self.http_client.httpx_client())
+            self.rate_limiter = get_rate_limiter(self.provider, self.api_key)
             logger.info("OpenAI DALL-E client initialized.")
         except Exception as e:
             self.api_key = None
@@ -103,6 +121,8 @@ class VisualGenerator:
             self.vertex_ai_model = ImageGenerationModel.from_pretrained(self.vertex_ai_imagen_model_id)
             logger.info(f"Google Vertex AI Imagen model '{self.vertex_ai_imagen_model_id}' initialized successfully.")
             self.api_key = "VERTEX_AI_READY" # Dummy key to indicate setup success
+            # Imagen quotas apply per project and region
+            self.rate_limiter = get_rate_limiter(self.provider, f"{self.gcp_project_id}/{self.gcp_location}")
         except Exception as e:
             self.vertex_ai_model = None
             self.api_key = None
@@ -149,28 +169,93 @@ class VisualGenerator:
         try:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-            if self.provider == "openai_dalle":
-                return self._generate_openai_dalle_image(final_image_prompt, output_path, quality)
-            elif self.provider == "google_vertex_ai_image":
-                return self._generate_google_vertex_ai_image(final_image_prompt, output_path)
-            elif self.provider == "stable_diffusion_api":
-                return self._generate_stable_diffusion_image(final_image_prompt, output_path)
-            else:
-                raise ValueError(f"Unsupported provider: {self.provider}")
+            cache_key = self._cache_key(final_image_prompt, quality)
+            cached = self._get_cached_image(cache_key, output_path)
+            if cached is not None:
+                return cached
+
+            with span("image_request", provider=self.provider) as request_span:
+                if self.provider == "openai_dalle":
+                    result = self._generate_openai_dalle_image(final_image_prompt, output_path, quality)
+                elif self.provider == "google_vertex_ai_image":
+                    result = self._generate_google_vertex_ai_image(final_image_prompt, output_path)
+                elif self.provider == "stable_diffusion_api":
+                    result = self._generate_stable_diffusion_image(final_image_prompt, output_path)
+                else:
+                    raise ValueError(f"Unsupported provider: {self.provider}")
+                if result.success:
+                    request_span.add_file(result.output_path)
+
+            if result.success and cache_key is not None:
+                self.image_cache.put_file(cache_key, result.output_path, {"provider": self.provider})
+            return result
         except Exception as e:
             error_msg = f"Error generating image: {e}"
             logger.error(error_msg)
             return GenerationResult(success=False, output_path="", error=error_msg)
 
+    def _cache_key(self, prompt_text: str, quality: str) -> Optional[str]:
+        """
+        Cache key of an image request: the provider, the settings the provider renders with and the final prompt.
+
+        Returns None (the request is not cached) for providers without settings that identify their images.
+        """
+        if self.image_cache is None:
+            return None
+        if self.provider == "openai_dalle":
+            return FileCache.make_key(self.provider, self.dalle_model, quality, self.dalle_size, prompt_text)
+        if self.provider == "google_vertex_ai_image":
+            # Imagen ignores the quality setting and uses its default 1:1 size
+            return FileCache.make_key(self.provider, self.vertex_ai_imagen_model_id, None, None, prompt_text)
+        # The Stable Diffusion API has no model or endpoint setting yet, so its images could not be told apart
+        return None
+
+    def _get_cached_image(self, cache_key: Optional[str], output_path: str) -> Optional[GenerationResult]:
+        """Serve an image from the cache without a network call; None on a miss."""
+        if cache_key is None:
+            return None
+        entry = self.image_cache.get(cache_key)
+        if entry is None:
+            return None
+        try:
+            self.image_cache.copy_to(entry, output_path)
+        except OSError as e:
+            # The entry was evicted between lookup and copy
+            logger.warning(f"Could not copy cached image {entry.path}: {e}")
+            return None
+        logger.info(f"Image cache hit, saved to {output_path} (cache stats: {self.image_cache.stats})")
+        return GenerationResult(success=True, output_path=output_path)
+
+    def _call_provider(self, func, *args, **kwargs):
+        """Call a provider SDK method through the shared rate limiter, retrying rate-limit (429) errors."""
+        def request():
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                throttled = as_throttled_error(e)
+                if throttled is not None:
+                    raise throttled from e
+                raise
+
+        if self.rate_limiter is None:
+            return func(*args, **kwargs)
+        return self.rate_limiter.call(request)
+
     def _generate_openai_dalle_image(self, prompt_text: str, output_path: str, quality: Literal["standard", "hd"]) -> GenerationResult:
         if not self.client: return GenerationResult(success=False, output_path="", error="OpenAI client not initialized.")
         try:
             logger.info("Generating image with DALL-E 3...")
-            response = self.client.images.generate(model="dall-e-3", prompt=prompt_text, size="1024x1024", quality=quality, n=1)
-            image_url = response.data[0].url
-            image_response = requests.get(image_url)
-            image_response.raise_for_status()
-            with open(output_path, "wb") as f: f.write(image_response.content)
+            response = self._call_provider(self.client.images.generate, model=self.dalle_model, prompt=prompt_text, size=self.dalle_size,
+                                           quality=quality, response_format=self.dalle_response_format, n=1)
+            image = response.data[0]
+            if getattr(image, "b64_json", None) and image.url is None:
+                # b64_json responses carry the image inline and save the second round trip
+                image_bytes = base64.b64decode(image.b64_json)
+            else:
+                image_response = self.http_client.get(image.url, timeout=Config.PROVIDER_TIMEOUT_SECONDS)
+                image_response.raise_for_status()
+                image_bytes = image_response.content
+            with open(output_path, "wb") as f: f.write(image_bytes)
             logger.info(f"Image saved to {output_path}")
             return GenerationResult(success=True, output_path=output_path)
         except Exception as e:
@@ -182,7 +267,7 @@ class VisualGenerator:
         if not self.vertex_ai_model: return GenerationResult(success=False, output_path="", error="Vertex AI model not initialized.")
         try:
             logger.info("Generating image with Vertex AI Imagen...")
-            response = self.vertex_ai_model.generate_images(prompt=prompt_text, number_of_images=1)
+            response = self._call_provider(self.vertex_ai_model.generate_images, prompt=prompt_text, number_of_images=1)
             if response.images:
                 image_data_bytes = response.images[0].image_bytes
                 with open(output_path, "wb") as f: f.write(image_data_bytes)
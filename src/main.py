@@ -3,6 +3,7 @@ Main entry point for the ShortFactory application.
 """
 
 import os
+import json
 import logging
 import argparse
 from typing import Optional
@@ -11,8 +12,14 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 
 from src.core.factory import ShortVideoFactory
+from src.core.batch import BatchRunner
+from src.core.scheduler import StageScheduler
+from src.core.job_queue import JobQueue
+from src.core.job_service import JobService, serve
+from src.models.schemas import VideoCreationConfig
 from src.config.config import Config
 from src.utils.logger import setup_logging
+from src.utils.profiling import load_profiles, summarize_profiles
 
 # Set up logging
 setup_logging()
@@ -45,6 +52,23 @@ def create_llm(llm_provider: str = "gemini"):
     else:
         raise ValueError(f"Unsupported LLM provider: {llm_provider}")
 
+def apply_story_cache(config: VideoCreationConfig, mode: Optional[str]):
+    """
+    Apply the --story-cache option to a configuration.
+    
+    The story cache is off unless STORY_CACHE_DIR is set; asking to use or refresh it on the command
+    line enables it in the default cache location.
+    
+    Args:
+        config: Configuration to update (before the factories are created from it)
+        mode: 'use', 'refresh', 'bypass' or None to keep the configured behaviour
+    """
+    if mode is None:
+        return
+    if mode != "bypass" and not config.story_cache_dir:
+        config.story_cache_dir = os.path.join(Config.CACHE_DIR, "stories")
+    config.story_cache_mode = mode
+
 def main():
     """Main entry point for the application."""
     parser = argparse.ArgumentParser(description="ShortFactory - Create short videos with AI")
@@ -55,15 +79,39 @@ def main():
                         help="TTS provider to use")
     parser.add_argument("--image", type=str, choices=["openai_dalle", "google_vertex_ai_image", "stable_diffusion_api"], 
                         default=Config.IMAGE_PROVIDER, help="Image generation provider to use")
+    parser.add_argument("--story-cache", type=str, choices=["use", "refresh", "bypass"],
+                        help="Story cache behaviour: reuse cached stories, regenerate and overwrite them, or ignore the cache. "
+                        "The cache is off unless STORY_CACHE_DIR is set or this option asks to use or refresh it")
+    parser.add_argument("--resume", type=str, metavar="RUN_ID", help="Resume a previous run, regenerating only missing or invalid assets")
+    parser.add_argument("--batch", type=str, help="Path to a .jsonl or .csv file of subjects to produce in batch mode")
+    parser.add_argument("--results", type=str, help="Path to the batch results JSONL file (defaults to <batch file>.results.jsonl)")
+    parser.add_argument("--workers", type=int, help="Number of videos produced in parallel in batch or service mode "
+                        "(defaults to BATCH_WORKERS or JOB_WORKERS)")
+    parser.add_argument("--serve", action="store_true", help="Run the job service: an HTTP API to submit, poll and cancel video jobs")
+    parser.add_argument("--host", type=str, default=Config.JOB_SERVICE_HOST, help="Interface the job service listens on")
+    parser.add_argument("--port", type=int, default=Config.JOB_SERVICE_PORT, help="Port the job service listens on")
+    parser.add_argument("--profile-summary", action="store_true", help="Print timing statistics aggregated over all saved run profiles and exit")
     
     args = parser.parse_args()
     
+    if args.profile_summary:
+        print(json.dumps(summarize_profiles(load_profiles(Config.RUNS_DIR)), indent=2))
+        return 0
+    
+    if args.batch:
+        return run_batch(args)
+    
+    if args.serve:
+        return run_service(args)
+    
     try:
         # Create LLM
         llm = create_llm(args.llm)
         
         # Create factory
-        factory = ShortVideoFactory(llm)
+        config = ShortVideoFactory.build_default_config()
+        apply_story_cache(config, args.story_cache)
+        factory = ShortVideoFactory(llm, config=config)
         
         # Override config with command line arguments
         factory.config.story_subject = args.subject
@@ -71,9 +119,15 @@ def main():
         factory.config.tts_provider = args.tts
         factory.config.image_provider = args.image
         
-        # Create video
-        logger.info(f"Starting video creation for subject: '{args.subject}' with {args.scenes} scenes...")
-        result = factory.create_video()
+        # Create video, or continue a previous run
+        if args.resume:
+            result = factory.resume(args.resume)
+        else:
+            logger.info(f"Starting video creation for subject: '{args.subject}' with {args.scenes} scenes...")
+            result = factory.create_video()
+        
+        if result.get("profile"):
+            logger.info(f"Run took {result['profile']['total_seconds']:.1f}s; profile saved in {result['run_dir']}")
         
         if result["success"]:
             logger.info(f"Video creation successful! Video saved to: {result['video']['video_path']}")
@@ -81,11 +135,66 @@ def main():
         else:
             logger.error(f"Video creation failed: {result.get('error', 'Unknown error')}")
             logger.info(f"Steps completed: {', '.join(result.get('steps_completed', []))}")
+            if result.get("run_id"):
+                logger.info(f"Resume this run with: --resume {result['run_id']}")
             return 1
     except Exception as e:
         logger.exception(f"Error in main: {e}")
         return 1
 
+def run_batch(args) -> int:
+    """
+    Run batch mode: produce one video per row of the subjects file.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Process exit code (0 if every job succeeded)
+    """
+    try:
+        base_config = ShortVideoFactory.build_default_config()
+        base_config.num_scenes = args.scenes
+        base_config.tts_provider = args.tts
+        base_config.image_provider = args.image
+        apply_story_cache(base_config, args.story_cache)
+        
+        results_path = args.results or f"{os.path.splitext(args.batch)[0]}.results.jsonl"
+        # Rows with a priority, deadline or tenant share the provider slots accordingly
+        runner = BatchRunner(lambda: create_llm(args.llm), base_config, workers=args.workers, scheduler=StageScheduler())
+        summary = runner.run(args.batch, results_path)
+        
+        logger.info(f"Batch results written to {results_path}")
+        return 0 if summary["failed"] == 0 else 1
+    except Exception as e:
+        logger.exception(f"Error in batch mode: {e}")
+        return 1
+
+def run_service(args) -> int:
+    """
+    Run the job service until interrupted.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Process exit code
+    """
+    try:
+        base_config = ShortVideoFactory.build_default_config()
+        base_config.num_scenes = args.scenes
+        base_config.tts_provider = args.tts
+        base_config.image_provider = args.image
+        apply_story_cache(base_config, args.story_cache)
+        
+        service = JobService(lambda: create_llm(args.llm), base_config, JobQueue(Config.JOB_DB_PATH), workers=args.workers)
+        logger.info(f"Starting job service on http://{args.host}:{args.port} (queue: {Config.JOB_DB_PATH})")
+        serve(service, args.host, args.port)
+        return 0
+    except Exception as e:
+        logger.exception(f"Error in job service: {e}")
+        return 1
+
 if __name__ == "__main__":
     exit_code = main()
     exit(exit_code)
@@ -4,7 +4,7 @@ These models define the structure for story generation, scene descriptions,
 and other data used throughout the application pipeline.
 """
 
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -36,6 +36,11 @@ class StoryWithScenes(BaseModel):
     scenes: List[Scene] = Field(description="A list of distinct scenes composing the story, each with its visual and narration details.")
 
 
+class RegeneratedScenes(BaseModel):
+    """Model for scenes written to replace the missing or invalid scenes of a story."""
+    scenes: List[Scene] = Field(description="The requested scenes only, each with its scene_number, visual and narration details.")
+
+
 class GenerationResult(BaseModel):
     """Model for tracking the success status and output paths of generation steps."""
     success: bool = Field(description="Whether the generation was successful.")
@@ -44,6 +49,17 @@ class GenerationResult(BaseModel):
     duration: float = Field(default=0.0, description="Duration of audio in seconds, if applicable.")
 
 
+class RunManifest(BaseModel):
+    """Persisted state of a single video creation run, used to resume interrupted or failed runs."""
+    run_id: str = Field(description="Unique identifier of the run.")
+    subject: str = Field(description="The subject of the story.")
+    num_scenes: int = Field(description="Number of scenes requested for the story.")
+    story: Optional[StoryWithScenes] = Field(default=None, description="The generated story, once available.")
+    narrations: Dict[int, GenerationResult] = Field(default_factory=dict, description="Narration results keyed by scene number.")
+    visuals: Dict[int, GenerationResult] = Field(default_factory=dict, description="Image results keyed by scene number.")
+    video: Optional[GenerationResult] = Field(default=None, description="Result of the final video assembly, once successful.")
+
+
 class VideoCreationConfig(BaseModel):
     """Configuration settings for the video creation process."""
     story_subject: str = Field(description="The subject of the story to be generated.")
@@ -57,3 +73,38 @@ class VideoCreationConfig(BaseModel):
     image_transition_duration: float = Field(description="Duration of fade transition between images in seconds.")
     video_fps: int = Field(description="Frames per second for the output video.")
     output_directories: dict = Field(description="Dictionary of output directories for various assets.")
+    max_concurrent_narrations: int = Field(default=4, ge=1, description="Maximum number of narration requests run in parallel (1 = sequential).")
+    max_concurrent_images: int = Field(default=4, ge=1, description="Maximum number of image requests run in parallel (1 = sequential).")
+    pipeline_mode: Literal["batch", "streaming"] = Field(default="batch", description="'batch' assembles the video after every scene is generated, "
+                                                                                     "'streaming' encodes each scene as soon as its audio and image exist.")
+    narration_mode: Literal["scene", "story"] = Field(default="scene", description="'scene' sends one TTS request per scene, 'story' narrates the whole story "
+                                                                                   "in one request and splits the audio at the scene boundaries (batch pipeline only).")
+    story_prompt_mode: Literal["parser", "structured"] = Field(default="parser", description="'parser' embeds the story's JSON schema in the prompt, 'structured' "
+                                                                                          "uses the model's native structured output with a shorter prompt.")
+    story_cache_dir: str = Field(default="", description="Directory of the story cache (empty disables caching).")
+    story_cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0, description="Byte budget of the story cache before LRU eviction.")
+    story_cache_ttl_seconds: float = Field(default=0.0, ge=0, description="Maximum age of a cached story in seconds (0 = never expires).")
+    story_cache_mode: Literal["use", "refresh", "bypass"] = Field(default="use", description="'use' reads and writes the story cache, 'refresh' regenerates "
+                                                                                            "and overwrites cached stories, 'bypass' ignores the cache.")
+    tts_cache_dir: str = Field(default="", description="Directory of the shared narration audio cache (empty disables caching).")
+    tts_cache_max_bytes: int = Field(default=512 * 1024 * 1024, ge=0, description="Byte budget of the narration cache before LRU eviction.")
+    image_cache_dir: str = Field(default="", description="Directory of the shared image cache (empty disables caching).")
+    image_cache_max_bytes: int = Field(default=2 * 1024 * 1024 * 1024, ge=0, description="Byte budget of the image cache before LRU eviction.")
+    image_cache_ttl_seconds: float = Field(default=0.0, ge=0, description="Maximum age of a cached image in seconds (0 = never expires).")
+    pipeline_queue_size: int = Field(default=2, ge=1, description="Size of the bounded queues between streaming pipeline stages.")
+    story_streaming: bool = Field(default=False, description="In the streaming pipeline, parse the story while the LLM writes it and start each "
+                                                            "scene's narration and image as soon as the scene is complete.")
+    video_filename_template: str = Field(default="final_video_{run_id}.mp4", description="File name of the published video; may use {run_id} and {timestamp}.")
+    scratch_cleanup_policy: Literal["on_success", "always", "never"] = Field(default="on_success", description="When a run's scratch space is deleted.")
+
+
+class BatchJob(BaseModel):
+    """A single row of a batch subjects file, with optional per-row overrides of the base configuration."""
+    job_id: str = Field(pattern=r"^[\w.-]+$", description="Identifier of the job, used for its output directory and in the results file.")
+    subject: str = Field(min_length=1, description="The subject of the story to be generated.")
+    num_scenes: Optional[int] = Field(default=None, ge=1, description="Number of scenes override for this job.")
+    tts_provider: Optional[Literal["elevenlabs", "google_cloud_tts"]] = Field(default=None, description="TTS provider override for this job.")
+    image_provider: Optional[Literal["openai_dalle", "google_vertex_ai_image", "stable_diffusion_api"]] = Field(default=None, description="Image provider override for this job.")
+    priority: Literal["urgent", "normal", "backfill"] = Field(default="normal", description="Priority class of the job; urgent work is scheduled ahead of queued lower-priority work.")
+    deadline_seconds: Optional[float] = Field(default=None, gt=0, description="Seconds after submission by which the video should be done; work with less slack runs first.")
+    tenant: str = Field(default="default", min_length=1, description="Tenant the job belongs to; provider slots are shared fairly between tenants.")
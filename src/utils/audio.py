@@ -0,0 +1,362 @@
+"""
+Audio duration measurement from container and frame headers.
+
+MP3 durations are read from the Xing/Info or VBRI header of the first frame when the encoder wrote
+one, and otherwise by walking the frame headers (each frame header gives its length and sample count),
+so no audio is decoded. WAV durations come from the RIFF header. Only files that are neither are
+decoded with pydub (ffmpeg). MP3 streams can also be split and joined at frame boundaries without
+re-encoding.
+"""
+
+import bisect
+import logging
+import wave
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pydub import AudioSegment
+    PYDUB_AVAILABLE = True
+except ImportError:
+    AudioSegment = None
+    PYDUB_AVAILABLE = False
+
+# Bitrates in kbit/s by (MPEG-1?, layer) and bitrate index; index 0 ("free") and 15 are not supported
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates in Hz by version bits (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1) and sample rate index
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+_XING_FRAMES_FLAG = 0x1
+
+
+class AudioDurationError(Exception):
+    """Raised when the duration of an audio file cannot be determined."""
+
+
+class Mp3Frame:
+    """The fields of an MPEG audio frame header needed to size and time the frame."""
+
+    __slots__ = ("mpeg1", "layer", "sample_rate", "mono", "length", "samples")
+
+    def __init__(self, mpeg1: bool, layer: int, sample_rate: int, mono: bool, length: int, samples: int):
+        self.mpeg1 = mpeg1
+        self.layer = layer
+        self.sample_rate = sample_rate
+        self.mono = mono
+        self.length = length
+        self.samples = samples
+
+    @property
+    def seconds(self) -> float:
+        """Playing time of the frame."""
+        return self.samples / self.sample_rate
+
+
+def parse_frame_header(data: bytes, offset: int) -> Optional[Mp3Frame]:
+    """
+    Parse the MPEG audio frame header at an offset.
+
+    Args:
+        data: MP3 data
+        offset: Position of the candidate header
+
+    Returns:
+        The frame, or None if there is no valid header at the offset
+    """
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version = (b1 >> 3) & 0x3
+    layer = 4 - ((b1 >> 1) & 0x3)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or mpeg1:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+    return Mp3Frame(mpeg1, layer, sample_rate, (b3 >> 6) == 3, length, samples)
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Offset of the first byte after a leading ID3v2 tag (0 without one)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _find_first_frame(data: bytes, start: int) -> Optional[Tuple[int, Mp3Frame]]:
+    """Find the first frame header that is followed by another one (or ends the stream), skipping junk."""
+    offset = data.find(b"\xff", start)
+    while 0 <= offset < len(data) - 3:
+        frame = parse_frame_header(data, offset)
+        if frame is not None:
+            following = offset + frame.length
+            if (following == len(data) or data[following:following + 3] == b"TAG"
+                    or parse_frame_header(data, following) is not None):
+                return offset, frame
+        offset = data.find(b"\xff", offset + 1)
+    return None
+
+
+def _vbr_header(data: bytes, offset: int, frame: Mp3Frame) -> Tuple[bool, Optional[int]]:
+    """
+    Look for a Xing/Info or VBRI header in the first frame.
+
+    Returns:
+        Whether the frame is such a header frame (which carries no audio), and the frame count it
+        declares, or None if it declares none (a Xing/Info header without the frames flag)
+    """
+    if frame.layer == 3:
+        side_info = (17 if frame.mono else 32) if frame.mpeg1 else (9 if frame.mono else 17)
+        xing = offset + 4 + side_info
+        if data[xing:xing + 4] in (b"Xing", b"Info"):
+            flags = int.from_bytes(data[xing + 4:xing + 8], "big")
+            if flags & _XING_FRAMES_FLAG and len(data) >= xing + 12:
+                return True, int.from_bytes(data[xing + 8:xing + 12], "big")
+            return True, None
+    vbri = offset + 36
+    if data[vbri:vbri + 4] == b"VBRI":
+        if len(data) >= vbri + 18:
+            return True, int.from_bytes(data[vbri + 14:vbri + 18], "big")
+        return True, None
+    return False, None
+
+
+def mp3_duration(data: bytes) -> Optional[float]:
+    """
+    Measure the duration of MP3 data from its headers, without decoding.
+
+    Uses the frame count of a Xing/Info or VBRI header when the first frame carries one, and otherwise
+    adds up the audio frames found by following the frame headers from the first frame to the end of the
+    stream (or the first byte that is not a frame, such as an ID3v1 tag). A header frame without a frame
+    count is not counted, as it carries no audio.
+
+    Args:
+        data: Contents of an MP3 file
+
+    Returns:
+        The duration in seconds, or None if the data contains no MPEG audio frames
+    """
+    first = _find_first_frame(data, _skip_id3v2(data))
+    if first is None:
+        return None
+    offset, frame = first
+    header_frame, declared_frames = _vbr_header(data, offset, frame)
+    if declared_frames:
+        return declared_frames * frame.seconds
+    if header_frame:
+        # Without a frame count the stream is walked, leaving out the header frame, which carries no audio
+        offset += frame.length
+        frame = parse_frame_header(data, offset)
+
+    seconds = 0.0
+    while frame is not None:
+        seconds += frame.seconds
+        offset += frame.length
+        frame = parse_frame_header(data, offset)
+    return seconds
+
+
+def _audio_frames(data: bytes) -> Tuple[List[int], List[float]]:
+    """
+    Locate the audio frames of MP3 data, skipping tags and a Xing/Info or VBRI header frame.
+
+    Returns:
+        Byte offset and start time of every audio frame, each followed by the end of the last frame
+
+    Raises:
+        AudioDurationError: If the data contains no MPEG audio frames
+    """
+    first = _find_first_frame(data, _skip_id3v2(data))
+    if first is None:
+        raise AudioDurationError("No MPEG audio frames found")
+    offset, frame = first
+    if _vbr_header(data, offset, frame)[0]:
+        # The header frame describes the whole stream and carries no audio
+        offset += frame.length
+        frame = parse_frame_header(data, offset)
+
+    offsets, starts = [], []
+    seconds = 0.0
+    while frame is not None:
+        offsets.append(offset)
+        starts.append(seconds)
+        seconds += frame.seconds
+        offset += frame.length
+        frame = parse_frame_header(data, offset)
+    offsets.append(offset)
+    starts.append(seconds)
+    return offsets, starts
+
+
+def split_mp3(data: bytes, cut_times: List[float]) -> List[Tuple[bytes, float]]:
+    """
+    Split MP3 data at frame boundaries, without decoding or re-encoding.
+
+    Every cut is made at the frame boundary closest to its time, so each segment is a valid MP3 stream
+    whose duration is exactly the playing time of its frames. Tags and a Xing/Info or VBRI header frame
+    (which would declare the frame count of the whole stream) are dropped. The first frame of a segment
+    may borrow bits from the previous frame (the MP3 bit reservoir), so cuts belong in pauses.
+
+    Args:
+        data: Contents of an MP3 file
+        cut_times: Increasing times in seconds at which to cut
+
+    Returns:
+        One (MP3 data, duration in seconds) tuple per segment, len(cut_times) + 1 in total
+
+    Raises:
+        AudioDurationError: If the data contains no MPEG audio frames or a segment would have none
+    """
+    offsets, starts = _audio_frames(data)
+
+    boundaries = [0]
+    for cut in cut_times:
+        index = bisect.bisect_left(starts, cut)
+        if index > 0 and (index == len(starts) or cut - starts[index - 1] < starts[index] - cut):
+            index -= 1
+        boundaries.append(max(index, boundaries[-1]))
+    boundaries.append(len(starts) - 1)
+
+    segments = []
+    for number, (begin, end) in enumerate(zip(boundaries, boundaries[1:])):
+        if end <= begin:
+            raise AudioDurationError(f"Segment {number} of the split would contain no audio frames")
+        segments.append((data[offsets[begin]:offsets[end]], starts[end] - starts[begin]))
+    return segments
+
+
+def concatenate_mp3(parts: List[bytes]) -> Tuple[bytes, float]:
+    """
+    Join MP3 streams into one by concatenating their audio frames, without decoding or re-encoding.
+
+    No samples are dropped or inserted at the joins, so the duration of the result is exactly the sum
+    of the parts' durations. Tags and Xing/Info or VBRI header frames of the parts are dropped, since
+    they would describe a single part. The parts should share one encoding (as the chunks of one voice do).
+
+    Args:
+        parts: Contents of the MP3 files, in order
+
+    Returns:
+        Tuple of the joined MP3 data and its duration in seconds
+
+    Raises:
+        AudioDurationError: If a part contains no MPEG audio frames
+    """
+    frames, seconds = [], 0.0
+    for part in parts:
+        offsets, starts = _audio_frames(part)
+        frames.append(part[offsets[0]:offsets[-1]])
+        seconds += starts[-1]
+    return b"".join(frames), seconds
+
+
+def crossfade_audio(paths: List[str], output_path: str, crossfade_ms: int) -> float:
+    """
+    Join audio files with a short crossfade at every join by decoding them with pydub (ffmpeg).
+
+    Each crossfade overlaps the end of one file with the start of the next, so the result is
+    crossfade_ms shorter per join than the files laid end to end. The result is encoded as MP3.
+
+    Args:
+        paths: Audio files, in order
+        output_path: Path of the joined MP3 file
+        crossfade_ms: Overlap of two consecutive files in milliseconds
+
+    Returns:
+        The duration of the joined audio in seconds, counted in samples of the decoded audio
+
+    Raises:
+        AudioDurationError: If pydub is not installed or a file cannot be decoded
+    """
+    if not PYDUB_AVAILABLE:
+        raise AudioDurationError("Crossfading needs pydub, which is not installed")
+    try:
+        combined = AudioSegment.from_file(paths[0])
+        for path in paths[1:]:
+            segment = AudioSegment.from_file(path)
+            combined = combined.append(segment, crossfade=min(crossfade_ms, len(combined), len(segment)))
+        combined.export(output_path, format="mp3")
+    except Exception as e:
+        raise AudioDurationError(f"Cannot crossfade {len(paths)} audio files: {e}") from e
+    return combined.frame_count() / combined.frame_rate
+
+
+def wav_duration(path: str) -> Optional[float]:
+    """Duration of a WAV file from its RIFF header, or None if it is not a PCM WAV file."""
+    try:
+        with wave.open(path, "rb") as audio:
+            return audio.getnframes() / audio.getframerate()
+    except (wave.Error, EOFError):
+        return None
+
+
+def decoded_duration(path: str) -> float:
+    """
+    Measure the duration of an audio file by decoding it with pydub (ffmpeg).
+
+    Args:
+        path: Path to the audio file
+
+    Returns:
+        The duration in seconds
+
+    Raises:
+        AudioDurationError: If pydub is not installed or cannot decode the file
+    """
+    if not PYDUB_AVAILABLE:
+        raise AudioDurationError(f"Cannot decode {path}: pydub is not installed")
+    try:
+        return len(AudioSegment.from_file(path)) / 1000.0
+    except Exception as e:
+        raise AudioDurationError(f"Cannot decode {path}: {e}") from e
+
+
+def audio_duration(path: str) -> float:
+    """
+    Measure the duration of an audio file, decoding it only if its headers cannot be used.
+
+    Args:
+        path: Path to an MP3 or WAV file (other formats are decoded)
+
+    Returns:
+        The duration in seconds, always positive
+
+    Raises:
+        AudioDurationError: If the file is empty, cannot be read or yields no audio
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise AudioDurationError(f"Cannot read {path}: {e}") from e
+    if not data:
+        raise AudioDurationError(f"{path} is empty")
+
+    duration = wav_duration(path) if data[:4] == b"RIFF" else mp3_duration(data)
+    if duration is None:
+        logger.debug(f"No audio headers found in {path}; decoding it to measure its duration")
+        duration = decoded_duration(path)
+    if duration <= 0:
+        raise AudioDurationError(f"{path} contains no audio")
+    return duration
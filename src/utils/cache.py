@@ -0,0 +1,258 @@
+"""
+On-disk, content-addressed cache shared by the generators.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import time
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+META_SUFFIX = ".meta.json"
+
+
+class CacheEntry(NamedTuple):
+    """A cache hit: path of the cached payload and the metadata stored with it."""
+    path: str
+    metadata: Dict[str, Any]
+
+
+class FileCache:
+    """
+    Content-addressed file cache with size-bounded LRU eviction and optional expiry.
+
+    Each entry is a payload file plus a JSON metadata sidecar, sharded by key prefix. Both files are
+    written to a temporary file in the cache directory and renamed into place, so concurrent threads
+    and processes sharing the directory never observe partial entries. Recency is tracked through the
+    payload's modification time, which is refreshed on every hit; the age of an entry is the
+    modification time of its metadata file, which is never touched after the entry is written.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None, suffix: str = "",
+                 ttl_seconds: Optional[float] = None):
+        """
+        Initialize the FileCache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Optional byte budget for payloads; least recently used entries are evicted beyond it
+            suffix: File extension for payload files (e.g. ".mp3")
+            ttl_seconds: Optional maximum age of an entry; older entries are treated as misses and evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._approx_bytes: Optional[int] = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a cache key from the values that fully determine a payload.
+
+        Args:
+            parts: JSON serialisable values (dicts are serialised with sorted keys)
+
+        Returns:
+            Hex SHA-256 digest of the parts
+        """
+        serialized = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        """Return the payload and metadata paths of a key."""
+        shard_dir = os.path.join(self.cache_dir, key[:2])
+        payload_path = os.path.join(shard_dir, f"{key}{self.suffix}")
+        return payload_path, payload_path + META_SUFFIX
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Look up an entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The CacheEntry on a hit, None on a miss
+        """
+        payload_path, meta_path = self._paths(key)
+        try:
+            if self._is_expired(os.stat(meta_path).st_mtime):
+                self._remove(payload_path)
+                raise FileNotFoundError(meta_path)
+            with open(meta_path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            os.utime(payload_path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return CacheEntry(payload_path, metadata)
+
+    def copy_to(self, entry: CacheEntry, output_path: str) -> str:
+        """
+        Atomically copy a cached payload to an output path.
+
+        Args:
+            entry: Entry returned by get()
+            output_path: Destination path
+
+        Returns:
+            The destination path
+        """
+        output_dir = os.path.dirname(output_path) or "."
+        os.makedirs(output_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=".cache-", suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(entry.path, tmp_path)
+            os.replace(tmp_path, output_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return output_path
+
+    def put_file(self, key: str, source_path: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Store a copy of a file under a key.
+
+        Args:
+            key: Cache key
+            source_path: File to store
+            metadata: Optional JSON serialisable metadata stored with the payload
+
+        Returns:
+            Path of the cached payload
+        """
+        def write_payload(f):
+            with open(source_path, "rb") as source:
+                shutil.copyfileobj(source, f)
+
+        return self._put(key, metadata, write_payload)
+
+    def put_bytes(self, key: str, data: bytes, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Store raw bytes under a key.
+
+        Args:
+            key: Cache key
+            data: Payload bytes
+            metadata: Optional JSON serialisable metadata stored with the payload
+
+        Returns:
+            Path of the cached payload
+        """
+        return self._put(key, metadata, lambda f: f.write(data))
+
+    def _put(self, key: str, metadata: Optional[Dict[str, Any]], write_payload) -> str:
+        """Write payload then metadata atomically; the metadata file marks the entry as complete."""
+        payload_path, meta_path = self._paths(key)
+        shard_dir = os.path.dirname(payload_path)
+        os.makedirs(shard_dir, exist_ok=True)
+
+        self._atomic_write(shard_dir, payload_path, "wb", write_payload)
+        self._atomic_write(shard_dir, meta_path, "w", lambda f: json.dump(metadata or {}, f))
+
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += os.path.getsize(payload_path)
+        self._maybe_evict()
+        return payload_path
+
+    @staticmethod
+    def _atomic_write(directory: str, path: str, mode: str, write):
+        """Write a file through a temporary file in the same directory and rename it into place."""
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, mode) as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _is_expired(self, written_at: float) -> bool:
+        """Whether an entry written at the given time is older than the TTL."""
+        return self.ttl_seconds is not None and time.time() - written_at > self.ttl_seconds
+
+    def _maybe_evict(self):
+        """Run an eviction pass when the (approximate) cache size exceeds the byte budget."""
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            approx_bytes = self._approx_bytes
+        if approx_bytes is None or approx_bytes > self.max_bytes:
+            self.evict()
+
+    def _scan(self):
+        """List (mtime, size, payload_path) for every entry, removing expired ones."""
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for item in os.scandir(shard.path):
+                if item.name.startswith(".") or item.name.endswith(META_SUFFIX):
+                    continue
+                try:
+                    stat = item.stat()
+                    if self.ttl_seconds is not None and self._is_expired(os.stat(item.path + META_SUFFIX).st_mtime):
+                        self._remove(item.path)
+                        continue
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        return entries
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then evict least recently used entries until the cache fits its byte budget.
+
+        Returns:
+            Number of evicted entries
+        """
+        entries = self._scan()
+        total_bytes = sum(size for _, size, _ in entries)
+        evicted = 0
+
+        if self.max_bytes is not None and total_bytes > self.max_bytes:
+            for _, size, payload_path in sorted(entries):
+                if total_bytes <= self.max_bytes:
+                    break
+                self._remove(payload_path)
+                total_bytes -= size
+                evicted += 1
+            logger.info(f"Evicted {evicted} entries from cache {self.cache_dir}")
+
+        with self._lock:
+            self._approx_bytes = total_bytes
+        return evicted
+
+    @staticmethod
+    def _remove(payload_path: str):
+        """Remove an entry, metadata first so readers treat it as a miss."""
+        for path in (payload_path + META_SUFFIX, payload_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters of this cache instance."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,339 @@
+"""
+Pooled keep-alive HTTP clients shared by the provider clients.
+
+Every host gets one requests.Session for the whole process, so the TCP and TLS handshakes of a provider
+are paid once per pooled connection instead of once per request. SDKs built on httpx (the OpenAI
+client) share one httpx.Client and coroutines share one httpx.AsyncClient per event loop; both can
+also speak HTTP/2. All of them count requests and newly opened connections per host, so connection
+reuse can be checked under load.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - httpx speaks HTTP/2 only when h2 is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def host_key(url: str) -> str:
+    """Identify the connection pool of a URL as scheme://host:port."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.hostname}:{parts.port or DEFAULT_PORTS.get(parts.scheme, 0)}"
+
+
+class ConnectionStats:
+    """Per-host counts of requests sent and connections opened, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def record_request(self, host: str):
+        """Count a request sent to a host."""
+        with self._lock:
+            self._hosts.setdefault(host, {"requests": 0, "connections": 0})["requests"] += 1
+
+    def record_connection(self, host: str):
+        """Count a new connection (TCP and, for HTTPS, TLS handshake) to a host."""
+        with self._lock:
+            self._hosts.setdefault(host, {"requests": 0, "connections": 0})["connections"] += 1
+
+    def reset(self):
+        """Forget all counts."""
+        with self._lock:
+            self._hosts.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Report connection reuse.
+
+        Returns:
+            Totals of requests, connections opened and requests served over a reused connection,
+            and the same counts per host
+        """
+        with self._lock:
+            hosts = {
+                host: {
+                    "requests": counts["requests"],
+                    "connections_opened": counts["connections"],
+                    "connections_reused": max(0, counts["requests"] - counts["connections"])
+                }
+                for host, counts in self._hosts.items()
+            }
+        return {
+            "requests": sum(counts["requests"] for counts in hosts.values()),
+            "connections_opened": sum(counts["connections_opened"] for counts in hosts.values()),
+            "connections_reused": sum(counts["connections_reused"] for counts in hosts.values()),
+            "hosts": hosts
+        }
+
+
+def _counting_pool_class(base: type, stats: ConnectionStats) -> type:
+    """urllib3 connection pool class whose connections report every (re)connect to stats."""
+    scheme = base.scheme
+
+    class CountingConnection(base.ConnectionCls):
+        def connect(self):
+            # Also called when a pooled connection that the server closed is reopened
+            stats.record_connection(f"{scheme}://{self.host}:{self.port}")
+            super().connect()
+
+    class CountingConnectionPool(base):
+        ConnectionCls = CountingConnection
+
+    return CountingConnectionPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count the connections they open."""
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        # Set before super().__init__, which creates the pool manager
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self._stats),
+            "https": _counting_pool_class(HTTPSConnectionPool, self._stats)
+        }
+
+
+class _StreamCounter:
+    """Counts the requests of an httpx transport and the distinct connections they were sent on."""
+
+    def __init__(self, stats: ConnectionStats):
+        self._stats = stats
+        self._streams = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def record(self, request, response):
+        host = host_key(str(request.url))
+        self._stats.record_request(host)
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            return
+        with self._lock:
+            new_connection = stream not in self._streams
+            self._streams.add(stream)
+        if new_connection:
+            self._stats.record_connection(host)
+
+
+if HTTPX_AVAILABLE:
+    class _CountingTransport(httpx.HTTPTransport):
+        """httpx transport that counts requests and the connections they were sent on."""
+
+        def __init__(self, stats: ConnectionStats, **kwargs):
+            super().__init__(**kwargs)
+            self._counter = _StreamCounter(stats)
+
+        def handle_request(self, request):
+            response = super().handle_request(request)
+            self._counter.record(request, response)
+            return response
+
+    class _CountingAsyncTransport(httpx.AsyncHTTPTransport):
+        """Asyncio variant of _CountingTransport."""
+
+        def __init__(self, stats: ConnectionStats, **kwargs):
+            super().__init__(**kwargs)
+            self._counter = _StreamCounter(stats)
+
+        async def handle_async_request(self, request):
+            response = await super().handle_async_request(request)
+            self._counter.record(request, response)
+            return response
+
+
+class HttpClientPool:
+    """
+    Process-wide pooled HTTP sessions.
+
+    requests calls go through one Session per host, each keeping up to pool_maxsize connections alive;
+    requests beyond that open extra connections that are closed afterwards. httpx_client() returns the
+    shared httpx.Client for SDKs that accept one, async_client() the httpx.AsyncClient of the running
+    event loop. Thread-safe.
+    """
+
+    def __init__(self,
+                 pool_maxsize: Optional[int] = None,
+                 keep_alive: Optional[bool] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 http2: Optional[bool] = None,
+                 timeout: Optional[float] = None):
+        """
+        Initialize the HttpClientPool.
+
+        Args:
+            pool_maxsize: Connections kept alive per host (defaults to Config.HTTP_POOL_MAXSIZE)
+            keep_alive: Reuse connections between requests (defaults to Config.HTTP_KEEP_ALIVE)
+            keepalive_expiry: Idle seconds before a pooled httpx connection is closed (defaults to Config.HTTP_KEEPALIVE_EXPIRY)
+            http2: Let the httpx client negotiate HTTP/2 (defaults to Config.HTTP2; needs the h2 package)
+            timeout: Default connect/read timeout in seconds (defaults to Config.PROVIDER_TIMEOUT_SECONDS)
+        """
+        self.pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+        self.keep_alive = Config.HTTP_KEEP_ALIVE if keep_alive is None else keep_alive
+        self.keepalive_expiry = Config.HTTP_KEEPALIVE_EXPIRY if keepalive_expiry is None else keepalive_expiry
+        self.http2 = Config.HTTP2 if http2 is None else http2
+        self.timeout = timeout or Config.PROVIDER_TIMEOUT_SECONDS
+        self.stats = ConnectionStats()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._httpx_client = None
+        # httpx connections belong to the event loop that opened them, so each loop gets its own client
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def session(self, url: str) -> requests.Session:
+        """
+        Get the pooled session of a URL's host, creating it on first use.
+
+        Args:
+            url: Any URL of the host
+
+        Returns:
+            The host's requests.Session
+        """
+        host = host_key(url)
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = _CountingAdapter(self.stats, pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if not self.keep_alive:
+                    session.headers["Connection"] = "close"
+                self._sessions[host] = session
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session of its host.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            kwargs: Arguments of requests.Session.request; timeout defaults to the pool's timeout
+
+        Returns:
+            The response; close it (or read it to the end) to return its connection to the pool
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        self.stats.record_request(host_key(url))
+        return self.session(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request (see request())."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request (see request())."""
+        return self.request("POST", url, **kwargs)
+
+    def httpx_client(self) -> Optional["httpx.Client"]:
+        """
+        Get the shared httpx.Client, e.g. for OpenAI(http_client=...), creating it on first use.
+
+        Returns:
+            The client, or None if httpx is not installed
+        """
+        if not HTTPX_AVAILABLE:
+            return None
+        with self._lock:
+            if self._httpx_client is None:
+                transport = _CountingTransport(self.stats, **self._httpx_transport_options())
+                self._httpx_client = httpx.Client(transport=transport, timeout=self.timeout)
+        return self._httpx_client
+
+    def async_client(self) -> Optional["httpx.AsyncClient"]:
+        """
+        Get the shared httpx.AsyncClient of the running event loop, creating it on first use.
+
+        All coroutines on a loop share its connection pool; the client lives as long as the loop.
+
+        Returns:
+            The client, or None if httpx is not installed
+
+        Raises:
+            RuntimeError: If called outside a running event loop
+        """
+        loop = asyncio.get_running_loop()
+        if not HTTPX_AVAILABLE:
+            return None
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                transport = _CountingAsyncTransport(self.stats, **self._httpx_transport_options())
+                client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+                self._async_clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the async client of the running event loop, if it has one."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def _httpx_transport_options(self) -> Dict[str, Any]:
+        """Keyword arguments of the httpx transports: HTTP/2 and keep-alive limits."""
+        if self.http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1.")
+        limits = httpx.Limits(max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0,
+                              keepalive_expiry=self.keepalive_expiry)
+        return {"http2": self.http2 and HTTP2_AVAILABLE, "limits": limits}
+
+    def close(self):
+        """Close every pooled connection of the sync clients; the pool can still be used afterwards."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            client, self._httpx_client = self._httpx_client, None
+        for session in sessions:
+            session.close()
+        if client is not None:
+            client.close()
+
+
+_shared_pool: Optional[HttpClientPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClientPool:
+    """
+    Get the process-wide HttpClientPool, creating it from Config on first use.
+
+    Returns:
+        The shared HttpClientPool
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = HttpClientPool()
+        return _shared_pool
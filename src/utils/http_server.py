@@ -0,0 +1,228 @@
+"""
+Minimal asyncio HTTP/1.1 server primitives (keep-alive, JSON and streamed responses) with no
+dependencies beyond the standard library. Used by the job service and the benchmark stand-in servers.
+"""
+
+import json
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK", 201: "Created", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 429: "Too Many Requests", 500: "Internal Server Error"
+}
+
+
+class HttpError(Exception):
+    """Error answered with the given status code and a JSON error body."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class HttpRequest:
+    """A parsed HTTP request."""
+    method: str
+    path: str
+    headers: Dict[str, str]
+    body: bytes = b""
+    query: Dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> Any:
+        """Decode the body as JSON; an empty body decodes to an empty object."""
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise HttpError(400, "Request body is not valid JSON")
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[HttpRequest]:
+    """
+    Read one request from a connection.
+
+    Args:
+        reader: Stream of the connection
+
+    Returns:
+        The request, or None when the client closed the connection
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+    url = urlsplit(target)
+    return HttpRequest(method.upper(), url.path, headers, body, dict(parse_qsl(url.query)))
+
+
+def response_head(status: int, headers: Dict[str, str]) -> bytes:
+    """Status line and headers of a response."""
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_response(writer: asyncio.StreamWriter, status: int, body: Any,
+                        headers: Optional[Dict[str, str]] = None, content_type: str = "application/json"):
+    """
+    Write a complete response with a Content-Length body.
+
+    Args:
+        writer: Stream of the connection
+        status: HTTP status code
+        body: Raw bytes, or any JSON serialisable value
+        headers: Extra response headers
+        content_type: Content type of raw byte bodies (JSON bodies are always application/json)
+    """
+    if isinstance(body, bytes):
+        data = body
+    else:
+        data = json.dumps(body).encode("utf-8")
+        content_type = "application/json"
+    all_headers = {"Content-Type": content_type, "Content-Length": str(len(data))}
+    all_headers.update(headers or {})
+    writer.write(response_head(status, all_headers) + data)
+    await writer.drain()
+
+
+async def send_chunk(writer: asyncio.StreamWriter, chunk: bytes):
+    """Write one chunk of a Transfer-Encoding: chunked body; an empty chunk ends the body."""
+    writer.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+    await writer.drain()
+
+
+class AsyncHttpServer:
+    """
+    Base class of a keep-alive HTTP/1.1 server on asyncio.
+
+    Subclasses implement handle(). The server can run on the caller's event loop (start()/stop())
+    or on its own loop in a daemon thread (start_in_thread()/stop_thread(), also used by the
+    context manager protocol).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the AsyncHttpServer.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        """
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Root URL of the server."""
+        return f"http://{self.host}:{self.port}"
+
+    async def handle(self, request: HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        """
+        Answer one request.
+
+        Args:
+            request: The parsed request
+            writer: Stream of the connection
+
+        Returns:
+            False if the connection must be closed afterwards
+        """
+        raise NotImplementedError
+
+    async def start(self):
+        """Start listening on the current event loop."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"{type(self).__name__} listening on {self.base_url}")
+
+    async def stop(self):
+        """Stop listening and close the open keep-alive connections."""
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    def start_in_thread(self) -> "AsyncHttpServer":
+        """
+        Run the server on its own event loop in a daemon thread.
+
+        Returns:
+            The started server
+        """
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.start())
+        self._thread = threading.Thread(target=self._loop.run_forever, name=f"{type(self).__name__}-loop", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop_thread(self):
+        """Stop a server started with start_in_thread()."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start_in_thread()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop_thread()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection until either side closes it."""
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                try:
+                    keep_open = await self.handle(request, writer)
+                except HttpError as e:
+                    await send_response(writer, e.status, {"error": e.message})
+                    keep_open = True
+                except (ConnectionError, asyncio.CancelledError):
+                    raise
+                except Exception as e:
+                    logger.exception(f"Error handling {request.method} {request.path}")
+                    await send_response(writer, 500, {"error": str(e)})
+                    keep_open = True
+                if not keep_open or request.headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            if not writer.is_closing():
+                writer.close()
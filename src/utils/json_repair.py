@@ -0,0 +1,143 @@
+"""
+Local repair of almost-valid JSON produced by LLMs.
+"""
+
+import re
+import json
+from typing import List
+
+_FENCE = re.compile(r"```[a-zA-Z]*[ \t]*\n?")
+_WHITESPACE = " \t\r\n"
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove Markdown code fences (```json ... ```) around or inside the text."""
+    return _FENCE.sub("", text)
+
+
+def extract_json(text: str) -> str:
+    """Drop any text before the JSON document (its first "{" or "["); text after it is ignored by repair_json."""
+    starts = [index for index in (text.find("{"), text.find("[")) if index >= 0]
+    return text[min(starts):] if starts else text.strip()
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair common defects of LLM JSON output.
+
+    Strips code fences and surrounding prose, removes trailing commas, inserts missing commas
+    between values and closes a truncated document (open string, dangling key or comma, unclosed
+    brackets). Valid JSON comes back unchanged apart from the surrounding text.
+
+    Args:
+        text: Raw LLM completion
+
+    Returns:
+        The repaired JSON text; it may still be invalid if the defects are of another kind
+    """
+    text = extract_json(strip_code_fences(text))
+    out: List[str] = []
+    # Per open container: "{" or "[" and what it expects next: "key", "colon", "value" or "next"
+    stack: List[List[str]] = []
+    in_string = False
+    escaped = False
+    literal_start = None
+
+    def value_done():
+        if stack:
+            frame = stack[-1]
+            frame[1] = "colon" if frame[0] == "{" and frame[1] == "key" else "next"
+
+    def last_significant() -> str:
+        for char in reversed(out):
+            if char not in _WHITESPACE:
+                return char
+        return ""
+
+    def drop_trailing_comma():
+        for index in range(len(out) - 1, -1, -1):
+            if out[index] in _WHITESPACE:
+                continue
+            if out[index] == ",":
+                del out[index]
+            return
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                value_done()
+            continue
+
+        if literal_start is not None:
+            if char not in ",}]:" + _WHITESPACE + '"{[':
+                out.append(char)
+                continue
+            literal_start = None
+            value_done()
+
+        if char in _WHITESPACE:
+            out.append(char)
+            continue
+        if stack and stack[-1][1] == "next" and char not in ",}]:":
+            # Two values without a comma between them
+            out.append(",")
+            stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            out.append(char)
+            stack.append([char, "key" if char == "{" else "value"])
+        elif char in "}]":
+            if not stack:
+                break
+            drop_trailing_comma()
+            if stack[-1][0] == "{" and stack[-1][1] in ("colon", "value"):
+                out.append(": null" if stack[-1][1] == "colon" else " null")
+            out.append("}" if stack.pop()[0] == "{" else "]")
+            value_done()
+            if not stack:
+                break
+        elif char == ":":
+            out.append(char)
+            if stack and stack[-1][1] == "colon":
+                stack[-1][1] = "value"
+        elif char == ",":
+            out.append(char)
+            if stack:
+                stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+        else:
+            literal_start = len(out)
+            out.append(char)
+
+    # Close a truncated document
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+        value_done()
+    elif literal_start is not None:
+        literal = "".join(out[literal_start:])
+        try:
+            json.loads(literal)
+            value_done()
+        except ValueError:
+            del out[literal_start:]
+    while stack:
+        frame = stack.pop()
+        if last_significant() == ",":
+            drop_trailing_comma()
+        if frame[0] == "{" and frame[1] == "colon":
+            out.append(": null")
+        elif frame[0] == "{" and frame[1] == "value":
+            out.append(" null")
+        out.append("}" if frame[0] == "{" else "]")
+        value_done()
+    return "".join(out)
@@ -0,0 +1,152 @@
+"""
+Incremental JSON parsing of streamed LLM output.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple, Union
+
+PathElement = Union[str, int]
+
+_WHITESPACE = " \t\r\n"
+_LITERAL_END = ",}]" + _WHITESPACE
+
+
+class _Frame:
+    """An open object or array and the member currently being read."""
+
+    __slots__ = ("is_object", "key", "expect_key", "value_start")
+
+    def __init__(self, is_object: bool):
+        self.is_object = is_object
+        self.key: Optional[PathElement] = None if is_object else 0
+        self.expect_key = is_object
+        self.value_start: Optional[int] = None
+
+
+class IncrementalJsonParser:
+    """
+    Parses a JSON document fed in arbitrary chunks and reports values as soon as they are complete.
+
+    Text before the first "{" or "[" (such as a Markdown code fence) and after the end of the
+    document is ignored. Only values whose path is at most max_depth deep are decoded, each exactly
+    once, so feeding a document costs a single pass over its characters. With the default depth of
+    2, {"style": "ink", "scenes": [{...}, {...}]} reports ("style",), ("scenes", 0), ("scenes", 1)
+    and finally ("scenes",).
+    """
+
+    def __init__(self, max_depth: int = 2):
+        """
+        Initialize the IncrementalJsonParser.
+
+        Args:
+            max_depth: Deepest path whose values are reported
+        """
+        self.max_depth = max_depth
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._literal_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """The document text received so far, starting at its opening bracket."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Tuple[Tuple[PathElement, ...], Any]]:
+        """
+        Consume the next chunk of the document.
+
+        Args:
+            chunk: Next piece of the streamed text
+
+        Returns:
+            (path, value) pairs of the values completed by this chunk, in document order
+
+        Raises:
+            ValueError: If the text is not valid JSON
+        """
+        if self.done:
+            return []
+        if not self._stack and not self._buffer:
+            starts = [index for index in (chunk.find("{"), chunk.find("[")) if index >= 0]
+            if not starts:
+                return []
+            chunk = chunk[min(starts):]
+        self._buffer += chunk
+
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and not self.done:
+            char = buffer[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    frame = self._stack[-1]
+                    if frame.is_object and frame.expect_key:
+                        frame.key = json.loads(buffer[self._string_start:pos + 1])
+                        frame.expect_key = False
+                    else:
+                        self._complete(pos + 1, completed)
+                pos += 1
+                continue
+
+            if self._literal_start is not None:
+                if char not in _LITERAL_END:
+                    pos += 1
+                    continue
+                self._complete(pos, completed)
+                self._literal_start = None
+
+            if char in _WHITESPACE or char == ":":
+                pass
+            elif char == '"':
+                self._in_string = True
+                self._string_start = pos
+                if self._stack and not (self._stack[-1].is_object and self._stack[-1].expect_key):
+                    self._stack[-1].value_start = pos
+            elif char in "{[":
+                if self._stack:
+                    self._stack[-1].value_start = pos
+                self._stack.append(_Frame(char == "{"))
+            elif char in "}]":
+                if not self._stack or self._stack[-1].is_object != (char == "}"):
+                    raise ValueError(f"Unexpected '{char}' at offset {pos}")
+                self._stack.pop()
+                if self._stack:
+                    self._complete(pos + 1, completed)
+                else:
+                    self.done = True
+            elif char == ",":
+                frame = self._stack[-1]
+                if frame.is_object:
+                    frame.expect_key = True
+                else:
+                    frame.key += 1
+            elif self._stack and not self._stack[-1].expect_key:
+                self._literal_start = pos
+                self._stack[-1].value_start = pos
+            else:
+                raise ValueError(f"Unexpected '{char}' at offset {pos}")
+            pos += 1
+
+        self._pos = pos
+        if self.done:
+            self._buffer = buffer[:pos]
+        return completed
+
+    def _complete(self, end: int, completed: List[Tuple[Tuple[PathElement, ...], Any]]):
+        """Report the value of the innermost open container's current member, ending before end."""
+        frame = self._stack[-1]
+        path = tuple(open_frame.key for open_frame in self._stack)
+        if len(path) <= self.max_depth:
+            completed.append((path, json.loads(self._buffer[frame.value_start:end])))
+        frame.value_start = None
@@ -0,0 +1,357 @@
+"""
+Lightweight span-based timing instrumentation for video creation runs.
+
+Code marks units of work with ``span()``; while a run is being profiled (``profile_run()``), every span
+is recorded with its wall time, scene, provider, bytes written and LLM tokens used. Listeners registered with
+``observe_spans()`` are notified when spans open and close (e.g. to report job progress). Outside a
+profiled or observed run spans cost almost nothing. The active profile and listeners are held in
+context variables, so work submitted to thread pools must be wrapped with ``propagate()`` to be
+attributed to the run.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FILENAME = "profile.json"
+
+
+class RunAborted(Exception):
+    """Raised by a span listener to stop the whole run rather than just the span's unit of work."""
+
+
+class Span:
+    """
+    A timed unit of work. Attributes can be updated while the span is open.
+
+    Bytes are recorded by the innermost span that writes a file, so they can be summed across spans.
+    """
+
+    __slots__ = ("name", "scene", "provider", "bytes_written", "input_tokens", "output_tokens", "error", "start", "duration", "parent")
+
+    def __init__(self, name: str, scene: Optional[int] = None, provider: Optional[str] = None,
+                 parent: Optional["Span"] = None):
+        self.name = name
+        self.scene = scene
+        self.provider = provider
+        self.bytes_written = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.error = False
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.parent = parent
+
+    def add_file(self, path: str):
+        """Count the size of a file written during the span."""
+        try:
+            self.bytes_written += os.path.getsize(path)
+        except OSError:
+            pass
+
+    def add_tokens(self, input_tokens: int, output_tokens: int):
+        """Count the prompt and completion tokens of an LLM call made during the span."""
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+
+class RunProfile:
+    """Thread-safe collection of the spans recorded during one run."""
+
+    def __init__(self, run_id: str):
+        """
+        Initialize the RunProfile.
+
+        Args:
+            run_id: Identifier of the profiled run
+        """
+        self.run_id = run_id
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        """Record a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the profile as a JSON serialisable dictionary.
+
+        Returns:
+            Dictionary with total wall time, per-stage and per-scene timings, bytes written,
+            LLM tokens, provider latencies and the raw spans
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        stages: Dict[str, Dict[str, float]] = {}
+        scenes: Dict[str, Dict[str, float]] = {}
+        providers: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            _accumulate(stages, span.name, span.duration, span.bytes_written)
+            if span.scene is not None:
+                scene = scenes.setdefault(str(span.scene), {})
+                scene[span.name] = round(scene.get(span.name, 0.0) + span.duration, 6)
+            if span.provider is not None:
+                _accumulate(providers, span.provider, span.duration, span.bytes_written)
+
+        return {
+            "run_id": self.run_id,
+            "total_seconds": round(self.duration, 6),
+            "stages": stages,
+            "scenes": scenes,
+            "providers": providers,
+            "bytes_written": sum(span.bytes_written for span in spans),
+            "tokens": {
+                "input": sum(span.input_tokens for span in spans),
+                "output": sum(span.output_tokens for span in spans)
+            },
+            "spans": [
+                {
+                    "name": span.name,
+                    "parent": span.parent.name if span.parent is not None else None,
+                    "scene": span.scene,
+                    "provider": span.provider,
+                    "start_seconds": round(span.start - self.start, 6),
+                    "duration_seconds": round(span.duration, 6),
+                    "bytes_written": span.bytes_written,
+                    "input_tokens": span.input_tokens,
+                    "output_tokens": span.output_tokens,
+                    "error": span.error
+                }
+                for span in sorted(spans, key=lambda span: span.start)
+            ]
+        }
+
+    def save(self, path: str):
+        """Write the profile to a JSON file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def _accumulate(table: Dict[str, Dict[str, float]], key: str, duration: float, bytes_written: int):
+    """Add one observation to a count/total/max table."""
+    entry = table.setdefault(key, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "bytes_written": 0})
+    entry["count"] += 1
+    entry["total_seconds"] = round(entry["total_seconds"] + duration, 6)
+    entry["max_seconds"] = round(max(entry["max_seconds"], duration), 6)
+    entry["bytes_written"] += bytes_written
+
+
+_current_profile: contextvars.ContextVar[Optional[RunProfile]] = contextvars.ContextVar("shortfactory_profile", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("shortfactory_span", default=None)
+_span_listeners: contextvars.ContextVar[tuple] = contextvars.ContextVar("shortfactory_span_listeners", default=())
+
+
+@contextmanager
+def profile_run(run_id: str) -> Iterator[RunProfile]:
+    """
+    Profile every span opened in the current context until the block exits.
+
+    Args:
+        run_id: Identifier of the run
+
+    Yields:
+        The RunProfile being recorded
+    """
+    profile = RunProfile(run_id)
+    profile_token = _current_profile.set(profile)
+    span_token = _current_span.set(None)
+    try:
+        yield profile
+    finally:
+        profile.duration = time.perf_counter() - profile.start
+        _current_span.reset(span_token)
+        _current_profile.reset(profile_token)
+
+
+@contextmanager
+def span(name: str, scene: Optional[int] = None, provider: Optional[str] = None) -> Iterator[Span]:
+    """
+    Time a unit of work.
+
+    Args:
+        name: Stage or operation name, e.g. "narration" or "tts_request"
+        scene: Scene number; inherited from the enclosing span when omitted
+        provider: Provider whose latency the span measures, if any
+
+    Yields:
+        The open Span, so callers can record bytes written
+    """
+    parent = _current_span.get()
+    if scene is None and parent is not None:
+        scene = parent.scene
+    current = Span(name, scene=scene, provider=provider, parent=parent)
+    profile = _current_profile.get()
+    listeners = _span_listeners.get()
+    if profile is None and not listeners:
+        yield current
+        return
+
+    # A listener may raise here to stop the work before it starts (e.g. a cancelled job)
+    for listener in listeners:
+        listener("start", current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException:
+        current.error = True
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        _current_span.reset(token)
+        if profile is not None:
+            profile.add(current)
+        for listener in listeners:
+            try:
+                listener("end", current)
+            except Exception as e:
+                logger.warning(f"Span listener failed on end of {name}: {e}")
+
+
+@contextmanager
+def observe_spans(listener: Callable[[str, Span], None]) -> Iterator[None]:
+    """
+    Notify a listener of every span opened in the current context until the block exits.
+
+    Args:
+        listener: Called as listener("start", span) before the span's work runs and
+            listener("end", span) after it finished. Raising from "start" aborts the span's work
+            (raise RunAborted to stop the whole run); exceptions raised on "end" are logged and ignored.
+    """
+    token = _span_listeners.set(_span_listeners.get() + (listener,))
+    try:
+        yield
+    finally:
+        _span_listeners.reset(token)
+
+
+def propagate(func: Callable) -> Callable:
+    """
+    Wrap a callable so it runs in a copy of the caller's context, keeping the active profile and span.
+
+    Args:
+        func: Callable to run in another thread (e.g. submitted to a ThreadPoolExecutor)
+
+    Returns:
+        Wrapped callable; every call runs in its own copy of the captured context
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return run
+
+
+def detached(events: Iterator[Any]) -> Iterator[Any]:
+    """
+    Hand out the items of a generator in the consumer's span rather than in the spans the generator holds open.
+
+    A generator runs in its consumer's context, so a span it keeps open across a yield stays the current
+    span while it is suspended, and work the consumer starts in between would be nested under it. Each
+    item is yielded with the span that was current when iteration started; the generator's own spans
+    are current again whenever it resumes. Closing the wrapper closes the generator.
+
+    Args:
+        events: Generator (or other iterator) to consume
+
+    Yields:
+        The items of events
+    """
+    outer = _current_span.get()
+    try:
+        for item in events:
+            token = _current_span.set(outer)
+            try:
+                yield item
+            finally:
+                _current_span.reset(token)
+    finally:
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
+
+
+def summarize_profiles(profiles: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate exported run profiles into per-stage and per-provider statistics.
+
+    Args:
+        profiles: Dictionaries produced by RunProfile.to_dict()
+
+    Returns:
+        Summary with the number of runs and count/mean/p50/p95/max seconds per run total,
+        stage and provider
+    """
+    totals: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    providers: Dict[str, List[float]] = {}
+    for profile in profiles:
+        totals.append(profile["total_seconds"])
+        for span in profile.get("spans", []):
+            stages.setdefault(span["name"], []).append(span["duration_seconds"])
+            if span.get("provider"):
+                providers.setdefault(span["provider"], []).append(span["duration_seconds"])
+
+    return {
+        "runs": len(totals),
+        "total_seconds": _distribution(totals),
+        "stages": {name: _distribution(values) for name, values in sorted(stages.items())},
+        "providers": {name: _distribution(values) for name, values in sorted(providers.items())}
+    }
+
+
+def load_profiles(runs_dir: str) -> List[Dict[str, Any]]:
+    """
+    Load the profiles saved in the workspaces of a runs directory.
+
+    Args:
+        runs_dir: Directory holding one workspace per run
+
+    Returns:
+        List of profile dictionaries; unreadable files are skipped
+    """
+    profiles = []
+    if not os.path.isdir(runs_dir):
+        return profiles
+    for entry in sorted(os.scandir(runs_dir), key=lambda entry: entry.name):
+        path = os.path.join(entry.path, PROFILE_FILENAME)
+        if not entry.is_dir() or not os.path.isfile(path):
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable profile {path}: {e}")
+    return profiles
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    """Count, mean, median, 95th percentile and maximum of a list of durations."""
+    if not values:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 6),
+        "p50": round(percentile(0.5), 6),
+        "p95": round(percentile(0.95), 6),
+        "max": round(ordered[-1], 6)
+    }
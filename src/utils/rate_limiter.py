@@ -0,0 +1,331 @@
+"""
+Adaptive rate limiting shared by the provider clients.
+
+Every (provider, API key) pair gets one AdaptiveRateLimiter for the whole process, so all factories,
+batch workers and asyncio tasks using the same key draw from the same budget.
+"""
+
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for a single wait, so waiters re-check state after releases from other event loops
+MAX_WAIT_SECONDS = 0.25
+
+
+class ThrottledError(Exception):
+    """Raised by a provider call that was rejected with a rate-limit (HTTP 429) response."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+
+    Returns:
+        Delay in seconds, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def as_throttled_error(error: Exception) -> Optional[ThrottledError]:
+    """
+    Translate a provider SDK exception into a ThrottledError if it signals rate limiting.
+
+    Recognises exceptions exposing an HTTP status of 429 as ``status_code`` (OpenAI) or ``code``
+    (google.api_core), taking the delay from the Retry-After header of an attached response.
+
+    Args:
+        error: Exception raised by a provider call
+
+    Returns:
+        ThrottledError for rate-limit errors, None for anything else
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    try:
+        if int(status) != 429:
+            return None
+    except (TypeError, ValueError):
+        return None
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    return ThrottledError(str(error), retry_after=parse_retry_after(headers.get("retry-after")))
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket combined with an AIMD (additive increase, multiplicative decrease) concurrency limit.
+
+    The bucket caps the request rate; the concurrency limit caps requests in flight. Each successful
+    request raises the limit by ``increase_step / limit`` (about one slot per round of requests), while
+    a throttled request multiplies it by ``decrease_factor``. Only one decrease is applied per round:
+    throttles reported by requests that started before the last decrease are ignored, so a burst of 429s
+    from the same overload does not collapse the limit to its minimum. A Retry-After delay pauses every
+    caller of the limiter, not only the one that was throttled, which avoids a thundering herd of retries.
+
+    The limiter can be used from threads (slot, call) and asyncio tasks (async_slot, acall) at once.
+    """
+
+    def __init__(self,
+                 name: str,
+                 requests_per_second: float,
+                 max_concurrency: int,
+                 burst: Optional[float] = None,
+                 min_concurrency: int = 1,
+                 initial_concurrency: Optional[float] = None,
+                 increase_step: float = 1.0,
+                 decrease_factor: float = 0.5,
+                 max_retries: int = 4,
+                 base_backoff: float = 1.0):
+        """
+        Initialize the AdaptiveRateLimiter.
+
+        Args:
+            name: Name used in log messages
+            requests_per_second: Sustained request rate of the token bucket
+            max_concurrency: Upper bound of the adaptive concurrency limit
+            burst: Bucket capacity (defaults to max_concurrency)
+            min_concurrency: Lower bound of the adaptive concurrency limit
+            initial_concurrency: Starting concurrency limit (defaults to max_concurrency)
+            increase_step: Additive increase per round of successful requests
+            decrease_factor: Multiplicative decrease applied on throttling
+            max_retries: Retries of a throttled request in call()/acall()
+            base_backoff: Base delay of the exponential backoff when no Retry-After is given
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive.")
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("Concurrency bounds must satisfy 1 <= min_concurrency <= max_concurrency.")
+
+        self.name = name
+        self.rate = requests_per_second
+        self.burst = burst if burst is not None else float(max_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.limit = float(initial_concurrency if initial_concurrency is not None else max_concurrency)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+
+        self.in_flight = 0
+        self.throttled = 0
+        self.succeeded = 0
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._next_ticket = 0
+        self._decreased_at_ticket = -1
+        self._condition = threading.Condition()
+
+    def _try_acquire_locked(self) -> Tuple[Optional[int], float]:
+        """Take a slot and a token if possible; otherwise return how long to wait before trying again."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+        if now < self._blocked_until:
+            return None, self._blocked_until - now
+        if self.in_flight >= int(self.limit):
+            return None, MAX_WAIT_SECONDS
+        if self._tokens < 1:
+            return None, (1 - self._tokens) / self.rate
+
+        self._tokens -= 1
+        self.in_flight += 1
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        return ticket, 0.0
+
+    def acquire(self) -> int:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            Ticket to pass to release()
+        """
+        with self._condition:
+            while True:
+                ticket, wait = self._try_acquire_locked()
+                if ticket is not None:
+                    return ticket
+                self._condition.wait(min(wait, MAX_WAIT_SECONDS))
+
+    async def acquire_async(self) -> int:
+        """
+        Wait without blocking the event loop until a request may be sent.
+
+        Returns:
+            Ticket to pass to release()
+        """
+        while True:
+            with self._condition:
+                ticket, wait = self._try_acquire_locked()
+            if ticket is not None:
+                return ticket
+            await asyncio.sleep(min(wait, MAX_WAIT_SECONDS))
+
+    def release(self, ticket: int, throttled: bool = False, retry_after: Optional[float] = None,
+                failed: bool = False):
+        """
+        Return a slot and feed the outcome of the request into the concurrency controller.
+
+        Args:
+            ticket: Ticket returned by acquire()
+            throttled: Whether the provider rejected the request for rate limiting
+            retry_after: Delay requested by the provider, if any
+            failed: Whether the request failed for another reason (leaves the limit unchanged)
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if ticket > self._decreased_at_ticket:
+                    self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+                    self._decreased_at_ticket = self._next_ticket - 1
+                    logger.warning(f"Rate limiter '{self.name}' throttled; concurrency limit reduced to {int(self.limit)}")
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            elif not failed:
+                self.succeeded += 1
+                self.limit = min(float(self.max_concurrency), self.limit + self.increase_step / self.limit)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a slot for the duration of a request. A ThrottledError raised inside the block
+        reduces the concurrency limit; any other exception leaves it unchanged.
+        """
+        ticket = self.acquire()
+        try:
+            yield
+        except ThrottledError as e:
+            self.release(ticket, throttled=True, retry_after=e.retry_after)
+            raise
+        except BaseException:
+            self.release(ticket, failed=True)
+            raise
+        else:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """Asyncio variant of slot()."""
+        ticket = await self.acquire_async()
+        try:
+            yield
+        except ThrottledError as e:
+            self.release(ticket, throttled=True, retry_after=e.retry_after)
+            raise
+        except BaseException:
+            self.release(ticket, failed=True)
+            raise
+        else:
+            self.release(ticket)
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call a function inside a slot, retrying it while it raises ThrottledError.
+
+        Args:
+            func: Function performing one provider request; must raise ThrottledError on HTTP 429
+            args: Positional arguments for func
+            kwargs: Keyword arguments for func
+
+        Returns:
+            The function's return value
+
+        Raises:
+            ThrottledError: If the request is still throttled after max_retries retries
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.slot():
+                    return func(*args, **kwargs)
+            except ThrottledError as e:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt, e.retry_after))
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Asyncio variant of call() for coroutine functions."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.async_slot():
+                    return await func(*args, **kwargs)
+            except ThrottledError as e:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e.retry_after))
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Delay before a retry: the provider's Retry-After, else exponential backoff with full jitter."""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, self.base_backoff * (2 ** attempt))
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Current limit, requests in flight and outcome counters."""
+        with self._condition:
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "succeeded": self.succeeded,
+                "throttled": self.throttled
+            }
+
+
+_registry: Dict[Tuple[str, str], AdaptiveRateLimiter] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, api_key: Optional[str] = None) -> AdaptiveRateLimiter:
+    """
+    Get the process-wide limiter of a provider and API key, creating it from Config on first use.
+
+    Args:
+        provider: Provider name, e.g. "elevenlabs", "openai_dalle" or "google_vertex_ai_image"
+        api_key: API key (or other credential identifier) the quota belongs to; only a hash is kept
+
+    Returns:
+        The shared AdaptiveRateLimiter
+    """
+    key_hash = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+    with _registry_lock:
+        limiter = _registry.get((provider, key_hash))
+        if limiter is None:
+            requests_per_second, max_concurrency = Config.RATE_LIMITS.get(provider, Config.DEFAULT_RATE_LIMIT)
+            limiter = AdaptiveRateLimiter(
+                f"{provider}:{key_hash}",
+                requests_per_second=requests_per_second,
+                max_concurrency=max_concurrency,
+                max_retries=Config.RATE_LIMIT_MAX_RETRIES
+            )
+            _registry[(provider, key_hash)] = limiter
+        return limiter
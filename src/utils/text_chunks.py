@@ -0,0 +1,67 @@
+"""
+Splitting of long narration texts into chunks at sentence boundaries.
+"""
+
+import re
+from typing import List
+
+# Whitespace after a sentence end, which may be followed by a closing quote or bracket
+_SENTENCE_BREAK = re.compile(r"(?:(?<=[.!?…])|(?<=[.!?…][\"'”’)\]]))\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a text into its sentences, without the whitespace between them."""
+    return [sentence for sentence in _SENTENCE_BREAK.split(text.strip()) if sentence]
+
+
+def _split_long_sentence(sentence: str, max_chars: int) -> List[str]:
+    """Split a sentence longer than max_chars between words (and inside words longer than max_chars)."""
+    pieces: List[str] = []
+    current = ""
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split a text into chunks of at most max_chars characters, ending at sentence boundaries.
+
+    Consecutive sentences are packed into a chunk as long as they fit. Only a sentence that is longer
+    than max_chars on its own is split, between words.
+
+    Args:
+        text: Text to split
+        max_chars: Maximum length of a chunk (0 or less returns the stripped text as a single chunk)
+
+    Returns:
+        The chunks, in order; joined with single spaces they give back the text up to whitespace
+    """
+    text = text.strip()
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks: List[str] = []
+    current = ""
+    for sentence in split_sentences(text):
+        for piece in _split_long_sentence(sentence, max_chars) if len(sentence) > max_chars else [sentence]:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,177 @@
+"""
+Tests for audio duration measurement.
+"""
+
+import os
+import wave
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.generators.narration_generator import NarrationGenerator
+from src.models.schemas import GenerationResult
+from src.utils.audio import (
+    AudioDurationError, audio_duration, concatenate_mp3, mp3_duration, parse_frame_header, split_mp3
+)
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, mono: 417 bytes and 1152 samples per frame
+MPEG1_HEADER = b"\xff\xfb\x90\xc0"
+MPEG1_FRAME_SECONDS = 1152 / 44100
+# MPEG-2 Layer III, 64 kbit/s, 22.05 kHz, stereo: 208 bytes and 576 samples per frame
+MPEG2_HEADER = b"\xff\xf3\x80\x00"
+MPEG2_FRAME_SECONDS = 576 / 22050
+
+
+def frames(header: bytes, count: int, payload: bytes = b"") -> bytes:
+    """Build count frames with the given header, the first one starting with payload."""
+    length = parse_frame_header(header, 0).length
+    first = header + payload + bytes(length - len(header) - len(payload))
+    return first + (header + bytes(length - len(header))) * (count - 1)
+
+
+class TestMp3Duration(unittest.TestCase):
+    """Test suite for header based MP3 duration measurement."""
+
+    def test_frame_headers(self):
+        """Test that the frame length and sample count follow from the header fields."""
+        mpeg1 = parse_frame_header(MPEG1_HEADER, 0)
+        mpeg2 = parse_frame_header(MPEG2_HEADER, 0)
+
+        self.assertEqual((mpeg1.length, mpeg1.samples, mpeg1.mono), (417, 1152, True))
+        self.assertEqual((mpeg2.length, mpeg2.samples, mpeg2.mono), (208, 576, False))
+        self.assertIsNone(parse_frame_header(b"\xff\xfb\xf0\xc0", 0))  # bitrate index 15
+
+    def test_frames_are_counted_without_vbr_header(self):
+        """Test that the frames of a stream without Xing/VBRI header are walked and added up."""
+        self.assertAlmostEqual(mp3_duration(frames(MPEG1_HEADER, 100)), 100 * MPEG1_FRAME_SECONDS)
+        self.assertAlmostEqual(mp3_duration(frames(MPEG2_HEADER, 40)), 40 * MPEG2_FRAME_SECONDS)
+
+    def test_tags_and_junk_are_skipped(self):
+        """Test that ID3v2 tags, junk before the first frame and a trailing ID3v1 tag are not audio."""
+        id3v2 = b"ID3\x04\x00\x00\x00\x00\x01\x00" + b"\xff" * 128
+        id3v1 = b"TAG" + bytes(125)
+        data = id3v2 + b"\x00\xff\xfb junk" + frames(MPEG1_HEADER, 10) + id3v1
+
+        self.assertAlmostEqual(mp3_duration(data), 10 * MPEG1_FRAME_SECONDS)
+
+    def test_vbr_headers_give_the_frame_count(self):
+        """Test that Xing/Info and VBRI frame counts are used instead of walking the stream."""
+        # Mono MPEG-1: the Xing header follows 17 bytes of side information
+        xing = bytes(17) + b"Xing" + (1).to_bytes(4, "big") + (500).to_bytes(4, "big")
+        vbri = bytes(32) + b"VBRI" + bytes(10) + (250).to_bytes(4, "big")
+
+        self.assertAlmostEqual(mp3_duration(frames(MPEG1_HEADER, 3, xing)), 500 * MPEG1_FRAME_SECONDS)
+        self.assertAlmostEqual(mp3_duration(frames(MPEG1_HEADER, 3, vbri)), 250 * MPEG1_FRAME_SECONDS)
+
+    def test_header_frame_without_frame_count_is_not_audio(self):
+        """Test that an Info header frame without the frames flag is left out of the walked duration."""
+        info = bytes(17) + b"Info" + (0).to_bytes(4, "big")
+        data = frames(MPEG1_HEADER, 1, info) + frames(MPEG1_HEADER, 10)
+
+        self.assertAlmostEqual(mp3_duration(data), 10 * MPEG1_FRAME_SECONDS)
+        segments = split_mp3(data, [5 * MPEG1_FRAME_SECONDS])
+        self.assertEqual([len(segment) // 417 for segment, _ in segments], [5, 5])
+        joined, seconds = concatenate_mp3([data, frames(MPEG1_HEADER, 2)])
+        self.assertEqual(joined, frames(MPEG1_HEADER, 12))
+        self.assertAlmostEqual(seconds, 12 * MPEG1_FRAME_SECONDS)
+
+    def test_split_at_nearest_frame_boundaries(self):
+        """Test that cuts snap to the closest frame boundary and drop the Xing header frame."""
+        xing = bytes(17) + b"Info" + (1).to_bytes(4, "big") + (10).to_bytes(4, "big")
+        data = frames(MPEG1_HEADER, 1, xing) + frames(MPEG1_HEADER, 10)
+
+        segments = split_mp3(data, [2.4 * MPEG1_FRAME_SECONDS, 7.6 * MPEG1_FRAME_SECONDS])
+
+        self.assertEqual([len(segment) // 417 for segment, _ in segments], [2, 6, 2])
+        for segment, seconds in segments:
+            self.assertTrue(segment.startswith(MPEG1_HEADER))
+            self.assertAlmostEqual(mp3_duration(segment), seconds)
+        with self.assertRaises(AudioDurationError):
+            split_mp3(data, [0.0])
+
+    def test_concatenate_keeps_every_frame(self):
+        """Test that joined streams keep all audio frames and drop the tags and header frames of the parts."""
+        xing = bytes(17) + b"Xing" + (1).to_bytes(4, "big") + (4).to_bytes(4, "big")
+        tagged = b"ID3\x04\x00\x00\x00\x00\x00\x10" + bytes(16) + frames(MPEG1_HEADER, 1, xing) + frames(MPEG1_HEADER, 4)
+
+        data, seconds = concatenate_mp3([frames(MPEG1_HEADER, 3), tagged])
+
+        self.assertEqual(data, frames(MPEG1_HEADER, 7))
+        self.assertAlmostEqual(seconds, 7 * MPEG1_FRAME_SECONDS)
+        self.assertAlmostEqual(mp3_duration(data), seconds)
+
+    def test_data_without_frames(self):
+        """Test that data without MPEG audio frames has no header duration."""
+        self.assertIsNone(mp3_duration(b"not audio \xff\xfb at all"))
+
+
+class TestAudioDuration(unittest.TestCase):
+    """Test suite for audio_duration and its decoder fallback."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, name: str, data: bytes) -> str:
+        """Write a file to the temporary directory."""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    @patch("src.utils.audio.decoded_duration")
+    def test_headers_avoid_the_decoder(self, mock_decode):
+        """Test that MP3 and WAV durations are read from their headers."""
+        mp3_path = self.write("a.mp3", frames(MPEG1_HEADER, 50))
+        wav_path = os.path.join(self.temp_dir, "a.wav")
+        with wave.open(wav_path, "wb") as audio:
+            audio.setnchannels(1)
+            audio.setsampwidth(2)
+            audio.setframerate(16000)
+            audio.writeframes(bytes(2 * 24000))
+
+        self.assertAlmostEqual(audio_duration(mp3_path), 50 * MPEG1_FRAME_SECONDS)
+        self.assertAlmostEqual(audio_duration(wav_path), 1.5)
+        mock_decode.assert_not_called()
+
+    @patch("src.utils.audio.decoded_duration", return_value=3.25)
+    def test_decoder_fallback_without_headers(self, mock_decode):
+        """Test that files without usable headers are decoded."""
+        path = self.write("a.ogg", b"OggS" + bytes(64))
+
+        self.assertEqual(audio_duration(path), 3.25)
+        mock_decode.assert_called_once_with(path)
+
+    @patch("src.utils.audio.decoded_duration", return_value=0.0)
+    def test_unmeasurable_audio_raises(self, mock_decode):
+        """Test that empty, missing and silent-length files raise instead of reporting zero seconds."""
+        for path in (self.write("empty.mp3", b""), os.path.join(self.temp_dir, "missing.mp3"),
+                     self.write("zero.ogg", b"OggS")):
+            with self.assertRaises(AudioDurationError):
+                audio_duration(path)
+
+    @patch.dict(os.environ, {"ELEVEN_LABS_API_KEY": "test-key"})
+    @patch("src.utils.audio.decoded_duration", side_effect=AudioDurationError("cannot decode"))
+    def test_narration_fails_when_duration_is_unknown(self, mock_decode):
+        """Test that a narration whose duration cannot be measured fails instead of lasting zero seconds."""
+        generator = NarrationGenerator(provider="elevenlabs", audio_cache=None)
+        output_path = os.path.join(self.temp_dir, "scene.mp3")
+
+        def synthesize(text, path):
+            self.write("scene.mp3", b"garbage")
+            return GenerationResult(success=True, output_path=path)
+
+        with patch.object(generator, "_generate_elevenlabs_narration", side_effect=synthesize):
+            result = generator.generate_narration("Hello there.", output_path)
+
+        self.assertFalse(result.success)
+        self.assertIn("cannot decode", result.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
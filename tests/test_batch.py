@@ -0,0 +1,147 @@
+"""
+Tests for the batch job runner.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.core.batch import BatchRunner, iter_batch_rows
+from src.models.schemas import VideoCreationConfig
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test suite for the BatchRunner class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.results_path = os.path.join(self.temp_dir, "results.jsonl")
+        self.base_config = VideoCreationConfig(
+            story_subject="Default subject",
+            num_scenes=3,
+            tts_provider="elevenlabs",
+            elevenlabs_voice_id="test_voice",
+            image_provider="openai_dalle",
+            gcp_project_id="",
+            gcp_location="us-central1",
+            vertex_ai_imagen_model_id="imagegeneration@002",
+            image_transition_duration=0.0,
+            video_fps=24,
+            output_directories={"base": self.temp_dir}
+        )
+
+        patcher = patch("src.core.batch.ShortVideoFactory")
+        self.mock_factory_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def make_factory(llm, config):
+            factory = MagicMock()
+            factory.config = config
+            factory.create_video.side_effect = lambda subject, num_scenes, run_id: {
+                "success": subject != "fail",
+                "error": "" if subject != "fail" else "Story generation failed: boom",
+                "steps_completed": ["story", "narration", "visuals", "video"] if subject != "fail" else [],
+                "video": {"video_path": os.path.join(self.temp_dir, f"final_video_{run_id}.mp4")},
+                "run_id": run_id
+            }
+            return factory
+        self.mock_factory_class.side_effect = make_factory
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_file(self, name, content):
+        """Write a jobs file into the temp directory."""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def read_results(self):
+        """Read result records keyed by job id."""
+        with open(self.results_path) as f:
+            return {record["job_id"]: record for record in map(json.loads, f)}
+
+    def test_run_jsonl(self):
+        """Test running jobs from a JSONL file with per-row overrides."""
+        jobs_path = self.write_file("jobs.jsonl", "\n".join([
+            json.dumps({"job_id": "a", "subject": "A cat", "num_scenes": 2}),
+            json.dumps({"subject": "A dog", "tts_provider": "google_cloud_tts"}),
+            json.dumps({"job_id": "c", "subject": "fail"}),
+        ]))
+
+        summary = BatchRunner(MagicMock, self.base_config, workers=2).run(jobs_path, self.results_path)
+
+        self.assertEqual(summary, {"total": 3, "succeeded": 2, "failed": 1})
+        results = self.read_results()
+        self.assertEqual(set(results), {"a", "job_2", "c"})
+        self.assertTrue(results["a"]["success"])
+        self.assertTrue(results["a"]["run_id"].startswith("a-"))
+        self.assertIn(results["a"]["run_id"], results["a"]["video_path"])
+        self.assertNotEqual(results["a"]["run_id"], results["c"]["run_id"])
+        self.assertFalse(results["c"]["success"])
+        self.assertIn("Story generation failed", results["c"]["error"])
+
+        configs = [call.kwargs["config"] for call in self.mock_factory_class.call_args_list]
+        self.assertIn("google_cloud_tts", [config.tts_provider for config in configs])
+
+    def test_run_csv_with_invalid_rows(self):
+        """Test that invalid rows are reported in the results instead of aborting the batch."""
+        jobs_path = self.write_file("jobs.csv", "job_id,subject,num_scenes,image_provider\n"
+                                                "x,A fox,3,\n"
+                                                "y,,2,\n"
+                                                "z,An owl,1,not_a_provider\n")
+
+        summary = BatchRunner(MagicMock, self.base_config, workers=1).run(jobs_path, self.results_path)
+
+        self.assertEqual(summary, {"total": 3, "succeeded": 1, "failed": 2})
+        results = self.read_results()
+        self.assertTrue(results["x"]["success"])
+        self.assertIn("invalid job row", results["y"]["error"])
+        self.assertIn("Line 4", results["z"]["error"])
+        # Every record has the same fields, whether its row ran or not
+        self.assertEqual(set(results["y"]), set(results["x"]))
+        self.assertEqual(results["y"]["run_id"], "")
+
+    def test_factories_are_reused_per_worker(self):
+        """Test that a worker keeps its factory warm between jobs."""
+        jobs_path = self.write_file("jobs.jsonl", "\n".join(
+            json.dumps({"subject": f"Subject {i}"}) for i in range(10)
+        ))
+        llm_factory = MagicMock()
+
+        BatchRunner(llm_factory, self.base_config, workers=1).run(jobs_path, self.results_path)
+
+        self.assertEqual(self.mock_factory_class.call_count, 1)
+        self.assertEqual(llm_factory.call_count, 1)
+        self.assertEqual(len(self.read_results()), 10)
+
+    def test_iter_batch_rows_is_lazy(self):
+        """Test that rows are read one at a time."""
+        jobs_path = self.write_file("jobs.jsonl", "\n".join(
+            json.dumps({"subject": f"Subject {i}"}) for i in range(3)
+        ) + "\nnot json\n")
+
+        rows = iter_batch_rows(jobs_path)
+        self.assertEqual(next(rows), (1, {"subject": "Subject 0"}))
+        remaining = list(rows)
+        self.assertEqual(len(remaining), 3)
+        self.assertIn("_error", remaining[-1][1])
+
+    def test_unsupported_format(self):
+        """Test that an unknown file extension raises ValueError."""
+        jobs_path = self.write_file("jobs.txt", "A cat")
+
+        with self.assertRaises(ValueError):
+            list(iter_batch_rows(jobs_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
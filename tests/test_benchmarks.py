@@ -0,0 +1,209 @@
+"""
+Tests for the offline benchmark suite and its simulated providers.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+from PIL import Image
+
+from benchmarks.fakes import (
+    MP3_FRAME_BYTES, MP3_FRAME_HEADER, MP3_FRAME_SECONDS, FakeNarrationGenerator, LatencyModel,
+    silent_mp3_bytes, solid_png_bytes
+)
+from benchmarks.pipeline import BenchmarkCase, ProviderLatencies, compare_results, main, run_case
+from benchmarks.provider_server import FaultProfile, ProviderStubServer
+from src.generators.narration_generator import NarrationGenerator
+from src.generators.visual_generator import VisualGenerator
+
+
+class TestSimulatedProviders(unittest.TestCase):
+    """Test suite for the fake artifacts and latency models."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_silent_mp3_is_made_of_whole_frames(self):
+        """Test that the fake audio is a whole number of CBR frames of the requested length."""
+        data = silent_mp3_bytes(2.0)
+
+        self.assertEqual(len(data) % MP3_FRAME_BYTES, 0)
+        self.assertTrue(data.startswith(MP3_FRAME_HEADER))
+        self.assertAlmostEqual(len(data) // MP3_FRAME_BYTES * MP3_FRAME_SECONDS, 2.0, delta=MP3_FRAME_SECONDS)
+
+    def test_solid_png_is_a_valid_image(self):
+        """Test that the fake image can be decoded."""
+        path = os.path.join(self.temp_dir, "image.png")
+        with open(path, "wb") as f:
+            f.write(solid_png_bytes(16, 8, (255, 0, 0)))
+
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (16, 8))
+            self.assertEqual(image.getpixel((3, 3)), (255, 0, 0))
+
+    def test_latency_models(self):
+        """Test constant, seeded and failing latency models."""
+        self.assertEqual(LatencyModel("constant", 0.25).sample(), 0.25)
+
+        first = [LatencyModel("heavy_tailed", 0.1, seed=7).sample() for _ in range(3)]
+        second = [LatencyModel("heavy_tailed", 0.1, seed=7).sample() for _ in range(3)]
+        self.assertEqual(first, second)
+        self.assertTrue(all(value >= 0.1 for value in first))
+
+        self.assertFalse(LatencyModel(error_rate=1.0).wait())
+        self.assertTrue(LatencyModel(error_rate=0.0).wait())
+        with self.assertRaises(ValueError):
+            LatencyModel("uniform")
+
+    def test_fake_narration_duration_matches_text_length(self):
+        """Test that the fake TTS writes audio whose probed duration follows the word count."""
+        generator = FakeNarrationGenerator()
+        output_path = os.path.join(self.temp_dir, "narration.mp3")
+
+        result = generator.generate_narration("one two three four five", output_path)
+
+        self.assertTrue(result.success)
+        self.assertAlmostEqual(result.duration, 2.0, delta=MP3_FRAME_SECONDS)
+
+
+class TestPipelineBenchmark(unittest.TestCase):
+    """Test suite for the pipeline benchmark runner."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.latencies = ProviderLatencies(llm=LatencyModel(), tts=LatencyModel(), image=LatencyModel())
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_run_case_with_simulated_encoder(self):
+        """Test that a case produces every video and reports throughput and stage timings."""
+        case = BenchmarkCase(scenes=2, concurrency=2, parallel_videos=2, videos=2)
+
+        record = run_case(case, self.latencies, self.temp_dir, assembler="fake")
+
+        self.assertEqual(record["succeeded"], 2)
+        self.assertGreater(record["videos_per_hour"], 0)
+        self.assertEqual(record["latency_seconds"]["count"], 2)
+        self.assertEqual(record["stages"]["scene_image"]["count"], 4)
+        self.assertGreater(record["peak_rss_mb"], 0)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower runs and lower throughput are reported as regressions."""
+        def results(videos_per_hour, p50):
+            return {"results": [{
+                "case_id": "scenes=4",
+                "videos_per_hour": videos_per_hour,
+                "latency_seconds": {"p50": p50, "p95": p50},
+                "peak_rss_mb": 100.0
+            }]}
+
+        rows = compare_results(results(100.0, 10.0), results(80.0, 10.5), threshold=0.1)
+        regressions = {row["metric"] for row in rows if row["regression"]}
+
+        self.assertEqual(regressions, {"videos_per_hour"})
+
+    def test_cli_exits_non_zero_on_regression(self):
+        """Test the command line runner writes results and fails the comparison on a regression."""
+        output_path = os.path.join(self.temp_dir, "results.json")
+        args = ["--scenes", "1", "--concurrency", "1", "--videos", "1", "--latency", "constant",
+                "--llm-latency", "0", "--tts-latency", "0", "--image-latency", "0",
+                "--encode-latency", "0", "--assembler", "fake", "--output", output_path]
+
+        self.assertEqual(main(args), 0)
+        with open(output_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        self.assertEqual(baseline["results"][0]["succeeded"], 1)
+        self.assertIn("commit", baseline["meta"])
+
+        # A baseline far faster than anything measurable makes the new run a regression
+        baseline["results"][0]["videos_per_hour"] = 1e12
+        baseline_path = os.path.join(self.temp_dir, "baseline.json")
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f)
+
+        self.assertEqual(main(args + ["--compare", baseline_path]), 1)
+
+
+@patch.dict(os.environ, {"ELEVEN_LABS_API_KEY": "stand-in-key", "OPENAI_API_KEY": "stand-in-key"})
+class TestProviderStubServer(unittest.TestCase):
+    """Test suite for the local ElevenLabs/OpenAI Images stand-in server."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_narration_streams_through_real_client(self):
+        """Test that the ElevenLabs code path downloads streamed audio from a configured base URL."""
+        with ProviderStubServer(audio_chunk_bytes=1000) as server:
+            generator = NarrationGenerator(elevenlabs_voice_id="voice", elevenlabs_base_url=server.base_url)
+            result = generator.generate_narration("one two three four five", os.path.join(self.temp_dir, "a.mp3"))
+
+        self.assertTrue(result.success, result.error)
+        self.assertAlmostEqual(result.duration, 2.0, delta=MP3_FRAME_SECONDS)
+        self.assertEqual(server.stats["requests"], 1)
+
+    def test_images_as_url_or_b64(self):
+        """Test that the OpenAI Images code path handles both response formats."""
+        with ProviderStubServer(image_size=32) as server:
+            generator = VisualGenerator(provider="openai_dalle", openai_base_url=server.openai_base_url)
+            for response_format in ("url", "b64_json"):
+                generator.dalle_response_format = response_format
+                output_path = os.path.join(self.temp_dir, f"{response_format}.png")
+                result = generator.generate_image("Flat", [], "A robot", output_path)
+
+                self.assertTrue(result.success, result.error)
+                with Image.open(output_path) as image:
+                    self.assertEqual(image.size, (32, 32))
+
+        # The URL format costs a second request for the download
+        self.assertEqual(server.stats["requests"], 3)
+
+    def test_story_narration_mode_saves_requests(self):
+        """Test that narrating the whole story at once replaces the per-scene TTS requests with one."""
+        latencies = ProviderLatencies(llm=LatencyModel(), tts=LatencyModel(), image=LatencyModel())
+        requests_made = {}
+        with ProviderStubServer() as server:
+            for narration_mode in ("scene", "story"):
+                before = server.stats["requests"]
+                case = BenchmarkCase(scenes=4, concurrency=2, videos=1, narration_mode=narration_mode)
+                record = run_case(case, latencies, os.path.join(self.temp_dir, narration_mode), "fake", server)
+                self.assertEqual(record["succeeded"], 1)
+                requests_made[narration_mode] = server.stats["requests"] - before
+
+        # Both modes make the same image requests; story mode needs one TTS request instead of four
+        self.assertEqual(requests_made["scene"] - requests_made["story"], 3)
+
+    def test_throttling_and_connection_resets(self):
+        """Test the injected 429 responses and connection resets."""
+        url_path = "/v1/text-to-speech/voice"
+        with ProviderStubServer(faults=FaultProfile(throttle_rate=1.0, retry_after=0.5)) as server:
+            response = requests.post(server.base_url + url_path, json={"text": "hi"}, timeout=5)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "0.5")
+
+        with ProviderStubServer(faults=FaultProfile(reset_rate=1.0)) as server:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                requests.post(server.base_url + url_path, json={"text": "hi"}, timeout=5)
+        self.assertEqual(server.stats["resets"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests for the FileCache class.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.cache import FileCache
+
+
+class TestFileCache(unittest.TestCase):
+    """Test suite for the FileCache class."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_make_key_is_order_insensitive_for_dicts(self):
+        """Test that keys depend on values, not on dict ordering."""
+        key1 = FileCache.make_key("voice", {"a": 1, "b": 2}, "text")
+        key2 = FileCache.make_key("voice", {"b": 2, "a": 1}, "text")
+        key3 = FileCache.make_key("voice", {"a": 1, "b": 3}, "text")
+        
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+    
+    def test_put_get_and_copy(self):
+        """Test storing a file and copying it back out."""
+        cache = FileCache(self.cache_dir, suffix=".mp3")
+        source_path = os.path.join(self.temp_dir, "source.mp3")
+        with open(source_path, "wb") as f:
+            f.write(b"audio bytes")
+        key = FileCache.make_key("text")
+        
+        self.assertIsNone(cache.get(key))
+        cache.put_file(key, source_path, {"duration": 1.25})
+        entry = cache.get(key)
+        output_path = cache.copy_to(entry, os.path.join(self.temp_dir, "out", "copy.mp3"))
+        
+        self.assertEqual(entry.metadata, {"duration": 1.25})
+        with open(output_path, "rb") as f:
+            self.assertEqual(f.read(), b"audio bytes")
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1})
+    
+    def test_lru_eviction_respects_byte_budget(self):
+        """Test that the least recently used entries are evicted first."""
+        cache = FileCache(self.cache_dir, max_bytes=25)
+        for name in ("a", "b"):
+            cache.put_bytes(name * 64, b"x" * 10)
+        
+        # Make "a" the most recently used entry
+        past = time.time() - 100
+        os.utime(cache._paths("b" * 64)[0], (past, past))
+        os.utime(cache._paths("a" * 64)[0], (past - 50, past - 50))
+        cache.get("a" * 64)
+        cache.put_bytes("c" * 64, b"x" * 10)
+        
+        self.assertIsNotNone(cache.get("a" * 64))
+        self.assertIsNone(cache.get("b" * 64))
+        self.assertIsNotNone(cache.get("c" * 64))
+    
+    def test_ttl_expires_entries(self):
+        """Test that entries older than the TTL are misses and get removed."""
+        cache = FileCache(self.cache_dir, ttl_seconds=60)
+        key = FileCache.make_key("prompt")
+        payload_path = cache.put_bytes(key, b"image")
+        self.assertIsNotNone(cache.get(key))
+        
+        past = time.time() - 120
+        os.utime(payload_path + ".meta.json", (past, past))
+        
+        self.assertIsNone(cache.get(key))
+        self.assertFalse(os.path.exists(payload_path))
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1})
+    
+    def test_concurrent_writers_share_entries(self):
+        """Test that concurrent writes of the same key leave one complete entry."""
+        cache = FileCache(self.cache_dir)
+        key = FileCache.make_key("same")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for i in range(32):
+                executor.submit(cache.put_bytes, key, b"payload" * 100, {"writer": i})
+        
+        entry = cache.get(key)
+        
+        with open(entry.path, "rb") as f:
+            self.assertEqual(f.read(), b"payload" * 100)
+        leftovers = [name for name in os.listdir(os.path.dirname(entry.path)) if name.startswith(".")]
+        self.assertEqual(leftovers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
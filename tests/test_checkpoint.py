@@ -0,0 +1,85 @@
+"""
+Tests for the RunCheckpoint class.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.checkpoint import RunCheckpoint, is_valid_artifact
+from src.models.schemas import GenerationResult, StoryWithScenes, Scene
+
+
+class TestRunCheckpoint(unittest.TestCase):
+    """Test suite for the RunCheckpoint class."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.audio_path = os.path.join(self.temp_dir, "scene_1_narration.mp3")
+        with open(self.audio_path, "wb") as f:
+            f.write(b"dummy audio data")
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_round_trip(self):
+        """Test that recorded results survive a save and load."""
+        checkpoint = RunCheckpoint.create(self.temp_dir, "run1", "A subject", 1)
+        story = StoryWithScenes(
+            title="Title", full_story_summary="Summary", overall_image_style="Style", main_characters=[],
+            scenes=[Scene(scene_number=1, visual_description="Visual", narration_text="Narration")]
+        )
+        checkpoint.record_story(story)
+        checkpoint.record_narration(1, GenerationResult(success=True, output_path=self.audio_path, duration=1.5))
+        
+        loaded = RunCheckpoint.load(self.temp_dir, "run1")
+        
+        self.assertEqual(loaded.manifest.story, story)
+        self.assertEqual(loaded.valid_narration(1).duration, 1.5)
+        self.assertIsNone(loaded.valid_visual(1))
+        self.assertEqual([name for name in os.listdir(os.path.join(self.temp_dir, "run1"))], ["manifest.json"])
+    
+    def test_load_missing_run(self):
+        """Test loading a run that does not exist."""
+        with self.assertRaises(FileNotFoundError):
+            RunCheckpoint.load(self.temp_dir, "missing")
+    
+    def test_scene_update_invalidates_video(self):
+        """Test that regenerating a scene drops the previously assembled video."""
+        checkpoint = RunCheckpoint.create(self.temp_dir, "run1", "A subject", 1)
+        checkpoint.record_video(GenerationResult(success=True, output_path=self.audio_path))
+        self.assertIsNotNone(checkpoint.valid_video())
+        
+        checkpoint.record_visual(1, GenerationResult(success=True, output_path=self.audio_path))
+        
+        self.assertIsNone(checkpoint.valid_video())
+    
+    def test_concurrent_records(self):
+        """Test that concurrent scene updates are all persisted."""
+        checkpoint = RunCheckpoint.create(self.temp_dir, "run1", "A subject", 20)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for scene_number in range(1, 21):
+                executor.submit(checkpoint.record_narration, scene_number,
+                                GenerationResult(success=True, output_path=self.audio_path, duration=1.0))
+        
+        loaded = RunCheckpoint.load(self.temp_dir, "run1")
+        
+        self.assertEqual(sorted(loaded.manifest.narrations), list(range(1, 21)))
+    
+    def test_is_valid_artifact(self):
+        """Test artifact validation rules."""
+        self.assertFalse(is_valid_artifact(None))
+        self.assertFalse(is_valid_artifact(GenerationResult(success=False, output_path=self.audio_path)))
+        self.assertFalse(is_valid_artifact(GenerationResult(success=True, output_path=os.path.join(self.temp_dir, "missing.mp3"))))
+        self.assertFalse(is_valid_artifact(GenerationResult(success=True, output_path=self.audio_path), require_duration=True))
+        self.assertTrue(is_valid_artifact(GenerationResult(success=True, output_path=self.audio_path, duration=1.0), require_duration=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
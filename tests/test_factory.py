@@ -244,3 +244,580 @@ class TestShortVideoFactory(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+def _make_config(output_dir, **overrides):
+    """Build a valid VideoCreationConfig rooted at output_dir."""
+    values = dict(
+        story_subject="Test subject",
+        num_scenes=2,
+        tts_provider="elevenlabs",
+        elevenlabs_voice_id="test_voice",
+        image_provider="openai_dalle",
+        gcp_project_id="",
+        gcp_location="us-central1",
+        vertex_ai_imagen_model_id="imagegeneration@002",
+        image_transition_duration=0.0,
+        video_fps=24,
+        output_directories={
+            "base": output_dir,
+            "audios": os.path.join(output_dir, "audios"),
+            "images": os.path.join(output_dir, "images"),
+            "videos": os.path.join(output_dir, "videos"),
+            "runs": os.path.join(output_dir, "runs"),
+        },
+    )
+    values.update(overrides)
+    return VideoCreationConfig(**values)
+
+
+def _write_result(output_path, data=b"dummy data", **kwargs):
+    """Write a dummy output file, as a real generator or assembler would, and return its result."""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return GenerationResult(success=True, output_path=output_path, **kwargs)
+
+
+def _make_story(num_scenes):
+    """Build a story with num_scenes simple scenes."""
+    return StoryWithScenes(
+        title="Test Story",
+        full_story_summary="A short test story",
+        overall_image_style="Cartoon style",
+        main_characters=[CharacterDescription(name="Character1", appearance="Description1")],
+        scenes=[
+            Scene(scene_number=i, visual_description=f"Scene {i} description", narration_text=f"Scene {i} narration")
+            for i in range(1, num_scenes + 1)
+        ]
+    )
+
+
+class TestShortVideoFactoryConcurrency(unittest.TestCase):
+    """Tests for concurrent narration and visual generation in ShortVideoFactory."""
+    
+    def setUp(self):
+        """Set up a factory whose components are all mocks."""
+        self.temp_dir = tempfile.mkdtemp()
+        patchers = [
+            patch("src.core.factory.StoryGenerator"),
+            patch("src.core.factory.NarrationGenerator"),
+            patch("src.core.factory.VisualGenerator"),
+            patch("src.core.factory.VideoAssembler"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+            
+        self.config = _make_config(self.temp_dir, max_concurrent_narrations=4, max_concurrent_images=4)
+        self.factory = ShortVideoFactory(MagicMock(), config=self.config)
+        self.story = _make_story(4)
+        self.factory.story_generator.generate_structured_story.return_value = self.story
+        self.factory.video_assembler.assemble_video.side_effect = (
+            lambda image_paths, audio_paths, audio_durations, output_video_path, **kwargs:
+            _write_result(output_video_path)
+        )
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        
+    def test_results_keep_scene_order_and_run_concurrently(self):
+        """Slow early scenes must not reorder results, and scenes must overlap in time."""
+        import time
+        
+        def slow_narration(text, output_path):
+            # Earlier scenes finish last
+            time.sleep(0.05 * (5 - int(text.split()[1])))
+            return GenerationResult(success=True, output_path=output_path, duration=1.0)
+        
+        def slow_image(overall_image_style, main_characters, scene_visual_description, output_path):
+            time.sleep(0.2)
+            return GenerationResult(success=True, output_path=output_path)
+        
+        self.factory.narration_generator.generate_narration.side_effect = slow_narration
+        self.factory.visual_generator.generate_image.side_effect = slow_image
+        
+        start = time.monotonic()
+        result = self.factory.create_video()
+        elapsed = time.monotonic() - start
+        
+        self.assertTrue(result["success"])
+        narration_paths = [r.output_path for r in result["narration"]["results"]]
+        self.assertEqual(narration_paths, [
+            os.path.join(result["run_dir"], "audios", f"scene_{i}_narration.mp3") for i in range(1, 5)
+        ])
+        image_paths = self.factory.video_assembler.assemble_video.call_args.kwargs["image_paths"]
+        self.assertEqual(image_paths, [
+            os.path.join(result["run_dir"], "images", f"scene_{i}_image.png") for i in range(1, 5)
+        ])
+        # Sequential execution would take 0.5s of narration plus 0.8s of images
+        self.assertLess(elapsed, 0.6)
+        
+    def test_partial_failure_skips_scene(self):
+        """A failed scene is skipped during assembly while the others are kept."""
+        def narration(text, output_path):
+            if text.startswith("Scene 2"):
+                return GenerationResult(success=False, output_path="", error="TTS error")
+            return GenerationResult(success=True, output_path=output_path, duration=2.0)
+        
+        self.factory.narration_generator.generate_narration.side_effect = narration
+        self.factory.visual_generator.generate_image.side_effect = (
+            lambda overall_image_style, main_characters, scene_visual_description, output_path:
+            GenerationResult(success=True, output_path=output_path)
+        )
+        
+        result = self.factory.create_video()
+        
+        self.assertTrue(result["success"])
+        kwargs = self.factory.video_assembler.assemble_video.call_args.kwargs
+        self.assertEqual(len(kwargs["image_paths"]), 3)
+        self.assertNotIn(os.path.join(result["run_dir"], "images", "scene_2_image.png"), kwargs["image_paths"])
+        
+    def test_sequential_mode(self):
+        """A concurrency limit of 1 processes scenes one at a time."""
+        self.factory.config.max_concurrent_narrations = 1
+        calls = []
+        
+        def narration(text, output_path):
+            calls.append(text)
+            return GenerationResult(success=True, output_path=output_path, duration=1.0)
+        
+        self.factory.narration_generator.generate_narration.side_effect = narration
+        
+        result = self.factory.generate_narrations(self.story)
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(calls, [scene.narration_text for scene in self.story.scenes])
+
+
+class TestShortVideoFactoryStreaming(unittest.TestCase):
+    """Tests for the streaming pipeline mode of ShortVideoFactory."""
+    
+    def setUp(self):
+        """Set up a streaming factory whose components are all mocks."""
+        self.temp_dir = tempfile.mkdtemp()
+        patchers = [
+            patch("src.core.factory.StoryGenerator"),
+            patch("src.core.factory.NarrationGenerator"),
+            patch("src.core.factory.VisualGenerator"),
+            patch("src.core.factory.VideoAssembler"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+            
+        self.config = _make_config(self.temp_dir, pipeline_mode="streaming", pipeline_queue_size=1)
+        self.factory = ShortVideoFactory(MagicMock(), config=self.config)
+        self.factory.story_generator.generate_structured_story.return_value = _make_story(4)
+        self.factory.narration_generator.generate_narration.side_effect = (
+            lambda text, output_path: GenerationResult(success=True, output_path=output_path, duration=1.5)
+        )
+        self.factory.video_assembler.concatenate_segments.side_effect = (
+            lambda segment_paths, output_video_path: _write_result(output_video_path)
+        )
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        
+    def test_segments_encode_while_generation_continues(self):
+        """The first scene is encoded before the last image is generated."""
+        import threading
+        first_segment_encoded = threading.Event()
+        
+        def image(overall_image_style, main_characters, scene_visual_description, output_path):
+            if scene_visual_description.startswith("Scene 4"):
+                self.assertTrue(first_segment_encoded.wait(timeout=5))
+            return GenerationResult(success=True, output_path=output_path)
+        
+        def render(image_path, audio_path, audio_duration, output_segment_path, fps, fade_duration):
+            first_segment_encoded.set()
+            return GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+        
+        self.factory.visual_generator.generate_image.side_effect = image
+        self.factory.video_assembler.render_scene_segment.side_effect = render
+        
+        result = self.factory.create_video()
+        
+        self.assertTrue(result["success"])
+        self.factory.video_assembler.assemble_video.assert_not_called()
+        segment_paths = self.factory.video_assembler.concatenate_segments.call_args.args[0]
+        self.assertEqual(segment_paths, [
+            os.path.join(result["run_dir"], "scratch", "segments", f"scene_{i}_segment.mp4") for i in range(1, 5)
+        ])
+        
+    def test_failed_scene_is_not_encoded(self):
+        """Scenes with a failed image are skipped, the rest are concatenated."""
+        def image(overall_image_style, main_characters, scene_visual_description, output_path):
+            if scene_visual_description.startswith("Scene 3"):
+                return GenerationResult(success=False, output_path="", error="Image error")
+            return GenerationResult(success=True, output_path=output_path)
+        
+        self.factory.visual_generator.generate_image.side_effect = image
+        self.factory.video_assembler.render_scene_segment.side_effect = (
+            lambda image_path, audio_path, audio_duration, output_segment_path, fps, fade_duration:
+            GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+        )
+        
+        result = self.factory.create_video()
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(self.factory.video_assembler.render_scene_segment.call_count, 3)
+        self.assertFalse(result["visuals"]["results"][2].success)
+        
+    def test_encoder_error_skips_scene_without_blocking(self):
+        """A segment that raises is skipped, and the full queues do not block the run."""
+        import threading
+        self.factory.visual_generator.generate_image.side_effect = (
+            lambda overall_image_style, main_characters, scene_visual_description, output_path:
+            GenerationResult(success=True, output_path=output_path)
+        )
+        
+        def render(image_path, audio_path, audio_duration, output_segment_path, fps, fade_duration):
+            if "scene_2_" in output_segment_path:
+                raise RuntimeError("encoder crashed")
+            return GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+        
+        self.factory.video_assembler.render_scene_segment.side_effect = render
+        results = []
+        runner = threading.Thread(target=lambda: results.append(self.factory.create_video()), daemon=True)
+        runner.start()
+        runner.join(timeout=10)
+        
+        self.assertFalse(runner.is_alive(), "streaming pipeline blocked after an encoder error")
+        self.assertTrue(results[0]["success"])
+        self.assertEqual(self.factory.video_assembler.render_scene_segment.call_count, 4)
+        segment_paths = self.factory.video_assembler.concatenate_segments.call_args.args[0]
+        self.assertEqual([os.path.basename(path) for path in segment_paths],
+                         [f"scene_{i}_segment.mp4" for i in (1, 3, 4)])
+        
+    def test_transitions_fade_in_later_segments(self):
+        """Image transitions are rendered as a fade-in of every segment after the first."""
+        self.factory.config.image_transition_duration = 0.5
+        self.factory.visual_generator.generate_image.side_effect = (
+            lambda overall_image_style, main_characters, scene_visual_description, output_path:
+            GenerationResult(success=True, output_path=output_path)
+        )
+        self.factory.video_assembler.render_scene_segment.side_effect = (
+            lambda image_path, audio_path, audio_duration, output_segment_path, fps, fade_duration:
+            GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+        )
+        
+        result = self.factory.create_video()
+        
+        self.assertTrue(result["success"])
+        fades = {os.path.basename(call.kwargs["output_segment_path"]): call.kwargs["fade_duration"]
+                 for call in self.factory.video_assembler.render_scene_segment.call_args_list}
+        self.assertEqual(fades, {"scene_1_segment.mp4": 0.0, "scene_2_segment.mp4": 0.5,
+                                 "scene_3_segment.mp4": 0.5, "scene_4_segment.mp4": 0.5})
+        
+    def test_first_encoded_segment_does_not_fade_in(self):
+        """When the first scene fails, the segment that opens the video does not fade in from black."""
+        self.factory.config.image_transition_duration = 0.5
+        
+        def image(overall_image_style, main_characters, scene_visual_description, output_path):
+            if scene_visual_description.startswith("Scene 1"):
+                return GenerationResult(success=False, output_path="", error="Image error")
+            return GenerationResult(success=True, output_path=output_path)
+        
+        self.factory.visual_generator.generate_image.side_effect = image
+        self.factory.video_assembler.render_scene_segment.side_effect = (
+            lambda image_path, audio_path, audio_duration, output_segment_path, fps, fade_duration:
+            GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+        )
+        
+        result = self.factory.create_video()
+        
+        self.assertTrue(result["success"])
+        fades = {os.path.basename(call.kwargs["output_segment_path"]): call.kwargs["fade_duration"]
+                 for call in self.factory.video_assembler.render_scene_segment.call_args_list}
+        self.assertEqual(fades, {"scene_2_segment.mp4": 0.0, "scene_3_segment.mp4": 0.5, "scene_4_segment.mp4": 0.5})
+        
+    def test_all_narrations_failed(self):
+        """The streaming pipeline reports narration failure like the batch pipeline."""
+        self.factory.narration_generator.generate_narration.side_effect = (
+            lambda text, output_path: GenerationResult(success=False, output_path="", error="TTS error")
+        )
+        self.factory.visual_generator.generate_image.side_effect = (
+            lambda overall_image_style, main_characters, scene_visual_description, output_path:
+            GenerationResult(success=True, output_path=output_path)
+        )
+        
+        result = self.factory.create_video()
+        
+        self.assertFalse(result["success"])
+        self.assertIn("Narration generation failed", result["error"])
+        self.assertEqual(result["steps_completed"], ["story"])
+        self.factory.video_assembler.render_scene_segment.assert_not_called()
+
+
+class TestShortVideoFactoryStoryStreaming(unittest.TestCase):
+    """Tests for starting scene work while the story is still being streamed."""
+    
+    def setUp(self):
+        """Set up a streaming factory whose story generator streams a scripted story."""
+        import threading
+        self.temp_dir = tempfile.mkdtemp()
+        patchers = [
+            patch("src.core.factory.StoryGenerator"),
+            patch("src.core.factory.NarrationGenerator"),
+            patch("src.core.factory.VisualGenerator"),
+            patch("src.core.factory.VideoAssembler"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+            
+        self.config = _make_config(self.temp_dir, num_scenes=3, pipeline_mode="streaming", story_streaming=True)
+        self.factory = ShortVideoFactory(MagicMock(), config=self.config)
+        self.story = _make_story(3)
+        self.first_narration_started = threading.Event()
+        
+        def narration(text, output_path):
+            self.first_narration_started.set()
+            with open(output_path, "wb") as f:
+                f.write(b"dummy audio data")
+            return GenerationResult(success=True, output_path=output_path, duration=1.5)
+        
+        self.factory.narration_generator.generate_narration.side_effect = narration
+        self.factory.visual_generator.generate_image.side_effect = (
+            lambda overall_image_style, main_characters, scene_visual_description, output_path:
+            _write_result(output_path)
+        )
+        self.factory.video_assembler.render_scene_segment.side_effect = (
+            lambda image_path, audio_path, audio_duration, output_segment_path, fps, fade_duration:
+            GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+        )
+        self.factory.video_assembler.concatenate_segments.side_effect = (
+            lambda segment_paths, output_video_path: _write_result(output_video_path)
+        )
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        
+    def stream(self, scenes_before_wait, final_event):
+        """Stream the story's parts, pausing until scene work has started."""
+        def events(subject, scene_count, use_cache=True, refresh_cache=False):
+            yield "overall_image_style", self.story.overall_image_style
+            yield "main_characters", self.story.main_characters
+            for scene in self.story.scenes[:scenes_before_wait]:
+                yield "scene", scene
+            # The LLM is still "writing" until the first scene's narration has started
+            self.assertTrue(self.first_narration_started.wait(timeout=5))
+            for scene in self.story.scenes[scenes_before_wait:]:
+                yield "scene", scene
+            yield final_event
+        self.factory.story_generator.stream_structured_story.side_effect = events
+        
+    def test_scenes_start_before_the_story_is_complete(self):
+        """The first scene is narrated while the story is still streaming, and the run completes."""
+        self.stream(1, ("story", self.story))
+        
+        result = self.factory.create_video()
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["story"]["story"], self.story)
+        self.assertEqual(self.factory.video_assembler.render_scene_segment.call_count, 3)
+        self.factory.story_generator.generate_structured_story.assert_not_called()
+        self.assertTrue(self.factory.has_run(result["run_id"]))
+        # Scenes started mid-stream are not nested under the still open story span
+        parents = {span["parent"] for span in result["profile"]["spans"] if span["name"] == "scene_narration"}
+        self.assertEqual(parents, {None})
+        
+    def test_story_failure_discards_streamed_scene_assets(self):
+        """A story that fails validation after scenes started leaves no assets to reuse."""
+        from src.core.checkpoint import RunCheckpoint
+        self.stream(1, ("error", "Error: invalid story"))
+        
+        result = self.factory.create_video(run_id="failed-story")
+        
+        self.assertFalse(result["success"])
+        self.assertEqual(result["steps_completed"], [])
+        self.assertIn("Story generation failed", result["error"])
+        manifest = RunCheckpoint.load(self.config.output_directories["runs"], "failed-story").manifest
+        self.assertIsNone(manifest.story)
+        self.assertEqual(manifest.narrations, {})
+        self.assertEqual(manifest.visuals, {})
+
+
+class TestShortVideoFactoryResume(unittest.TestCase):
+    """Tests for checkpointed, resumable runs of ShortVideoFactory."""
+    
+    def setUp(self):
+        """Set up a factory whose generators write real (dummy) files."""
+        self.temp_dir = tempfile.mkdtemp()
+        patchers = [
+            patch("src.core.factory.StoryGenerator"),
+            patch("src.core.factory.NarrationGenerator"),
+            patch("src.core.factory.VisualGenerator"),
+            patch("src.core.factory.VideoAssembler"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+            
+        self.config = _make_config(self.temp_dir)
+        self.factory = ShortVideoFactory(MagicMock(), config=self.config)
+        self.factory.story_generator.generate_structured_story.return_value = _make_story(3)
+        self.failing_images = {"Scene 2 description"}
+        
+        def narration(text, output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, "wb") as f:
+                f.write(b"dummy audio data")
+            return GenerationResult(success=True, output_path=output_path, duration=2.0)
+        
+        def image(overall_image_style, main_characters, scene_visual_description, output_path):
+            if scene_visual_description in self.failing_images:
+                return GenerationResult(success=False, output_path="", error="Image error")
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, "wb") as f:
+                f.write(b"dummy image data")
+            return GenerationResult(success=True, output_path=output_path)
+        
+        def assemble(image_paths, audio_paths, audio_durations, output_video_path, **kwargs):
+            os.makedirs(os.path.dirname(output_video_path), exist_ok=True)
+            with open(output_video_path, "wb") as f:
+                f.write(b"dummy video data")
+            return GenerationResult(success=True, output_path=output_video_path)
+        
+        self.factory.narration_generator.generate_narration.side_effect = narration
+        self.factory.visual_generator.generate_image.side_effect = image
+        self.factory.video_assembler.assemble_video.side_effect = assemble
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        
+    def test_resume_regenerates_only_missing_pieces(self):
+        """Resuming reuses the story and valid scene assets and regenerates the rest."""
+        first = self.factory.create_video(run_id="run1")
+        self.assertTrue(first["success"])
+        self.assertEqual(first["run_id"], "run1")
+        self.assertTrue(os.path.exists(os.path.join(self.config.output_directories["runs"], "run1", "manifest.json")))
+        
+        # Scene 2's image now succeeds and scene 3's audio was lost
+        self.failing_images.clear()
+        os.remove(os.path.join(first["run_dir"], "audios", "scene_3_narration.mp3"))
+        self.factory.narration_generator.generate_narration.reset_mock()
+        self.factory.visual_generator.generate_image.reset_mock()
+        
+        resumed = self.factory.resume("run1")
+        
+        self.assertTrue(resumed["success"])
+        self.factory.story_generator.generate_structured_story.assert_called_once()
+        self.assertEqual(
+            [call.args[0] for call in self.factory.narration_generator.generate_narration.call_args_list],
+            ["Scene 3 narration"]
+        )
+        self.assertEqual(
+            [call.kwargs["scene_visual_description"] for call in self.factory.visual_generator.generate_image.call_args_list],
+            ["Scene 2 description"]
+        )
+        self.assertEqual(self.factory.video_assembler.assemble_video.call_count, 2)
+        self.assertEqual(len(self.factory.video_assembler.assemble_video.call_args.kwargs["image_paths"]), 3)
+        
+    def test_resume_completed_run_skips_everything(self):
+        """Resuming a finished run reuses the published video without calling any provider."""
+        self.failing_images.clear()
+        self.assertTrue(self.factory.create_video(run_id="run2")["success"])
+        self.factory.narration_generator.generate_narration.reset_mock()
+        self.factory.visual_generator.generate_image.reset_mock()
+        self.factory.video_assembler.assemble_video.reset_mock()
+        
+        resumed = self.factory.resume("run2")
+        
+        self.assertTrue(resumed["success"])
+        self.factory.narration_generator.generate_narration.assert_not_called()
+        self.factory.visual_generator.generate_image.assert_not_called()
+        self.factory.video_assembler.assemble_video.assert_not_called()
+        
+    def test_resume_unknown_run(self):
+        """Resuming a run without a manifest fails cleanly."""
+        result = self.factory.resume("does-not-exist")
+        
+        self.assertFalse(result["success"])
+        self.assertIn("No manifest found", result["error"])
+
+
+class TestShortVideoFactoryWorkspaces(unittest.TestCase):
+    """Tests for run-scoped workspaces of ShortVideoFactory."""
+    
+    def setUp(self):
+        """Set up a factory whose components write dummy files."""
+        self.temp_dir = tempfile.mkdtemp()
+        patchers = [
+            patch("src.core.factory.StoryGenerator"),
+            patch("src.core.factory.NarrationGenerator"),
+            patch("src.core.factory.VisualGenerator"),
+            patch("src.core.factory.VideoAssembler"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+            
+        self.config = _make_config(self.temp_dir)
+        self.factory = ShortVideoFactory(MagicMock(), config=self.config)
+        self.factory.story_generator.generate_structured_story.return_value = _make_story(2)
+        self.factory.narration_generator.generate_narration.side_effect = (
+            lambda text, output_path: _write_result(output_path, duration=1.0)
+        )
+        self.factory.visual_generator.generate_image.side_effect = (
+            lambda overall_image_style, main_characters, scene_visual_description, output_path: _write_result(output_path)
+        )
+        self.factory.video_assembler.assemble_video.side_effect = (
+            lambda image_paths, audio_paths, audio_durations, output_video_path, **kwargs:
+            _write_result(output_video_path, data=output_video_path.encode())
+        )
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        
+    def test_concurrent_runs_do_not_collide(self):
+        """Runs on the same factory publish distinct videos built from their own scratch files."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda i: self.factory.create_video(run_id=f"run{i}"), range(4)))
+        
+        self.assertTrue(all(result["success"] for result in results))
+        video_paths = [result["video"]["video_path"] for result in results]
+        self.assertEqual(video_paths, [
+            os.path.join(self.config.output_directories["videos"], f"final_video_run{i}.mp4") for i in range(4)
+        ])
+        for i, video_path in enumerate(video_paths):
+            with open(video_path, "rb") as f:
+                self.assertIn(f"run{i}".encode(), f.read())
+            self.assertFalse(os.path.exists(os.path.join(results[i]["run_dir"], "scratch")))
+        self.assertFalse([name for name in os.listdir(self.config.output_directories["videos"]) if name.startswith(".")])
+        
+    def test_result_includes_profile(self):
+        """A run exports its timing profile in the result and its run directory."""
+        result = self.factory.create_video(run_id="profiled")
+        
+        profile = result["profile"]
+        self.assertEqual(profile["run_id"], "profiled")
+        self.assertEqual(set(profile["scenes"]), {"1", "2"})
+        self.assertIn("scene_narration", profile["scenes"]["1"])
+        for stage in ("story", "narration", "visuals", "assembly"):
+            self.assertEqual(profile["stages"][stage]["count"], 1)
+        self.assertTrue(os.path.isfile(os.path.join(result["run_dir"], "profile.json")))
+        
+    def test_failed_run_keeps_scratch_space(self):
+        """With the on_success policy, scratch space of a failed run is kept for inspection."""
+        self.factory.video_assembler.assemble_video.side_effect = None
+        self.factory.video_assembler.assemble_video.return_value = GenerationResult(success=False, output_path="", error="Encoder error")
+        
+        result = self.factory.create_video(run_id="failed")
+        
+        self.assertFalse(result["success"])
+        self.assertTrue(os.path.isdir(os.path.join(result["run_dir"], "scratch")))
+        self.assertEqual(os.listdir(self.config.output_directories["videos"]), [])
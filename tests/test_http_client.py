@@ -0,0 +1,60 @@
+"""
+Tests for the pooled HTTP clients.
+"""
+
+import unittest
+
+from benchmarks.provider_server import ProviderStubServer
+from src.utils.http_client import HttpClientPool, host_key
+
+
+class TestHttpClientPool(unittest.TestCase):
+    """Test suite for HttpClientPool."""
+
+    def post_narrations(self, pool, server, count):
+        """Send count TTS requests to the stand-in server, reading each body to the end."""
+        for index in range(count):
+            response = pool.post(f"{server.base_url}/v1/text-to-speech/voice", json={"text": f"request {index}"}, stream=True)
+            response.raise_for_status()
+            self.assertGreater(sum(len(chunk) for chunk in response.iter_content(1024)), 0)
+            response.close()
+
+    def test_connections_are_reused(self):
+        """Test that sequential requests share one keep-alive connection and that the reuse is reported."""
+        pool = HttpClientPool(timeout=5)
+        with ProviderStubServer(audio_chunk_bytes=500) as server:
+            self.post_narrations(pool, server, 3)
+            host = host_key(server.base_url)
+            pool.close()
+
+        self.assertEqual(server.stats["connections"], 1)
+        self.assertEqual(pool.stats.snapshot()["hosts"][host],
+                         {"requests": 3, "connections_opened": 1, "connections_reused": 2})
+
+    def test_keep_alive_can_be_disabled(self):
+        """Test that every request opens its own connection without keep-alive."""
+        pool = HttpClientPool(keep_alive=False, timeout=5)
+        with ProviderStubServer() as server:
+            self.post_narrations(pool, server, 2)
+            pool.close()
+
+        self.assertEqual(server.stats["connections"], 2)
+        self.assertEqual(pool.stats.snapshot()["connections_reused"], 0)
+
+    def test_shared_httpx_client(self):
+        """Test that the httpx client is shared and counts its connections in the same stats."""
+        pool = HttpClientPool(timeout=5)
+        with ProviderStubServer(image_size=8) as server:
+            client = pool.httpx_client()
+            for _ in range(2):
+                client.get(f"{server.base_url}/images/a.png").raise_for_status()
+            self.assertIs(pool.httpx_client(), client)
+            pool.close()
+
+        stats = pool.stats.snapshot()
+        self.assertEqual(server.stats["connections"], 1)
+        self.assertEqual((stats["requests"], stats["connections_opened"]), (2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,349 @@
+"""
+Tests for the persistent job queue and the job service.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.core.job_queue import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from src.core.job_service import JobService, JobServiceServer
+from src.models.schemas import BatchJob, CharacterDescription, GenerationResult, Scene, StoryWithScenes, VideoCreationConfig
+from src.utils.profiling import span
+
+
+class TestJobQueue(unittest.TestCase):
+    """Test suite for the SQLite job queue."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "jobs.sqlite3")
+        self.queue = JobQueue(self.db_path)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.queue.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fifo_claim_and_finish(self):
+        """Test that jobs are claimed oldest first and their outcome is recorded."""
+        self.queue.submit(BatchJob(job_id="a", subject="First"))
+        self.queue.submit(BatchJob(job_id="b", subject="Second"))
+        with self.assertRaises(ValueError):
+            self.queue.submit(BatchJob(job_id="a", subject="Duplicate"))
+
+        claimed = self.queue.claim("worker-0")
+        self.assertEqual(claimed["job_id"], "a")
+        self.assertEqual(claimed["status"], RUNNING)
+        self.assertTrue(claimed["run_id"].startswith("a-"))
+        self.assertEqual(self.queue.counts()[QUEUED], 1)
+
+        self.queue.update_progress("a", {"stage": "story"})
+        self.queue.finish("a", SUCCEEDED, {"video_path": "video.mp4"})
+        record = self.queue.get("a")
+        self.assertEqual(record["status"], SUCCEEDED)
+        self.assertEqual(record["progress"], {"stage": "story"})
+        self.assertEqual(record["result"], {"video_path": "video.mp4"})
+
+        self.assertEqual(self.queue.claim("worker-0")["job_id"], "b")
+        self.assertIsNone(self.queue.claim("worker-0"))
+
+    def test_claim_by_priority_and_deadline(self):
+        """Test that jobs are claimed by priority class, then deadline, then submission order."""
+        self.queue.submit(BatchJob(job_id="backfill", subject="Old", priority="backfill"))
+        self.queue.submit(BatchJob(job_id="normal", subject="Plain"))
+        self.queue.submit(BatchJob(job_id="late", subject="Late", deadline_seconds=600))
+        self.queue.submit(BatchJob(job_id="soon", subject="Soon", deadline_seconds=60))
+        self.queue.submit(BatchJob(job_id="urgent", subject="Now", priority="urgent", tenant="news"))
+
+        record = self.queue.get("soon")
+        self.assertAlmostEqual(record["deadline"], record["submitted_at"] + 60)
+        claimed = [self.queue.claim("worker-0")["job_id"] for _ in range(5)]
+        self.assertEqual(claimed, ["urgent", "soon", "late", "normal", "backfill"])
+        self.assertEqual(self.queue.get("urgent")["tenant"], "news")
+
+    def test_cancel_and_requeue_after_restart(self):
+        """Test cancelling queued and running jobs, and requeueing jobs interrupted by a restart."""
+        for job_id in ("a", "b", "c"):
+            self.queue.submit(BatchJob(job_id=job_id, subject=job_id))
+        running = self.queue.claim("worker-0")
+        self.queue.claim("worker-1")
+
+        self.assertEqual(self.queue.request_cancel("c")["status"], CANCELLED)
+        self.assertTrue(self.queue.request_cancel("b")["cancel_requested"])
+        self.assertIsNone(self.queue.request_cancel("missing"))
+
+        # A new process sees the jobs the previous one left running
+        self.queue.close()
+        self.queue = JobQueue(self.db_path)
+        self.assertEqual(self.queue.requeue_interrupted(), 1)
+        self.assertEqual(self.queue.get("b")["status"], CANCELLED)
+        reclaimed = self.queue.claim("worker-0")
+        self.assertEqual(reclaimed["job_id"], "a")
+        self.assertEqual(reclaimed["run_id"], running["run_id"])
+        self.assertEqual(reclaimed["attempts"], 2)
+
+
+class TestJobService(unittest.TestCase):
+    """Test suite for the job service workers and HTTP API."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.base_config = VideoCreationConfig(
+            story_subject="Default subject",
+            num_scenes=2,
+            tts_provider="elevenlabs",
+            elevenlabs_voice_id="test_voice",
+            image_provider="openai_dalle",
+            gcp_project_id="",
+            gcp_location="us-central1",
+            vertex_ai_imagen_model_id="imagegeneration@002",
+            image_transition_duration=0.0,
+            video_fps=24,
+            output_directories={"base": self.temp_dir}
+        )
+        self.release = threading.Event()
+        self.llm_factory = MagicMock(side_effect=lambda: MagicMock())
+
+        patcher = patch("src.core.batch.ShortVideoFactory")
+        self.mock_factory_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        def create_video(subject, num_scenes, run_id):
+            # Stages open spans like the real pipeline, so progress and cancellation can hook in
+            with span("story"):
+                pass
+            for stage in ("narration", "visuals"):
+                with span(stage):
+                    for scene in (1, 2):
+                        self.release.wait(5)
+                        with span(f"scene_{'image' if stage == 'visuals' else 'narration'}", scene=scene):
+                            pass
+            with span("assembly"):
+                pass
+            return {
+                "success": subject != "fail",
+                "error": "" if subject != "fail" else "Story generation failed: boom",
+                "steps_completed": ["story", "narration", "visuals", "video"],
+                "video": {"video_path": f"final_video_{run_id}.mp4"},
+                "run_id": run_id
+            }
+
+        def make_factory(llm, config):
+            factory = MagicMock()
+            factory.config = config
+            factory.has_run.return_value = False
+            factory.create_video.side_effect = create_video
+            return factory
+        self.mock_factory_class.side_effect = make_factory
+
+        self.queue = JobQueue(os.path.join(self.temp_dir, "jobs.sqlite3"))
+        self.service = JobService(self.llm_factory, self.base_config, self.queue, workers=2, poll_interval=0.05)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.release.set()
+        self.service.stop(timeout=5)
+        self.queue.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def wait_for(self, job_id, statuses, timeout=5.0):
+        """Poll a job until it reaches one of the given statuses."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            record = self.service.get(job_id)
+            if record["status"] in statuses:
+                return record
+            time.sleep(0.02)
+        self.fail(f"Job {job_id} did not reach {statuses}: {self.service.get(job_id)}")
+
+    def test_workers_stay_warm_between_jobs(self):
+        """Test that jobs complete with progress and workers create their LLM only once."""
+        self.release.set()
+        self.service.start()
+        job_ids = [self.service.submit({"subject": f"Subject {i}"})["job_id"] for i in range(4)]
+        failed = self.service.submit({"job_id": "bad", "subject": "fail"})
+
+        for job_id in job_ids:
+            record = self.wait_for(job_id, (SUCCEEDED,))
+            self.assertEqual(record["progress"]["stages_completed"], ["story", "narration", "visuals", "assembly"])
+            self.assertEqual(record["progress"]["scenes_done"]["image"], 2)
+            self.assertTrue(record["result"]["video_path"].startswith(f"final_video_{job_id}-"))
+        self.assertEqual(self.wait_for(failed["job_id"], (FAILED,))["error"], "Story generation failed: boom")
+
+        # One LLM and one factory per worker, created at warm-up rather than per job
+        self.assertEqual(self.llm_factory.call_count, 2)
+        self.assertEqual(self.mock_factory_class.call_count, 2)
+        with self.assertRaises(ValueError):
+            self.service.submit({"subject": ""})
+
+    def test_cancel_running_job(self):
+        """Test that a running job stops at the next scene boundary."""
+        self.service.start()
+        job_id = self.service.submit({"subject": "Long"})["job_id"]
+        record = self.wait_for(job_id, (RUNNING,))
+        while (record.get("progress") or {}).get("stage") != "narration":
+            time.sleep(0.02)
+            record = self.service.get(job_id)
+
+        self.service.cancel(job_id)
+        self.release.set()
+
+        record = self.wait_for(job_id, (CANCELLED,))
+        self.assertEqual(record["error"], "Job cancelled")
+        self.assertEqual(record["progress"]["scenes_done"]["image"], 0)
+
+    def test_cancel_from_another_queue(self):
+        """Test that a job cancelled through another queue on the same database stops."""
+        self.service.start()
+        job_id = self.service.submit({"subject": "Long"})["job_id"]
+        record = self.wait_for(job_id, (RUNNING,))
+        while (record.get("progress") or {}).get("stage") != "narration":
+            time.sleep(0.02)
+            record = self.service.get(job_id)
+
+        other = JobQueue(os.path.join(self.temp_dir, "jobs.sqlite3"))
+        self.addCleanup(other.close)
+        self.assertTrue(other.request_cancel(job_id)["cancel_requested"])
+        time.sleep(0.1)
+        self.release.set()
+
+        record = self.wait_for(job_id, (CANCELLED,))
+        self.assertEqual(record["error"], "Job cancelled")
+        self.assertEqual(record["progress"]["scenes_done"]["image"], 0)
+
+    def test_http_api(self):
+        """Test submitting, polling, listing and cancelling jobs over HTTP."""
+        with JobServiceServer(self.service) as server:
+            response = requests.post(f"{server.base_url}/jobs", json={"job_id": "api", "subject": "Over HTTP"}, timeout=5)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.json()["status"], QUEUED)
+
+            self.assertEqual(requests.post(f"{server.base_url}/jobs", json={"job_id": "api", "subject": "Again"}, timeout=5).status_code, 409)
+            self.assertEqual(requests.post(f"{server.base_url}/jobs", json={"num_scenes": 2}, timeout=5).status_code, 400)
+
+            stats = requests.get(f"{server.base_url}/stats", timeout=5).json()
+            self.assertEqual(stats["queue_depth"], 1)
+            self.assertEqual(stats["in_flight"], 0)
+
+            self.assertEqual(requests.get(f"{server.base_url}/jobs/api", timeout=5).json()["request"]["subject"], "Over HTTP")
+            self.assertEqual(requests.get(f"{server.base_url}/jobs/missing", timeout=5).status_code, 404)
+            listed = requests.get(f"{server.base_url}/jobs", params={"status": "queued"}, timeout=5).json()["jobs"]
+            self.assertEqual([job["job_id"] for job in listed], ["api"])
+
+            cancelled = requests.delete(f"{server.base_url}/jobs/api", timeout=5).json()
+            self.assertEqual(cancelled["status"], CANCELLED)
+
+
+class TestJobServiceStreaming(unittest.TestCase):
+    """Test suite for cancelling jobs that run the streaming pipeline."""
+
+    def setUp(self):
+        """Set up a one-worker service whose factories stream with mocked components."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.base_config = VideoCreationConfig(
+            story_subject="Default subject",
+            num_scenes=3,
+            tts_provider="elevenlabs",
+            elevenlabs_voice_id="test_voice",
+            image_provider="openai_dalle",
+            gcp_project_id="",
+            gcp_location="us-central1",
+            vertex_ai_imagen_model_id="imagegeneration@002",
+            image_transition_duration=0.0,
+            video_fps=24,
+            pipeline_mode="streaming",
+            pipeline_queue_size=1,
+            output_directories={
+                "base": self.temp_dir,
+                "videos": os.path.join(self.temp_dir, "videos"),
+                "runs": os.path.join(self.temp_dir, "runs")
+            }
+        )
+        components = {}
+        for name in ("StoryGenerator", "NarrationGenerator", "VisualGenerator", "VideoAssembler"):
+            patcher = patch(f"src.core.factory.{name}")
+            components[name] = patcher.start().return_value
+            self.addCleanup(patcher.stop)
+
+        components["StoryGenerator"].generate_structured_story.return_value = StoryWithScenes(
+            title="Story",
+            full_story_summary="A story",
+            overall_image_style="Cartoon style",
+            main_characters=[CharacterDescription(name="Hero", appearance="Tall")],
+            scenes=[Scene(scene_number=i, visual_description=f"Scene {i}", narration_text=f"Scene {i} narration")
+                    for i in (1, 2, 3)]
+        )
+        components["NarrationGenerator"].generate_narration.side_effect = (
+            lambda text, output_path: GenerationResult(success=True, output_path=output_path, duration=1.0)
+        )
+        components["VisualGenerator"].generate_image.side_effect = (
+            lambda overall_image_style, main_characters, scene_visual_description, output_path:
+            GenerationResult(success=True, output_path=output_path)
+        )
+        self.encoding = threading.Event()
+        self.release = threading.Event()
+
+        def render(image_path, audio_path, audio_duration, output_segment_path, fps, fade_duration):
+            self.encoding.set()
+            self.release.wait(5)
+            return GenerationResult(success=True, output_path=output_segment_path, duration=audio_duration)
+
+        def concatenate(segment_paths, output_video_path):
+            with open(output_video_path, "wb") as f:
+                f.write(b"video")
+            return GenerationResult(success=True, output_path=output_video_path)
+
+        self.assembler = components["VideoAssembler"]
+        self.assembler.render_scene_segment.side_effect = render
+        self.assembler.concatenate_segments.side_effect = concatenate
+
+        self.queue = JobQueue(os.path.join(self.temp_dir, "jobs.sqlite3"))
+        self.service = JobService(MagicMock(side_effect=lambda: MagicMock()), self.base_config, self.queue,
+                                  workers=1, poll_interval=0.05)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.release.set()
+        self.service.stop(timeout=5)
+        self.queue.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def wait_for(self, job_id, statuses, timeout=10.0):
+        """Poll a job until it reaches one of the given statuses."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            record = self.service.get(job_id)
+            if record["status"] in statuses:
+                return record
+            time.sleep(0.02)
+        self.fail(f"Job {job_id} did not reach {statuses}: {self.service.get(job_id)}")
+
+    def test_cancel_frees_the_worker(self):
+        """Test that cancelling a job while its segments encode stops the pipeline and frees the worker."""
+        self.service.start()
+        job_id = self.service.submit({"subject": "Long"})["job_id"]
+        self.assertTrue(self.encoding.wait(5))
+
+        self.service.cancel(job_id)
+        self.release.set()
+
+        record = self.wait_for(job_id, (CANCELLED,))
+        self.assertEqual(record["error"], "Job cancelled")
+        self.assertEqual(self.assembler.render_scene_segment.call_count, 1)
+
+        # The only worker is free to run the next job to completion
+        next_id = self.service.submit({"subject": "Next"})["job_id"]
+        self.assertEqual(self.wait_for(next_id, (SUCCEEDED,))["result"]["success"], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
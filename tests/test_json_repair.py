@@ -0,0 +1,42 @@
+"""
+Tests for the local JSON repair helpers.
+"""
+
+import json
+import unittest
+
+from src.utils.json_repair import repair_json
+
+
+class TestRepairJson(unittest.TestCase):
+    """Test suite for repair_json."""
+
+    def assertRepairs(self, text, expected):
+        """Assert that the repaired text decodes to the expected value."""
+        self.assertEqual(json.loads(repair_json(text)), expected)
+
+    def test_valid_json_is_unchanged(self):
+        """Test that valid JSON passes through untouched."""
+        text = json.dumps({"a": [1, {"b": "x, }"}], "c": None})
+        self.assertEqual(repair_json(text), text)
+
+    def test_fences_and_surrounding_text(self):
+        """Test that code fences and prose around the document are dropped."""
+        self.assertRepairs('Sure! Here it is:\n```json\n{"a": 1}\n```\nEnjoy {the story}.', {"a": 1})
+
+    def test_trailing_and_missing_commas(self):
+        """Test that trailing commas are removed and missing commas between values inserted."""
+        self.assertRepairs('{"a": [1, 2,], "b": {"c": "x",},}', {"a": [1, 2], "b": {"c": "x"}})
+        self.assertRepairs('{"scenes": [{"n": 1}\n{"n": 2}] "title": "t"}', {"scenes": [{"n": 1}, {"n": 2}], "title": "t"})
+
+    def test_truncated_documents(self):
+        """Test that documents cut off mid-way are closed."""
+        self.assertRepairs('{"a": {"x": 1}, "b": [1, 2', {"a": {"x": 1}, "b": [1, 2]})
+        self.assertRepairs('{"a": "cut off', {"a": "cut off"})
+        self.assertRepairs('{"a": 1, "b', {"a": 1, "b": None})
+        self.assertRepairs('{"a": 1, "b": ', {"a": 1, "b": None})
+        self.assertRepairs('{"a": [1, 2], "b": tr', {"a": [1, 2], "b": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for the incremental JSON parser.
+"""
+
+import json
+import unittest
+
+from src.utils.json_stream import IncrementalJsonParser
+
+
+class TestIncrementalJsonParser(unittest.TestCase):
+    """Test suite for IncrementalJsonParser."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.document = {
+            "title": "A \"quoted\" title with \\ and {braces} and [brackets]",
+            "count": -1.5e3,
+            "flags": [True, False, None],
+            "scenes": [
+                {"scene_number": 1, "tags": ["a", "b"]},
+                {"scene_number": 2, "tags": []}
+            ],
+            "empty": {}
+        }
+        self.text = "```json\n" + json.dumps(self.document, indent=2) + "\n```"
+
+    def feed_in_chunks(self, text, size, **kwargs):
+        """Feed text to a new parser in chunks of the given size."""
+        parser = IncrementalJsonParser(**kwargs)
+        completed = []
+        for start in range(0, len(text), size):
+            completed.extend(parser.feed(text[start:start + size]))
+        return parser, completed
+
+    def test_chunking_does_not_change_the_result(self):
+        """Test that values are reported in document order whatever the chunk boundaries."""
+        expected = [
+            (("title",), self.document["title"]),
+            (("count",), -1500.0),
+            (("flags", 0), True),
+            (("flags", 1), False),
+            (("flags", 2), None),
+            (("flags",), [True, False, None]),
+            (("scenes", 0), self.document["scenes"][0]),
+            (("scenes", 1), self.document["scenes"][1]),
+            (("scenes",), self.document["scenes"]),
+            (("empty",), {})
+        ]
+        for size in (1, 2, 7, len(self.text)):
+            parser, completed = self.feed_in_chunks(self.text, size)
+            self.assertEqual(completed, expected)
+            self.assertTrue(parser.done)
+            self.assertEqual(json.loads(parser.text), self.document)
+
+    def test_values_are_reported_as_soon_as_complete(self):
+        """Test that a scene is reported before the rest of the document arrives."""
+        parser = IncrementalJsonParser()
+        prefix = '{"scenes": [{"scene_number": 1}, {"scene_'
+        self.assertEqual(parser.feed(prefix), [(("scenes", 0), {"scene_number": 1})])
+        self.assertFalse(parser.done)
+        self.assertEqual(parser.feed('number": 2}]}'), [(("scenes", 1), {"scene_number": 2}), (("scenes",), [{"scene_number": 1}, {"scene_number": 2}])])
+        self.assertTrue(parser.done)
+        self.assertEqual(parser.feed("trailing text"), [])
+
+    def test_max_depth(self):
+        """Test that only values up to max_depth are reported."""
+        _, completed = self.feed_in_chunks(self.text, 5, max_depth=1)
+        self.assertEqual([path for path, _ in completed], [("title",), ("count",), ("flags",), ("scenes",), ("empty",)])
+
+    def test_invalid_json(self):
+        """Test that malformed documents raise ValueError."""
+        with self.assertRaises(ValueError):
+            IncrementalJsonParser().feed('{"a": [1, 2}')
+        with self.assertRaises(ValueError):
+            IncrementalJsonParser().feed('{"a": tru, "b": 1}')
+
+
+if __name__ == "__main__":
+    unittest.main()
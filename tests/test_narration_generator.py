@@ -12,6 +12,7 @@ from pydub import AudioSegment
 
 from src.generators.narration_generator import NarrationGenerator
 from src.models.schemas import GenerationResult
+from src.utils.cache import FileCache
 
 
 class TestNarrationGenerator(unittest.TestCase):
@@ -44,7 +45,7 @@ class TestNarrationGenerator(unittest.TestCase):
             os.rmdir(self.temp_dir)
     
     @patch('src.generators.narration_generator.Config')
-    @patch('requests.post')
+    @patch('src.utils.http_client.HttpClientPool.post')
     def test_generate_elevenlabs_narration_success(self, mock_post, mock_config):
         """Test successful narration generation with ElevenLabs."""
         # Configure mocks
@@ -72,7 +73,7 @@ class TestNarrationGenerator(unittest.TestCase):
         mock_post.assert_called_once()
         
     @patch('src.generators.narration_generator.Config')
-    @patch('requests.post')
+    @patch('src.utils.http_client.HttpClientPool.post')
     def test_generate_elevenlabs_narration_failure(self, mock_post, mock_config):
         """Test handling of narration generation failure with ElevenLabs."""
         # Configure mocks
@@ -135,5 +136,310 @@ class TestNarrationGenerator(unittest.TestCase):
         self.assertIn("API Key not set", result.error)
 
 
+class TestNarrationGeneratorCache(unittest.TestCase):
+    """Tests for the narration audio cache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = FileCache(os.path.join(self.temp_dir, "cache"), suffix=".mp3")
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @patch('src.generators.narration_generator.Config')
+    @patch('src.utils.http_client.HttpClientPool.post')
+    def test_cache_hit_skips_request_and_probe(self, mock_post, mock_config):
+        """Test that a repeated request is served from the cache."""
+        mock_config.get_api_key.return_value = "test_api_key"
+        mock_response = MagicMock()
+        mock_response.iter_content.return_value = [b"test audio content"]
+        mock_post.return_value = mock_response
+        
+        generator = NarrationGenerator(provider="elevenlabs", elevenlabs_voice_id="voice", audio_cache=self.cache)
+        with patch.object(generator, "get_audio_duration", return_value=2.5) as mock_probe:
+            first = generator.generate_narration("Same text", os.path.join(self.temp_dir, "first.mp3"))
+            second = generator.generate_narration("Same text", os.path.join(self.temp_dir, "second.mp3"))
+        
+        self.assertTrue(second.success)
+        self.assertEqual(second.duration, 2.5)
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(mock_probe.call_count, 1)
+        with open(second.output_path, "rb") as f:
+            self.assertEqual(f.read(), b"test audio content")
+    
+    @patch('src.generators.narration_generator.Config')
+    @patch('src.utils.http_client.HttpClientPool.post')
+    def test_cache_key_includes_voice(self, mock_post, mock_config):
+        """Test that different voices do not share cache entries."""
+        mock_config.get_api_key.return_value = "test_api_key"
+        mock_response = MagicMock()
+        mock_response.iter_content.return_value = [b"test audio content"]
+        mock_post.return_value = mock_response
+        
+        for voice in ("voice_a", "voice_b"):
+            generator = NarrationGenerator(provider="elevenlabs", elevenlabs_voice_id=voice, audio_cache=self.cache)
+            with patch.object(generator, "get_audio_duration", return_value=1.0):
+                generator.generate_narration("Same text", os.path.join(self.temp_dir, f"{voice}.mp3"))
+        
+        self.assertEqual(mock_post.call_count, 2)
+
+
+class TestNarrationGeneratorRateLimiting(unittest.TestCase):
+    """Tests for rate-limit handling of the NarrationGenerator."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @patch('src.generators.narration_generator.Config')
+    @patch('src.utils.http_client.HttpClientPool.post')
+    def test_throttled_request_is_retried(self, mock_post, mock_config):
+        """Test that a 429 response is retried after its Retry-After delay instead of failing the scene."""
+        mock_config.get_api_key.return_value = "throttled_test_api_key"
+        throttled_response = MagicMock(status_code=429, headers={"Retry-After": "0"}, text="too_many_concurrent_requests")
+        ok_response = MagicMock(status_code=200)
+        ok_response.iter_content.return_value = [b"test audio content"]
+        mock_post.side_effect = [throttled_response, ok_response]
+        
+        generator = NarrationGenerator(provider="elevenlabs")
+        output_path = os.path.join(self.temp_dir, "output.mp3")
+        result = generator._generate_elevenlabs_narration("Test narration text", output_path)
+        
+        self.assertTrue(result.success)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(generator.rate_limiter.stats["throttled"], 1)
+
+
+
+@patch.dict(os.environ, {"ELEVEN_LABS_API_KEY": "async-test-key"})
+class TestNarrationGeneratorAsync(unittest.TestCase):
+    """Tests for the asyncio narration path against the local provider stand-in."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def make_generator(self, server):
+        """Build a generator against the stand-in server with a limiter that does not slow the test down."""
+        from src.utils.http_client import HttpClientPool
+        from src.utils.rate_limiter import AdaptiveRateLimiter
+        generator = NarrationGenerator(elevenlabs_voice_id="voice", elevenlabs_base_url=server.base_url)
+        generator.rate_limiter = AdaptiveRateLimiter("async-test", requests_per_second=1000.0, max_concurrency=32)
+        generator.http_client = HttpClientPool(timeout=5)
+        return generator
+    
+    def test_concurrent_narrations_share_a_pool(self):
+        """Test that many concurrent coroutines complete on one event loop over pooled connections."""
+        import asyncio
+        from benchmarks.provider_server import FaultProfile, ProviderStubServer
+        from benchmarks.fakes import LatencyModel
+        
+        async def narrate_all(generator):
+            results = await asyncio.gather(*(
+                generator.agenerate_narration(f"scene {index} one two three", os.path.join(self.temp_dir, f"{index}.mp3"))
+                for index in range(24)
+            ))
+            pool_stats = generator.http_client.stats.snapshot()["hosts"]
+            await generator.http_client.aclose()
+            return results, pool_stats
+        
+        with ProviderStubServer(faults=FaultProfile(first_byte=LatencyModel(mean_seconds=0.05))) as server:
+            generator = self.make_generator(server)
+            results, pool_stats = asyncio.run(narrate_all(generator))
+        
+        self.assertTrue(all(result.success for result in results), [result.error for result in results])
+        self.assertTrue(all(result.duration > 0 for result in results))
+        self.assertGreater(server.stats["peak_in_flight"], 1)
+        host = pool_stats[f"http://127.0.0.1:{server.port}"]
+        self.assertEqual(host["requests"], 24)
+        self.assertLessEqual(host["connections_opened"], server.stats["peak_in_flight"])
+        self.assertEqual(generator.rate_limiter.stats["in_flight"], 0)
+    
+    def test_cancellation(self):
+        """Test that cancelling a narration aborts the request without leaving a file or a held slot."""
+        import asyncio
+        from benchmarks.provider_server import FaultProfile, ProviderStubServer
+        output_path = os.path.join(self.temp_dir, "cancelled.mp3")
+        
+        async def narrate_and_cancel(generator):
+            task = asyncio.create_task(generator.agenerate_narration("word " * 200, output_path))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await generator.http_client.aclose()
+        
+        with ProviderStubServer(faults=FaultProfile(chunk_delay=0.1), audio_chunk_bytes=256) as server:
+            generator = self.make_generator(server)
+            asyncio.run(narrate_and_cancel(generator))
+        
+        self.assertFalse(os.path.exists(output_path))
+        self.assertEqual(generator.rate_limiter.stats["in_flight"], 0)
+        self.assertEqual(server.stats["requests"], 1)
+
+
+@patch.dict(os.environ, {"ELEVEN_LABS_API_KEY": "story-test-key"})
+class TestNarrationGeneratorStory(unittest.TestCase):
+    """Tests for whole-story narration split at the scene boundaries."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.texts = ["one two three four five", "six seven eight nine ten eleven twelve thirteen fourteen fifteen", "sixteen seventeen eighteen"]
+        self.output_paths = [os.path.join(self.temp_dir, f"scene_{index}.mp3") for index in range(len(self.texts))]
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_one_request_split_per_scene(self):
+        """Test that one timestamped request yields a file per scene with its exact duration, then a cache hit."""
+        from benchmarks.fakes import MP3_FRAME_SECONDS
+        from benchmarks.provider_server import ProviderStubServer
+        from src.utils.audio import audio_duration
+        
+        cache = FileCache(os.path.join(self.temp_dir, "cache"), suffix=".mp3")
+        with ProviderStubServer() as server:
+            generator = NarrationGenerator(elevenlabs_voice_id="voice", elevenlabs_base_url=server.base_url, audio_cache=cache)
+            generator.rate_limiter = None
+            results = generator.generate_story_narration(self.texts, self.output_paths)
+            cached_results = generator.generate_story_narration(self.texts, self.output_paths)
+        
+        self.assertTrue(all(result.success for result in results), [result.error for result in results])
+        # 2.5 words per second; every cut lands on a frame boundary
+        for result, expected in zip(results, (2.0, 4.0, 1.2)):
+            self.assertAlmostEqual(result.duration, expected, delta=MP3_FRAME_SECONDS)
+            self.assertAlmostEqual(audio_duration(result.output_path), result.duration)
+        self.assertAlmostEqual(sum(result.duration for result in results), 7.2, delta=MP3_FRAME_SECONDS)
+        self.assertEqual(server.stats["requests"], 1)
+        self.assertEqual([result.duration for result in cached_results], [result.duration for result in results])
+    
+    def test_mismatched_alignment_fails_every_scene(self):
+        """Test that timestamps that do not cover the text fail all scenes instead of cutting at guessed times."""
+        from benchmarks.fakes import timed_speech
+        generator = NarrationGenerator(provider="elevenlabs")
+        audio, alignment = timed_speech("a shorter text")
+        
+        with patch.object(generator, "_synthesize_with_timestamps", return_value=(audio, alignment)):
+            results = generator.generate_story_narration(self.texts, self.output_paths)
+        
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(not result.success and "timestamps" in result.error for result in results))
+        self.assertFalse(any(os.path.exists(path) for path in self.output_paths))
+
+
+@patch.dict(os.environ, {"ELEVEN_LABS_API_KEY": "chunk-test-key"})
+class TestNarrationGeneratorChunking(unittest.TestCase):
+    """Tests for the parallel synthesis of long narrations in chunks."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        # Six sentences of five words; at most 80 characters per chunk packs them two by two
+        self.sentences = [f"Sentence {word} has five words." for word in ("one", "two", "three", "four", "five", "six")]
+        self.text = " ".join(self.sentences)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def make_generator(self, server, **kwargs):
+        """Build a chunking generator against the stand-in server with a limiter that does not slow the test down."""
+        from src.utils.http_client import HttpClientPool
+        from src.utils.rate_limiter import AdaptiveRateLimiter
+        generator = NarrationGenerator(elevenlabs_voice_id="voice", elevenlabs_base_url=server.base_url,
+                                       chunk_max_chars=80, chunk_concurrency=3, **kwargs)
+        generator.rate_limiter = AdaptiveRateLimiter("chunk-test", requests_per_second=1000.0, max_concurrency=8)
+        generator.http_client = HttpClientPool(timeout=5)
+        return generator
+    
+    def test_chunks_are_synthesized_in_parallel_and_joined(self):
+        """Test that a long text becomes parallel chunk requests joined into one file with the summed duration."""
+        from benchmarks.fakes import MP3_FRAME_SECONDS, LatencyModel
+        from benchmarks.provider_server import FaultProfile, ProviderStubServer
+        from src.utils.audio import audio_duration
+        output_path = os.path.join(self.temp_dir, "long.mp3")
+        
+        with ProviderStubServer(faults=FaultProfile(first_byte=LatencyModel(mean_seconds=0.2))) as server:
+            result = self.make_generator(server).generate_narration(self.text, output_path)
+        
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(server.stats["requests"], 3)
+        self.assertEqual(server.stats["peak_in_flight"], 3)
+        # Three chunks of ten words at 2.5 words per second, each a whole number of frames
+        self.assertAlmostEqual(result.duration, 12.0, delta=3 * MP3_FRAME_SECONDS)
+        self.assertAlmostEqual(audio_duration(output_path), result.duration)
+        self.assertEqual(os.listdir(self.temp_dir), ["long.mp3"])
+    
+    def test_unchanged_chunks_are_cached(self):
+        """Test that editing one sentence of a long text only synthesizes the chunk containing it again."""
+        from benchmarks.provider_server import ProviderStubServer
+        cache = FileCache(os.path.join(self.temp_dir, "cache"), suffix=".mp3")
+        edited = " ".join(self.sentences[:-1] + ["Sentence six was edited now."])
+        
+        with ProviderStubServer() as server:
+            generator = self.make_generator(server, audio_cache=cache)
+            first = generator.generate_narration(self.text, os.path.join(self.temp_dir, "first.mp3"))
+            second = generator.generate_narration(edited, os.path.join(self.temp_dir, "second.mp3"))
+        
+        self.assertTrue(first.success and second.success)
+        self.assertEqual(server.stats["requests"], 4)
+        self.assertAlmostEqual(first.duration, second.duration)
+    
+    def test_failed_chunk_fails_the_narration(self):
+        """Test that one failed chunk fails the narration and leaves no chunk files behind."""
+        from benchmarks.provider_server import ProviderStubServer
+        output_path = os.path.join(self.temp_dir, "long.mp3")
+        
+        with ProviderStubServer() as server:
+            generator = self.make_generator(server)
+            real_request = generator._generate_elevenlabs_narration
+            
+            def fail_third_sentence(text, path):
+                if "three" in text:
+                    return GenerationResult(success=False, output_path="", error="chunk rejected")
+                return real_request(text, path)
+            
+            with patch.object(generator, "_generate_elevenlabs_narration", side_effect=fail_third_sentence):
+                result = generator.generate_narration(self.text, output_path)
+        
+        self.assertFalse(result.success)
+        self.assertIn("1 of 3 narration chunks failed: chunk rejected", result.error)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+    
+    def test_async_chunks(self):
+        """Test that the asyncio path chunks long texts the same way."""
+        import asyncio
+        from benchmarks.provider_server import ProviderStubServer
+        output_path = os.path.join(self.temp_dir, "long.mp3")
+        
+        async def narrate(generator):
+            result = await generator.agenerate_narration(self.text, output_path)
+            await generator.http_client.aclose()
+            return result
+        
+        with ProviderStubServer() as server:
+            result = asyncio.run(narrate(self.make_generator(server)))
+        
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(server.stats["requests"], 3)
+        self.assertAlmostEqual(result.duration, 12.0, delta=0.1)
+
+
 if __name__ == "__main__":
     unittest.main()
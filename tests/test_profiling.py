@@ -0,0 +1,128 @@
+"""
+Tests for the span-based profiling utilities.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.profiling import detached, load_profiles, profile_run, propagate, span, summarize_profiles
+
+
+class TestProfiling(unittest.TestCase):
+    """Test suite for span recording and profile export."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_spans_are_recorded_per_stage_scene_and_provider(self):
+        """Test that nested spans inherit their scene and are aggregated."""
+        output_path = os.path.join(self.temp_dir, "audio.mp3")
+        with open(output_path, "wb") as f:
+            f.write(b"x" * 10)
+
+        with profile_run("run1") as profile:
+            with span("narration"):
+                for scene_number in (1, 2):
+                    with span("scene_narration", scene=scene_number):
+                        with span("tts_request", provider="elevenlabs") as request_span:
+                            time.sleep(0.01)
+                            request_span.add_file(output_path)
+
+        exported = profile.to_dict()
+        self.assertEqual(exported["run_id"], "run1")
+        self.assertEqual(exported["stages"]["tts_request"]["count"], 2)
+        self.assertEqual(exported["providers"]["elevenlabs"]["count"], 2)
+        self.assertGreaterEqual(exported["scenes"]["2"]["tts_request"], 0.01)
+        self.assertEqual(exported["bytes_written"], 20)
+        self.assertGreaterEqual(exported["total_seconds"], exported["stages"]["narration"]["total_seconds"])
+        json.dumps(exported)
+
+    def test_spans_outside_a_run_are_not_recorded(self):
+        """Test that spans are no-ops when no run is being profiled."""
+        with span("story") as unrecorded:
+            pass
+        with profile_run("run2") as profile:
+            pass
+
+        self.assertEqual(unrecorded.duration, 0.0)
+        self.assertEqual(profile.to_dict()["spans"], [])
+
+    def test_propagate_attributes_thread_work_to_the_run(self):
+        """Test that work in a thread pool is recorded with the submitting span's scene."""
+        def work(_):
+            with span("image_request", provider="openai_dalle"):
+                pass
+
+        with profile_run("run3") as profile:
+            with span("scene_image", scene=4):
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    list(executor.map(propagate(work), range(3)))
+
+        requests = [s for s in profile.to_dict()["spans"] if s["name"] == "image_request"]
+        self.assertEqual(len(requests), 3)
+        self.assertTrue(all(s["scene"] == 4 and s["parent"] == "scene_image" for s in requests))
+
+    def test_detached_generator_spans_do_not_parent_consumer_work(self):
+        """Test that work done between the items of a generator is not nested under the generator's spans."""
+        def stream():
+            with span("story"), span("llm_request"):
+                for scene_number in (1, 2):
+                    yield scene_number
+                    with span("parse"):
+                        pass
+
+        with profile_run("run5") as profile:
+            with span("pipeline"):
+                events = detached(stream())
+                for scene_number in events:
+                    with span("scene_narration", scene=scene_number):
+                        pass
+                    if scene_number == 1:
+                        # Closing the wrapper closes the generator and its spans
+                        events.close()
+
+        parents = {s["name"]: s["parent"] for s in profile.to_dict()["spans"]}
+        self.assertEqual(parents["scene_narration"], "pipeline")
+        self.assertEqual(parents["llm_request"], "story")
+        self.assertEqual(parents["story"], "pipeline")
+        self.assertNotIn("parse", parents)
+
+    def test_failed_span_is_marked(self):
+        """Test that a span closed by an exception is flagged as an error."""
+        with profile_run("run4") as profile:
+            with self.assertRaises(RuntimeError):
+                with span("encode"):
+                    raise RuntimeError("x264 failed")
+
+        self.assertTrue(profile.to_dict()["spans"][0]["error"])
+
+    def test_summary_across_saved_profiles(self):
+        """Test aggregating the profiles saved in run workspaces."""
+        for index in range(3):
+            with profile_run(f"run{index}") as profile:
+                with span("story"):
+                    pass
+            profile.save(os.path.join(self.temp_dir, f"run{index}", "profile.json"))
+        os.makedirs(os.path.join(self.temp_dir, "run_without_profile"))
+
+        summary = summarize_profiles(load_profiles(self.temp_dir))
+
+        self.assertEqual(summary["runs"], 3)
+        self.assertEqual(summary["stages"]["story"]["count"], 3)
+        self.assertLessEqual(summary["stages"]["story"]["p50"], summary["stages"]["story"]["max"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Tests for the adaptive rate limiter.
+"""
+
+import time
+import asyncio
+import threading
+import unittest
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.rate_limiter import (
+    AdaptiveRateLimiter, ThrottledError, as_throttled_error, get_rate_limiter, parse_retry_after
+)
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """Test suite for the AdaptiveRateLimiter class."""
+
+    def make_limiter(self, **kwargs):
+        """Create a limiter that never waits for tokens unless configured to."""
+        values = dict(requests_per_second=1000.0, max_concurrency=8, base_backoff=0.0)
+        values.update(kwargs)
+        return AdaptiveRateLimiter("test", **values)
+
+    def test_aimd_limit(self):
+        """Test multiplicative decrease on throttling and additive increase on success."""
+        limiter = self.make_limiter()
+
+        with self.assertRaises(ThrottledError):
+            with limiter.slot():
+                raise ThrottledError("429")
+        self.assertEqual(limiter.stats["concurrency_limit"], 4)
+
+        # Roughly one slot is added per round of limit-many successes
+        for _ in range(5):
+            with limiter.slot():
+                pass
+        self.assertEqual(limiter.stats["concurrency_limit"], 5)
+
+    def test_one_decrease_per_round(self):
+        """Test that throttles from requests started before a decrease do not decrease again."""
+        limiter = self.make_limiter()
+        tickets = [limiter.acquire() for _ in range(4)]
+
+        for ticket in tickets:
+            limiter.release(ticket, throttled=True)
+        self.assertEqual(limiter.stats["concurrency_limit"], 4)
+
+        limiter.release(limiter.acquire(), throttled=True)
+        self.assertEqual(limiter.stats["concurrency_limit"], 2)
+
+    def test_concurrency_limit_is_enforced(self):
+        """Test that no more requests than the limit are in flight at once."""
+        limiter = self.make_limiter(max_concurrency=2)
+        peak = 0
+        lock = threading.Lock()
+
+        def request():
+            nonlocal peak
+            with limiter.slot():
+                with lock:
+                    peak = max(peak, limiter.in_flight)
+                time.sleep(0.02)
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak, 2)
+
+    def test_token_bucket_rate(self):
+        """Test that requests beyond the burst are spaced by the refill rate."""
+        limiter = self.make_limiter(requests_per_second=20.0, burst=1.0)
+
+        start = time.monotonic()
+        for _ in range(3):
+            with limiter.slot():
+                pass
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_call_retries_after_retry_after(self):
+        """Test that call() retries throttled requests and pauses all callers for Retry-After."""
+        limiter = self.make_limiter()
+        attempts = []
+
+        def request():
+            attempts.append(time.monotonic())
+            if len(attempts) < 3:
+                raise ThrottledError("429", retry_after=0.05)
+            return "ok"
+
+        self.assertEqual(limiter.call(request), "ok")
+        self.assertEqual(len(attempts), 3)
+        self.assertGreaterEqual(attempts[1] - attempts[0], 0.05)
+        self.assertEqual(limiter.stats["throttled"], 2)
+
+    def test_call_gives_up_after_max_retries(self):
+        """Test that call() re-raises once retries are exhausted."""
+        limiter = self.make_limiter(max_retries=1)
+
+        def request():
+            raise ThrottledError("429", retry_after=0)
+
+        with self.assertRaises(ThrottledError):
+            limiter.call(request)
+        self.assertEqual(limiter.stats["in_flight"], 0)
+
+    def test_async_and_thread_callers_share_the_limit(self):
+        """Test that asyncio tasks respect slots held by threads."""
+        limiter = self.make_limiter(max_concurrency=1)
+        ticket = limiter.acquire()
+        threading.Timer(0.05, limiter.release, args=(ticket,)).start()
+
+        async def request():
+            start = time.monotonic()
+            return await limiter.acall(asyncio.sleep, 0, result=time.monotonic() - start)
+
+        async def main():
+            start = time.monotonic()
+            await request()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(main()), 0.04)
+        self.assertEqual(limiter.stats["in_flight"], 0)
+
+    def test_failed_requests_leave_limit_unchanged(self):
+        """Test that non-throttling errors release the slot without adjusting the limit."""
+        limiter = self.make_limiter(max_concurrency=4, initial_concurrency=2)
+
+        with self.assertRaises(ValueError):
+            with limiter.slot():
+                raise ValueError("boom")
+
+        self.assertEqual(limiter.stats, {"concurrency_limit": 2, "in_flight": 0, "succeeded": 0, "throttled": 0})
+
+
+class TestRateLimiterHelpers(unittest.TestCase):
+    """Tests for the rate limiter helper functions."""
+
+    def test_parse_retry_after(self):
+        """Test parsing delay seconds, HTTP dates and invalid values."""
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_as_throttled_error(self):
+        """Test translating SDK exceptions that carry an HTTP 429 status."""
+        error = Exception("Rate limit reached")
+        error.status_code = 429
+        error.response = SimpleNamespace(headers={"retry-after": "2"})
+
+        throttled = as_throttled_error(error)
+
+        self.assertEqual(throttled.retry_after, 2.0)
+        self.assertIsNone(as_throttled_error(ValueError("other")))
+
+    def test_registry_is_keyed_by_provider_and_key(self):
+        """Test that limiters are shared per provider and API key."""
+        self.assertIs(get_rate_limiter("elevenlabs", "key-a"), get_rate_limiter("elevenlabs", "key-a"))
+        self.assertIsNot(get_rate_limiter("elevenlabs", "key-a"), get_rate_limiter("elevenlabs", "key-b"))
+        self.assertIsNot(get_rate_limiter("elevenlabs", "key-a"), get_rate_limiter("openai_dalle", "key-a"))
+        self.assertNotIn("key-a", get_rate_limiter("elevenlabs", "key-a").name)
+
+
+if __name__ == "__main__":
+    unittest.main()
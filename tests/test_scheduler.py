@@ -0,0 +1,156 @@
+"""
+Tests for the priority- and deadline-aware stage scheduler.
+"""
+
+import time
+import threading
+import unittest
+
+from src.core.scheduler import JobTicket, StageScheduler, scheduled
+from src.utils.profiling import observe_spans
+
+
+class TestStageScheduler(unittest.TestCase):
+    """Test suite for StageScheduler."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # A fixed estimate keeps the fair queuing charges predictable
+        self.scheduler = StageScheduler(slots={"tts": 1}, estimate_alpha=0.0)
+        self.order = []
+        self.release = threading.Event()
+        self.threads = []
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.release.set()
+        for thread in self.threads:
+            thread.join(5)
+
+    def ticket(self, job_id, **kwargs):
+        """Create a ticket of the test scheduler."""
+        return JobTicket(self.scheduler, job_id, num_scenes=4, **kwargs)
+
+    def run_unit(self, ticket, label, hold=False):
+        """Start a unit of tts work in a thread and record when it gets its slot."""
+        def work():
+            with self.scheduler.slot("tts", ticket):
+                self.order.append(label)
+                if hold:
+                    self.release.wait(5)
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def wait_until(self, condition, timeout=5.0):
+        """Poll until a condition holds."""
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("Timed out waiting for the scheduler")
+            time.sleep(0.005)
+
+    def waiting(self):
+        """Number of requests waiting for a tts slot."""
+        return sum(self.scheduler.stats()["tts"]["waiting"].values())
+
+    def hold_slot(self, ticket):
+        """Occupy the only slot until self.release is set."""
+        self.run_unit(ticket, "holder", hold=True)
+        self.wait_until(lambda: self.order == ["holder"])
+
+    def drain(self, expected):
+        """Free the slot and wait for every queued unit to run."""
+        self.release.set()
+        self.wait_until(lambda: len(self.order) == expected)
+
+    def test_urgent_overtakes_queued_backfill(self):
+        """Test that urgent work runs before backfill work queued earlier."""
+        backfill = self.ticket("backfill", priority="backfill")
+        urgent = self.ticket("urgent", priority="urgent")
+        self.hold_slot(backfill)
+        for scene in range(3):
+            self.run_unit(backfill, f"backfill-{scene}")
+            self.wait_until(lambda: self.waiting() == scene + 1)
+        for scene in range(2):
+            self.run_unit(urgent, f"urgent-{scene}")
+            self.wait_until(lambda: self.waiting() == scene + 4)
+        self.assertEqual(self.scheduler.stats()["tts"]["waiting"], {"backfill": 3, "urgent": 2})
+
+        self.drain(6)
+        self.assertEqual(self.order[1:3], ["urgent-0", "urgent-1"])
+        self.assertEqual(sorted(self.order[3:]), ["backfill-0", "backfill-1", "backfill-2"])
+        self.assertEqual(self.scheduler.stats()["tts"]["dispatched"], {"backfill": 4, "urgent": 2})
+        self.assertEqual(backfill.done["tts"], 4)
+
+    def test_tenants_share_slots_fairly(self):
+        """Test that a tenant queueing a burst of work does not starve another tenant."""
+        first = self.ticket("first", tenant="a")
+        second = self.ticket("second", tenant="b")
+        self.hold_slot(first)
+        for scene in range(3):
+            self.run_unit(first, f"a-{scene}")
+            self.wait_until(lambda: self.waiting() == scene + 1)
+        for scene in range(3):
+            self.run_unit(second, f"b-{scene}")
+            self.wait_until(lambda: self.waiting() == scene + 4)
+
+        self.drain(7)
+        tenants = [label[0] for label in self.order[1:]]
+        self.assertEqual(tenants, ["b", "a", "b", "a", "b", "a"])
+
+    def test_least_slack_first_within_a_class(self):
+        """Test that work of the job closest to its deadline runs first within a priority class."""
+        now = time.time()
+        holder = self.ticket("holder")
+        relaxed = self.ticket("relaxed")
+        tight = self.ticket("tight", deadline=now + 10)
+        loose = self.ticket("loose", deadline=now + 1000)
+        self.assertLess(tight.slack(now), loose.slack(now))
+        self.assertEqual(relaxed.slack(now), float("inf"))
+
+        self.hold_slot(holder)
+        for count, ticket in enumerate((relaxed, loose, tight), start=1):
+            self.run_unit(ticket, ticket.job_id)
+            self.wait_until(lambda: self.waiting() == count)
+
+        self.drain(4)
+        self.assertEqual(self.order[1:], ["tight", "loose", "relaxed"])
+
+    def test_scheduled_outside_a_job(self):
+        """Test that scheduled() runs work directly outside a job and through the scheduler inside one."""
+        with scheduled("tts"):
+            pass
+        self.assertEqual(self.scheduler.stats()["tts"]["dispatched"], {})
+
+        with self.scheduler.job("job", priority="urgent", num_scenes=2) as ticket:
+            with scheduled("tts"):
+                pass
+        self.assertEqual(ticket.done["tts"], 1)
+        self.assertEqual(self.scheduler.stats()["tts"]["dispatched"], {"urgent": 1})
+
+        with self.assertRaises(ValueError):
+            with self.scheduler.job("job", priority="whenever"):
+                pass
+
+    def test_refused_wait_leaves_no_request_behind(self):
+        """Test that a span listener raising on schedule_wait does not leave the request queued."""
+        def refuse(event, span):
+            if event == "start" and span.name == "schedule_wait":
+                raise RuntimeError("refused")
+
+        ticket = self.ticket("job")
+        with observe_spans(refuse):
+            with self.assertRaises(RuntimeError):
+                with self.scheduler.slot("tts", ticket):
+                    self.fail("Work ran although its wait was refused")
+        self.assertEqual(self.waiting(), 0)
+
+        # The next request is not stuck behind the refused one
+        with self.scheduler.slot("tts", ticket):
+            self.order.append("next")
+        self.assertEqual(self.order, ["next"])
+
+
+if __name__ == "__main__":
+    unittest.main()
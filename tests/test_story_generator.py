@@ -2,6 +2,7 @@
 Tests for the StoryGenerator class.
 """
 
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -11,6 +12,7 @@ from langchain_core.outputs import Generation, ChatGeneration, ChatResult
 
 from src.generators.story_generator import StoryGenerator
 from src.models.schemas import StoryWithScenes, CharacterDescription, Scene
+from src.utils.cache import FileCache
 
 
 class TestStoryGenerator(unittest.TestCase):
@@ -103,5 +105,467 @@ class TestStoryGenerator(unittest.TestCase):
             StoryGenerator(None)
 
 
+class TestStoryGeneratorCache(unittest.TestCase):
+    """Tests for the story result cache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        import tempfile
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = FileCache(self.temp_dir, suffix=".json")
+        self.story = StoryWithScenes(
+            title="Cached Story",
+            full_story_summary="Summary",
+            overall_image_style="Style",
+            main_characters=[CharacterDescription(name="Nibbles", appearance="Red squirrel")],
+            scenes=[Scene(scene_number=1, visual_description="Visual", narration_text="Narration")]
+        )
+        self.llm = FakeListChatModel(responses=[self.story.model_dump_json()] * 5)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_cache_hit_skips_llm(self):
+        """Test that identical requests are served from the cache."""
+        generator = StoryGenerator(self.llm, story_cache=self.cache)
+        
+        first = generator.generate_structured_story("A squirrel", 1)
+        second = generator.generate_structured_story("A squirrel", 1)
+        
+        self.assertEqual(first, self.story)
+        self.assertEqual(second, self.story)
+        self.assertEqual(self.llm.i, 1)
+        self.assertEqual(self.cache.stats, {"hits": 1, "misses": 1})
+    
+    def test_cache_key_includes_inputs(self):
+        """Test that a different scene count or subject misses the cache."""
+        # Without scene regeneration, so every request makes exactly one LLM call
+        generator = StoryGenerator(self.llm, story_cache=self.cache, scene_retries=0)
+        
+        generator.generate_structured_story("A squirrel", 1)
+        generator.generate_structured_story("A squirrel", 2)
+        generator.generate_structured_story("A fox", 1)
+        
+        self.assertEqual(self.llm.i, 3)
+    
+    def test_bypass_and_refresh(self):
+        """Test the explicit cache controls."""
+        generator = StoryGenerator(self.llm, story_cache=self.cache)
+        generator.generate_structured_story("A squirrel", 1)
+        
+        generator.generate_structured_story("A squirrel", 1, use_cache=False)
+        generator.generate_structured_story("A squirrel", 1, refresh_cache=True)
+        generator.generate_structured_story("A squirrel", 1)
+        
+        self.assertEqual(self.llm.i, 3)
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+
+class TestStoryGeneratorRepair(unittest.TestCase):
+    """Tests for single-call story generation with local JSON repair."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.story = StoryWithScenes(
+            title="Repaired Story",
+            full_story_summary="Summary",
+            overall_image_style="Style",
+            main_characters=[CharacterDescription(name="Nibbles", appearance="Red squirrel")],
+            scenes=[Scene(scene_number=i, visual_description=f"Visual {i}", narration_text=f"Narration {i}") for i in (1, 2)]
+        )
+    
+    def make_generator(self, *responses, **kwargs):
+        """Build a generator over a fake LLM returning the given responses in turn."""
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        self.llm = FakeListChatModel(responses=list(responses))
+        return StoryGenerator(self.llm, **kwargs)
+    
+    def test_valid_output_uses_one_call(self):
+        """Test that a valid completion is parsed without any further LLM call."""
+        generator = self.make_generator(self.story.model_dump_json(), "unused")
+        
+        self.assertEqual(generator.generate_structured_story("A squirrel", 2), self.story)
+        self.assertEqual(self.llm.i, 1)
+        self.assertEqual(generator.repair_stats["valid"], 1)
+    
+    def test_local_repair(self):
+        """Test that fenced, truncated output with trailing commas and bad numbering is repaired locally."""
+        data = self.story.model_dump()
+        data["scenes"][0]["scene_number"] = 7
+        del data["scenes"][1]["scene_number"]
+        broken = "Here is your story:\n```json\n" + json.dumps(data, indent=2).replace('"Red squirrel"', '"Red squirrel",')
+        # Cut off the closing brackets, as when the model runs out of tokens
+        broken = broken.rstrip()[:-3]
+        generator = self.make_generator(broken, self.story.model_dump_json())
+        
+        self.assertEqual(generator.generate_structured_story("A squirrel", 2), self.story)
+        self.assertEqual(self.llm.i, 1)
+        self.assertEqual(generator.repair_stats, {"valid": 0, "repaired": 1, "llm_repaired": 0, "failed": 0})
+    
+    def test_llm_repair_is_the_last_resort(self):
+        """Test that output that cannot be repaired locally is sent back to the LLM once."""
+        generator = self.make_generator("Sorry, I cannot write JSON.", self.story.model_dump_json(), "unused")
+        
+        self.assertEqual(generator.generate_structured_story("A squirrel", 2), self.story)
+        self.assertEqual(self.llm.i, 2)
+        self.assertEqual(generator.repair_stats["llm_repaired"], 1)
+        
+        generator = self.make_generator("Sorry, I cannot write JSON.", "Still no JSON.", "unused", llm_repair=True)
+        result = generator.generate_structured_story("A squirrel", 2)
+        
+        self.assertIsInstance(result, str)
+        self.assertIn("Error:", result)
+        self.assertEqual(self.llm.i, 2)
+        self.assertEqual(generator.repair_stats["failed"], 1)
+        
+        generator = self.make_generator("Sorry, I cannot write JSON.", "unused", llm_repair=False)
+        self.assertIsInstance(generator.generate_structured_story("A squirrel", 2), str)
+        self.assertEqual(self.llm.i, 1)
+
+
+class TestStoryGeneratorSceneRegeneration(unittest.TestCase):
+    """Tests for the validation and partial regeneration of scenes."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.story = {
+            "title": "Acorn Heist",
+            "full_story_summary": "Summary",
+            "overall_image_style": "Watercolor",
+            "main_characters": [{"name": "Nibbles", "appearance": "Red squirrel"}],
+            "scenes": [{"scene_number": i, "visual_description": f"Visual {i}", "narration_text": f"Narration {i}"} for i in (1, 2, 3)]
+        }
+    
+    def make_generator(self, *responses, **kwargs):
+        """Build a generator over a fake LLM returning the given responses in turn and recording its prompts."""
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        
+        class RecordingChatModel(FakeListChatModel):
+            prompts: list = []
+            
+            def _call(self, messages, *args, **kwargs):
+                self.prompts.append(messages[-1].content)
+                return super()._call(messages, *args, **kwargs)
+        
+        self.llm = RecordingChatModel(responses=[json.dumps(response) for response in responses] + ["unused"])
+        return StoryGenerator(self.llm, llm_repair=False, **kwargs)
+    
+    def test_only_defective_scenes_are_regenerated(self):
+        """Test that an empty and a missing scene are requested in one call, with context, and merged in place."""
+        broken = dict(self.story, scenes=[self.story["scenes"][0], dict(self.story["scenes"][1], narration_text=" ")])
+        replacements = {"scenes": self.story["scenes"][1:]}
+        generator = self.make_generator(broken, replacements)
+        
+        result = generator.generate_structured_story("A squirrel", 3)
+        
+        self.assertEqual(result, StoryWithScenes.model_validate(self.story))
+        self.assertEqual(self.llm.i, 2)
+        self.assertEqual(generator.scene_stats, {"checked": 1, "regenerated": 2, "unrecoverable": 0})
+        scene_prompt = self.llm.prompts[1]
+        for context in ("scenes 2, 3 are missing", "Acorn Heist", "Watercolor", "Nibbles: Red squirrel", "Scene 1: Narration 1"):
+            self.assertIn(context, scene_prompt)
+        self.assertNotIn(generator.format_instructions, scene_prompt)
+    
+    def test_numbering_and_extra_scenes_are_fixed_locally(self):
+        """Test that duplicate numbers are renumbered by position and extra scenes dropped without an LLM call."""
+        scenes = [dict(scene, scene_number=1) for scene in self.story["scenes"]]
+        generator = self.make_generator(dict(self.story, scenes=scenes))
+        
+        with self.assertLogs("src.generators.story_generator", level="WARNING") as logs:
+            result = generator.generate_structured_story("A squirrel", 2)
+        
+        self.assertTrue(any("Dropping 1 scenes beyond the 2 requested" in line for line in logs.output))
+        self.assertEqual([scene.scene_number for scene in result.scenes], [1, 2])
+        self.assertEqual(result.scenes[1].narration_text, "Narration 2")
+        self.assertEqual(self.llm.i, 1)
+        self.assertEqual(generator.scene_stats["regenerated"], 0)
+    
+    def test_unrecoverable_scenes(self):
+        """Test that a repeated scene whose replacement is invalid is left out after scene_retries rounds."""
+        repeated = dict(self.story["scenes"][0], scene_number=3)
+        broken = dict(self.story, scenes=self.story["scenes"][:2] + [repeated])
+        generator = self.make_generator(broken, {"scenes": [repeated]}, {"scenes": [dict(repeated, visual_description="")]}, scene_retries=2)
+        
+        with self.assertLogs("src.generators.story_generator", level="ERROR") as logs:
+            result = generator.generate_structured_story("A squirrel", 3)
+        
+        self.assertEqual(result.scenes, StoryWithScenes.model_validate(self.story).scenes[:2])
+        self.assertTrue(any("Scenes [3]" in line for line in logs.output))
+        self.assertEqual(self.llm.i, 3)
+        self.assertEqual(generator.scene_stats, {"checked": 1, "regenerated": 0, "unrecoverable": 1})
+    
+    def test_failed_regeneration_keeps_the_valid_scenes(self):
+        """Test that a failing regeneration request falls back to the valid scenes, keeping their numbers."""
+        broken = dict(self.story, scenes=[self.story["scenes"][0], dict(self.story["scenes"][1], narration_text=""), self.story["scenes"][2]])
+        generator = self.make_generator(broken)
+        
+        with patch.object(generator, "scene_chain") as scene_chain:
+            scene_chain.invoke.side_effect = RuntimeError("LLM unavailable")
+            result = generator.generate_structured_story("A squirrel", 3)
+        
+        self.assertEqual([scene.scene_number for scene in result.scenes], [1, 3])
+        self.assertEqual(generator.scene_stats["unrecoverable"], 1)
+        
+    def test_story_without_valid_scenes_fails(self):
+        """Test that a story is only rejected when none of its scenes is valid."""
+        empty = [dict(scene, visual_description="") for scene in self.story["scenes"]]
+        generator = self.make_generator(dict(self.story, scenes=empty), scene_retries=0)
+        
+        self.assertIsInstance(generator.generate_structured_story("A squirrel", 3), str)
+
+
+class SubjectChatModel(BaseChatModel):
+    """
+    Chat model that writes a one-scene story titled after the prompt's subject, tracking concurrency.
+    
+    It reports one token per prompt word and per completion character, and returns the story as a
+    tool call when bound to tools.
+    """
+    
+    active: int = 0
+    peak: int = 0
+    calls: int = 0
+    prompts: list = []
+    
+    @property
+    def _llm_type(self) -> str:
+        return "subject-chat-model"
+    
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=tools, **kwargs)
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        import re
+        import time
+        from langchain_core.messages import AIMessage
+        prompt = messages[-1].content
+        subject = re.search(r"\*\*Subject for the Story:\*\* (.+)", prompt).group(1).strip()
+        self.prompts.append(prompt)
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.02)
+            if subject == "boom":
+                raise RuntimeError("provider error")
+            story = {
+                "title": subject,
+                "full_story_summary": "Summary",
+                "overall_image_style": "Style",
+                "main_characters": [{"name": "Nibbles", "appearance": "Red squirrel"}],
+                "scenes": [{"scene_number": 1, "visual_description": "Visual", "narration_text": "Narration"}]
+            }
+            content = "not json" if subject == "garbage" else json.dumps(story)
+            usage = {"input_tokens": len(prompt.split()), "output_tokens": len(content)}
+            usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+            tool_calls = []
+            if kwargs.get("tools"):
+                tool_calls = [{"name": "StoryWithScenes", "args": story, "id": "call-1"}]
+                content = ""
+            message = AIMessage(content=content, tool_calls=tool_calls, usage_metadata=usage,
+                                response_metadata={"model_name": self._llm_type})
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        finally:
+            self.active -= 1
+
+
+class TestStoryGeneratorBatch(unittest.TestCase):
+    """Tests for batched and async story generation."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        import tempfile
+        self.temp_dir = tempfile.mkdtemp()
+        self.llm = SubjectChatModel()
+        self.generator = StoryGenerator(self.llm, story_cache=FileCache(self.temp_dir, suffix=".json"), llm_repair=False)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_batch_keeps_order_and_isolates_errors(self):
+        """Test that results follow the subjects, failures stay per item and concurrency is bounded."""
+        subjects = [f"Subject {i}" for i in range(6)] + ["boom", "garbage"]
+        
+        results = self.generator.generate_structured_stories(subjects, 1, max_concurrency=3)
+        
+        self.assertEqual([result.title for result in results[:6]], subjects[:6])
+        self.assertIn("provider error", results[6])
+        self.assertTrue(results[7].startswith("Error: Could not generate structured story for 'garbage'"))
+        self.assertLessEqual(self.llm.peak, 3)
+        self.assertGreater(self.llm.peak, 1)
+        
+        # Stories generated by the batch are served from the cache afterwards
+        calls = self.llm.calls
+        again = self.generator.generate_structured_stories(subjects[:2] + ["New subject"], 1)
+        self.assertEqual([result.title for result in again], subjects[:2] + ["New subject"])
+        self.assertEqual(self.llm.calls, calls + 1)
+    
+    def test_shared_generator_serves_concurrent_requests(self):
+        """Test that one generator serves many threads at once without cross-talk or per-call rebuilding."""
+        from concurrent.futures import ThreadPoolExecutor
+        generator = StoryGenerator(self.llm)
+        chain = generator.story_chain
+        partial_variables = dict(generator.prompt_template.partial_variables)
+        subjects = [f"Concurrent subject {i}" for i in range(16)]
+        
+        with patch.object(type(generator.parser), "get_format_instructions") as get_format_instructions:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda subject: generator.generate_structured_story(subject, 1), subjects))
+        
+        self.assertEqual([result.title for result in results], subjects)
+        self.assertGreater(self.llm.peak, 1)
+        # Nothing is rebuilt or mutated per call
+        get_format_instructions.assert_not_called()
+        self.assertIs(generator.story_chain, chain)
+        self.assertEqual(generator.prompt_template.partial_variables, partial_variables)
+        self.assertEqual(generator.repair_stats["valid"], len(subjects))
+    
+    def test_async_variants(self):
+        """Test the async single and batched variants."""
+        import asyncio
+        
+        story = asyncio.run(self.generator.agenerate_structured_story("Async subject", 1))
+        results = asyncio.run(self.generator.agenerate_structured_stories(["A", "boom", "Async subject"], 1, max_concurrency=2))
+        
+        self.assertEqual(story.title, "Async subject")
+        self.assertEqual(results[0].title, "A")
+        self.assertIn("Error:", results[1])
+        self.assertEqual(results[2], story)
+        self.assertEqual(self.llm.calls, 3)
+
+
+class TestStoryGeneratorPromptModes(unittest.TestCase):
+    """Tests for the structured-output prompt mode and token accounting."""
+    
+    def test_structured_mode_uses_a_lean_prompt(self):
+        """Test that structured mode parses tool calls and sends far fewer prompt tokens."""
+        from src.utils.profiling import profile_run
+        parser_llm = SubjectChatModel()
+        structured_llm = SubjectChatModel()
+        parser_generator = StoryGenerator(parser_llm)
+        structured_generator = StoryGenerator(structured_llm, prompt_mode="structured")
+        
+        with profile_run("lean") as profile:
+            structured_story = structured_generator.generate_structured_story("Lean subject", 1)
+        parser_story = parser_generator.generate_structured_story("Lean subject", 1)
+        
+        self.assertEqual(structured_generator.prompt_mode, "structured")
+        self.assertEqual(structured_story, parser_story)
+        self.assertNotIn(parser_generator.format_instructions, structured_llm.prompts[0])
+        self.assertIn(parser_generator.format_instructions, parser_llm.prompts[0])
+        self.assertLess(structured_generator.token_usage["input_tokens"], parser_generator.token_usage["input_tokens"] / 2)
+        self.assertEqual(structured_generator.token_usage["calls"], 1)
+        self.assertEqual(structured_generator.token_usage["input_tokens"], len(structured_llm.prompts[0].split()))
+        
+        report = profile.to_dict()
+        request = next(span for span in report["spans"] if span["name"] == "llm_request")
+        self.assertEqual(request["input_tokens"], structured_generator.token_usage["input_tokens"])
+        self.assertEqual(report["tokens"]["input"], structured_generator.token_usage["input_tokens"])
+    
+    def test_batch_tokens_are_summed(self):
+        """Test that the tokens of every call of a batch are counted."""
+        llm = SubjectChatModel()
+        generator = StoryGenerator(llm, prompt_mode="structured")
+        
+        results = generator.generate_structured_stories(["One", "Two", "Three"], 1)
+        
+        self.assertEqual([result.title for result in results], ["One", "Two", "Three"])
+        self.assertEqual(generator.token_usage["calls"], 3)
+        self.assertEqual(generator.token_usage["input_tokens"], sum(len(prompt.split()) for prompt in llm.prompts))
+    
+    def test_fallback_without_structured_output(self):
+        """Test that models without tool calling fall back to the parser prompt."""
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        story = StoryWithScenes(
+            title="Fallback", full_story_summary="Summary", overall_image_style="Style",
+            main_characters=[CharacterDescription(name="Nibbles", appearance="Red squirrel")],
+            scenes=[Scene(scene_number=1, visual_description="Visual", narration_text="Narration")]
+        )
+        generator = StoryGenerator(FakeListChatModel(responses=[story.model_dump_json()]), prompt_mode="structured")
+        
+        self.assertEqual(generator.prompt_mode, "parser")
+        self.assertEqual(generator.generate_structured_story("A squirrel", 1), story)
+        with self.assertRaises(ValueError):
+            StoryGenerator(SubjectChatModel(), prompt_mode="xml")
+
+
+class TestStoryGeneratorStreaming(unittest.TestCase):
+    """Tests for the incremental streaming story parser."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        import tempfile
+        from langchain_core.callbacks import BaseCallbackHandler
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.story = StoryWithScenes(
+            title="Streamed Story",
+            full_story_summary="Summary",
+            overall_image_style="Ink drawing",
+            main_characters=[CharacterDescription(name="Nibbles", appearance="Red squirrel")],
+            scenes=[Scene(scene_number=i, visual_description=f"Visual {i}", narration_text=f"Narration {i}") for i in (1, 2, 3)]
+        )
+        self.response = "```json\n" + self.story.model_dump_json(indent=2) + "\n```"
+        
+        tokens = []
+        class TokenCounter(BaseCallbackHandler):
+            def on_llm_new_token(self, token, **kwargs):
+                tokens.append(token)
+        self.tokens = tokens
+        self.llm = FakeListChatModel(responses=[self.response, "not json at all"], callbacks=[TokenCounter()])
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_parts_are_yielded_while_streaming(self):
+        """Test that style, characters and scenes are yielded before the LLM finishes."""
+        generator = StoryGenerator(self.llm)
+        events = []
+        tokens_at_event = []
+        for event, value in generator.stream_structured_story("A squirrel", 3):
+            events.append((event, value))
+            tokens_at_event.append(len(self.tokens))
+        
+        self.assertEqual([event for event, _ in events],
+                         ["overall_image_style", "main_characters", "scene", "scene", "scene", "story"])
+        self.assertEqual(events[0][1], "Ink drawing")
+        self.assertEqual(events[1][1], self.story.main_characters)
+        self.assertEqual([value for event, value in events if event == "scene"], self.story.scenes)
+        self.assertEqual(events[-1][1], self.story)
+        # The first scene arrives while most of the response is still to be streamed
+        self.assertLess(tokens_at_event[2], len(self.response) * 3 // 4)
+    
+    def test_invalid_output_ends_with_error(self):
+        """Test that a response that is not a valid story ends the stream with an error."""
+        generator = StoryGenerator(self.llm, llm_repair=False)
+        list(generator.stream_structured_story("A squirrel", 3))
+        
+        events = list(generator.stream_structured_story("A squirrel", 3))
+        
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][0], "error")
+        self.assertIn("Could not generate structured story", events[0][1])
+    
+    def test_cached_story_is_streamed(self):
+        """Test that a cached story is replayed as events without calling the LLM."""
+        generator = StoryGenerator(self.llm, story_cache=FileCache(self.temp_dir, suffix=".json"))
+        list(generator.stream_structured_story("A squirrel", 3))
+        
+        events = list(generator.stream_structured_story("A squirrel", 3))
+        
+        self.assertEqual(self.llm.i, 1)
+        self.assertEqual([event for event, _ in events][-2:], ["scene", "story"])
+        self.assertEqual(events[-1][1], self.story)
+
+
 if __name__ == "__main__":
     unittest.main()
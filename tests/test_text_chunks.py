@@ -0,0 +1,39 @@
+"""
+Tests for splitting narration texts into chunks.
+"""
+
+import unittest
+
+from src.utils.text_chunks import chunk_text, split_sentences
+
+
+class TestTextChunks(unittest.TestCase):
+    """Test suite for sentence splitting and chunking."""
+
+    def test_split_sentences(self):
+        """Test that sentences end at terminal punctuation, including a closing quote or bracket."""
+        text = 'It rained. "Was it cold?" Yes! The end… (Or not.) Last one'
+
+        self.assertEqual(split_sentences(text),
+                         ["It rained.", '"Was it cold?"', "Yes!", "The end…", "(Or not.)", "Last one"])
+        self.assertEqual(split_sentences("Version 2.5 is out."), ["Version 2.5 is out."])
+
+    def test_sentences_are_packed_into_chunks(self):
+        """Test that whole sentences are packed greedily up to the character limit."""
+        text = "One two. Three four. Five six seven eight. Nine."
+
+        self.assertEqual(chunk_text(text, 21), ["One two. Three four.", "Five six seven eight.", "Nine."])
+        self.assertEqual(chunk_text(text, 0), [text])
+        self.assertEqual(chunk_text("  Short.  ", 20), ["Short."])
+        self.assertEqual(chunk_text("   ", 20), [])
+
+    def test_long_sentences_are_split_between_words(self):
+        """Test that a sentence over the limit is split between words, and a word over it inside."""
+        chunks = chunk_text("alpha beta gamma delta epsilon. " + "x" * 12, 10)
+
+        self.assertEqual(chunks, ["alpha beta", "gamma", "delta", "epsilon.", "xxxxxxxxxx", "xx"])
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -194,6 +194,79 @@ class TestVideoAssembler(unittest.TestCase):
         mock_concatenate.assert_called_once()
         mock_final_clip.write_videofile.assert_called_once()
 
+    @patch('src.assemblers.video_assembler.ImageClip')
+    @patch('moviepy.editor.AudioFileClip')
+    def test_render_scene_segment(self, mock_audio_clip, mock_image_clip):
+        """Test encoding a single scene segment."""
+        mock_img_clip = MagicMock()
+        mock_segment_clip = MagicMock()
+        mock_image_clip.return_value = mock_img_clip
+        mock_img_clip.set_audio.return_value = mock_segment_clip
+        segment_path = os.path.join(self.temp_dir, "scene_1_segment.mp4")
+        
+        assembler = VideoAssembler()
+        result = assembler.render_scene_segment(
+            self.test_image_paths[0],
+            self.test_audio_paths[0],
+            3.0,
+            segment_path
+        )
+        
+        self.assertTrue(result.success)
+        self.assertEqual(result.output_path, segment_path)
+        self.assertEqual(result.duration, 3.0)
+        mock_image_clip.assert_called_once_with(self.test_image_paths[0], duration=3.0)
+        mock_segment_clip.write_videofile.assert_called_once()
+    
+    @patch('src.assemblers.video_assembler.ImageClip')
+    @patch('moviepy.editor.AudioFileClip')
+    def test_render_scene_segment_fade_and_cleanup(self, mock_audio_clip, mock_image_clip):
+        """Test that a segment fades in and its clips are closed when encoding fails."""
+        mock_img_clip = MagicMock()
+        mock_faded_clip = MagicMock()
+        mock_image_clip.return_value = mock_img_clip
+        mock_img_clip.set_audio.return_value.fx.return_value = mock_faded_clip
+        mock_faded_clip.write_videofile.side_effect = Exception("Encoding error")
+        segment_path = os.path.join(self.temp_dir, "scene_2_segment.mp4")
+        
+        assembler = VideoAssembler()
+        result = assembler.render_scene_segment(
+            self.test_image_paths[1],
+            self.test_audio_paths[1],
+            3.0,
+            segment_path,
+            fade_duration=0.5
+        )
+        
+        self.assertFalse(result.success)
+        self.assertIn("Encoding error", result.error)
+        self.assertEqual(mock_img_clip.set_audio.return_value.fx.call_args.args[1], 0.5)
+        mock_faded_clip.close.assert_called_once()
+        mock_img_clip.close.assert_called_once()
+        mock_audio_clip.return_value.close.assert_called_once()
+    
+    @patch('src.assemblers.video_assembler.ffmpeg')
+    def test_concatenate_segments(self, mock_ffmpeg):
+        """Test joining segments through the concat demuxer without re-encoding."""
+        written_lists = []
+        mock_ffmpeg.input.side_effect = lambda path, **kwargs: written_lists.append(open(path).read()) or MagicMock()
+        
+        assembler = VideoAssembler()
+        result = assembler.concatenate_segments(self.test_image_paths, self.test_output_path)
+        
+        self.assertTrue(result.success)
+        self.assertEqual(mock_ffmpeg.input.call_args.kwargs["format"], "concat")
+        self.assertIn(f"file '{self.test_image_paths[0]}'", written_lists[0])
+        self.assertFalse(os.path.exists(f"{self.test_output_path}.segments.txt"))
+    
+    def test_concatenate_segments_empty(self):
+        """Test concatenation with no segments."""
+        assembler = VideoAssembler()
+        result = assembler.concatenate_segments([], self.test_output_path)
+        
+        self.assertFalse(result.success)
+        self.assertIn("No segments provided", result.error)
+
 
 if __name__ == "__main__":
     unittest.main()
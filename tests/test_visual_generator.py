@@ -11,6 +11,7 @@ import pytest
 
 from src.generators.visual_generator import VisualGenerator
 from src.models.schemas import CharacterDescription, GenerationResult
+from src.utils.cache import FileCache
 
 
 class TestVisualGenerator(unittest.TestCase):
@@ -47,7 +48,7 @@ class TestVisualGenerator(unittest.TestCase):
     
     @patch('src.generators.visual_generator.Config')
     @patch('src.generators.visual_generator.OpenAI')
-    @patch('requests.get')
+    @patch('src.utils.http_client.HttpClientPool.get')
     def test_generate_dalle_image_success(self, mock_get, mock_openai_class, mock_config):
         """Test successful image generation with DALL-E."""
         # Configure mocks
@@ -84,7 +85,7 @@ class TestVisualGenerator(unittest.TestCase):
             self.assertTrue(result.success)
             self.assertEqual(result.output_path, self.test_image_path)
             mock_client.images.generate.assert_called_once()
-            mock_get.assert_called_once_with("https://test-url.com/image.png")
+            mock_get.assert_called_once_with("https://test-url.com/image.png", timeout=mock_config.PROVIDER_TIMEOUT_SECONDS)
     
     @patch('src.generators.visual_generator.Config')
     @patch('src.generators.visual_generator.aiplatform')
@@ -169,7 +170,7 @@ class TestVisualGenerator(unittest.TestCase):
         
         # Initialize the generator
         with patch('src.generators.visual_generator.OPENAI_AVAILABLE', True):
-            with patch('requests.get') as mock_get:
+            with patch('src.utils.http_client.HttpClientPool.get') as mock_get:
                 mock_get_response = MagicMock()
                 mock_get_response.content = b"test image content"
                 mock_get.return_value = mock_get_response
@@ -192,6 +193,60 @@ class TestVisualGenerator(unittest.TestCase):
                 self.assertIn("Watercolor painting", prompt)
                 self.assertIn("Small red squirrel", prompt)  # Character description should be included
 
+    @patch('src.generators.visual_generator.aiplatform')
+    @patch('src.generators.visual_generator.ImageGenerationModel')
+    def test_image_cache(self, mock_image_model_class, mock_aiplatform):
+        """Test that identical prompts are served from the image cache."""
+        mock_model = MagicMock()
+        mock_image_model_class.from_pretrained.return_value = mock_model
+        mock_model.generate_images.return_value = MagicMock(images=[MagicMock(image_bytes=b"png bytes")])
+        cache = FileCache(os.path.join(self.temp_dir, "cache"), suffix=".png")
+        
+        with patch('src.generators.visual_generator.VERTEX_AI_AVAILABLE', True):
+            generator = VisualGenerator(provider="google_vertex_ai_image", gcp_project_id="test-project",
+                                        gcp_location="us-central1", image_cache=cache)
+            first = generator.generate_image(self.overall_style, self.main_characters, self.scene_description,
+                                             os.path.join(self.temp_dir, "first.png"))
+            second = generator.generate_image(self.overall_style, self.main_characters, self.scene_description,
+                                              os.path.join(self.temp_dir, "second.png"))
+            other = generator.generate_image(self.overall_style, self.main_characters, "A different scene",
+                                             os.path.join(self.temp_dir, "other.png"))
+        
+        self.assertTrue(first.success and second.success and other.success)
+        self.assertEqual(mock_model.generate_images.call_count, 2)
+        with open(second.output_path, "rb") as f:
+            self.assertEqual(f.read(), b"png bytes")
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 2})
+        
+        for name in ("first.png", "second.png", "other.png"):
+            os.remove(os.path.join(self.temp_dir, name))
+        import shutil
+        shutil.rmtree(os.path.join(self.temp_dir, "cache"))
+
+    def test_cache_keys_use_the_provider_settings(self):
+        """Test that each provider's cache key depends on its own model only."""
+        cache = FileCache(os.path.join(self.temp_dir, "cache"), suffix=".png")
+        generator = VisualGenerator(provider="stable_diffusion_api", image_cache=cache)
+
+        self.assertIsNone(generator._cache_key("prompt", "standard"))
+
+        generator.provider = "google_vertex_ai_image"
+        imagen_key = generator._cache_key("prompt", "standard")
+        self.assertEqual(imagen_key, generator._cache_key("prompt", "hd"))
+        generator.dalle_model = "dall-e-2"
+        self.assertEqual(imagen_key, generator._cache_key("prompt", "standard"))
+        generator.vertex_ai_imagen_model_id = "imagen-3.0-generate-002"
+        self.assertNotEqual(imagen_key, generator._cache_key("prompt", "standard"))
+
+        generator.provider = "openai_dalle"
+        dalle_key = generator._cache_key("prompt", "standard")
+        generator.vertex_ai_imagen_model_id = "imagegeneration@002"
+        self.assertEqual(dalle_key, generator._cache_key("prompt", "standard"))
+        self.assertNotEqual(dalle_key, generator._cache_key("prompt", "hd"))
+        
+        import shutil
+        shutil.rmtree(os.path.join(self.temp_dir, "cache"))
+
 
 if __name__ == "__main__":
     unittest.main()
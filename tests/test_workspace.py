@@ -0,0 +1,109 @@
+"""
+Tests for run-scoped workspaces.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from src.core.workspace import RunWorkspace
+
+
+class TestRunWorkspace(unittest.TestCase):
+    """Test suite for the RunWorkspace class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.runs_dir = os.path.join(self.temp_dir, "runs")
+        self.videos_dir = os.path.join(self.temp_dir, "videos")
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_workspace(self, run_id="run1", **kwargs):
+        """Create a workspace in the temp directory."""
+        return RunWorkspace(self.runs_dir, run_id, self.videos_dir, **kwargs)
+
+    def write_scratch_video(self, workspace, data=b"video"):
+        """Write a dummy video into the workspace's scratch space."""
+        path = workspace.scratch_path("final_video.mp4")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_directories_are_created_per_run(self):
+        """Test that every run gets its own asset and scratch directories."""
+        first = self.make_workspace("a")
+        second = self.make_workspace("b")
+
+        for workspace in (first, second):
+            for directory in (workspace.audios_dir, workspace.images_dir, workspace.segments_dir):
+                self.assertTrue(os.path.isdir(directory))
+        self.assertNotEqual(first.audios_dir, second.audios_dir)
+
+    def test_publish_uses_template_and_never_overwrites(self):
+        """Test that publishing moves the video under the templated name without replacing existing files."""
+        workspace = self.make_workspace(video_filename_template="{run_id}.mp4")
+
+        first = workspace.publish(self.write_scratch_video(workspace, b"first"))
+        second = workspace.publish(self.write_scratch_video(workspace, b"second"))
+
+        self.assertEqual(first, os.path.join(self.videos_dir, "run1.mp4"))
+        self.assertEqual(second, os.path.join(self.videos_dir, "run1_1.mp4"))
+        with open(first, "rb") as f:
+            self.assertEqual(f.read(), b"first")
+        self.assertEqual(sorted(os.listdir(self.videos_dir)), ["run1.mp4", "run1_1.mp4"])
+
+    def test_concurrent_publishes_claim_distinct_names(self):
+        """Test that runs publishing under the same name at once each get their own file."""
+        workspaces = [self.make_workspace(f"run{i}", video_filename_template="video.mp4") for i in range(8)]
+        sources = [self.write_scratch_video(workspace, workspace.run_id.encode()) for workspace in workspaces]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            published = list(executor.map(lambda args: args[0].publish(args[1]), zip(workspaces, sources)))
+
+        self.assertEqual(len(set(published)), 8)
+        self.assertEqual(sorted(os.listdir(self.videos_dir)), sorted(os.path.basename(path) for path in published))
+        for workspace, path in zip(workspaces, published):
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), workspace.run_id.encode())
+
+    def test_publish_without_hard_links(self):
+        """Test that names are still claimed exclusively on filesystems without hard links."""
+        workspace = self.make_workspace(video_filename_template="{run_id}.mp4")
+        first = workspace.publish(self.write_scratch_video(workspace, b"first"))
+
+        with patch("src.core.workspace.os.link", side_effect=PermissionError("hard links not supported")):
+            second = workspace.publish(self.write_scratch_video(workspace, b"second"))
+
+        self.assertEqual(second, os.path.join(self.videos_dir, "run1_1.mp4"))
+        with open(first, "rb") as f:
+            self.assertEqual(f.read(), b"first")
+        with open(second, "rb") as f:
+            self.assertEqual(f.read(), b"second")
+        self.assertEqual(sorted(os.listdir(self.videos_dir)), ["run1.mp4", "run1_1.mp4"])
+
+    def test_cleanup_policies(self):
+        """Test when each cleanup policy removes the scratch directory."""
+        expectations = {
+            ("on_success", True): False,
+            ("on_success", False): True,
+            ("always", False): False,
+            ("never", True): True,
+        }
+        for (policy, success), scratch_kept in expectations.items():
+            workspace = self.make_workspace(f"{policy}-{success}", cleanup_policy=policy)
+            workspace.cleanup(success)
+            self.assertEqual(os.path.isdir(workspace.scratch_dir), scratch_kept, (policy, success))
+            self.assertTrue(os.path.isdir(workspace.audios_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()